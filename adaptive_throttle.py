@@ -0,0 +1,120 @@
+# adaptive_throttle.py - ホストの応答状況に応じてリクエスト間隔を自動調整するスロットル（AIMD）
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_THROTTLE_SETTINGS: Dict[str, Any] = {
+    'adaptive': True,
+    'initial_delay': 3.0,     # 最初のリクエスト間隔（秒）
+    'floor': 1.0,             # 間隔の下限（これより速くはしない）
+    'ceiling': 60.0,          # 間隔の上限
+    'decrease_step': 0.25,    # 正常応答ごとに間隔を縮める秒数（加算的な加速）
+    'backoff_factor': 2.0,    # 403/429/ブロック時に間隔を掛ける倍率（乗算的な減速）
+    'slow_latency': 8.0,      # この秒数を超える応答は「遅延」とみなして減速
+    'slow_backoff_factor': 1.5,
+    'jitter': 0.2,            # 間隔に加える±ゆらぎの割合
+}
+
+BACKOFF_STATUS_CODES = {403, 429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数またはHTTP日付）を秒数に変換"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostThrottle:
+    """1ホスト分のリクエスト間隔を管理する"""
+
+    def __init__(self, host: str, settings: Dict[str, Any]):
+        self.host = host
+        self.floor = float(settings['floor'])
+        self.ceiling = float(settings['ceiling'])
+        self.decrease_step = float(settings['decrease_step'])
+        self.backoff_factor = float(settings['backoff_factor'])
+        self.slow_latency = float(settings['slow_latency'])
+        self.slow_backoff_factor = float(settings['slow_backoff_factor'])
+        self.jitter = float(settings['jitter'])
+        self.delay = min(self.ceiling, max(self.floor, float(settings['initial_delay'])))
+        self._last_request = 0.0
+        self._hold_until = 0.0
+        self._lock = threading.Lock()
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.ceiling, max(self.floor, delay))
+
+    def wait(self) -> float:
+        """前回のリクエストから現在の間隔が経過するまで待機（戻り値: 待機した秒数）"""
+        with self._lock:
+            now = time.monotonic()
+            interval = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            start_at = max(self._last_request + interval, self._hold_until, now)
+            self._last_request = start_at
+        wait = start_at - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(0.0, wait)
+
+    def record(self, latency: float, status: Optional[int] = None, blocked: bool = False,
+               retry_after: Optional[float] = None) -> None:
+        """応答結果を反映して間隔を調整"""
+        with self._lock:
+            previous = self.delay
+            if blocked or (status in BACKOFF_STATUS_CODES):
+                self.delay = self._clamp(max(self.delay, self.floor) * self.backoff_factor)
+                reason = f"status {status}" if status in BACKOFF_STATUS_CODES else "block detected"
+            elif latency > self.slow_latency:
+                self.delay = self._clamp(self.delay * self.slow_backoff_factor)
+                reason = f"slow response {latency:.1f}s"
+            else:
+                self.delay = self._clamp(self.delay - self.decrease_step)
+                reason = None
+
+            if retry_after is not None:
+                self._hold_until = max(self._hold_until, time.monotonic() + retry_after)
+                self.delay = self._clamp(max(self.delay, retry_after))
+                reason = f"Retry-After {retry_after:.0f}s"
+
+        if reason:
+            logging.warning(f"    -> 🐢 Throttle {self.host}: {previous:.1f}s → {self.delay:.1f}s ({reason})")
+        else:
+            logging.debug(f"Throttle {self.host}: {previous:.1f}s → {self.delay:.1f}s")
+
+
+_throttles: Dict[str, HostThrottle] = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle_settings(config: Dict[str, Any], host: str) -> Dict[str, Any]:
+    """config.yamlのthrottle設定（全体＋ホスト別上書き）を取得"""
+    throttle_config = config.get('throttle', {}) or {}
+    settings = dict(DEFAULT_THROTTLE_SETTINGS)
+    settings.update({key: value for key, value in throttle_config.items() if key != 'hosts'})
+    settings.update((throttle_config.get('hosts', {}) or {}).get(host, {}) or {})
+    return settings
+
+
+def get_host_throttle(url: str, config: Dict[str, Any]) -> HostThrottle:
+    """URLのホストに対応するスロットルを取得（実行中は状態を保持）"""
+    host = urlsplit(url).netloc or url
+    with _throttles_lock:
+        throttle = _throttles.get(host)
+        if throttle is None:
+            throttle = HostThrottle(host, get_throttle_settings(config, host))
+            _throttles[host] = throttle
+        return throttle
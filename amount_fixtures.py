@@ -0,0 +1,443 @@
+# amount_fixtures.py - 金額解析エンジン（amount_parser）の比較用の表記コーパスと、導入前の各サイト別実装（テスト・ベンチマーク共通）
+import re
+import unicodedata
+from typing import Any, Callable, Dict, List, Tuple
+
+from amount_parser import amount_range, amount_to_yen
+from main2 import DataConverter
+import scraper_btix
+
+# 実際の一覧・詳細ページに現れる表記
+CORPUS = [
+    "5～10億円", "10～50億円", "50～100億円", "100億円超",
+    "5億円～10億円", "10億円～20億円", "2億円未満", "100億円以上",
+    "3,000万円～5,000万円", "5,000万円～1億円", "1億円～2億円", "3億円～5億円",
+    "～１億円", "１～５億円", "５億円以上", "５～１０億円", "１０～３０億円", "３０億円以上",
+    "3億円", "5,000万円", "8,000万円", "1.5億円", "2.3億円", "500百万円", "約820百万円",
+    "約53百万円（直近期実績）", "約1,200百万円（修正後）", "300～500百万円", "3千万円",
+    "６億円/年間", "７億２，０００万円/年間", "2億5,000万円～3億円", "1億円-2億円",
+    "▲1,000万円", "▲500万円～1,000万円", "1,000万円未満", "3億円以下", "1億円～",
+    "1億円ー2億円", "3,000万円 ※オーナー報酬調整後",
+    "3億円（別途協議）", "5億円（その他事業含む）", "約5億円 ※赤字部門あり", "別途", "その他",
+    "応相談", "非公開", "非開示", "赤字", "N/A", "希望なし", "**", "", "-",
+]
+
+# main2.pyのサイト別判定は各サイトの一覧・詳細ページに出る表記で比較する
+NIHON_MA_REVENUE_LABELS = [
+    "1億円～2億円", "2億円～5億円", "3億円～5億円", "5億円～10億円", "10億円～20億円", "20億円～50億円",
+    "50億円～100億円", "100億円以上", "非公開", "",
+]
+INTEGROUP_REVENUE_LABELS = ["～１億円", "１～５億円", "５億円以上", "５～１０億円", "１０～３０億円", "３０億円以上", "非公開", ""]
+NEWOLD_REVENUE_LABELS = ["1億円～3億円", "3億円～5億円", "5億円～10億円", "10億円以上", "応相談", ""]
+PROFIT_MAN_YEN_LABELS = [
+    "1,000万円～3,000万円", "2,000万円～5,000万円", "3,000万円～8,000万円", "5,000万円～1億円", "1億円以上",
+    "3,000万円", "5,000万円", "8,000万円", "1.5億円", "3千万円", "▲1,000万円", "赤字", "応相談", "",
+]
+ONDECK_LABELS = [
+    "約820百万円", "約53百万円（直近期実績）", "約1,200百万円（修正後）", "500百万円", "300～500百万円", "30～50百万円",
+    "30百万円", "25百万円", "約45百万円（直近期実績）", "▲12百万円", "350", "20", "応相談", "非開示", "-", "",
+]
+
+# ---------------------------------------------------------------------------
+# 従来実装（amount_parser導入前のコードをそのまま保持。デバッグ出力のみ削除）
+# ---------------------------------------------------------------------------
+
+
+def legacy_main_parse_financial_value(text: str) -> int:
+    """main.py DataConverter.parse_financial_value"""
+    if not text or any(keyword in text for keyword in ["非公開", "応相談", "赤字", "N/A", "希望なし", "黒字なし", "損益なし"]):
+        return 0
+    text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789')).replace(',', '')
+    target_text = re.split(r'[〜～-]', text)[-1]
+    match = re.search(r'([\d\.]+)', target_text)
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1))
+    except ValueError:
+        return 0
+    multipliers = {'億': 100_000_000, '千万': 10_000_000, '百万': 1_000_000, '万': 10_000}
+    for unit, multiplier in multipliers.items():
+        if unit in text:
+            value *= multiplier
+            break
+    return int(value)
+
+
+def legacy_speedma_parse_financial_value(text: str) -> int:
+    """main3.py SpeedMADataConverter.parse_financial_value"""
+    if not text or any(keyword in text for keyword in ["非公開", "応相談", "赤字", "N/A", "希望なし", "**"]):
+        return 0
+    text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789')).replace(',', '')
+    if any(separator in text for separator in ['〜', '～', '-', '?']):
+        for separator in ['〜', '～', '-', '?']:
+            if separator in text:
+                parts = text.split(separator)
+                if len(parts) >= 1:
+                    text = parts[0].strip()
+                break
+    match = re.search(r'([\d\.]+)', text)
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1))
+    except ValueError:
+        return 0
+    multipliers = {'億円': 100_000_000, '億': 100_000_000, '千万円': 10_000_000, '千万': 10_000_000,
+                   '百万円': 1_000_000, '百万': 1_000_000, '万円': 10_000, '万': 10_000}
+    for unit, multiplier in multipliers.items():
+        if unit in text:
+            value *= multiplier
+            break
+    return int(value)
+
+
+def _legacy_ondeck_normalize(text):
+    if not text:
+        return ""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', text))
+
+
+def _legacy_ondeck_convert_single(amount_str):
+    if not amount_str:
+        return 0
+    amount_str = _legacy_ondeck_normalize(amount_str).replace('円', '').replace(',', '')
+    if '百万' in amount_str:
+        match = re.search(r'(\d+(?:\.\d+)?)\s*百万', amount_str)
+        if match:
+            return int(float(match.group(1)) * 1_000_000)
+    elif '億' in amount_str:
+        match = re.search(r'(\d+(?:\.\d+)?)\s*億', amount_str)
+        if match:
+            return int(float(match.group(1)) * 100_000_000)
+    elif '万' in amount_str:
+        match = re.search(r'(\d+(?:,\d+)*(?:\.\d+)?)\s*万', amount_str)
+        if match:
+            return int(float(match.group(1).replace(',', '')) * 10_000)
+    elif '千' in amount_str:
+        match = re.search(r'(\d+(?:,\d+)*(?:\.\d+)?)\s*千', amount_str)
+        if match:
+            return int(float(match.group(1).replace(',', '')) * 1_000)
+    match = re.search(r'(\d+(?:,\d+)*(?:\.\d+)?)', amount_str)
+    if match:
+        return int(float(match.group(1).replace(',', '')))
+    return 0
+
+
+def legacy_ondeck_parse_amount(amount_str):
+    """scraper_ondeck.py OnDeckScraper.parse_amount"""
+    if not amount_str:
+        return 0
+    amount_str = _legacy_ondeck_normalize(amount_str)
+    amount_str = re.sub(r'約|（[^）]*）|直近期実績|修正後', '', amount_str)
+    for sep in ['～', '?', '?', '-', '〜', 'ー', '−', '–', '—']:
+        if sep in amount_str:
+            parts = amount_str.split(sep)
+            if len(parts) == 2:
+                return _legacy_ondeck_convert_single(parts[1].strip())
+    return _legacy_ondeck_convert_single(amount_str)
+
+
+def _legacy_btix_normalize(text):
+    if not text:
+        return text
+    text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
+    text = text.replace('，', ',').replace('、', ',')
+    text = text.replace('〜', '～').replace('~', '～').replace('ー', '～')
+    text = text.replace('▲', '-').replace('△', '-').replace('−', '-').replace('—', '-')
+    return text.replace('／', '/')
+
+
+def _legacy_btix_single(text):
+    if not text:
+        return 0
+    text = _legacy_btix_normalize(text)
+    value = 0
+    for pattern in [r'(-?[\d,，]+\.?\d*)', r'(-?[\d,，]+)', r'(-?\d+\.?\d*)']:
+        match = re.search(pattern, text)
+        if match:
+            try:
+                value = float(match.group(1).replace(',', '').replace('，', ''))
+                break
+            except ValueError:
+                continue
+    if value == 0:
+        return 0
+    unit_multiplier = 1
+    if "億" in text:
+        unit_multiplier = 100_000_000
+    elif "百万円" in text:
+        unit_multiplier = 1_000_000
+    elif "万" in text:
+        unit_multiplier = 10_000
+    elif "千" in text:
+        unit_multiplier = 1_000
+    return int(value * unit_multiplier)
+
+
+def legacy_btix_parse_financial_value(text):
+    """scraper_btix.py parse_financial_value"""
+    if not text:
+        return (0, 0)
+    if any(keyword in text for keyword in ["応相談", "非開示", "要相談", "別途", "その他"]):
+        return (0, 0)
+    normalized_text = re.sub(r'/年間?', '', _legacy_btix_normalize(text))
+    if "未満" in normalized_text or "以下" in normalized_text:
+        return (0, _legacy_btix_single(normalized_text))
+    if "以上" in normalized_text or normalized_text.rstrip().endswith("～"):
+        val = _legacy_btix_single(normalized_text)
+        return (float('-inf'), val) if val < 0 else (val, float('inf'))
+    parts = [normalized_text]
+    for sep in ["～", "〜", "~", "ー", "-", "から", "〜"]:
+        if sep in normalized_text:
+            parts = normalized_text.split(sep, 1)
+            break
+    if len(parts) >= 2:
+        return (_legacy_btix_single(parts[0].strip()), _legacy_btix_single(parts[1].strip()))
+    single_val = _legacy_btix_single(normalized_text)
+    return (single_val, single_val)
+
+
+def _legacy_batonz_single(text):
+    if not text:
+        return 0
+    text = text.replace(",", "").replace("，", "")
+    match = re.search(r'([\d\.]+)', text)
+    if not match:
+        return 0
+    value = float(match.group(1))
+    if "億" in text:
+        value *= 100_000_000
+    elif "万" in text:
+        value *= 10_000
+    elif "千" in text:
+        value *= 1_000
+    return int(value)
+
+
+def legacy_batonz_parse_financial_value(text):
+    """scraper_batonz.py parse_financial_value"""
+    if not text:
+        return (0, 0)
+    parts = [text]
+    is_range = False
+    for sep in ["～", "〜", "?", "？", "-", "ー", "–", "—"]:
+        if sep in text:
+            parts = text.split(sep)
+            is_range = True
+            break
+    if is_range and len(parts) >= 2:
+        return (_legacy_batonz_single(parts[0].strip()), _legacy_batonz_single(parts[1].strip()))
+    single_val = _legacy_batonz_single(text)
+    return (single_val, single_val)
+
+
+def _legacy_succeed_single(text):
+    if not text:
+        return 0
+    text = text.replace(",", "").replace("，", "").replace("▲", "-")
+    match = re.search(r'(-?[\d\.]+)', text)
+    if not match:
+        return 0
+    value = float(match.group(1))
+    if "億" in text:
+        value *= 100_000_000
+    elif "百万円" in text:
+        value *= 1_000_000
+    elif "万" in text:
+        value *= 10_000
+    elif "千" in text:
+        value *= 1_000
+    return int(value)
+
+
+def legacy_succeed_parse_financial_value(text):
+    """scraper_masucceed.py / scraper_macloud.py parse_financial_value（macloud版は数値の正規表現が壊れていて常に0だった）"""
+    if not text or "応相談" in text:
+        return (0, 0)
+    if "未満" in text or "以下" in text:
+        return (0, _legacy_succeed_single(text))
+    if "以上" in text or text.strip().endswith("〜"):
+        val = _legacy_succeed_single(text)
+        return (float('-inf'), val) if val < 0 else (val, float('inf'))
+    parts = [text]
+    for sep in ["～", "〜", "~", "ー"]:
+        if sep in text:
+            parts = text.split(sep)
+            break
+    if len(parts) >= 2:
+        return (_legacy_succeed_single(parts[0].strip()), _legacy_succeed_single(parts[1].strip()))
+    single_val = _legacy_succeed_single(text)
+    return (single_val, single_val)
+
+
+def legacy_nihon_ma_revenue(revenue_text):
+    """main2.py DataConverter.parse_nihon_ma_revenue（5億円以上）"""
+    if not revenue_text:
+        return False
+    return revenue_text in ["5億円～10億円", "10億円～20億円", "20億円～50億円", "50億円～100億円", "100億円以上"]
+
+
+def legacy_integroup_revenue(revenue_text):
+    """main2.py DataConverter.parse_integroup_revenue（5億円以上）"""
+    if not revenue_text:
+        return False
+    return revenue_text not in ["～１億円", "１～５億円"]
+
+
+def legacy_newold_revenue(revenue_text):
+    """main2.py DataConverter.parse_newold_revenue（3億円以上）"""
+    if not revenue_text:
+        return False
+    return revenue_text in ["3億円～5億円", "5億円～10億円"]
+
+
+def _legacy_man_yen_profit(profit_text, threshold_man):
+    """main2.py parse_newold_profit / parse_nihon_ma_profit の共通部分（threshold_manは万円単位）"""
+    if not profit_text:
+        return False
+    range_match = re.search(r'([\d,]+)万円～([\d,]+)万円', profit_text)
+    if range_match:
+        try:
+            return int(range_match.group(2).replace(',', '')) >= threshold_man
+        except ValueError:
+            pass
+    if '億円' in profit_text:
+        return True
+    single_match = re.search(r'([\d,]+)万円', profit_text)
+    if single_match:
+        try:
+            return int(single_match.group(1).replace(',', '')) >= threshold_man
+        except ValueError:
+            pass
+    return False
+
+
+def legacy_newold_profit(profit_text):
+    """main2.py DataConverter.parse_newold_profit（3,000万円以上）"""
+    return _legacy_man_yen_profit(profit_text, 3000)
+
+
+def legacy_nihon_ma_profit(profit_text):
+    """main2.py DataConverter.parse_nihon_ma_profit（5,000万円以上）"""
+    return _legacy_man_yen_profit(profit_text, 5000)
+
+
+def legacy_ondeck_revenue(revenue_text):
+    """main2.py DataConverter.parse_ondeck_revenue（300百万円以上）"""
+    if not revenue_text:
+        return False
+    if any(keyword in revenue_text for keyword in ['応相談', '非開示', '未開示', '-']):
+        return False
+    try:
+        cleaned_text = re.sub(r'約|[（(][^）)]*[）)]', '', revenue_text)
+        range_match = re.search(r'([\d,]+)～([\d,]+)', cleaned_text)
+        if range_match:
+            return int(range_match.group(1).replace(',', '')) >= 300
+        single_match = re.search(r'([\d,]+)', cleaned_text)
+        if single_match:
+            return int(single_match.group(1).replace(',', '')) >= 300
+    except (ValueError, AttributeError):
+        return False
+    return False
+
+
+def legacy_ondeck_profit(profit_text):
+    """main2.py DataConverter.parse_ondeck_profit（30百万円以上）"""
+    if not profit_text:
+        return False
+    if '▲' in profit_text or '－' in profit_text or profit_text.strip().startswith('-'):
+        return False
+    range_match = re.search(r'([\d,]+)～([\d,]+)', profit_text)
+    if range_match:
+        try:
+            return int(range_match.group(1).replace(',', '')) >= 30
+        except ValueError:
+            pass
+    single_match = re.search(r'([\d,]+)', profit_text)
+    if single_match:
+        try:
+            return int(single_match.group(1).replace(',', '')) >= 30
+        except ValueError:
+            pass
+    return False
+
+
+def meets_condition(value_range, threshold):
+    """standaloneスクレイパー共通の判定（範囲の最大値が閾値以上ならOK）"""
+    min_val, max_val = value_range
+    if max_val < 0 and threshold > 0:
+        return False
+    return max_val >= threshold
+
+
+# ---------------------------------------------------------------------------
+# 比較対象：(キー, 名前, 従来実装, 新実装, 判定に使われる値を取り出す関数)
+# ---------------------------------------------------------------------------
+
+
+def _is_true(value: Any) -> bool:
+    return bool(value)
+
+
+CASES: List[Tuple[str, str, Callable[[str], Any], Callable[[str], Any], Callable[[Any], Any], List[str]]] = [
+    ("main", "main.DataConverter (上限値)", legacy_main_parse_financial_value,
+     lambda text: amount_to_yen(text, 'upper'), lambda value: value >= 300_000_000, CORPUS),
+    ("speedma", "main3.SpeedMADataConverter (下限値)", legacy_speedma_parse_financial_value,
+     lambda text: amount_to_yen(text, 'lower'), lambda value: value >= 300_000_000, CORPUS),
+    ("ondeck", "OnDeckScraper.parse_amount (上限値)", legacy_ondeck_parse_amount,
+     lambda text: amount_to_yen(text, 'upper'), lambda value: value >= 300_000_000, CORPUS),
+    ("btix", "scraper_btix (範囲)", legacy_btix_parse_financial_value, scraper_btix.parse_financial_value,
+     lambda value: meets_condition(value, 300_000_000), CORPUS),
+    ("batonz", "scraper_batonz (範囲)", legacy_batonz_parse_financial_value, amount_range,
+     lambda value: meets_condition(value, 300_000_000), CORPUS),
+    ("succeed", "scraper_masucceed/macloud (範囲)", legacy_succeed_parse_financial_value, amount_range,
+     lambda value: meets_condition(value, 300_000_000), CORPUS),
+    ("nihon_ma_revenue", "main2.parse_nihon_ma_revenue (5億円以上)", legacy_nihon_ma_revenue,
+     DataConverter.parse_nihon_ma_revenue, _is_true, NIHON_MA_REVENUE_LABELS),
+    ("integroup_revenue", "main2.parse_integroup_revenue (5億円以上)", legacy_integroup_revenue,
+     DataConverter.parse_integroup_revenue, _is_true, INTEGROUP_REVENUE_LABELS),
+    ("newold_revenue", "main2.parse_newold_revenue (3億円以上)", legacy_newold_revenue,
+     DataConverter.parse_newold_revenue, _is_true, NEWOLD_REVENUE_LABELS),
+    ("newold_profit", "main2.parse_newold_profit (3,000万円以上)", legacy_newold_profit,
+     DataConverter.parse_newold_profit, _is_true, PROFIT_MAN_YEN_LABELS),
+    ("nihon_ma_profit", "main2.parse_nihon_ma_profit (5,000万円以上)", legacy_nihon_ma_profit,
+     DataConverter.parse_nihon_ma_profit, _is_true, PROFIT_MAN_YEN_LABELS),
+    ("ondeck_revenue", "main2.parse_ondeck_revenue (300百万円以上)", legacy_ondeck_revenue,
+     DataConverter.parse_ondeck_revenue, _is_true, ONDECK_LABELS),
+    ("ondeck_profit", "main2.parse_ondeck_profit (30百万円以上)", legacy_ondeck_profit,
+     DataConverter.parse_ondeck_profit, _is_true, ONDECK_LABELS),
+]
+
+# 従来実装の不具合で判定が異なる既知のケース（新実装側が正しい）。(キー, 表記) -> 理由
+KNOWN_DIFFERENCES: Dict[Tuple[str, str], str] = {
+    ("speedma", "5～10億円"): "従来実装は単位のない下限値「5」を5円として扱っていた",
+    ("speedma", "10～50億円"): "従来実装は単位のない下限値「10」を10円として扱っていた",
+    ("speedma", "50～100億円"): "従来実装は単位のない下限値「50」を50円として扱っていた",
+    ("speedma", "５～１０億円"): "従来実装は単位のない下限値「5」を5円として扱っていた",
+    ("speedma", "１０～３０億円"): "従来実装は単位のない下限値「10」を10円として扱っていた",
+    ("speedma", "300～500百万円"): "従来実装は単位のない下限値「300」を300円として扱っていた",
+    ("ondeck", "2億5,000万円～3億円"): "従来実装はNFKC正規化で「～」が「~」になって区切りと認識できず、先頭の「2億」だけを読んでいた",
+    ("batonz", "500百万円"): "従来実装は「百万」を万として扱っていた",
+    ("batonz", "約820百万円"): "従来実装は「百万」を万として扱っていた",
+    ("batonz", "約1,200百万円（修正後）"): "従来実装は「百万」を万として扱っていた",
+    ("batonz", "300～500百万円"): "従来実装は単位のない下限値を円、上限の「百万」を万として扱っていた",
+    ("batonz", "1億円～"): "従来実装は末尾の区切り文字の後ろ（空文字）を上限0として解析していた（btixと同じく上限なしとする）",
+    ("succeed", "1億円～"): "従来実装は全角の「～」を末尾の区切りとして認識せず上限0になっていた（btixと同じく上限なしとする）",
+    ("newold_profit", "3千万円"): "従来実装は「千万」の表記を読めず3,000万円を対象外にしていた",
+    ("main", "約5億円 ※赤字部門あり"): "従来実装は注記の中の「赤字」でも金額なしにしていた",
+    ("speedma", "約5億円 ※赤字部門あり"): "従来実装は注記の中の「赤字」でも金額なしにしていた",
+    ("btix", "3億円（別途協議）"): "従来実装は注記の中の「別途」でも金額なしにしていた",
+    ("btix", "5億円（その他事業含む）"): "従来実装は注記の中の「その他」でも金額なしにしていた",
+}
+
+
+def decision_differences() -> List[Tuple[str, str, Any, Any]]:
+    """従来実装と新実装で判定が異なる (キー, 表記, 従来の値, 新しい値) の一覧"""
+    differences = []
+    for key, _, legacy, new, decide, corpus in CASES:
+        for text in corpus:
+            legacy_value, new_value = legacy(text), new(text)
+            if decide(legacy_value) != decide(new_value):
+                differences.append((key, text, legacy_value, new_value))
+    return differences
@@ -0,0 +1,212 @@
+# amount_parser.py - 日本語の金額表記（5～10億円・3,000万円超・応相談など）を1パスで解析する共通エンジン
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+UNIT_MULTIPLIERS = {
+    '億': 100_000_000,
+    '千万': 10_000_000,
+    '百万': 1_000_000,
+    '万': 10_000,
+    '千': 1_000,
+    '円': 1,
+}
+
+# 全角数字・区切り文字・マイナス記号の表記揺れを1回のtranslateで統一（モジュール読み込み時に1回だけ作成）
+_NORMALIZE_TABLE = str.maketrans({
+    **{chr(ord('０') + i): str(i) for i in range(10)},
+    '．': '.', ',': None, '，': None, '、': None,
+    '〜': '～', '~': '～', '〰': '～',
+    '−': '-', '－': '-', '–': '-', '—': '-', '‐': '-',
+    '△': '▲',
+})
+
+# 長音記号「ー」は数値・単位と数字に挟まれたとき（「1億円ー2億円」）だけ区切り文字とみなす
+# （「3,000万円 ※オーナー報酬調整後」のような後ろのカタカナ語を区切りと誤認すると上限なしのレンジになる）
+_LONG_VOWEL_SEPARATOR = re.compile(r'(?<=[\d億万千百円])\s*ー\s*(?=\d)')
+
+_TOKEN_PATTERN = re.compile(
+    r'(?P<num>\d+(?:\.\d+)?)'
+    r'|(?P<unit>千万|百万|億|万|千|円)'
+    r'|(?P<sep>～|から|-)'
+    r'|(?P<neg>▲)'
+    r'|(?P<over>以上|超)'
+    r'|(?P<under>未満|以下)'
+    r'|(?P<period>年|期|月)'
+)
+
+# 「（直近期実績）」「(2023年3月期)」「※赤字部門あり」などの注記（中の数字や語を金額・非公開と誤認しないよう除去）
+_NOTE_PATTERN = re.compile(r'[（(][^）)]*[）)]|※.*')
+
+# 数値として扱えない表記（非公開・応相談・赤字など。注記を除いた本体だけで判定する）
+_UNDISCLOSED_PATTERN = re.compile(r'非公開|応相談|要相談|非開示|未開示|N/A|希望なし|黒字なし|損益なし|赤字|\*\*')
+
+
+@dataclass(frozen=True)
+class ParsedAmount:
+    """金額表記の解析結果（金額は円単位。レンジの片側が開いている場合はNone）"""
+    text: str
+    min: Optional[int] = None
+    max: Optional[int] = None
+    unit: Optional[str] = None        # 表記中で最も大きい単位（億・百万・万など）
+    open_lower: bool = False          # 「未満」「以下」「～1億円」
+    open_upper: bool = False          # 「以上」「超」「3億円～」
+    undisclosed: bool = False         # 「応相談」「非公開」など
+
+    @property
+    def has_value(self) -> bool:
+        return self.min is not None or self.max is not None
+
+    @property
+    def lower(self) -> int:
+        """レンジの下限（片側しかなければその値、値がなければ0）"""
+        if self.min is not None:
+            return self.min
+        return self.max if self.max is not None else 0
+
+    @property
+    def upper(self) -> int:
+        """レンジの上限（片側しかなければその値、値がなければ0）"""
+        if self.max is not None:
+            return self.max
+        return self.min if self.min is not None else 0
+
+    def as_range(self) -> Tuple[float, float]:
+        """(最小, 最大)のタプル。未満/以下は(0, 値)、以上/超は(値, inf)（マイナスなら(-inf, 値)）"""
+        if self.undisclosed or not self.has_value:
+            return (0, 0)
+        if self.min is None:
+            return (0, self.max)
+        if self.max is None:
+            return (float('-inf'), self.min) if self.min < 0 else (self.min, float('inf'))
+        return (self.min, self.max)
+
+
+def normalize_amount_text(text: str) -> str:
+    """全角数字・カンマ・チルダ・マイナス記号の表記揺れを統一"""
+    return _LONG_VOWEL_SEPARATOR.sub('～', text.translate(_NORMALIZE_TABLE))
+
+
+def _resolve_parts(parts: List[dict], default_unit: str) -> Tuple[List[int], Optional[str]]:
+    """
+    各パートの(数値, 単位)グループを円に換算（単位のない数値はレンジの相手側の単位を引き継ぐ）。
+    グループを足し合わせるのは「1億2,000万円」のように単位が小さくなっていく間だけで、
+    「1億円 2億円」のように単位が小さくならないグループが来たら最初の金額で打ち切る。
+    """
+    part_units = [next((unit for _, unit in part['groups'] if unit), None) for part in parts]
+    values = []
+    largest_unit = None
+    for index, part in enumerate(parts):
+        inherited = part_units[index]
+        if inherited is None:
+            neighbours = part_units[index + 1:] + part_units[:index][::-1]
+            inherited = next((unit for unit in neighbours if unit), default_unit)
+        total = 0.0
+        previous_unit = None
+        for number, unit in part['groups']:
+            if unit is None:
+                # 「2億5000」のように億の後ろに続く単位なしの数値は万とみなす
+                unit = '万' if previous_unit == '億' else inherited
+            if previous_unit is not None and UNIT_MULTIPLIERS[unit] >= UNIT_MULTIPLIERS[previous_unit]:
+                break
+            total += number * UNIT_MULTIPLIERS[unit]
+            previous_unit = unit
+            if largest_unit is None or UNIT_MULTIPLIERS[unit] > UNIT_MULTIPLIERS[largest_unit]:
+                largest_unit = unit
+        values.append(int(round(-total if part['neg'] else total)))
+    return values, largest_unit
+
+
+@lru_cache(maxsize=4096)
+def parse_amount(text: Optional[str], default_unit: str = '円',
+                 undisclosed_keywords: Tuple[str, ...] = ()) -> ParsedAmount:
+    """
+    金額表記を解析する（同じ表記は何度も出現するため結果をLRUキャッシュ）。
+    default_unitは単位が一切書かれていない数値の単位（オンデックの一覧など百万円表記なら'百万'）。
+    undisclosed_keywordsはそのサイトだけで金額なしを意味する語（MAXの「別途」「その他」など）。
+    """
+    if not text:
+        return ParsedAmount(text or '')
+
+    normalized = _NOTE_PATTERN.sub('', normalize_amount_text(text))
+    undisclosed = bool(_UNDISCLOSED_PATTERN.search(normalized)) or any(
+        keyword in normalized for keyword in undisclosed_keywords)
+
+    parts: List[dict] = []
+    current = {'groups': [], 'neg': False}
+    pending: Optional[float] = None
+    leading_sep = over = under = False
+    last_kind = None
+
+    for match in _TOKEN_PATTERN.finditer(normalized):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == 'num':
+            if pending is not None:
+                current['groups'].append((pending, None))
+            pending = float(token)
+        elif kind == 'unit':
+            if pending is not None:
+                current['groups'].append((pending, token))
+                pending = None
+        elif kind == 'sep':
+            if token == '-' and pending is None and not current['groups']:
+                # 数値より前の「-」はマイナス記号
+                current['neg'] = True
+                continue
+            if pending is not None:
+                current['groups'].append((pending, None))
+                pending = None
+            if current['groups']:
+                parts.append(current)
+                current = {'groups': [], 'neg': False}
+            elif not parts:
+                leading_sep = True
+        elif kind == 'neg':
+            current['neg'] = True
+        elif kind == 'over':
+            over = True
+        elif kind == 'under':
+            under = True
+        elif kind == 'period':
+            # 「2023年3月期」の年・月・期の数値は金額ではない
+            pending = None
+            continue
+        last_kind = kind
+
+    if pending is not None:
+        current['groups'].append((pending, None))
+    if current['groups']:
+        parts.append(current)
+
+    if not parts:
+        return ParsedAmount(text, undisclosed=undisclosed)
+
+    values, unit = _resolve_parts(parts, default_unit)
+    open_lower = under or leading_sep
+    open_upper = over or (last_kind == 'sep' and len(values) == 1)
+
+    if len(values) >= 2:
+        return ParsedAmount(text, values[0], values[1], unit, open_lower, open_upper, undisclosed)
+    value = values[0]
+    if open_lower:
+        return ParsedAmount(text, None, value, unit, True, False, undisclosed)
+    if open_upper:
+        return ParsedAmount(text, value, None, unit, False, True, undisclosed)
+    return ParsedAmount(text, value, value, unit, False, False, undisclosed)
+
+
+def amount_to_yen(text: Optional[str], pick: str = 'upper', default_unit: str = '円',
+                  undisclosed_keywords: Tuple[str, ...] = ()) -> int:
+    """金額表記を円の整数に変換（pick='upper'はレンジの上限、'lower'は下限。非公開等は0）"""
+    parsed = parse_amount(text, default_unit, undisclosed_keywords)
+    if parsed.undisclosed:
+        return 0
+    return parsed.upper if pick == 'upper' else parsed.lower
+
+
+def amount_range(text: Optional[str], default_unit: str = '円',
+                 undisclosed_keywords: Tuple[str, ...] = ()) -> Tuple[float, float]:
+    """金額表記を(最小, 最大)の円タプルに変換（ParsedAmount.as_range参照）"""
+    return parse_amount(text, default_unit, undisclosed_keywords).as_range()
@@ -0,0 +1,159 @@
+# async_fetcher.py - 全サイトの一覧ページを並行取得する非同期フェッチエンジン
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from http_client import DEFAULT_HEADERS
+
+
+def decode_response(response: httpx.Response) -> str:
+    """レスポンス本文をデコード（失敗時は日本語エンコーディングを順に試行）"""
+    try:
+        return response.text
+    except UnicodeDecodeError:
+        for encoding in ['utf-8', 'shift_jis', 'euc-jp', 'iso-2022-jp']:
+            try:
+                return response.content.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        return response.content.decode('utf-8', errors='ignore')
+
+
+def build_list_page_urls(site_config: Dict[str, Any]) -> List[str]:
+    """config.yamlのサイト設定から一覧ページURLを生成"""
+    base_url = site_config['url']
+    max_pages = site_config.get('max_pages', 1)
+    pagination = site_config.get('pagination', {}) or {}
+
+    urls = []
+    for page_num in range(1, max_pages + 1):
+        if pagination.get('type') == 'query_param':
+            urls.append(f"{base_url}?{pagination['param']}={page_num}")
+        elif pagination.get('type') == 'path':
+            urls.append(f"{base_url}{pagination['path'].format(page_num=page_num)}")
+        else:
+            urls.append(base_url)
+            break
+    return urls
+
+
+class _HostGate:
+    """ホスト単位の同時接続数制限とリクエスト間隔（ポライトネス）制御"""
+
+    def __init__(self, max_concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.delay = max(0.0, delay)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait_turn(self) -> None:
+        """前回のリクエスト開始からdelay秒経過するまで待機"""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncFetchEngine:
+    """httpx.AsyncClientで複数サイトの一覧ページを同時に取得する"""
+
+    def __init__(self, scraping_config: Optional[Dict[str, Any]] = None):
+        scraping_config = scraping_config or {}
+        fetch_config = scraping_config.get('async_fetch', {}) or {}
+        pool_config = scraping_config.get('http_pool', {}) or {}
+
+        self.timeout = scraping_config.get('timeout', 15)
+        self.max_retries = scraping_config.get('max_retries', 3)
+        self.retry_delay = scraping_config.get('retry_delay', 1)
+        self.max_concurrency = fetch_config.get('max_concurrency_per_host', 2)
+        self.politeness_delay = fetch_config.get('politeness_delay', 2.0)
+        self.host_overrides: Dict[str, Dict[str, Any]] = fetch_config.get('hosts', {}) or {}
+        self.limits = httpx.Limits(
+            max_connections=pool_config.get('max_connections_per_host', 10),
+            max_keepalive_connections=pool_config.get('max_keepalive_per_host', 5),
+            keepalive_expiry=pool_config.get('keepalive_expiry', 30.0),
+        )
+        self._gates: Dict[str, _HostGate] = {}
+
+    def _gate_for(self, url: str) -> _HostGate:
+        host = urlsplit(url).netloc
+        gate = self._gates.get(host)
+        if gate is None:
+            override = self.host_overrides.get(host, {})
+            gate = _HostGate(
+                override.get('max_concurrency', self.max_concurrency),
+                override.get('politeness_delay', self.politeness_delay),
+            )
+            self._gates[host] = gate
+        return gate
+
+    async def _fetch_one(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """1ページ取得（タイムアウト・5xxはリトライ、4xxは即座に諦める）"""
+        gate = self._gate_for(url)
+        for attempt in range(self.max_retries):
+            async with gate.semaphore:
+                await gate.wait_turn()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    content = decode_response(response)
+                    if not content:
+                        logging.error(f"Retrieved content is empty for {url}")
+                        return None
+                    return content
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code < 500:
+                        logging.error(f"HTTP client error (no retry): {e.response.status_code} for url {url}")
+                        return None
+                    logging.warning(f"Server error {e.response.status_code}. Retrying {attempt + 1}/{self.max_retries}: {url}")
+                except httpx.RequestError as e:
+                    logging.warning(f"Network error. Retrying {attempt + 1}/{self.max_retries}: {e}")
+                except Exception as e:
+                    logging.error(f"Unexpected error fetching {url}: {e}")
+                    return None
+            await asyncio.sleep(self.retry_delay * (attempt + 1))
+        logging.error(f"Max retries reached for {url}")
+        return None
+
+    async def _fetch_site(self, client: httpx.AsyncClient, site_name: str,
+                          urls: List[str]) -> Dict[str, Optional[str]]:
+        started = time.monotonic()
+        pages = await asyncio.gather(*(self._fetch_one(client, url) for url in urls))
+        fetched = sum(1 for page in pages if page)
+        logging.info(f"⚡ {site_name}: prefetched {fetched}/{len(urls)} list pages in {time.monotonic() - started:.1f}s")
+        return dict(zip(urls, pages))
+
+    async def fetch_sites(self, jobs: Dict[str, List[str]]) -> Dict[str, Dict[str, Optional[str]]]:
+        """サイト名→URL一覧を受け取り、全サイトを並行取得してサイト名→{URL: HTML}を返す"""
+        async with httpx.AsyncClient(headers=DEFAULT_HEADERS, timeout=self.timeout,
+                                     limits=self.limits, follow_redirects=True) as client:
+            results = await asyncio.gather(
+                *(self._fetch_site(client, site_name, urls) for site_name, urls in jobs.items()),
+                return_exceptions=True,
+            )
+
+        pages_by_site: Dict[str, Dict[str, Optional[str]]] = {}
+        for site_name, result in zip(jobs.keys(), results):
+            if isinstance(result, Exception):
+                logging.error(f"❌ Async prefetch failed for {site_name}: {result}")
+                pages_by_site[site_name] = {}
+            else:
+                pages_by_site[site_name] = result
+        return pages_by_site
+
+
+def prefetch_list_pages(jobs: Dict[str, List[str]], config: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """同期コードから呼び出すためのラッパー（一覧ページを全サイト同時に取得）"""
+    if not jobs:
+        return {}
+    engine = AsyncFetchEngine((config or {}).get('scraping', {}))
+    started = time.monotonic()
+    pages_by_site = asyncio.run(engine.fetch_sites(jobs))
+    logging.info(f"⚡ Prefetched list pages for {len(jobs)} sites in {time.monotonic() - started:.1f}s")
+    return pages_by_site
@@ -0,0 +1,66 @@
+# benchmark_amounts.py - 金額解析エンジン（amount_parser）と従来の各サイト別実装の同値性チェック＋ベンチマーク
+import argparse
+import sys
+import time
+from typing import Any, Callable, List
+
+from amount_fixtures import CASES, KNOWN_DIFFERENCES
+from amount_parser import parse_amount
+
+
+def check_equivalence() -> bool:
+    """全ケースで従来実装と新実装を比較（判定結果が既知の差分以外で変わらないことを確認）"""
+    ok = True
+    for key, name, legacy, new, decide, corpus in CASES:
+        same_value = same_decision = 0
+        unexpected = []
+        for text in corpus:
+            legacy_value, new_value = legacy(text), new(text)
+            if legacy_value == new_value:
+                same_value += 1
+            if decide(legacy_value) == decide(new_value):
+                same_decision += 1
+            elif (key, text) not in KNOWN_DIFFERENCES:
+                unexpected.append((text, legacy_value, new_value))
+        print(f"  {name}: 値一致 {same_value}/{len(corpus)}, 判定一致 {same_decision}/{len(corpus)}")
+        for text, legacy_value, new_value in unexpected:
+            ok = False
+            print(f"    ❌ '{text}': legacy={legacy_value} new={new_value}")
+    return ok
+
+
+def measure(func: Callable[[str], Any], texts: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return time.perf_counter() - started
+
+
+def run(repeat: int) -> int:
+    print("🔍 Equivalence check (legacy vs amount_parser)")
+    ok = check_equivalence()
+    print(f"  既知の差分（従来実装の不具合）: {len(KNOWN_DIFFERENCES)}件")
+    for (key, text), reason in KNOWN_DIFFERENCES.items():
+        print(f"    - {key} '{text}': {reason} → {parse_amount(text)}")
+
+    print(f"\n📊 Benchmark: each corpus × {repeat} runs")
+    for _, name, legacy, new, _, corpus in CASES:
+        parse_amount.cache_clear()
+        cold_started = time.perf_counter()
+        for text in corpus:
+            new(text)
+        cold = time.perf_counter() - cold_started
+        legacy_time = measure(legacy, corpus, repeat)
+        new_time = measure(new, corpus, repeat) + cold
+        print(f"  {name}: legacy {legacy_time * 1000:8.2f} ms | amount_parser {new_time * 1000:8.2f} ms"
+              f" | x{legacy_time / new_time:.1f}")
+    print(f"  cache: {parse_amount.cache_info()}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='金額解析エンジンの同値性チェックとベンチマーク')
+    parser.add_argument('--repeat', type=int, default=200, help='コーパスを繰り返す回数')
+    args = parser.parse_args()
+    sys.exit(run(args.repeat))
@@ -0,0 +1,155 @@
+# benchmark_btix_rows.py - MAX（btix）一覧テーブルの行判定・業界判定のベンチマーク（html.parser＋キーワード逐次照合 vs lxml＋KeywordMatcher）
+import argparse
+import random
+import re
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from fetched_document import FetchedDocument
+from scraper_btix import INDUSTRY_KEYWORDS, classify_row, extract_industry_info
+from selector_compiler import element_text
+
+ROW_TEMPLATES = [
+    "<tr><td>{n:06d}</td><td>関東地方の老舗{industry}企業、後継者不在のため譲渡を検討</td><td>東京都</td>"
+    "<td>売上規模 {revenue}</td><td>希望価格 {price}</td><td><a href=\"/matter/detail/{n}\">詳細</a></td></tr>",
+    "<tr><td>A{n:05d}</td><td>{industry}を展開する地域密着型の会社です。安定した顧客基盤あり</td><td>九州地方</td>"
+    "<td>{revenue}</td><td>{price}</td><td><a href=\"/matter/{n}\">詳細</a></td></tr>",
+    "<tr><td colspan=\"6\">お知らせ：掲載内容は毎週更新されます</td></tr>",
+]
+
+INDUSTRY_WORDS = ["ソフトウェア開発", "Web制作", "金属加工", "不動産仲介", "人材派遣", "物流", "飲食店",
+                  "温泉旅館", "デイサービス", "学習塾", "リース", "デザイン", "エステサロン", "保守点検", "農業"]
+
+REVENUE_WORDS = ["5億円/年間", "７億２，０００万円/年間", "3,000万円～5,000万円", "1億円以上", "応相談"]
+
+PRICE_WORDS = ["2億円", "5,000万円", "応相談", "1億円～2億円"]
+
+
+def build_page(rows: int, seed: int) -> str:
+    """ベンチマーク用の結果一覧ページHTMLを生成（ヘッダー行・ページ送り行を含む）"""
+    rng = random.Random(seed)
+    body = ["<tr><th>ID</th><th>案件名</th><th>所在地</th><th>売上</th><th>価格</th><th></th></tr>"]
+    for n in range(1, rows + 1):
+        body.append(rng.choice(ROW_TEMPLATES).format(
+            n=n, industry=rng.choice(INDUSTRY_WORDS), revenue=rng.choice(REVENUE_WORDS), price=rng.choice(PRICE_WORDS)))
+    body.append("<tr><td>ページ 1 / 10 &lt; 前へ 次へ &gt;</td></tr>")
+    return f"<html><head><title>案件一覧</title></head><body><table>{''.join(body)}</table></body></html>"
+
+
+def legacy_is_deal_row(text_content: str, header_skipped: bool) -> Optional[str]:
+    """変更前のscrape_all_pagesの行判定（キーワードごとの`in`照合）"""
+    if not header_skipped and ('タイトル' in text_content or 'ヘッダー' in text_content or
+                               '案件名' in text_content or ('ID' in text_content and '売上' in text_content)):
+        return 'header'
+    has_money = ('円' in text_content or '万' in text_content or '億' in text_content)
+    has_business_info = (
+        '売上' in text_content or '価格' in text_content or '規模' in text_content or
+        '事業' in text_content or '会社' in text_content or 'ID' in text_content or
+        '譲渡' in text_content or '買収' in text_content or '業界' in text_content or
+        '製造' in text_content or 'サービス' in text_content or '地方' in text_content or
+        '建設' in text_content or '不動産' in text_content
+    )
+    has_sufficient_content = len(text_content.strip()) > 20
+    not_navigation = not ('ページ' in text_content and ('前へ' in text_content or '次へ' in text_content))
+    if has_sufficient_content and not_navigation and (has_money or has_business_info):
+        return 'deal'
+    return None
+
+
+def legacy_extract_industry_info(text_content: str) -> Optional[str]:
+    """変更前のextract_industry_info（業界ごと・キーワードごとの逐次照合。デバッグ出力は除去）"""
+    found_industries = []
+    text_lower = text_content.lower()
+    for industry, keywords in INDUSTRY_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword.lower() in text_lower or keyword in text_content:
+                if industry not in found_industries:
+                    found_industries.append(industry)
+    if found_industries:
+        return found_industries[0]
+    advanced_patterns = [
+        (r'.*業$', '製造業'),
+        (r'.*サービス', 'サービス業'),
+        (r'.*システム', 'IT・システム'),
+        (r'.*商事|.*商社', '小売・卸売'),
+        (r'.*建設|.*工業', '建設・不動産'),
+    ]
+    for pattern, industry in advanced_patterns:
+        if re.search(pattern, text_content):
+            return industry
+    return None
+
+
+def legacy_classify_page(html: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    """変更前の経路：html.parserでパースし、行ごとにget_text()→逐次照合"""
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    header_skipped = False
+    for row in soup.select("tr"):
+        text_content = row.get_text()
+        kind = legacy_is_deal_row(text_content, header_skipped)
+        if kind == 'header':
+            header_skipped = True
+        results.append((kind, legacy_extract_industry_info(text_content) if kind == 'deal' else None))
+    return results
+
+
+def matcher_classify_page(html: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    """新しい経路：lxmlツリー上でKeywordMatcherにより1回の走査で判定"""
+    tree = FetchedDocument(html).tree
+    results = []
+    header_skipped = False
+    for row in tree.iter("tr"):
+        text_content = element_text(row)
+        kind, _ = classify_row(text_content, header_skipped)
+        if kind == 'header':
+            header_skipped = True
+        results.append((kind, extract_industry_info(text_content) if kind == 'deal' else None))
+    return results
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """repeat回実行したときの1回あたりの平均秒数"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(html: str, repeat: int) -> None:
+    legacy = legacy_classify_page(html)
+    fast = matcher_classify_page(html)
+    assert legacy == fast, "row classification results differ"
+
+    # 行テキストに対する判定部分だけの比較（パース・テキスト抽出を除く）
+    texts = [element_text(row) for row in FetchedDocument(html).tree.iter("tr")]
+    legacy_rows = measure(lambda: [legacy_extract_industry_info(t) for t in texts
+                                   if legacy_is_deal_row(t, True) == 'deal'], repeat)
+    fast_rows = measure(lambda: [extract_industry_info(t) for t in texts
+                                 if classify_row(t, True)[0] == 'deal'], repeat)
+    legacy_total = measure(lambda: legacy_classify_page(html), repeat)
+    fast_total = measure(lambda: matcher_classify_page(html), repeat)
+
+    deals = sum(1 for kind, _ in fast if kind == 'deal')
+    print(f"📊 MAX row benchmark: {len(fast)} rows ({deals} deal rows), {repeat} runs")
+    print(f"  classify only : sequential {legacy_rows * 1000:8.2f} ms | matcher {fast_rows * 1000:8.2f} ms"
+          f" | x{legacy_rows / fast_rows:.1f}")
+    print(f"  parse+classify: html.parser {legacy_total * 1000:8.2f} ms | lxml {fast_total * 1000:8.2f} ms"
+          f" | x{legacy_total / fast_total:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='MAX一覧テーブルの行判定ベンチマーク')
+    parser.add_argument('--html', help='保存済みの結果一覧ページ（省略時は合成ページを使用）')
+    parser.add_argument('--rows', type=int, default=500, help='合成ページの行数')
+    parser.add_argument('--repeat', type=int, default=20, help='計測の繰り返し回数')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.html:
+        with open(args.html, 'r', encoding='utf-8') as f:
+            page = f.read()
+    else:
+        page = build_page(args.rows, args.seed)
+    run(page, args.repeat)
@@ -0,0 +1,114 @@
+# benchmark_deal_batch.py - 過去案件の再判定ベンチマーク（1件ずつの条件分岐 vs DealBatchのベクトル演算）
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+from amount_parser import parse_amount
+from deal_batch import (ACCEPTED, PROFIT_BELOW, PROFIT_UNKNOWN, REVENUE_BELOW, REVENUE_UNKNOWN,
+                        DealBatch, ThresholdRule, load_threshold_rules)
+
+SITES = ["日本M&Aセンター", "インテグループ", "NEWOLD CAPITAL", "オンデック", "M&A総合研究所", "ストライク"]
+
+REVENUE_LABELS = [
+    "2億円未満", "2億円～5億円", "5億円～10億円", "10億円～20億円", "100億円以上",
+    "約820百万円", "3億5,000万円", "１２億円", "応相談", "非公開", "", "5億円～",
+]
+
+PROFIT_LABELS = [
+    "3,000万円～5,000万円", "5,000万円～1億円", "1億円超", "▲2,000万円", "赤字",
+    "約53百万円", "800万円", "2億円", "非開示", "", "1,000万円未満",
+]
+
+
+def build_archive(count: int, seed: int) -> List[Dict[str, str]]:
+    """ベンチマーク用の過去案件（辞書形式）を生成"""
+    rng = random.Random(seed)
+    return [
+        {
+            'site_name': rng.choice(SITES),
+            'deal_id': f"{n:06d}",
+            'revenue_text': rng.choice(REVENUE_LABELS),
+            'profit_text': rng.choice(PROFIT_LABELS),
+        }
+        for n in range(count)
+    ]
+
+
+def scalar_evaluate(deals: List[Dict[str, str]], default_rule: ThresholdRule,
+                    site_rules: Dict[str, ThresholdRule]) -> List[int]:
+    """従来方式：1件ずつ金額を解析して条件分岐（DealBatch.evaluateと同じ判定規則）"""
+    reasons = []
+    for deal in deals:
+        rule = site_rules.get(deal['site_name'], default_rule)
+        reason = ACCEPTED
+        for text, threshold, unknown, below in (
+                (deal['revenue_text'], rule.min_revenue, REVENUE_UNKNOWN, REVENUE_BELOW),
+                (deal['profit_text'], rule.min_profit, PROFIT_UNKNOWN, PROFIT_BELOW)):
+            if threshold <= 0:
+                continue
+            parsed = parse_amount(text)
+            if parsed.undisclosed or not parsed.has_value:
+                if rule.allow_unknown:
+                    continue
+                reason = unknown
+                break
+            if parsed.as_range()[1] < threshold:
+                reason = below
+                break
+        reasons.append(reason)
+    return reasons
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """repeat回実行したときの1回あたりの平均秒数"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(config_path: str, count: int, repeat: int, seed: int) -> Tuple[int, int]:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    default_rule, site_rules = load_threshold_rules(config)
+    deals = build_archive(count, seed)
+
+    print(f"📊 Deal batch benchmark: {count:,} deals, {repeat} runs")
+    for rule in [default_rule] + list(site_rules.values()):
+        print(f"  rule {rule.name}: revenue ≥ {rule.min_revenue:,.0f}, profit ≥ {rule.min_profit:,.0f}")
+
+    build_time = measure(lambda: DealBatch.from_deals(deals), 1)
+    batch = DealBatch.from_deals(deals)
+    result = batch.evaluate(default_rule, site_rules)
+
+    # 判定結果（合否と理由）が一致することを確認
+    expected = scalar_evaluate(deals, default_rule, site_rules)
+    mismatches = sum(1 for got, want in zip(result.reason_code.tolist(), expected) if got != want)
+    assert mismatches == 0, f"{mismatches} decisions differ between scalar and vectorized evaluation"
+
+    scalar_time = measure(lambda: scalar_evaluate(deals, default_rule, site_rules), repeat)
+    vector_time = measure(lambda: batch.evaluate(default_rule, site_rules), repeat)
+
+    print(f"\n  batch build (1回のみ): {build_time * 1000:8.2f} ms")
+    print(f"  re-evaluate: scalar {scalar_time * 1000:8.2f} ms | vectorized {vector_time * 1000:8.2f} ms"
+          f" | x{scalar_time / vector_time:.1f}")
+    print(f"  accepted: {int(result.accepted.sum()):,} / {len(result):,}")
+    for site_name, counts in result.summary().items():
+        print(f"    {site_name}: {counts}")
+    first_rejected = next((i for i in range(len(result)) if not result.accepted[i]), None)
+    if first_rejected is not None:
+        print(f"  e.g. {batch.deal_ids[first_rejected]}: {result.reason(first_rejected)}")
+    return int(result.accepted.sum()), len(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='過去案件の財務条件再判定ベンチマーク')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--deals', type=int, default=50_000, help='再判定する案件数')
+    parser.add_argument('--repeat', type=int, default=5, help='計測の繰り返し回数')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.config, args.deals, args.repeat, args.seed)
@@ -0,0 +1,259 @@
+# benchmark_features.py - 特色テキスト整形の比較（正規表現の置換を何段も重ねる従来の整形 vs 1回走査のFeatureNormalizer）
+import argparse
+import json
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List
+
+from features_normalizer import normalize_features
+
+FRAGMENTS = [
+    "【事業概要】", "【強み】", "【譲渡理由】", "【", "】", "【】",
+    "・", "・", "・", "○", "◆", "✓", "●", "◉", "▼", "■", "■", "◎", "☆", "※", "▲",
+    "。", "。", "、", "、", "．",
+    " ", " ", "　", "\t", "\n", "\n", "\n\n", " \n ", "\r\n", " ",
+    "関西地方を中心に", "企画・開発", "製造業", "安定した顧客基盤があります", "従業員30名", "売上高は増加傾向",
+    "後継者不在のため譲渡を検討", "技術力に定評があり", "大手企業との取引実績多数", "M&A", "m&a", "ab",
+    "M&Aを成功させるための秘訣", "を無料で進呈します。", "最新のM&A事例を踏まえて", "お気軽にお問合せください。",
+    "『中小企業M&Aの真実』", "無料価値算定サービス", "企業価値を無料で算定", "お問合せください。", "強引に売却を勧めたり",
+]
+
+
+def legacy_format_features_text(raw_text_block: str) -> str:
+    """
+    変更前の_format_features_text。
+    元の行頭マーカーのパターンは可変長の後読み（(?<=。\\s*)）でコンパイルできず常にre.errorになっていたため、
+    同じ意図の固定長の後読みに直した版を基準にする。
+    """
+    text_with_header_breaks = re.sub(r'(?<!^)(【[^【】]+】)', r'\n\1', raw_text_block)
+    line_start_marker_pattern = r'(?<=[。、\n])(\s*)([・○◆✓●◉▼■])'
+    if re.search(line_start_marker_pattern, text_with_header_breaks):
+        text_with_all_breaks = re.sub(line_start_marker_pattern, r'\1\n\2', text_with_header_breaks)
+        lines = text_with_all_breaks.splitlines()
+    else:
+        lines = text_with_header_breaks.splitlines()
+    final_lines = []
+    for line in lines:
+        stripped_line = line.strip()
+        if stripped_line:
+            cleaned_line = re.sub(r'^([・○◆✓●◉▼■　☆★※▲▽])[\s　\t]+', r'\1', stripped_line)
+            final_lines.append(cleaned_line)
+    return "\n".join(final_lines)
+
+
+def legacy_format_strike_text(text: str) -> str:
+    """変更前の_format_strike_text_with_linebreaks"""
+    if not text:
+        return ""
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        line_start_markers = ['■', '●', '◆', '○', '▼', '◎']
+        if any(line.startswith(marker) for marker in line_start_markers):
+            lines.append(re.sub(r'^([■●◆○▼◎])[\s　\t]+', r'\1', line))
+        elif '・' in line:
+            parts = re.split(r'(?<=。)\s*・|(?<=、)\s*・|^\s*・', line)
+            if len(parts) > 1:
+                for i, part in enumerate(parts):
+                    part = part.strip()
+                    if part:
+                        if i == 0 and not part.startswith('・'):
+                            lines.append(part)
+                        else:
+                            if not part.startswith('・'):
+                                part = f'・{part}'
+                            lines.append(re.sub(r'^([・])[\s　\t]+', r'\1', part))
+            else:
+                lines.append(line)
+        elif '■' in line and not line.startswith('■'):
+            parts = re.split(r'(?<=。)\s*■', line)
+            if len(parts) > 1:
+                if parts[0].strip():
+                    lines.append(parts[0].strip())
+                for part in parts[1:]:
+                    part = part.strip()
+                    if part:
+                        cleaned_part = re.sub(r'^[\s　\t]+', '', part)
+                        lines.append(f'■{cleaned_part}')
+            else:
+                lines.append(line)
+        else:
+            lines.append(line)
+    final_lines = []
+    seen = set()
+    for line in lines:
+        if line and len(line) > 2 and line not in seen:
+            final_lines.append(line)
+            seen.add(line)
+    return '\n'.join(final_lines)
+
+
+def masouken_fallback(cleaned_text: str) -> str:
+    """_format_masouken_textのマーカーがない場合の文単位の整形（変更なし）"""
+    if len(cleaned_text) > 500:
+        sentences = re.split(r'[。．]', cleaned_text)
+        truncated_sentences = []
+        current_length = 0
+        for sentence in sentences:
+            if current_length + len(sentence) > 500:
+                break
+            truncated_sentences.append(sentence.strip())
+            current_length += len(sentence)
+        cleaned_text = '。'.join([s for s in truncated_sentences if s])
+        if cleaned_text and not cleaned_text.endswith('。'):
+            cleaned_text += '。'
+    bullet_points = []
+    for sentence in re.split(r'[。．]', cleaned_text):
+        sentence = sentence.strip()
+        if len(sentence) > 10:
+            bullet_points.append(f"・{sentence}。")
+    return "\n".join(bullet_points[:3])
+
+
+def legacy_format_masouken_text(text: str) -> str:
+    """変更前の_format_masouken_text"""
+    if not text or len(text) < 20:
+        return ""
+    cleaned_text = text.strip()
+    if any(marker in cleaned_text for marker in ['・', '◆', '▼', '○', '●']):
+        lines = []
+        for line in cleaned_text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            found_marker = False
+            for marker in ['・', '◆', '▼', '○', '●']:
+                if marker in line:
+                    found_marker = True
+                    for part in line.split(marker)[1:]:
+                        part = part.strip()
+                        if len(part) > 10:
+                            cleaned_part = re.sub(r'^[\s　]+', '', part)
+                            lines.append(f"・{cleaned_part}")
+                    break
+            if not found_marker and len(line) > 10:
+                lines.append(f"・{line}")
+        if lines:
+            return '\n'.join(lines[:5])
+    return masouken_fallback(cleaned_text)
+
+
+def new_format_masouken_text(text: str) -> str:
+    """変更後の_format_masouken_text（main.pyと同じ手順）"""
+    if not text or len(text) < 20:
+        return ""
+    cleaned_text = text.strip()
+    if any(marker in cleaned_text for marker in ['・', '◆', '▼', '○', '●']):
+        formatted = normalize_features(cleaned_text, 'masouken')
+        if formatted:
+            return formatted
+    return masouken_fallback(cleaned_text)
+
+
+def legacy_clean_integroup_features(features_text: str) -> str:
+    """変更前のclean_integroup_features"""
+    if not features_text:
+        return features_text
+    unwanted_patterns = [
+        r'M&Aを成功させるための秘訣.*?を無料で進呈します。',
+        r'最新のM&A事例を踏まえて.*?お気軽にお問合せください。',
+        r'『中小企業M&Aの真実』.*?を無料で進呈します。',
+        r'無料価値算定サービス.*?お気軽にお問合せください。',
+        r'M&Aを成功させるための.*?無料で進呈します。',
+        r'企業価値を無料で算定.*?お問合せください。'
+    ]
+    cleaned_text = features_text
+    for pattern in unwanted_patterns:
+        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.DOTALL | re.IGNORECASE)
+    unwanted_keywords = [
+        "M&Aを成功させるための秘訣", "中小企業M&Aの真実", "無料で進呈します", "無料価値算定サービス",
+        "企業価値を無料で算定", "強引に売却を勧めたり", "お気軽にお問合せください"
+    ]
+    filtered_lines = []
+    for line in cleaned_text.split('\n'):
+        line = line.strip()
+        if line and not any(keyword in line for keyword in unwanted_keywords):
+            filtered_lines.append(line)
+    result = '\n'.join(filtered_lines).strip()
+    return re.sub(r'\n\s*\n\s*\n+', '\n\n', result)
+
+
+# 整形の種類 -> (変更前, 変更後)
+FORMATTERS: Dict[str, Any] = {
+    'default': (legacy_format_features_text, lambda text: normalize_features(text)),
+    'strike': (legacy_format_strike_text, lambda text: normalize_features(text, 'strike') if text else ""),
+    'masouken': (legacy_format_masouken_text, new_format_masouken_text),
+    'integroup': (legacy_clean_integroup_features,
+                  lambda text: normalize_features(text, 'integroup') if text else text),
+}
+
+
+SENTENCES = [
+    "関西地方を中心に事業を展開しています。", "企画・開発から製造まで一貫して対応。", "安定した顧客基盤があります。",
+    "従業員は30名で、技術力に定評があります。", "大手企業との取引実績が多数あります、", "後継者不在のため譲渡を検討しています。",
+]
+
+
+def random_texts(count: int, seed: int) -> List[str]:
+    """
+    半分は見出し・箇条書きで構成した案件説明風のテキスト、
+    半分は記号・空白・改行・宣伝文の断片をランダムに並べた境界条件用のテキスト
+    """
+    rng = random.Random(seed)
+    texts = []
+    for n in range(count):
+        if n % 2:
+            texts.append("".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60))))
+            continue
+        parts = []
+        for header in rng.sample(["【事業概要】", "【強み】", "【譲渡理由】", "【特徴】"], rng.randint(1, 3)):
+            parts.append(header + rng.choice(["\n", "", " "]))
+            for _ in range(rng.randint(1, 6)):
+                parts.append(rng.choice(["・", "■ ", "○", "◆", "● ", ""])
+                             + "".join(rng.sample(SENTENCES, rng.randint(1, 3))) + rng.choice(["\n", " ", ""]))
+        texts.append("".join(parts))
+    return texts
+
+
+def load_corpus(path: str) -> List[str]:
+    """保存済みの特色テキスト（1行1件のJSON文字列、または{"features": ...}）"""
+    texts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                texts.append(record.get('features', '') if isinstance(record, dict) else str(record))
+    return texts
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """repeat回実行したときの1回あたりの平均秒数"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(texts: List[str], repeat: int) -> None:
+    print(f"📊 Features normalizer benchmark: {len(texts)} texts, {repeat} runs")
+    for style, (legacy, new) in FORMATTERS.items():
+        for text in texts:
+            expected, actual = legacy(text), new(text)
+            assert expected == actual, f"{style}: output differs for {text!r}\n  legacy: {expected!r}\n  new   : {actual!r}"
+        legacy_time = measure(lambda: [legacy(text) for text in texts], repeat)
+        new_time = measure(lambda: [new(text) for text in texts], repeat)
+        print(f"  {style:10s}: chained {legacy_time * 1000:8.2f} ms | one-pass {new_time * 1000:8.2f} ms"
+              f" | x{legacy_time / new_time:.1f}  ✅ identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='特色テキスト整形のベンチマーク')
+    parser.add_argument('--corpus', help='保存済みの特色テキスト（JSON Lines）。省略時はランダム生成')
+    parser.add_argument('--texts', type=int, default=2000, help='ランダム生成するテキスト数')
+    parser.add_argument('--repeat', type=int, default=5, help='計測の繰り返し回数')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(load_corpus(args.corpus) if args.corpus else random_texts(args.texts, args.seed), args.repeat)
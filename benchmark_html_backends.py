@@ -0,0 +1,186 @@
+# benchmark_html_backends.py - サイトごとにHTMLパーサーのバックエンドを比較し、ゴールデン出力と一致する最速のものを選ぶ
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import scraper_macp
+import scraper_maroyal
+from html_backend import available_backends, get_html_backend
+
+# 変更前の挙動（スタンドアロンスクレイパーのhtml.parser）をゴールデン出力の基準にする
+REFERENCE_BACKEND = 'bs4-html.parser'
+
+# スクレイパー名 -> 一覧ページの抽出関数（html, backend_name）。保存ページは「<スクレイパー名>*.html」
+SITE_EXTRACTORS: Dict[str, Callable[[str, str], Any]] = {
+    'scraper_macp': lambda html, backend: scraper_macp.extract_list_deals(html, backend_name=backend),
+    'scraper_maroyal': lambda html, backend: scraper_maroyal.extract_list_deals(html, backend_name=backend),
+}
+
+# スクレイパー名 -> 詳細ページの抽出関数。保存ページは「<スクレイパー名>_detail*.html」（一覧ページの対象からは外す）
+DETAIL_EXTRACTORS: Dict[str, Callable[[str, str], Any]] = {
+    'scraper_macp': lambda html, backend: scraper_macp.extract_detail_features(html, backend_name=backend),
+    'scraper_maroyal': lambda html, backend: scraper_maroyal.extract_detail_features(html, backend_name=backend),
+}
+
+MACP_ITEM_TEMPLATE = """
+<article class="c-filter-project">
+  <p class="c-filter-project__no">案件No：{n:05d}</p>
+  <h4 class="c-filter-project__ttl">業歴50年超の部品メーカー　案件{n}</h4>
+  <dl class="c-filter-project__dataList"><dt>所在地</dt><dd>大阪府</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>概算売上</dt><dd>10億円</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>営業利益</dt><dd>8,000万円</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>希望金額</dt><dd>応相談</dd></dl>
+  <a class="c-cta" href="/deal/{n}/">詳細を見る</a>
+</article>
+"""
+
+# M&Aロイヤル：案件番号なし・絶対URLのリンク・「希望価格」見出し・対象外の項目など、MACPの合成ページにない分岐を通す
+MAROYAL_ITEM_TEMPLATE = """
+<article class="c-filter-project">
+  <h4 class="c-filter-project__ttl">【関東】調剤薬局チェーン（{n}店舗）</h4>
+  <dl class="c-filter-project__dataList"><dt>所在地</dt><dd>東京都・神奈川県</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>業種</dt><dd>医療・福祉</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>概算売上</dt><dd>5億円～10億円</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>営業利益</dt><dd>▲1,000万円</dd></dl>
+  <dl class="c-filter-project__dataList"><dt>希望価格</dt><dd>3億円</dd></dl>
+  <a class="c-cta" href="https://www.ma-cp.com/deal/r{n}/">詳細を見る</a>
+</article>
+"""
+
+MACP_DETAIL_PAGE = """
+<html><body><main>
+  <h4>所在地</h4><p>大阪府</p>
+  <h4>事業概要</h4>
+  <ul><li>自動車向け精密部品の製造</li><li>大手メーカー{n}社と直接取引</li><li></li></ul>
+  <p>・</p>
+  <div>ISO9001認証取得済みの自社工場</div>
+  <div>短文</div>
+  <h4>譲渡理由</h4><p>後継者不在</p>
+</main></body></html>
+"""
+
+# M&Aロイヤル：見出しがなく、本文の「・」の箇条書きから特色を拾うパターン
+MAROYAL_DETAIL_PAGE = """
+<html><body><main>
+  <section>
+    <p>・関東圏で調剤薬局を{n}店舗展開</p>
+    <p>・在宅医療への対応実績あり</p>
+    <p>・薬剤師の定着率が高い</p>
+  </section>
+  <p>ご興味のある方はお問い合わせください。</p>
+</main></body></html>
+"""
+
+SITE_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    'scraper_macp': (MACP_ITEM_TEMPLATE, MACP_DETAIL_PAGE),
+    'scraper_maroyal': (MAROYAL_ITEM_TEMPLATE, MAROYAL_DETAIL_PAGE),
+}
+
+
+def sample_page(site_key: str, items: int) -> str:
+    """保存ページがない場合に使うサイトごとの合成の一覧ページ"""
+    item_template = SITE_TEMPLATES[site_key][0]
+    body = "".join(item_template.format(n=n) for n in range(1, items + 1))
+    return f"<html><head><title>案件一覧</title></head><body><main>{body}</main></body></html>"
+
+
+def load_pages(pages_dir: Optional[str], site_key: str, items: int, detail: bool = False) -> List[Tuple[str, str]]:
+    """(ページ名, HTML)の一覧。保存ページがなければ合成ページ1枚"""
+    pages = []
+    if pages_dir:
+        pattern = f"{site_key}_detail*.html" if detail else f"{site_key}*.html"
+        for path in sorted(glob.glob(os.path.join(pages_dir, pattern))):
+            if not detail and os.path.basename(path).startswith(f"{site_key}_detail"):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append((path, f.read()))
+    if pages:
+        return pages
+    if detail:
+        return [("<synthetic detail page>", SITE_TEMPLATES[site_key][1].format(n=items))]
+    return [(f"<synthetic {items} items>", sample_page(site_key, items))]
+
+
+def load_golden(page_name: str) -> Optional[Any]:
+    """保存ページと同名の.golden.jsonがあれば読み込む"""
+    golden_path = f"{os.path.splitext(page_name)[0]}.golden.json"
+    if os.path.exists(golden_path):
+        with open(golden_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """repeat回実行したときの1回あたりの平均秒数"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def quietly(func: Callable[[], Any]) -> Any:
+    """スクレイパーの進捗表示（print）を捨てて実行する"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func()
+
+
+def run(pages_dir: Optional[str], items: int, repeat: int, write_golden: bool) -> Dict[str, Optional[str]]:
+    backends = available_backends()
+    print(f"📊 HTML backend benchmark: {', '.join(backends)} ({repeat} runs)")
+    recommendations: Dict[str, Optional[str]] = {}
+
+    for site_key, extract in SITE_EXTRACTORS.items():
+        # HTML_BACKENDは一覧・詳細ページの両方に使うため、両方がゴールデン出力と一致するバックエンドだけを候補にする
+        pages = [(page_name, html, extract) for page_name, html in load_pages(pages_dir, site_key, items)]
+        detail_pages = load_pages(pages_dir, site_key, items, detail=True)
+        pages += [(page_name, html, DETAIL_EXTRACTORS[site_key]) for page_name, html in detail_pages]
+        print(f"\n--- {site_key} ({len(pages) - len(detail_pages)} list pages, {len(detail_pages)} detail pages) ---")
+
+        goldens = []
+        for page_name, html, page_extract in pages:
+            golden = load_golden(page_name)
+            if golden is None:
+                golden = quietly(lambda: page_extract(html, REFERENCE_BACKEND))
+                if write_golden and os.path.exists(page_name):
+                    with open(f"{os.path.splitext(page_name)[0]}.golden.json", 'w', encoding='utf-8') as f:
+                        json.dump(golden, f, ensure_ascii=False, indent=2)
+            goldens.append(golden)
+
+        timings: List[Tuple[float, str]] = []
+        for backend_name in backends:
+            get_html_backend(backend_name)
+            try:
+                passed = all(quietly(lambda: page_extract(html, backend_name)) == golden
+                             for (_, html, page_extract), golden in zip(pages, goldens))
+            except Exception as e:
+                print(f"  {backend_name:16s}: error ({e})")
+                continue
+            elapsed = sum(quietly(lambda: measure(lambda: page_extract(html, backend_name), repeat))
+                          for _, html, page_extract in pages)
+            print(f"  {backend_name:16s}: {elapsed * 1000:8.2f} ms  {'✅ golden' if passed else '❌ differs'}")
+            if passed:
+                timings.append((elapsed, backend_name))
+
+        recommendations[site_key] = min(timings)[1] if timings else None
+        print(f"  → fastest passing backend: {recommendations[site_key] or 'none'}")
+
+    print("\nSet HTML_BACKEND in each scraper to the recommended backend:")
+    for site_key, backend_name in recommendations.items():
+        print(f"  {site_key}.py: HTML_BACKEND = \"{backend_name or REFERENCE_BACKEND}\"")
+    return recommendations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='HTMLパーサーバックエンドのサイト別ベンチマーク')
+    parser.add_argument('--pages', help='保存ページのディレクトリ（<スクレイパー名>*.html・<スクレイパー名>_detail*.html と任意の .golden.json）')
+    parser.add_argument('--items', type=int, default=50, help='合成ページの案件数（保存ページがない場合）')
+    parser.add_argument('--repeat', type=int, default=20, help='計測の繰り返し回数')
+    parser.add_argument('--write-golden', action='store_true',
+                        help=f'ゴールデン出力がない保存ページに {REFERENCE_BACKEND} の結果を書き出す')
+    args = parser.parse_args()
+    run(args.pages, args.items, args.repeat, args.write_golden)
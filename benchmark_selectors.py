@@ -0,0 +1,151 @@
+# benchmark_selectors.py - 一覧ページ抽出のベンチマーク（soupsieve経路 vs コンパイル済みXPath経路）
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+import main
+from fetched_document import FetchedDocument
+from selector_compiler import compile_site_plan, element_text
+
+ROYAL_ITEM_TEMPLATE = """
+<li class="p-case__unit">
+  <p class="p-case__no"><span>案件No.</span><span>{n:05d}</span></p>
+  <h2 class="p-case__ttl">関東エリアの製造業 案件{n}</h2>
+  <dl class="p-case__dl"><dt>売上高</dt><dd>5億円～10億円</dd></dl>
+  <dl class="p-case__dl"><dt>営業利益</dt><dd>5,000万円～1億円</dd></dl>
+  <dl class="p-case__dl"><dt>所在地</dt><dd>東京都</dd></dl>
+  <div class="p-case__txt">【特徴・強み】✓大手企業との長期取引実績があります ✓独自の技術による高い品質を維持しています</div>
+  <div class="p-case__more"><a href="/case/{n}/">詳細を見る</a></div>
+</li>
+"""
+
+MACP_ITEM_TEMPLATE = """
+<article class="c-filter-project">
+  <p class="c-filter-project__no">案件No：{n:05d}</p>
+  <h4 class="c-filter-project__ttl">業歴50年超の部品メーカー 案件{n}</h4>
+  <dl class="c-filter-project__dataList">
+    <dt>所在地</dt><dd>大阪府</dd>
+    <dt>概算売上</dt><dd>10億円</dd>
+    <dt>営業利益</dt><dd>8,000万円</dd>
+    <dt>希望金額</dt><dd>応相談</dd>
+  </dl>
+  <div class="c-filter-project__listBlock">
+    <h5 class="c-filter-project__label">事業内容</h5>
+    <div class="c-filter-project__lists">精密部品の製造・加工<br>大手メーカーとの長期取引</div>
+  </div>
+  <a class="c-cta" href="/deal/{n}/">詳細</a>
+</article>
+"""
+
+# サイト名 -> コンパイル済みプラン（run()で設定）
+_plans: Dict[str, Any] = {}
+
+TEMPLATES = {
+    "M&Aロイヤルアドバイザリー": ROYAL_ITEM_TEMPLATE,
+    "M&Aキャピタルパートナーズ": MACP_ITEM_TEMPLATE,
+}
+
+
+# サイト名 -> (従来のbs4パーサー, コンパイル済みプランのパーサー)
+PARSERS = {
+    "M&Aロイヤルアドバイザリー": (main.UniversalParser._parse_selector_based,
+                              main.UniversalParser._parse_selector_compiled),
+    "M&Aキャピタルパートナーズ": (main.UniversalParser._parse_ma_capital_partners,
+                              main.UniversalParser._parse_ma_capital_partners_compiled),
+}
+
+
+def build_page(template: str, items: int) -> str:
+    """ベンチマーク用の一覧ページHTMLを生成"""
+    body = "".join(template.format(n=n) for n in range(1, items + 1))
+    return f"<html><head><title>案件一覧</title></head><body><ul>{body}</ul></body></html>"
+
+
+def soupsieve_extract(site_config: Dict[str, Any], document: FetchedDocument) -> List[List[str]]:
+    """従来経路：soup.select / item.select_one（:contains含む）でフィールドを抽出"""
+    soup = document.soup
+    rows = []
+    for item in soup.select(site_config['item_selector']):
+        row = []
+        for selector in site_config['data_selectors'].values():
+            element = item.select_one(selector)
+            row.append(element.get_text(strip=True) if element else "")
+        rows.append(row)
+    return rows
+
+
+def compiled_extract(site_config: Dict[str, Any], document: FetchedDocument) -> List[List[str]]:
+    """コンパイル済み経路：lxmlツリーに対してXPathで抽出"""
+    plan = _plans[site_config['name']]
+    rows = []
+    for item in plan.item_selectors[0].all(document.tree):
+        row = []
+        for jp_key in plan.fields:
+            element = plan.fields[jp_key][0].first(item)
+            row.append(element_text(element, strip=True) if element is not None else "")
+        rows.append(row)
+    return rows
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """repeat回実行したときの1回あたりの平均秒数"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(config_path: str, items: int, repeat: int) -> None:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    # 計測中にデバッグ用HTMLを書き出さない
+    config.setdefault('debug', {})['save_html_files'] = False
+    main.CONFIG = config
+    sites = {site['name']: site for site in config.get('sites', []) if isinstance(site, dict)}
+
+    print(f"📊 Selector benchmark: {items} items/page, {repeat} runs")
+    for site_name, template in TEMPLATES.items():
+        site_config = sites[site_name]
+        _plans[site_name] = compile_site_plan(site_config)
+        html = build_page(template, items)
+
+        # 抽出結果が一致することを確認
+        baseline = soupsieve_extract(site_config, FetchedDocument(html))
+        compiled = compiled_extract(site_config, FetchedDocument(html))
+        assert baseline == compiled, f"{site_name}: extraction results differ"
+
+        parsed_soup = FetchedDocument(html)
+        parsed_soup.soup
+        parsed_tree = FetchedDocument(html)
+        parsed_tree.tree
+        extract_old = measure(lambda: soupsieve_extract(site_config, parsed_soup), repeat)
+        extract_new = measure(lambda: compiled_extract(site_config, parsed_tree), repeat)
+        total_old = measure(lambda: soupsieve_extract(site_config, FetchedDocument(html)), repeat)
+        total_new = measure(lambda: compiled_extract(site_config, FetchedDocument(html)), repeat)
+
+        print(f"\n--- {site_name} ({len(baseline)} deals) ---")
+        print(f"  extract only : soupsieve {extract_old * 1000:8.2f} ms | compiled {extract_new * 1000:8.2f} ms"
+              f" | x{extract_old / extract_new:.1f}")
+        print(f"  parse+extract: soupsieve {total_old * 1000:8.2f} ms | compiled {total_new * 1000:8.2f} ms"
+              f" | x{total_old / total_new:.1f}")
+
+        # パーサー全体（UniversalParser）の比較
+        legacy_parser, compiled_parser = PARSERS[site_name]
+        legacy = legacy_parser(site_config, FetchedDocument(html))
+        fast = compiled_parser(site_config, FetchedDocument(html), _plans[site_name])
+        assert legacy and legacy == fast, f"{site_name}: parser results differ"
+        parser_old = measure(lambda: legacy_parser(site_config, FetchedDocument(html)), repeat)
+        parser_new = measure(lambda: compiled_parser(site_config, FetchedDocument(html), _plans[site_name]), repeat)
+        print(f"  UniversalParser: legacy {parser_old * 1000:8.2f} ms | compiled {parser_new * 1000:8.2f} ms"
+              f" | x{parser_old / parser_new:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='一覧ページ抽出のベンチマーク')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--items', type=int, default=50, help='1ページあたりの案件数')
+    parser.add_argument('--repeat', type=int, default=20, help='計測の繰り返し回数')
+    args = parser.parse_args()
+    run(args.config, args.items, args.repeat)
@@ -0,0 +1,95 @@
+# benchmark_sheet_ids.py - 既存ID読み込みの比較（get_all_recordsで全セルを取得 vs unique_id列だけを取得）
+import argparse
+import hashlib
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Set
+
+from gspread.utils import numericise_all
+
+HEADERS = ['extraction_time', 'site_name', 'deal_id', 'title', 'features', 'location',
+           'revenue', 'profit', 'price', 'link', 'unique_id']
+
+SITES = ["M&A総合研究所", "M&Aキャピタルパートナーズ", "ストライク", "日本M&Aセンター", "インテグループ", "スピードM&A"]
+
+FEATURE_LINES = [
+    "【事業概要】", "・関西地方を中心に事業を展開しています。", "・企画・開発から製造まで一貫して対応。",
+    "・安定した顧客基盤があります。", "・従業員は30名で、技術力に定評があります。", "・後継者不在のため譲渡を検討しています。",
+    "■大手企業との取引実績が多数あります。", "【強み】", "・売上高は増加傾向で、営業利益率は10%を超えています。",
+]
+
+
+def build_sheet(rows: int, seed: int) -> List[List[str]]:
+    """ベンチマーク用のシート（見出し行＋rows行）を生成"""
+    rng = random.Random(seed)
+    values = [HEADERS]
+    for n in range(rows):
+        site = rng.choice(SITES)
+        deal_id = f"{n:06d}"
+        values.append([
+            "2026-10-01 09:00:00", site, deal_id, f"【{rng.choice(['製造業', '建設業', 'IT', '小売'])}】案件{n}",
+            "\n".join(rng.sample(FEATURE_LINES, rng.randint(3, 8))), rng.choice(["東京都", "大阪府", "愛知県"]),
+            f"{rng.randint(3, 80)}億円", f"{rng.randint(3, 90) * 1000}万円", rng.choice(["応相談", "5億円", ""]),
+            f"https://example.com/deals/{deal_id}", hashlib.md5(f"{site}_{deal_id}".encode()).hexdigest(),
+        ])
+    return values
+
+
+def full_range_payload(values: List[List[str]]) -> bytes:
+    """get_all_records（values.get、行方向）のレスポンス本文"""
+    return json.dumps({'range': "'Sheet1'!A1:K", 'majorDimension': 'ROWS', 'values': values},
+                      ensure_ascii=False).encode('utf-8')
+
+
+def column_payload(values: List[List[str]]) -> bytes:
+    """col_values（values.get、列方向・1列のみ）のレスポンス本文"""
+    column = [row[HEADERS.index('unique_id')] for row in values]
+    return json.dumps({'range': "'Sheet1'!K1:K", 'majorDimension': 'COLUMNS', 'values': [column]},
+                      ensure_ascii=False).encode('utf-8')
+
+
+def legacy_ids(body: bytes) -> Set[str]:
+    """変更前：全セルを辞書のリストに変換（get_all_recordsと同じ数値変換付き）してからunique_idを集める"""
+    data = json.loads(body)['values']
+    keys = data[0]
+    records = [dict(zip(keys, numericise_all(row))) for row in data[1:]]
+    return {row['unique_id'] for row in records if row.get('unique_id')}
+
+
+def column_ids(body: bytes) -> Set[str]:
+    """変更後：unique_id列の値をそのまま集合にする（先頭は見出し）"""
+    values = json.loads(body)['values'][0]
+    return {str(value) for value in values[1:] if value not in (None, '')}
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """repeat回実行したときの1回あたりの平均秒数"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(rows: int, repeat: int, seed: int) -> Dict[str, float]:
+    values = build_sheet(rows, seed)
+    full_body, column_body = full_range_payload(values), column_payload(values)
+    assert legacy_ids(full_body) == column_ids(column_body), "ID sets differ"
+
+    legacy_time = measure(lambda: legacy_ids(full_body), repeat)
+    column_time = measure(lambda: column_ids(column_body), repeat)
+    print(f"📊 Existing-ID load benchmark: {rows} rows, {repeat} runs")
+    print(f"  payload : all records {len(full_body) / 1024:9.1f} KiB | unique_id column {len(column_body) / 1024:9.1f} KiB"
+          f" | -{(1 - len(column_body) / len(full_body)) * 100:.1f}%")
+    print(f"  parse   : all records {legacy_time * 1000:9.2f} ms  | unique_id column {column_time * 1000:9.2f} ms"
+          f"  | -{(1 - column_time / legacy_time) * 100:.1f}%  ✅ identical IDs")
+    return {'payload_ratio': len(column_body) / len(full_body), 'time_ratio': column_time / legacy_time}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='既存ID読み込みのベンチマーク')
+    parser.add_argument('--rows', type=int, default=8000, help='シートの行数')
+    parser.add_argument('--repeat', type=int, default=5, help='計測の繰り返し回数')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.rows, args.repeat, args.seed)
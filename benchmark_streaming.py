@@ -0,0 +1,99 @@
+# benchmark_streaming.py - 大きな一覧ページの解析比較（全体を受信してからパース vs チャンクごとのストリーミング解析）
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, List, Optional, Tuple
+
+import yaml
+
+import main
+from benchmark_selectors import ROYAL_ITEM_TEMPLATE, build_page
+from fetched_document import FetchedDocument
+from selector_compiler import compile_site_plan
+from streaming_parser import StreamingListParser
+
+SITE_NAME = "M&Aロイヤルアドバイザリー"
+
+
+def chunked(data: bytes, chunk_size: int) -> List[bytes]:
+    """受信チャンクを模擬"""
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def full_page(site_config, plan, chunks: List[bytes], encoding: str = 'utf-8') -> Tuple[list, int]:
+    """従来方式：全チャンクを連結してからパース（最初の案件は全受信後）"""
+    html = b"".join(chunks).decode(encoding)
+    deals = main.UniversalParser._parse_selector_compiled(site_config, FetchedDocument(html), plan)
+    return deals, len(chunks)
+
+
+def streamed(site_config, plan, chunks: List[bytes], charset: Optional[str] = 'utf-8') -> Tuple[list, int]:
+    """ストリーミング方式：チャンクごとにfeedし、閉じたアイテムから順に取り出す（charsetはContent-Typeヘッダーの値）"""
+    base_url = '/'.join(site_config['url'].split('/')[:3])
+    parser = StreamingListParser(plan.item_selectors[0].css,
+                                 lambda item: main.UniversalParser._compiled_item_to_deal(site_config, item, plan, base_url),
+                                 encoding=charset)
+    deals = []
+    first_item_chunk = None
+    for index, chunk in enumerate(chunks, 1):
+        deals.extend(parser.feed(chunk))
+        if deals and first_item_chunk is None:
+            first_item_chunk = index
+    deals.extend(parser.close())
+    return deals, first_item_chunk or len(chunks)
+
+
+def profile(func: Callable[[], Any]) -> Tuple[Any, float, int]:
+    """(結果, 秒数, ピークメモリ[バイト])"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(config_path: str, items: int, chunk_size: int) -> None:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    main.CONFIG = config
+    main.CONFIG.setdefault('selector_memory', {})['enabled'] = False
+    site_config = next(site for site in config['sites'] if isinstance(site, dict) and site.get('name') == SITE_NAME)
+    plan = compile_site_plan(site_config)
+
+    data = build_page(ROYAL_ITEM_TEMPLATE, items).encode('utf-8')
+    chunks = chunked(data, chunk_size)
+
+    (baseline, baseline_first), full_time, full_peak = profile(lambda: full_page(site_config, plan, chunks))
+    (streamed_deals, stream_first), stream_time, stream_peak = profile(lambda: streamed(site_config, plan, chunks))
+    assert baseline == streamed_deals, "streamed deals differ from full-page parsing"
+
+    # Content-Typeにcharsetがないページ（metaタグなしのUTF-8、metaタグだけで宣言したShift_JIS）も同じ結果になること
+    no_charset, _ = streamed(site_config, plan, chunks, charset=None)
+    assert no_charset == baseline, "UTF-8 page without a charset header decoded differently"
+    sjis_html = build_page(ROYAL_ITEM_TEMPLATE, items).replace(
+        '<head>', '<head><meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">', 1)
+    sjis_data = sjis_html.encode('cp932', errors='xmlcharrefreplace')
+    sjis_chunks = chunked(sjis_data, chunk_size)
+    sjis_baseline, _ = full_page(site_config, plan, sjis_chunks, encoding='shift_jis')
+    sjis_streamed, _ = streamed(site_config, plan, sjis_chunks, charset=None)
+    assert sjis_streamed == sjis_baseline and len(sjis_streamed) == len(baseline), \
+        "Shift_JIS page with a meta charset decoded differently"
+
+    print(f"📊 Streaming benchmark: {SITE_NAME}, {len(baseline)} deals, {len(data) / 1024:.0f} KiB "
+          f"in {len(chunks)} chunks of {chunk_size} bytes")
+    print(f"  first deal available after chunk: full {baseline_first:5d} | streaming {stream_first:5d}")
+    print(f"  total time : full {full_time * 1000:8.2f} ms | streaming {stream_time * 1000:8.2f} ms")
+    print(f"  peak memory: full {full_peak / 1024:8.0f} KiB | streaming {stream_peak / 1024:8.0f} KiB"
+          f" (results included)")
+    print("  encoding   : charset header / no charset (UTF-8) / meta charset only (Shift_JIS)  ✅ identical deals")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='一覧ページのストリーミング解析ベンチマーク')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--items', type=int, default=2000, help='1ページあたりの案件数')
+    parser.add_argument('--chunk-size', type=int, default=16384, help='受信チャンクのバイト数')
+    args = parser.parse_args()
+    run(args.config, args.items, args.chunk_size)
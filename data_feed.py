@@ -0,0 +1,322 @@
+# data_feed.py - 一覧を埋めるJSON（XHR/fetch）をChrome DevToolsの通信ログから特定し、次回以降はブラウザを使わず直接取得する
+import base64
+import datetime
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from http_client import get_http_client
+
+DEFAULT_FEED_PATH = 'data_feed.json'
+
+DEFAULT_FEED_SETTINGS: Dict[str, Any] = {
+    'enabled': False,
+    'min_matches': 3,   # 一覧に表示された案件IDのうち、この件数以上を含むJSONだけをフィードとみなす
+    'timeout': 15,
+    'retry_capture_hours': 24,  # フィードが見つからなかった一覧ページで、通信ログ記録用のブラウザを再び起動するまでの間隔
+}
+
+# 再送しないリクエストヘッダー（接続・Cookie・共有クライアントが自動で付けるもの）
+_SKIPPED_HEADERS = {'cookie', 'content-length', 'host', 'connection', 'accept-encoding', 'user-agent'}
+
+
+class FeedError(Exception):
+    """フィードの取得・解析に失敗した（ブラウザでの取得にフォールバックする）"""
+
+
+def get_feed_settings(config: Dict[str, Any], site_name: str) -> Dict[str, Any]:
+    """config.yamlのdata_feed設定（default＋サイト別上書き）を取得"""
+    feed_config = config.get('data_feed', {}) or {}
+    settings = dict(DEFAULT_FEED_SETTINGS)
+    settings.update(feed_config.get('default', {}) or {})
+    settings.update((feed_config.get('sites', {}) or {}).get(site_name, {}) or {})
+    return settings
+
+
+@dataclass
+class FeedEndpoint:
+    """
+    一覧を埋めるJSONフィードの取得方法と、レコードから一覧の表示値への対応。
+    fieldsは 項目名 -> {'key': レコードのキー, 'format': 表示形式（'SS{}'など）, 'values': JSONの値 -> 表示値（コード値の場合）}
+    """
+    site_name: str
+    page_url: str
+    url: str
+    method: str = 'GET'
+    headers: Dict[str, str] = field(default_factory=dict)
+    post_data: Optional[str] = None
+    records_path: List[Any] = field(default_factory=list)  # JSONのルートからレコード配列までのキー・添字
+    fields: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    captured_at: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FeedEndpoint':
+        return cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+
+    def records(self, payload: Any) -> List[Dict[str, Any]]:
+        """JSONからレコード配列を取り出す"""
+        node = payload
+        try:
+            for step in self.records_path:
+                node = node[step]
+        except (KeyError, IndexError, TypeError) as e:
+            raise FeedError(f"records not found at {self.records_path}: {e}") from e
+        if not isinstance(node, list):
+            raise FeedError(f"records at {self.records_path} is not a list")
+        return [record for record in node if isinstance(record, dict)]
+
+    def entry(self, record: Dict[str, Any]) -> Dict[str, str]:
+        """レコードを一覧の表示値（項目名 -> 文字列）に変換"""
+        entry = {}
+        for name, spec in self.fields.items():
+            value = record.get(spec['key'])
+            if value is None:
+                raise FeedError(f"field '{spec['key']}' missing in record")
+            text = str(value)
+            values = spec.get('values') or {}
+            if values:
+                if text not in values:
+                    # 記録時に見ていないコード値（表示が分からないのでブラウザで取り直して学習し直す）
+                    raise FeedError(f"unknown value '{text}' for field '{name}'")
+                entry[name] = values[text]
+            else:
+                entry[name] = spec.get('format', '{}').format(text)
+        return entry
+
+
+class FeedStore:
+    """
+    サイト＋一覧ページURLごとに特定済みのフィードをJSONファイルに保存する。
+    フィードが見つからなかったページは {'missed_at': 日時} を保存し、一定時間は特定し直さない。
+    """
+
+    def __init__(self, path: str = DEFAULT_FEED_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write data feed store {self.path}: {e}")
+
+    def get(self, site_name: str, page_url: str) -> Optional[FeedEndpoint]:
+        with self._lock:
+            data = self._entries.get(site_name, {}).get(page_url)
+        return FeedEndpoint.from_dict(data) if data and 'missed_at' not in data else None
+
+    def capture_due(self, site_name: str, page_url: str, retry_hours: float) -> bool:
+        """フィードを特定すべきか（未特定で、前回見つからなかったのがretry_hours以上前か記録がなければTrue）"""
+        with self._lock:
+            data = self._entries.get(site_name, {}).get(page_url)
+        if not data:
+            return True
+        if 'missed_at' not in data:
+            return False
+        try:
+            missed_at = datetime.datetime.strptime(data['missed_at'], "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            return True
+        return datetime.datetime.now() - missed_at >= datetime.timedelta(hours=retry_hours)
+
+    def record_miss(self, site_name: str, page_url: str) -> None:
+        """フィードが見つからなかった（特定に失敗した）ことを記録"""
+        with self._lock:
+            self._entries.setdefault(site_name, {})[page_url] = {
+                'missed_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            self._save()
+
+    def put(self, endpoint: FeedEndpoint) -> None:
+        with self._lock:
+            self._entries.setdefault(endpoint.site_name, {})[endpoint.page_url] = asdict(endpoint)
+            self._save()
+
+    def forget(self, site_name: str, page_url: str) -> None:
+        with self._lock:
+            if self._entries.get(site_name, {}).pop(page_url, None) is not None:
+                self._save()
+
+
+_store: Optional[FeedStore] = None
+_store_lock = threading.Lock()
+
+
+def get_feed_store(config: Optional[Dict[str, Any]] = None) -> FeedStore:
+    """共有のFeedStoreを取得（config.yamlのdata_feed.path）"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeedStore(((config or {}).get('data_feed', {}) or {}).get('path', DEFAULT_FEED_PATH))
+        return _store
+
+
+def fetch_feed(endpoint: FeedEndpoint, config: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> List[Dict[str, str]]:
+    """特定済みのフィードを共有HTTPクライアントで直接取得し、一覧の表示値のリストを返す"""
+    try:
+        response = get_http_client(config).request(endpoint.method, endpoint.url, headers=endpoint.headers,
+                                                   content=endpoint.post_data, timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        raise FeedError(f"{endpoint.method} {endpoint.url} failed: {e}") from e
+    records = endpoint.records(payload)
+    if not records:
+        raise FeedError(f"{endpoint.url} returned no records")
+    return [endpoint.entry(record) for record in records]
+
+
+# --- 通信ログからのフィード特定 ---
+
+def _network_json_responses(driver) -> List[Tuple[str, Dict[str, Any]]]:
+    """performanceログから、XHR/fetchのレスポンスの(requestId, リクエスト情報)を取得順に返す"""
+    requests: Dict[str, Dict[str, Any]] = {}
+    responses: List[str] = []
+    for log_entry in driver.get_log('performance'):
+        try:
+            message = json.loads(log_entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        method, params = message.get('method'), message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            requests[params.get('requestId')] = params.get('request', {})
+        elif method == 'Network.responseReceived':
+            response = params.get('response', {})
+            # JSONをtext/plainなどで返すサイトもあるので、MIMEタイプではなく本文を解析できるかで判定する
+            if params.get('type') in ('XHR', 'Fetch') and response.get('status') == 200:
+                responses.append(params.get('requestId'))
+    return [(request_id, requests[request_id]) for request_id in responses if request_id in requests]
+
+
+def _response_json(driver, request_id: str) -> Any:
+    body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+    text = body.get('body', '')
+    if body.get('base64Encoded'):
+        text = base64.b64decode(text).decode('utf-8')
+    return json.loads(text)
+
+
+def _record_lists(node: Any, path: Optional[List[Any]] = None) -> Iterator[Tuple[List[Any], List[Dict[str, Any]]]]:
+    """JSON中のオブジェクト配列を(ルートからのパス, 配列)ですべて列挙"""
+    path = path or []
+    if isinstance(node, list):
+        records = [item for item in node if isinstance(item, dict)]
+        if records:
+            yield path, records
+        for index, item in enumerate(node):
+            if isinstance(item, (dict, list)):
+                yield from _record_lists(item, path + [index])
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, (dict, list)):
+                yield from _record_lists(value, path + [key])
+
+
+def _scalar_keys(records: List[Dict[str, Any]]) -> List[str]:
+    keys: List[str] = []
+    for record in records:
+        for key, value in record.items():
+            if key not in keys and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                keys.append(key)
+    return keys
+
+
+def _value_format(pairs: List[Tuple[str, str]]) -> Optional[str]:
+    """JSONの値と表示値の組がすべて「共通の接頭辞＋値」なら表示形式（'{}'・'SS{}'など）"""
+    prefixes = {shown[:len(shown) - len(raw)] for raw, shown in pairs if raw and shown.endswith(raw)}
+    if len(prefixes) == 1 and all(raw and shown.endswith(raw) for raw, shown in pairs):
+        return prefixes.pop().replace('{', '{{').replace('}', '}}') + '{}'
+    return None
+
+
+def _learn_field(records: List[Dict[str, Any]], shown: List[str]) -> Optional[Dict[str, Any]]:
+    """一覧の表示値に対応するレコードのキーを推定（一致・接頭辞付き→コード値の対応表の順に優先）"""
+    best: Optional[Dict[str, Any]] = None
+    for key in _scalar_keys(records):
+        if any(key not in record for record in records):
+            continue
+        pairs = [(str(record[key]), text) for record, text in zip(records, shown)]
+        value_format = _value_format(pairs)
+        if value_format is not None:
+            return {'key': key, 'format': value_format, 'values': {}}
+        mapping: Dict[str, str] = {}
+        if all(mapping.setdefault(raw, text) == text for raw, text in pairs) and len(mapping) < len(pairs):
+            # 値の種類が件数より少ない＝区分コード（売上高の階級など）
+            if best is None or len(best['values']) > len(mapping):
+                best = {'key': key, 'format': '{}', 'values': mapping}
+    return best
+
+
+def capture_feed(driver, site_name: str, page_url: str, dom_entries: List[Dict[str, str]],
+                 min_matches: int = 3) -> Optional[FeedEndpoint]:
+    """
+    一覧を表示したブラウザの通信ログから、表示中の案件（dom_entries: 'id'ほかの項目 -> 表示値）を含むJSONを探し、
+    再取得の方法とレコード→表示値の対応を推定する。見つからなければNone。
+    """
+    dom_by_id = {entry['id']: entry for entry in dom_entries if entry.get('id')}
+    if not dom_by_id:
+        return None
+    required = min(min_matches, len(dom_by_id))
+    # 案件IDはJSONでは数字だけのこともあるので、表示上の接頭辞（'SS'など）を付けた形でも照合する
+    id_prefixes = sorted({re.match(r'\D*', deal_id).group() for deal_id in dom_by_id} | {''})
+    best: Optional[Tuple[int, FeedEndpoint]] = None
+
+    for request_id, request in _network_json_responses(driver):
+        try:
+            payload = _response_json(driver, request_id)
+        except Exception as e:
+            logging.debug(f"Could not read response body for {request.get('url')}: {e}")
+            continue
+        for path, records in _record_lists(payload):
+            for id_key, prefix in ((key, prefix) for key in _scalar_keys(records) for prefix in id_prefixes):
+                matched = [(record, dom_by_id[prefix + str(record[id_key])]) for record in records
+                           if prefix + str(record.get(id_key, '')) in dom_by_id]
+                if len(matched) < required or (best and len(matched) <= best[0]):
+                    continue
+                fields = {'id': {'key': id_key, 'format': prefix.replace('{', '{{').replace('}', '}}') + '{}',
+                                 'values': {}}}
+                matched_records = [record for record, _ in matched]
+                for name in next(iter(dom_by_id.values())):
+                    if name == 'id':
+                        continue
+                    learned = _learn_field(matched_records, [entry.get(name, '') for _, entry in matched])
+                    if learned is None:
+                        break
+                    fields[name] = learned
+                else:
+                    headers = {name: value for name, value in (request.get('headers') or {}).items()
+                               if not name.startswith(':') and name.lower() not in _SKIPPED_HEADERS}
+                    endpoint = FeedEndpoint(
+                        site_name=site_name, page_url=page_url, url=request.get('url', ''),
+                        method=request.get('method', 'GET'), headers=headers, post_data=request.get('postData'),
+                        records_path=path, fields=fields,
+                        captured_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                    best = (len(matched), endpoint)
+
+    if best is None:
+        logging.info(f"📡 {site_name}: no JSON feed containing the listed deals was found in the network log")
+        return None
+    logging.info(f"📡 {site_name}: identified data feed {best[1].method} {best[1].url} "
+                 f"({best[0]}/{len(dom_by_id)} listed deals matched)")
+    return best[1]
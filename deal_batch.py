@@ -0,0 +1,189 @@
+# deal_batch.py - 案件を列指向（NumPy配列）にまとめ、サイト別の財務条件をベクトル演算で一括判定する
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from amount_parser import parse_amount
+
+DEFAULT_MIN_REVENUE = 300_000_000  # 3億円
+DEFAULT_MIN_PROFIT = 30_000_000    # 3,000万円
+
+# 判定理由コード（FilterResult.reason_codeの値）
+ACCEPTED = 0
+REVENUE_UNKNOWN = 1
+REVENUE_BELOW = 2
+PROFIT_UNKNOWN = 3
+PROFIT_BELOW = 4
+
+REASON_LABELS = {
+    ACCEPTED: '条件合格',
+    REVENUE_UNKNOWN: '売上高不明',
+    REVENUE_BELOW: '売上高不足',
+    PROFIT_UNKNOWN: '営業利益不明',
+    PROFIT_BELOW: '営業利益不足',
+}
+
+
+@dataclass(frozen=True)
+class ThresholdRule:
+    """1サイト分の財務条件（金額は円。0以下なら条件なし）"""
+    name: str
+    min_revenue: float = DEFAULT_MIN_REVENUE
+    min_profit: float = DEFAULT_MIN_PROFIT
+    allow_unknown: bool = False  # 非公開・応相談などの不明値を合格扱いにするか
+
+
+def _find_filtering_criteria(config: Dict[str, Any]) -> Dict[str, Any]:
+    """filtering_criteriaを取得（トップレベル、なければsitesの要素内に書かれたものも探す）"""
+    criteria = config.get('filtering_criteria')
+    if isinstance(criteria, dict):
+        return criteria
+    for site_config in config.get('sites', []) or []:
+        if isinstance(site_config, dict) and isinstance(site_config.get('filtering_criteria'), dict):
+            return site_config['filtering_criteria']
+    return {}
+
+
+def load_threshold_rules(config: Dict[str, Any]) -> Tuple[ThresholdRule, Dict[str, ThresholdRule]]:
+    """
+    config.yamlから(既定ルール, サイト名->ルール)を作成。
+    既定はscraping.min_revenue/min_profit（円）、サイト別はfiltering_criteriaのmin_revenue_oku（億円）/min_profit_man（万円）。
+    """
+    scraping = config.get('scraping', {}) or {}
+    default = ThresholdRule('default',
+                            scraping.get('min_revenue', DEFAULT_MIN_REVENUE),
+                            scraping.get('min_profit', DEFAULT_MIN_PROFIT))
+    site_rules = {}
+    for site_name, criteria in _find_filtering_criteria(config).items():
+        criteria = criteria or {}
+        min_revenue = criteria.get('min_revenue_oku')
+        min_profit = criteria.get('min_profit_man')
+        site_rules[site_name] = ThresholdRule(
+            site_name,
+            min_revenue * 100_000_000 if min_revenue is not None else default.min_revenue,
+            min_profit * 10_000 if min_profit is not None else default.min_profit,
+            bool(criteria.get('allow_unknown', default.allow_unknown)),
+        )
+    return default, site_rules
+
+
+def _field(deal: Any, name: str) -> Any:
+    """RawDealDataなどのオブジェクトと辞書の両方から値を取得"""
+    if isinstance(deal, dict):
+        return deal.get(name)
+    return getattr(deal, name, None)
+
+
+def _amount_bounds(text: Optional[str]) -> Tuple[float, float]:
+    """金額表記を(下限, 上限)に変換（非公開・値なしはNaN、以上/超の上限はinf）"""
+    parsed = parse_amount(text or '')
+    if parsed.undisclosed or not parsed.has_value:
+        return (np.nan, np.nan)
+    return parsed.as_range()
+
+
+class DealBatch:
+    """案件の集合を列（サイトコード・売上高/営業利益の下限と上限）として保持する"""
+
+    def __init__(self, site_names: List[str], site_code: np.ndarray, deal_ids: List[str],
+                 revenue_min: np.ndarray, revenue_max: np.ndarray,
+                 profit_min: np.ndarray, profit_max: np.ndarray):
+        self.site_names = site_names  # site_codeの値 -> サイト名
+        self.site_code = site_code
+        self.deal_ids = deal_ids
+        self.revenue_min = revenue_min
+        self.revenue_max = revenue_max
+        self.profit_min = profit_min
+        self.profit_max = profit_max
+
+    @classmethod
+    def from_deals(cls, deals: Iterable[Any], site_key: str = 'site_name', id_key: str = 'deal_id',
+                   revenue_key: str = 'revenue_text', profit_key: str = 'profit_text') -> 'DealBatch':
+        """RawDealData（または同じキーを持つ辞書）の列から作成。金額はamount_parserで解析（同じ表記はキャッシュ済み）"""
+        deals = list(deals)
+        site_index: Dict[str, int] = {}
+        codes = np.empty(len(deals), dtype=np.int32)
+        revenue = np.empty((len(deals), 2), dtype=np.float64)
+        profit = np.empty((len(deals), 2), dtype=np.float64)
+        deal_ids = []
+        for row, deal in enumerate(deals):
+            site_name = _field(deal, site_key) or ''
+            codes[row] = site_index.setdefault(site_name, len(site_index))
+            revenue[row] = _amount_bounds(_field(deal, revenue_key))
+            profit[row] = _amount_bounds(_field(deal, profit_key))
+            deal_ids.append(str(_field(deal, id_key) or ''))
+        return cls(list(site_index), codes, deal_ids,
+                   revenue[:, 0], revenue[:, 1], profit[:, 0], profit[:, 1])
+
+    def __len__(self) -> int:
+        return len(self.site_code)
+
+    def evaluate(self, default_rule: ThresholdRule,
+                 site_rules: Optional[Dict[str, ThresholdRule]] = None) -> 'FilterResult':
+        """
+        サイトごとの条件をマスク演算で一括適用する（範囲の上限が閾値以上なら合格）。
+        売上高→営業利益の順に判定し、最初に落ちた条件を理由として記録する。
+        """
+        site_rules = site_rules or {}
+        rules = [site_rules.get(site_name, default_rule) for site_name in self.site_names]
+        # サイトコード -> 閾値の参照表を作り、案件ごとの閾値列に展開
+        min_revenue = np.array([rule.min_revenue for rule in rules], dtype=np.float64)[self.site_code]
+        min_profit = np.array([rule.min_profit for rule in rules], dtype=np.float64)[self.site_code]
+        allow_unknown = np.array([rule.allow_unknown for rule in rules], dtype=bool)[self.site_code]
+
+        revenue_unknown = np.isnan(self.revenue_max) & (min_revenue > 0) & ~allow_unknown
+        profit_unknown = np.isnan(self.profit_max) & (min_profit > 0) & ~allow_unknown
+        # NaNとの比較はFalseになるため、不明値はここでは不足扱いにならない
+        revenue_below = (self.revenue_max < min_revenue) & (min_revenue > 0)
+        profit_below = (self.profit_max < min_profit) & (min_profit > 0)
+
+        reason_code = np.select(
+            [revenue_unknown, revenue_below, profit_unknown, profit_below],
+            [REVENUE_UNKNOWN, REVENUE_BELOW, PROFIT_UNKNOWN, PROFIT_BELOW],
+            default=ACCEPTED,
+        ).astype(np.int8)
+        return FilterResult(self, rules, reason_code, min_revenue, min_profit)
+
+
+class FilterResult:
+    """DealBatch.evaluateの結果（案件ごとの合否・理由コード・適用ルール）"""
+
+    def __init__(self, batch: DealBatch, rules: List[ThresholdRule], reason_code: np.ndarray,
+                 min_revenue: np.ndarray, min_profit: np.ndarray):
+        self.batch = batch
+        self.rules = rules  # site_codeの値 -> 適用したルール
+        self.reason_code = reason_code
+        self.accepted = reason_code == ACCEPTED
+        self.min_revenue = min_revenue
+        self.min_profit = min_profit
+
+    def __len__(self) -> int:
+        return len(self.reason_code)
+
+    def rule_for(self, index: int) -> ThresholdRule:
+        return self.rules[self.batch.site_code[index]]
+
+    def reason(self, index: int) -> str:
+        """1件分の判定理由（例: "売上高不足 [日本M&Aセンター: 売上高≥500,000,000円]"）"""
+        code = int(self.reason_code[index])
+        rule = self.rule_for(index)
+        if code in (REVENUE_UNKNOWN, REVENUE_BELOW):
+            condition = f"売上高≥{int(self.min_revenue[index]):,}円"
+        elif code in (PROFIT_UNKNOWN, PROFIT_BELOW):
+            condition = f"営業利益≥{int(self.min_profit[index]):,}円"
+        else:
+            condition = f"売上高≥{int(self.min_revenue[index]):,}円, 営業利益≥{int(self.min_profit[index]):,}円"
+        return f"{REASON_LABELS[code]} [{rule.name}: {condition}]"
+
+    def accepted_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.accepted)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """サイト名 -> {判定理由: 件数}"""
+        counts = np.zeros((len(self.batch.site_names), len(REASON_LABELS)), dtype=np.int64)
+        np.add.at(counts, (self.batch.site_code, self.reason_code), 1)
+        return {
+            site_name: {REASON_LABELS[code]: int(count) for code, count in enumerate(row) if count}
+            for site_name, row in zip(self.batch.site_names, counts)
+        }
@@ -0,0 +1,344 @@
+# deal_sinks.py - 案件の書き出し先（スプレッドシート・CSV・履歴のParquet/JSONL）を共通のインターフェースで扱う
+import csv
+import datetime
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+from urllib.parse import quote
+
+DEFAULT_HISTORY_SETTINGS: Dict[str, Any] = {
+    'enabled': True,
+    'path': 'history',                 # 履歴の保存先ディレクトリ（形式ごとのサブディレクトリに分かれる）
+    'formats': ['parquet', 'jsonl'],   # parquetはpyarrowが必要（未導入なら警告してjsonlのみ）
+}
+
+_MONTH = re.compile(r'^(\d{4})-(\d{2})')
+
+# 履歴の共通の列（mainのFormattedDealDataと同じ項目名）。サイトをまたいで1つのスキーマで読めるようにする
+HISTORY_COLUMNS = ['extraction_time', 'site_name', 'deal_id', 'title', 'features', 'location',
+                   'revenue', 'profit', 'price', 'link', 'unique_id', 'extra']
+
+# 単体スクリプトの出力見出し -> 共通の列（ここにない見出しの値はextraにJSONでまとめる）
+HISTORY_COLUMN_ALIASES = {
+    '抽出日時': 'extraction_time', 'サイト名': 'site_name',
+    '案件ID': 'deal_id', '案件No.': 'deal_id', '案件番号': 'deal_id',
+    'タイトル': 'title',
+    '特色': 'features', '業界': 'features', '業種': 'features', '分類': 'features',
+    '所在地': 'location', '地域': 'location',
+    '売上高': 'revenue', '売上規模': 'revenue', '年商': 'revenue', '前期売上': 'revenue',
+    '営業利益': 'profit', '事業の利益': 'profit', '利益': 'profit', '前期営業損益': 'profit',
+    '希望金額': 'price', '希望価格': 'price', '譲渡価格': 'price', '譲渡希望額': 'price', '価格目線': 'price',
+    'リンク': 'link',
+}
+
+
+def _pyarrow_available() -> bool:
+    """pyarrowが導入済みか確認（Parquetの書き出しはオプション依存）"""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def as_record(item: Any) -> Dict[str, Any]:
+    """データクラス・辞書を 見出し -> 値 の辞書にする"""
+    if is_dataclass(item) and not isinstance(item, type):
+        return asdict(item)
+    if isinstance(item, Mapping):
+        return dict(item)
+    raise TypeError(f"Unsupported record type: {type(item).__name__}")
+
+
+def records_from_rows(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """見出し行と2次元リストの行から辞書のレコードを作る"""
+    return [dict(zip(headers, row)) for row in rows]
+
+
+def to_history_record(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """レコードを履歴の共通の列（HISTORY_COLUMNS）にそろえる（ない列はNone、対応のない項目はextraにJSONで保存）"""
+    history: Dict[str, Any] = dict.fromkeys(HISTORY_COLUMNS)
+    extra: Dict[str, Any] = {}
+    for name, value in record.items():
+        column = name if name in history else HISTORY_COLUMN_ALIASES.get(name)
+        if column is None or column == 'extra':
+            extra[name] = value
+        elif history[column] in (None, ''):
+            history[column] = value
+        elif value not in (None, ''):
+            extra[name] = value
+    if extra:
+        history['extra'] = json.dumps(extra, ensure_ascii=False, default=str)
+    return history
+
+
+def partition_of(record: Mapping[str, Any]) -> Tuple[str, str]:
+    """レコードの (サイト名, 年月YYYY-MM)。年月はextraction_timeから取り、なければ現在の年月"""
+    match = _MONTH.match(str(record.get('extraction_time') or ''))
+    month = f"{match.group(1)}-{match.group(2)}" if match else datetime.datetime.now().strftime("%Y-%m")
+    return str(record.get('site_name') or 'unknown'), month
+
+
+def partition_dir(root: str, site_name: str, month: str) -> str:
+    """Hive形式のパーティションディレクトリ（root/site=<URLエンコードしたサイト名>/month=YYYY-MM）"""
+    return os.path.join(root, f"site={quote(site_name, safe='')}", f"month={month}")
+
+
+def _group_by_partition(records: Iterable[Mapping[str, Any]]) -> Dict[Tuple[str, str], List[Mapping[str, Any]]]:
+    groups: Dict[Tuple[str, str], List[Mapping[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(partition_of(record), []).append(record)
+    return groups
+
+
+class DealSink:
+    """案件の書き出し先。write()はレコード（データクラスまたは辞書）を受け取り、失敗したら例外を送出する"""
+
+    def write(self, records: Iterable[Any]) -> Optional[List[Optional[int]]]:
+        """レコードを書き出す。書き出した行の位置が分かるシンク（スプレッドシート）はその行番号、ほかはNone"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'DealSink':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SheetsSink(DealSink):
+    """SheetWriterでスプレッドシートの見出しの順に並べて追記する（見出しにない項目は書かない）"""
+
+    def __init__(self, writer, default_headers: Sequence[str], value_input_option: str = 'USER_ENTERED'):
+        self.writer = writer
+        self.default_headers = list(default_headers)
+        self.value_input_option = value_input_option
+
+    def write(self, records: Iterable[Any]) -> Optional[List[Optional[int]]]:
+        headers = self.writer.ensure_headers(self.default_headers)
+        rows = [[record.get(header, '') for header in headers] for record in map(as_record, records)]
+        return self.writer.append_rows(rows, value_input_option=self.value_input_option)
+
+
+class CsvSink(DealSink):
+    """1つのCSVファイルに書き出す（最初のwrite()でファイルを作り直して見出し行を書き、以降は追記）"""
+
+    def __init__(self, path: str, headers: Sequence[str], encoding: str = 'utf-8-sig'):
+        self.path = path
+        self.headers = list(headers)
+        self.encoding = encoding
+        self._file = None
+        self._writer = None
+
+    def write(self, records: Iterable[Any]) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'w', newline='', encoding=self.encoding)
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.headers)
+        self._writer.writerows([record.get(header, '') for header in self.headers] for record in map(as_record, records))
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonlSink(DealSink):
+    """サイト・年月ごとのJSONLファイル（root/site=.../month=.../deals.jsonl）に1件1行で追記する"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def write(self, records: Iterable[Any]) -> None:
+        with self._lock:
+            for (site_name, month), group in _group_by_partition(map(as_record, records)).items():
+                directory = partition_dir(self.root, site_name, month)
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, 'deals.jsonl'), 'a', encoding='utf-8') as f:
+                    for record in group:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+
+class ParquetSink(DealSink):
+    """
+    サイト・年月でパーティション分割したParquet（root/site=.../month=.../part-*.parquet）に追記する。
+    既存ファイルは書き換えず、write()のたびにパーティションごとに新しいファイルを足す（値はすべて文字列で保存）。
+    pyarrow.datasetでhiveパーティションとして読めば、サイト・月の絞り込みと列の選択でファイル単位に読み飛ばせる。
+    """
+
+    def __init__(self, root: str):
+        import pyarrow
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _table(self, records: List[Mapping[str, Any]]):
+        columns: Dict[str, List[Optional[str]]] = {}
+        for record in records:
+            for name in record:
+                columns.setdefault(name, [])
+        for record in records:
+            for name, values in columns.items():
+                value = record.get(name)
+                values.append(None if value is None else str(value))
+        return self._pa.table({name: self._pa.array(values, type=self._pa.string())
+                               for name, values in columns.items()})
+
+    def write(self, records: Iterable[Any]) -> None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        with self._lock:
+            for (site_name, month), group in _group_by_partition(map(as_record, records)).items():
+                directory = partition_dir(self.root, site_name, month)
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+                # 書きかけのファイルが読まれないよう一時ファイルに書いてから置き換える
+                tmp_path = f"{path}.tmp"
+                self._pq.write_table(self._table(group), tmp_path)
+                os.replace(tmp_path, path)
+
+
+class MultiSink(DealSink):
+    """複数のシンクに同じレコードを書き出す（1つが失敗してもほかには書き出し、失敗は記録する）"""
+
+    def __init__(self, sinks: Sequence[DealSink]):
+        self.sinks = list(sinks)
+
+    def write(self, records: Iterable[Any]) -> None:
+        records = list(records)
+        for sink in self.sinks:
+            try:
+                sink.write(records)
+            except Exception as e:
+                logging.warning(f"🗄️ {type(sink).__name__} could not write {len(records)} deals: {e}")
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+def get_history_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """config.yamlのhistory_export設定を取得（未設定の項目は既定値）"""
+    settings = dict(DEFAULT_HISTORY_SETTINGS)
+    settings.update((config or {}).get('history_export', {}) or {})
+    return settings
+
+
+def build_history_sink(settings: Dict[str, Any]) -> MultiSink:
+    """設定の形式ごとのシンクをまとめたMultiSink（無効なら空）"""
+    sinks: List[DealSink] = []
+    if not settings.get('enabled', True):
+        return MultiSink(sinks)
+    root = settings.get('path') or DEFAULT_HISTORY_SETTINGS['path']
+    for fmt in settings.get('formats') or []:
+        if fmt == 'parquet':
+            if not _pyarrow_available():
+                logging.warning("Parquet history export is enabled in config but 'pyarrow' is not installed. Skipping Parquet")
+                continue
+            sinks.append(ParquetSink(os.path.join(root, 'parquet')))
+        elif fmt == 'jsonl':
+            sinks.append(JsonlSink(os.path.join(root, 'jsonl')))
+        else:
+            logging.warning(f"Unknown history export format: {fmt}")
+    return MultiSink(sinks)
+
+
+_history: Optional[MultiSink] = None
+_history_lock = threading.Lock()
+
+
+def get_history_sink(config: Optional[Dict[str, Any]] = None) -> MultiSink:
+    """共有の履歴シンクを取得（最初の呼び出しのconfigで作成。config.ini のスクリプトからは既定値）"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = build_history_sink(get_history_settings(config))
+        return _history
+
+
+def close_history_sink() -> None:
+    """共有の履歴シンクを閉じる"""
+    global _history
+    with _history_lock:
+        if _history is not None:
+            _history.close()
+            _history = None
+
+
+def export_history(records: Iterable[Any], site_name: Optional[str] = None,
+                   config: Optional[Dict[str, Any]] = None) -> int:
+    """
+    案件を履歴（Parquet/JSONL）に共通の列（HISTORY_COLUMNS）で追記し、件数を返す。
+    site_name・extraction_timeがないレコードには補う。履歴の書き出しに失敗しても本来の出力は止めない。
+    """
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    prepared = []
+    for record in map(to_history_record, map(as_record, records)):
+        if site_name and not record['site_name']:
+            record['site_name'] = site_name
+        if not record['extraction_time']:
+            record['extraction_time'] = now
+        prepared.append(record)
+    if not prepared:
+        return 0
+    get_history_sink(config).write(prepared)
+    return len(prepared)
+
+
+def read_history_jsonl(root: str, site_names: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """JsonlSinkの出力（root/site=.../month=.../deals.jsonl）を古い月から順に読み出す（site_names指定時はそのサイトだけ）"""
+    wanted = {f"site={quote(name, safe='')}" for name in site_names} if site_names is not None else None
+    for path in sorted(glob.glob(os.path.join(root, 'site=*', 'month=*', 'deals.jsonl')),
+                       key=lambda path: (os.path.basename(os.path.dirname(path)), path)):
+        if wanted is not None and os.path.basename(os.path.dirname(os.path.dirname(path))) not in wanted:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def load_known_values(site_name: str, column: str, csv_path: Optional[str] = None,
+                      csv_encoding: str = 'utf-8-sig', config: Optional[Dict[str, Any]] = None) -> Set[str]:
+    """
+    履歴のJSONL（全月）と前回の出力CSVから、サイトのcolumn列の値の集合を読み込む（差分クロールの既知ID）。
+    columnは出力CSVの見出しで、履歴では対応する共通の列（HISTORY_COLUMN_ALIASES）を読む。
+    出力CSVは実行のたびに作り直されるため、それより前の分は履歴から補う。
+    """
+    history_column = HISTORY_COLUMN_ALIASES.get(column, column)
+    values: Set[str] = set()
+    root = get_history_settings(config).get('path') or DEFAULT_HISTORY_SETTINGS['path']
+    site_dir = os.path.join(root, 'jsonl', f"site={quote(site_name, safe='')}")
+    for path in sorted(glob.glob(os.path.join(site_dir, 'month=*', 'deals.jsonl'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        # 共通の列にそろえる前に書き出した履歴は出力CSVの見出しのまま
+                        value = record.get(history_column) or record.get(column)
+                    except (ValueError, AttributeError):
+                        continue
+                    if value not in (None, ''):
+                        values.add(str(value))
+        except OSError as e:
+            logging.warning(f"Could not read deal history {path}: {e}")
+    if csv_path and os.path.exists(csv_path):
+        try:
+            with open(csv_path, 'r', newline='', encoding=csv_encoding) as f:
+                values.update(str(row[column]) for row in csv.DictReader(f) if row.get(column))
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            logging.warning(f"Could not read previous output {csv_path}: {e}")
+    return values
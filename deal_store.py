@@ -0,0 +1,381 @@
+# deal_store.py - 整形済み案件をローカルのSQLiteに保存して重複判定の基準にし、スプレッドシートは書き込み先として定期的に突き合わせる
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import asdict, fields
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Type, TypeVar
+
+T = TypeVar('T')
+
+DEFAULT_STORE_PATH = 'deals.sqlite3'
+DEFAULT_RECONCILE_INTERVAL_HOURS = 24
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deals (
+    unique_id       TEXT PRIMARY KEY,
+    site_name       TEXT,
+    deal_id         TEXT,
+    extraction_time TEXT,
+    data            TEXT NOT NULL,              -- 整形済み案件の全項目（JSON）
+    synced          INTEGER NOT NULL DEFAULT 0, -- スプレッドシートへ書き込み済みか
+    stored_at       TEXT NOT NULL,
+    sheet_row       INTEGER,                    -- スプレッドシートの行番号（不明ならNULL）
+    content_hash    TEXT,                       -- 一覧ページの掲載内容（listing）のハッシュ
+    listing         TEXT,                       -- 一覧ページの掲載内容（項目名 -> 表示値のJSON）
+    pending_update  TEXT                        -- シートへの反映待ちの変更項目（JSON配列）
+);
+CREATE TABLE IF NOT EXISTS rejected (            -- 取得したが条件に合わなかった案件（差分クロールの停止判定用）
+    unique_id   TEXT PRIMARY KEY,
+    site_name   TEXT,
+    rejected_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_deals_site ON deals (site_name, extraction_time);
+CREATE INDEX IF NOT EXISTS idx_deals_extraction_time ON deals (extraction_time);
+CREATE INDEX IF NOT EXISTS idx_deals_unsynced ON deals (synced) WHERE synced = 0;
+CREATE INDEX IF NOT EXISTS idx_deals_pending_update ON deals (site_name) WHERE pending_update IS NOT NULL;
+"""
+
+# 既存のストアに後から追加した列
+_ADDED_COLUMNS = {
+    'sheet_row': 'INTEGER',
+    'content_hash': 'TEXT',
+    'listing': 'TEXT',
+    'pending_update': 'TEXT',
+}
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# SQLiteのバインド変数の上限より十分小さい、IN句1回あたりのID数
+_IN_CHUNK = 500
+
+
+def _now() -> str:
+    return datetime.datetime.now().strftime(_TIME_FORMAT)
+
+
+def listing_hash(listing: Mapping[str, str]) -> str:
+    """掲載内容のハッシュ（項目の順序に依存しない）"""
+    return hashlib.md5(json.dumps(listing, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _chunks(items: Sequence[Any], size: int = _IN_CHUNK) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class DealStore:
+    """
+    整形済み案件（FormattedDealData）をunique_idをキーにSQLiteへ保存する。
+    重複判定はこのストアに対して行い、スプレッドシートの全件読み込みは定期的な突き合わせ（reconcile）のときだけにする。
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH,
+                 reconcile_interval_hours: float = DEFAULT_RECONCILE_INTERVAL_HOURS, upsert: bool = False):
+        self.path = path
+        self.reconcile_interval_hours = reconcile_interval_hours
+        self.upsert = upsert
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # main.py / main2.py / main3.pyが同じファイルを使っても読み書きが競合しにくいようWALにする
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(deals)")}
+        for name, column_type in _ADDED_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE deals ADD COLUMN {name} {column_type}")
+        self._conn.executescript(_INDEXES)
+        self._conn.commit()
+
+    def existing_ids(self) -> Set[str]:
+        """保存済みの全unique_id"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT unique_id FROM deals")}
+
+    def seen_ids(self) -> Set[str]:
+        """保存済みの案件と、前回までに条件に合わず除外した案件のunique_id（一覧のページ送りを止めるかの判定用）"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT unique_id FROM deals UNION SELECT unique_id FROM rejected")}
+
+    def record_rejected(self, site_name: str, unique_ids: Iterable[str]) -> int:
+        """
+        取得したが条件に合わなかった案件を記録（既に記録済みのunique_idは無視）。記録した件数を返す。
+        差分クロールの停止判定で既知として扱うだけで、詳細ページの取得を省く重複判定（existing_ids）には含めない。
+        """
+        rejected_at = _now()
+        rows = [(unique_id, site_name, rejected_at) for unique_id in unique_ids]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO rejected (unique_id, site_name, rejected_at) VALUES (?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM deals").fetchone()[0]
+
+    def add_deals(self, deals: Iterable[Any], listings: Optional[Mapping[str, Mapping[str, str]]] = None) -> int:
+        """
+        案件を未書き込みとして保存（既存のunique_idは無視）。追加した件数を返す。
+        listings（unique_id -> 一覧ページの掲載内容）を渡すと、以降の変更検知の基準として一緒に記録する。
+        """
+        stored_at = _now()
+        listings = listings or {}
+        rows = []
+        for deal in deals:
+            listing = listings.get(deal.unique_id)
+            rows.append((deal.unique_id, deal.site_name, deal.deal_id, deal.extraction_time,
+                         json.dumps(asdict(deal), ensure_ascii=False), stored_at,
+                         listing_hash(listing) if listing is not None else None,
+                         json.dumps(listing, ensure_ascii=False) if listing is not None else None))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO deals (unique_id, site_name, deal_id, extraction_time, data, synced, stored_at, "
+                "content_hash, listing) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def pending_deals(self, deal_type: Type[T], site_names: Optional[Iterable[str]] = None) -> List[T]:
+        """スプレッドシートに未書き込みの案件（前回の書き込み失敗分を含む）を保存順に返す"""
+        query = "SELECT data FROM deals WHERE synced = 0"
+        params: List[str] = []
+        if site_names is not None:
+            site_names = list(site_names)
+            query += f" AND site_name IN ({', '.join('?' for _ in site_names)})"
+            params = site_names
+        with self._lock:
+            records = [json.loads(row[0]) for row in self._conn.execute(query + " ORDER BY rowid", params)]
+        names = [f.name for f in fields(deal_type)]
+        return [deal_type(**{name: record.get(name, '') for name in names}) for record in records]
+
+    def stored_records(self, site_names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """保存済みの案件（整形済みの全項目の辞書）を保存順に返す（過去案件の再判定用）"""
+        query = "SELECT data FROM deals"
+        params: List[str] = []
+        if site_names is not None:
+            site_names = list(site_names)
+            query += f" WHERE site_name IN ({', '.join('?' for _ in site_names)})"
+            params = site_names
+        with self._lock:
+            return [json.loads(row[0]) for row in self._conn.execute(query + " ORDER BY rowid", params)]
+
+    def mark_synced(self, unique_ids: Iterable[str], sheet_rows: Optional[Iterable[Optional[int]]] = None) -> None:
+        """スプレッドシートへの書き込みが済んだ案件を記録（書き込んだ行番号が分かれば一緒に記録。行ごと書いたので反映待ちの変更は不要）"""
+        unique_ids = list(unique_ids)
+        sheet_rows = list(sheet_rows) if sheet_rows is not None else [None] * len(unique_ids)
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE deals SET synced = 1, sheet_row = COALESCE(?, sheet_row), pending_update = NULL "
+                                   "WHERE unique_id = ?",
+                                   list(zip(sheet_rows, unique_ids)))
+
+    def sync(self, deals: List[Any], write: Callable[[List[Any]], Optional[List[Optional[int]]]]) -> bool:
+        """
+        案件をwriteでスプレッドシートへ書き込み、書き込めた分を書き込み済みにする。
+        writeは先頭から書き込めた案件の行番号のリスト（途中で失敗したらそこまでの分、何も書けなければNone）を返す。
+        全件書き込めたときだけTrue。
+        """
+        if not deals:
+            return False
+        sheet_rows = write(deals)
+        if not sheet_rows:
+            return False
+        written = deals[:len(sheet_rows)]
+        self.mark_synced((deal.unique_id for deal in written), sheet_rows[:len(written)])
+        if len(written) < len(deals):
+            logging.warning(f"🗃️ {len(written)}/{len(deals)} deals reached the sheet; the rest stay pending")
+            return False
+        return True
+
+    # --- 掲載内容の変更検知（upsert） ---
+
+    def observe_listings(self, listings: Mapping[str, Mapping[str, str]]) -> int:
+        """
+        一覧ページの掲載内容（unique_id -> 項目名 -> 表示値）を前回と比べ、変わった項目を保存済みの案件に反映してシートへの反映待ちにする。
+        ハッシュが同じ案件はそれ以上比べない。初めて見る案件は比較の基準として記録するだけ。変更された案件の件数を返す。
+        """
+        hashes = {unique_id: listing_hash(listing) for unique_id, listing in listings.items()}
+        with self._lock:
+            stored: Dict[str, Optional[str]] = {}
+            for chunk in _chunks(list(hashes)):
+                stored.update(self._conn.execute(
+                    f"SELECT unique_id, content_hash FROM deals WHERE unique_id IN ({', '.join('?' for _ in chunk)})",
+                    chunk).fetchall())
+        baseline = [unique_id for unique_id in hashes if unique_id in stored and stored[unique_id] is None]
+        differing = [unique_id for unique_id in hashes
+                     if stored.get(unique_id) is not None and stored[unique_id] != hashes[unique_id]]
+        if not baseline and not differing:
+            return 0
+
+        changed = 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE deals SET content_hash = ?, listing = ? WHERE unique_id = ?",
+                [(hashes[unique_id], json.dumps(listings[unique_id], ensure_ascii=False), unique_id)
+                 for unique_id in baseline])
+            for chunk in _chunks(differing):
+                rows = self._conn.execute(
+                    f"SELECT unique_id, data, listing, pending_update FROM deals "
+                    f"WHERE unique_id IN ({', '.join('?' for _ in chunk)})", chunk).fetchall()
+                for unique_id, data_json, listing_json, pending_json in rows:
+                    listing = listings[unique_id]
+                    previous = json.loads(listing_json or '{}')
+                    fields_changed = [name for name, value in listing.items() if previous.get(name) != value]
+                    data = json.loads(data_json or '{}')
+                    pending = set(json.loads(pending_json or '[]'))
+                    if fields_changed:
+                        changed += 1
+                        for name in fields_changed:
+                            data[name] = listing[name]
+                        pending.update(fields_changed)
+                        logging.info(f"🔁 {data.get('site_name') or unique_id} {data.get('deal_id', '')}: "
+                                     f"listing changed ({', '.join(fields_changed)})")
+                    self._conn.execute(
+                        "UPDATE deals SET content_hash = ?, listing = ?, data = ?, pending_update = ? WHERE unique_id = ?",
+                        (hashes[unique_id], json.dumps(listing, ensure_ascii=False), json.dumps(data, ensure_ascii=False),
+                         json.dumps(sorted(pending), ensure_ascii=False) if pending else None, unique_id))
+        return changed
+
+    def pending_updates(self, site_names: Optional[Iterable[str]] = None) -> Dict[str, Tuple[int, Dict[str, str]]]:
+        """シートへの反映待ちの変更（unique_id -> (行番号, 項目名 -> 新しい値)）。行番号が分からない案件は次の突き合わせ待ち"""
+        query = "SELECT unique_id, sheet_row, data, pending_update FROM deals WHERE pending_update IS NOT NULL AND synced = 1"
+        params: List[str] = []
+        if site_names is not None:
+            site_names = list(site_names)
+            query += f" AND site_name IN ({', '.join('?' for _ in site_names)})"
+            params = site_names
+        updates: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        with self._lock:
+            for unique_id, sheet_row, data_json, pending_json in self._conn.execute(query, params):
+                if sheet_row is None:
+                    continue
+                data = json.loads(data_json or '{}')
+                updates[unique_id] = (sheet_row, {name: data.get(name, '') for name in json.loads(pending_json)})
+        return updates
+
+    def mark_updated(self, unique_ids: Iterable[str]) -> None:
+        """変更をシートへ反映し終えた案件を記録"""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE deals SET pending_update = NULL WHERE unique_id = ?",
+                                   [(unique_id,) for unique_id in unique_ids])
+
+    def forget_rows(self, unique_ids: Iterable[str]) -> None:
+        """行番号が当てにならなくなった案件の行番号を消し、次回の実行で突き合わせをやり直す"""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE deals SET sheet_row = NULL WHERE unique_id = ?",
+                                   [(unique_id,) for unique_id in unique_ids])
+            self._conn.execute("DELETE FROM meta WHERE key = 'last_reconciled_at'")
+
+    def sync_updates(self, update: Callable[[Dict[str, Tuple[int, Dict[str, str]]]], Tuple[List[str], List[str]]],
+                     site_names: Optional[Iterable[str]] = None) -> int:
+        """
+        反映待ちの変更をupdateでシートに書き込む。updateは(書き込めたunique_id, 行がずれていたunique_id)を返す。
+        書き込めた件数を返す。
+        """
+        updates = self.pending_updates(site_names)
+        if not updates:
+            return 0
+        updated, moved = update(updates)
+        self.mark_updated(updated)
+        if moved:
+            logging.warning(f"🔁 {len(moved)} rows moved in the sheet; their updates wait for the next reconciliation")
+            self.forget_rows(moved)
+        return len(updated)
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def reconcile_due(self, interval_hours: float) -> bool:
+        """前回の突き合わせからinterval_hours以上経過しているか（未実施なら常にTrue）"""
+        with self._lock:
+            last = self._meta('last_reconciled_at')
+        if last is None or interval_hours <= 0:
+            return True
+        try:
+            elapsed = datetime.datetime.now() - datetime.datetime.strptime(last, _TIME_FORMAT)
+        except ValueError:
+            return True
+        return elapsed >= datetime.timedelta(hours=interval_hours)
+
+    def reconcile(self, sheet_rows: Mapping[str, int]) -> Tuple[int, int]:
+        """
+        スプレッドシートのunique_id（-> 行番号）と突き合わせる。
+        シートにだけある案件（手入力・別環境での書き込み）は書き込み済みとして取り込み、未書き込み扱いの案件がシートにあれば書き込み済みにする。
+        行番号はすべてシートの現状に合わせ直す。
+        (取り込んだ件数, ストアでは書き込み済みなのにシートから消えている件数)を返す。
+        """
+        with self._lock, self._conn:
+            synced_by_id = {row[0]: row[1] for row in self._conn.execute("SELECT unique_id, synced FROM deals")}
+            imported = [unique_id for unique_id in sheet_rows if unique_id not in synced_by_id]
+            stored_at = _now()
+            self._conn.executemany(
+                "INSERT INTO deals (unique_id, data, synced, stored_at) VALUES (?, '{}', 1, ?)",
+                [(unique_id, stored_at) for unique_id in imported])
+            self._conn.execute("UPDATE deals SET sheet_row = NULL")
+            self._conn.executemany(
+                "UPDATE deals SET synced = 1, sheet_row = ? WHERE unique_id = ?",
+                [(row, unique_id) for unique_id, row in sheet_rows.items()])
+            missing = sum(1 for unique_id, synced in synced_by_id.items() if synced and unique_id not in sheet_rows)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_reconciled_at', ?)", (stored_at,))
+        return len(imported), missing
+
+    def reconcile_if_due(self, fetch_sheet_rows: Callable[[], Optional[Mapping[str, int]]]) -> None:
+        """突き合わせの時期ならスプレッドシートのIDと行番号を読み込んで突き合わせる（読み込みに失敗したら次回に持ち越す）"""
+        if not self.reconcile_due(self.reconcile_interval_hours):
+            return
+        sheet_rows = fetch_sheet_rows()
+        if sheet_rows is None:
+            logging.warning("🗄️ Could not read the sheet; deal store reconciliation postponed")
+            return
+        imported, missing = self.reconcile(sheet_rows)
+        logging.info(f"🗄️ Reconciled deal store with the sheet: {len(sheet_rows)} rows, {imported} imported")
+        if missing:
+            logging.warning(f"🗄️ {missing} deals in the local store are no longer in the sheet "
+                            f"(deleted rows are not re-added)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[DealStore] = None
+_store_lock = threading.Lock()
+
+
+def get_deal_store(config: Optional[Dict[str, Any]] = None) -> DealStore:
+    """共有のDealStoreを取得（config.yamlのdeal_store）"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store_config = (config or {}).get('deal_store', {}) or {}
+            _store = DealStore(store_config.get('path', DEFAULT_STORE_PATH),
+                               store_config.get('reconcile_interval_hours', DEFAULT_RECONCILE_INTERVAL_HOURS),
+                               store_config.get('upsert', False))
+        return _store
+
+
+def close_deal_store() -> None:
+    """共有DealStoreを閉じる（実行終了時に呼び出す）"""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -0,0 +1,70 @@
+# detail_enricher.py - 詳細ページ取得をワーカープール＋ホスト別トークンバケットで並行実行
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from rate_limit import get_host_bucket
+
+T = TypeVar('T')
+
+DEFAULT_ENRICHMENT_SETTINGS: Dict[str, Any] = {
+    'workers': 4,
+    'rate': 2.0,   # 1ホストあたり毎秒のリクエスト数
+    'burst': 2,
+}
+
+
+def get_enrichment_settings(config: Dict[str, Any], site_name: str) -> Dict[str, Any]:
+    """config.yamlのdetail_enrichment設定（default＋サイト別上書き）を取得"""
+    enrichment_config = config.get('detail_enrichment', {}) or {}
+    settings = dict(DEFAULT_ENRICHMENT_SETTINGS)
+    settings.update(enrichment_config.get('default', {}) or {})
+    settings.update((enrichment_config.get('sites', {}) or {}).get(site_name, {}) or {})
+    return settings
+
+
+def enrich_concurrently(deals: List[T],
+                        fetch_details: Callable[[str], Dict[str, str]],
+                        apply_details: Callable[[int, T, Dict[str, str]], bool],
+                        site_name: str,
+                        config: Dict[str, Any],
+                        link_getter: Callable[[T], Optional[str]] = lambda deal: getattr(deal, 'link', None)) -> List[T]:
+    """
+    詳細ページを並行取得し、元の順序でapply_detailsを適用する。
+    fetch_detailsはワーカースレッドで実行され、apply_detailsは呼び出し元スレッドで順番に実行される。
+    apply_detailsがTrueを返した案件のみを結果に含める。
+    """
+    if not deals:
+        return []
+
+    settings = get_enrichment_settings(config, site_name)
+    workers = max(1, int(settings['workers']))
+    rate = float(settings['rate'])
+    burst = int(settings['burst'])
+
+    def fetch(deal: T) -> Dict[str, str]:
+        link = link_getter(deal)
+        if not link:
+            return {}
+        get_host_bucket(link, rate, burst).acquire()
+        return fetch_details(link)
+
+    started = time.monotonic()
+    logging.info(f"🔗 Fetching details for {len(deals)} deals from {site_name} "
+                 f"(workers={workers}, rate={rate}/s, burst={burst})")
+
+    enhanced: List[T] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"detail-{site_name}") as executor:
+        futures = [executor.submit(fetch, deal) for deal in deals]
+        for i, (deal, future) in enumerate(zip(deals, futures), 1):
+            try:
+                detail_info = future.result()
+                if apply_details(i, deal, detail_info):
+                    enhanced.append(deal)
+            except Exception as e:
+                logging.error(f"  ❌ Error processing deal {getattr(deal, 'deal_id', i)}: {e}")
+                continue
+
+    logging.info(f"⏱️ {site_name}: detail enrichment finished in {time.monotonic() - started:.1f}s")
+    return enhanced
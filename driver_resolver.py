@@ -0,0 +1,138 @@
+# driver_resolver.py - chromedriverのパスをローカルマニフェストにキャッシュして解決する
+import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+MANIFEST_PATH = os.environ.get(
+    'CHROMEDRIVER_MANIFEST',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.driver_cache', 'chromedriver_manifest.json'),
+)
+
+_VERSION_PATTERN = re.compile(r'(\d+)\.(\d+)\.(\d+)\.(\d+)')
+
+_CHROME_COMMANDS = [
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+_resolved_path: Optional[str] = None
+_resolve_lock = threading.Lock()
+
+
+def _run_version_command(command: str) -> Optional[str]:
+    """--versionの出力からバージョン文字列を取り出す"""
+    executable = command if os.path.isabs(command) else shutil.which(command)
+    if not executable or not os.path.exists(executable):
+        return None
+    try:
+        output = subprocess.run([executable, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_PATTERN.search(output or '')
+    return match.group(0) if match else None
+
+
+def _windows_chrome_version() -> Optional[str]:
+    """Windowsのレジストリからインストール済みChromeのバージョンを取得"""
+    try:
+        import winreg
+    except ImportError:
+        return None
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(hive, r'Software\Google\Chrome\BLBeacon') as key:
+                version, _ = winreg.QueryValueEx(key, 'version')
+                if _VERSION_PATTERN.search(version):
+                    return version
+        except OSError:
+            continue
+    return None
+
+
+def detect_chrome_version() -> Optional[str]:
+    """ネットワークを使わずにローカルのChromeバージョンを検出"""
+    if sys.platform.startswith('win'):
+        return _windows_chrome_version()
+    for command in _CHROME_COMMANDS:
+        version = _run_version_command(command)
+        if version:
+            return version
+    return None
+
+
+def _major(version: Optional[str]) -> Optional[str]:
+    return version.split('.')[0] if version else None
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    """キャッシュ済みのchromedriver情報を読み込む"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Any], path: str = MANIFEST_PATH) -> None:
+    """chromedriver情報をマニフェストに保存"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"Could not write chromedriver manifest {path}: {e}")
+
+
+def _install_with_webdriver_manager() -> str:
+    """webdriver_managerでchromedriverを取得（ネットワークアクセスあり）"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver_path(manifest_path: str = MANIFEST_PATH) -> str:
+    """
+    chromedriverのパスを返す。
+    キャッシュ済みドライバーがローカルChromeのメジャーバージョンと一致すればwebdriver_managerを呼ばない。
+    """
+    global _resolved_path
+    with _resolve_lock:
+        if _resolved_path and os.path.exists(_resolved_path):
+            return _resolved_path
+
+        manifest = load_manifest(manifest_path)
+        cached_path = manifest.get('driver_path')
+        cached_available = bool(cached_path) and os.path.exists(cached_path)
+        chrome_version = detect_chrome_version()
+
+        if cached_available and (chrome_version is None or _major(chrome_version) == manifest.get('chrome_major')):
+            logging.info(f"🧭 Using cached chromedriver {manifest.get('driver_version', '?')} "
+                         f"(Chrome {chrome_version or 'version unknown'})")
+            _resolved_path = cached_path
+            return cached_path
+
+        try:
+            driver_path = _install_with_webdriver_manager()
+        except Exception as e:
+            if cached_available:
+                logging.warning(f"⚠️ chromedriver download failed ({e}). Falling back to cached driver {cached_path}")
+                _resolved_path = cached_path
+                return cached_path
+            raise
+
+        save_manifest({
+            'chrome_version': chrome_version,
+            'chrome_major': _major(chrome_version),
+            'driver_path': driver_path,
+            'driver_version': _run_version_command(driver_path),
+            'resolved_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }, manifest_path)
+        logging.info(f"🧭 Resolved chromedriver via webdriver_manager: {driver_path}")
+        _resolved_path = driver_path
+        return driver_path
@@ -0,0 +1,185 @@
+# features_normalizer.py - 特色テキスト（【見出し】・箇条書きマーカー・空白・改行）をサイト別のルール表に従って1回の走査で整形する
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+# str.splitlines()が行区切りとみなす文字（どれも空白文字なので、前後の空白とまとめて1つの改行に置き換えられる）
+_LINE_BREAK_CHARS = '\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029'
+
+
+@dataclass(frozen=True)
+class FeatureRules:
+    """サイト別の特色テキスト整形ルール"""
+    line_breaks: str = '\n'                 # 行区切り（'all'ならstr.splitlines()と同じ文字すべて）
+    header_breaks: bool = False             # 【…】見出しの前で改行（テキスト全体が対象）
+    break_after: str = ''                   # この文字（＋空白）の直後にbreak_markersが来たら、その前で改行
+    break_markers: str = ''
+    head_markers: str = ''                  # 行頭がこのマーカーの行は分割せず、マーカー直後の空白だけ詰める
+    inline_splits: Tuple[Tuple[str, str, str], ...] = ()  # (含まれていれば適用する文字, 分割パターン, 置換後の行頭)。最初に該当した1つだけ使う
+    item_markers: str = ''                  # 行に最初に見つかったマーカーで分割（最初のマーカーより前は捨てる。inline_splitsより優先）
+    tight_markers: str = ''                 # 行頭マーカー直後の空白を詰める
+    drop_blocks: Tuple[str, ...] = ()       # 除去する宣伝文（DOTALL|IGNORECASE。drop_keywordsのいずれかを必ず含むこと）
+    drop_keywords: Tuple[str, ...] = ()     # これを含む行を除去
+    min_length: int = 0                     # これより短い項目は捨てる
+    dedupe: bool = False                    # 同じ行は最初の1回だけ
+    bullet: str = ''                        # 各項目の先頭に付ける記号
+    max_items: Optional[int] = None
+
+
+FEATURE_RULES: Dict[str, FeatureRules] = {
+    # 汎用（_fetch_standard_features）：見出しの前と、文末・読点の後の箇条書きマーカーの前で改行
+    'default': FeatureRules(
+        line_breaks='all',
+        header_breaks=True,
+        break_after='。、',
+        break_markers='・○◆✓●◉▼■',
+        tight_markers='・○◆✓●◉▼■　☆★※▲▽',
+    ),
+    # ストライク：「・」は文末・読点の後と行頭で、「・」がない行は文末の後の「■」で分割
+    'strike': FeatureRules(
+        head_markers='■●◆○▼◎',
+        inline_splits=(
+            ('・', r'(?:(?<=[。、])|^)\s*・\s*(?:・\s*)?', '・'),
+            ('■', r'(?<=。)\s*■\s*', '■'),
+        ),
+        tight_markers='■●◆○▼◎',
+        min_length=3,
+        dedupe=True,
+    ),
+    # M&A総合研究所：行ごとに最初に見つかったマーカーで項目に分け、「・」付きで最大5項目
+    'masouken': FeatureRules(
+        item_markers='・◆▼○●',
+        min_length=11,
+        bullet='・',
+        max_items=5,
+    ),
+    # インテグループ：資料請求・無料査定の宣伝文とそれを含む行を除去
+    'integroup': FeatureRules(
+        drop_blocks=(
+            r'M&Aを成功させるための秘訣.*?を無料で進呈します。',
+            r'最新のM&A事例を踏まえて.*?お気軽にお問合せください。',
+            r'『中小企業M&Aの真実』.*?を無料で進呈します。',
+            r'無料価値算定サービス.*?お気軽にお問合せください。',
+            r'M&Aを成功させるための.*?無料で進呈します。',
+            r'企業価値を無料で算定.*?お問合せください。',
+        ),
+        drop_keywords=(
+            "M&Aを成功させるための秘訣",
+            "中小企業M&Aの真実",
+            "無料で進呈します",
+            "無料価値算定サービス",
+            "企業価値を無料で算定",
+            "強引に売却を勧めたり",
+            "お気軽にお問合せください",
+        ),
+    ),
+}
+
+
+def _char_class(chars: str) -> str:
+    return '[' + ''.join(re.escape(char) for char in chars) + ']'
+
+
+class FeatureNormalizer:
+    """
+    FeatureRulesをコンパイルした整形器。
+    見出し・マーカー前の改行挿入と前後の空白除去は1本の正規表現の1回の置換で行い、残りは行ごとの文字列操作だけで済ませる。
+    """
+
+    def __init__(self, rules: FeatureRules):
+        self.rules = rules
+        self._break_pattern = self._compile_break_pattern(rules)
+        self._inline_splits: List[Tuple[str, Pattern, str]] = [
+            (trigger, re.compile(pattern), '\n' + head) for trigger, pattern, head in rules.inline_splits]
+        self._drop_blocks = [re.compile(pattern, re.DOTALL | re.IGNORECASE) for pattern in rules.drop_blocks]
+        self._drop_keywords = (re.compile('|'.join(re.escape(keyword) for keyword in rules.drop_keywords))
+                               if rules.drop_keywords else None)
+
+    @staticmethod
+    def _compile_break_pattern(rules: FeatureRules) -> Optional[Pattern]:
+        """改行を入れる位置（と、その前後の空白）に一致する正規表現"""
+        alternatives = []
+        if rules.line_breaks == 'all':
+            # 行区切りを含む空白の連続（行末・行頭の空白と空行をまとめて1つの改行にする）
+            alternatives.append(rf'\s*[{_LINE_BREAK_CHARS}]\s*')
+        if rules.header_breaks:
+            alternatives.append(r'\s*(?=【[^【】]+】)')
+        if rules.break_after and rules.break_markers:
+            alternatives.append(rf'(?<={_char_class(rules.break_after)})\s*(?={_char_class(rules.break_markers)})')
+        if not alternatives:
+            return None
+        # どの候補も空白・【・マーカーのいずれかから始まるので、先読みで他の位置を素早く読み飛ばす
+        first_chars = (r'\s' + ('【' if rules.header_breaks else '')
+                       + ''.join(re.escape(char) for char in rules.break_markers))
+        return re.compile(f"(?=[{first_chars}])(?:{'|'.join(alternatives)})")
+
+    def normalize(self, text: str) -> str:
+        rules = self.rules
+        drop_lines = False
+        if self._drop_keywords is not None and self._drop_keywords.search(text):
+            # 宣伝文はどれもキーワードを含むので、キーワードがなければ除去処理ごと省略できる
+            for pattern in self._drop_blocks:
+                text = pattern.sub('', text)
+            drop_lines = True
+
+        if self._break_pattern is not None:
+            lines = self._break_pattern.sub('\n', text).split('\n')
+        elif rules.line_breaks == 'all':
+            lines = text.splitlines()
+        else:
+            lines = text.split(rules.line_breaks)
+
+        head_markers, tight_markers, item_markers = rules.head_markers, rules.tight_markers, rules.item_markers
+        min_length, bullet, dedupe = rules.min_length, rules.bullet, rules.dedupe
+        max_items = rules.max_items if rules.max_items is not None else -1
+        items: List[str] = []
+        seen: Set[str] = set()
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if drop_lines and self._drop_keywords.search(line):
+                continue
+            if line[0] in head_markers:
+                parts = [line[0] + line[1:].lstrip()]
+            elif item_markers:
+                parts = [line]
+                for marker in item_markers:
+                    if marker in line:
+                        parts = line.split(marker)[1:]
+                        break
+            else:
+                parts = [line]
+                for trigger, pattern, head in self._inline_splits:
+                    if trigger in line:
+                        parts = pattern.sub(head, line).split('\n')
+                        break
+
+            for part in parts:
+                part = part.strip()
+                if not part:
+                    continue
+                if part[0] in tight_markers:
+                    part = part[0] + part[1:].lstrip()
+                if len(part) < min_length:
+                    continue
+                if dedupe:
+                    if part in seen:
+                        continue
+                    seen.add(part)
+                items.append(bullet + part)
+                if len(items) == max_items:
+                    return '\n'.join(items)
+        return '\n'.join(items)
+
+
+@lru_cache(maxsize=None)
+def get_feature_normalizer(style: str = 'default') -> FeatureNormalizer:
+    """ルール表の名前で整形器を取得（コンパイルはプロセス内で1回）"""
+    return FeatureNormalizer(FEATURE_RULES[style])
+
+
+def normalize_features(text: str, style: str = 'default') -> str:
+    """特色テキストをサイト別のルールで整形"""
+    return get_feature_normalizer(style).normalize(text)
@@ -0,0 +1,93 @@
+# fetched_document.py - 取得したページ（生バイト・デコード済みテキスト・パースツリー）を1回のパースで共有する
+from typing import Optional, Union
+
+import httpx
+import lxml.html
+from bs4 import BeautifulSoup
+
+from async_fetcher import decode_response
+from selector_compiler import element_text
+
+
+class FetchedDocument:
+    """
+    1ページ分の取得結果。
+    パースツリーは最初に参照されたときに1回だけ構築し、ブロック判定・構造診断・一覧パーサーで使い回す。
+    soupはBeautifulSoup、treeはコンパイル済みXPath用のlxmlツリー（必要な方だけが構築される）。
+    （ツリーは共有されるため、書き換えが必要な処理はコピーに対して行うこと）
+    """
+
+    def __init__(self, text: str, raw: Optional[bytes] = None, url: Optional[str] = None, parser: str = 'lxml'):
+        self.text = text or ''
+        self.raw = raw
+        self.url = url
+        self.parser = parser
+        self._soup: Optional[BeautifulSoup] = None
+        self._tree = None
+        self._lower_text: Optional[str] = None
+        self._page_text: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> 'FetchedDocument':
+        """httpxのレスポンスから生成（生バイトも保持）"""
+        return cls(decode_response(response), raw=response.content, url=str(response.url))
+
+    @classmethod
+    def coerce(cls, content: Union[str, 'FetchedDocument', None], url: Optional[str] = None) -> Optional['FetchedDocument']:
+        """文字列のHTMLも受け付けるための変換（既にFetchedDocumentならそのまま返す）"""
+        if content is None or isinstance(content, FetchedDocument):
+            return content
+        return cls(content, url=url)
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """パースツリー（初回参照時に構築してキャッシュ）"""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.text, self.parser)
+        return self._soup
+
+    @property
+    def tree(self):
+        """lxmlのパースツリー（初回参照時に構築してキャッシュ）"""
+        if self._tree is None:
+            # エンコーディング宣言付きのstrはlxmlが受け付けないため、UTF-8のバイト列として渡す
+            parser = lxml.html.HTMLParser(encoding='utf-8')
+            self._tree = lxml.html.document_fromstring(self.text.encode('utf-8'), parser=parser)
+        return self._tree
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._soup is not None or self._tree is not None
+
+    def _prefers_tree(self) -> bool:
+        """lxmlツリーだけが構築済みなら、そちらを使ってsoupの構築を避ける"""
+        return self._tree is not None and self._soup is None
+
+    @property
+    def lower_text(self) -> str:
+        """HTMLソース全体を小文字化したもの（キーワード検索用）"""
+        if self._lower_text is None:
+            self._lower_text = self.text.lower()
+        return self._lower_text
+
+    @property
+    def page_text(self) -> str:
+        """ページ本文のテキスト（soup.get_text()の結果をキャッシュ）"""
+        if self._page_text is None:
+            self._page_text = element_text(self.tree) if self._prefers_tree() else self.soup.get_text()
+        return self._page_text
+
+    @property
+    def title(self) -> Optional[str]:
+        """titleタグのテキスト（なければNone）"""
+        if self._prefers_tree():
+            title_tag = self.tree.find('.//title')
+            return element_text(title_tag) if title_tag is not None else None
+        title_tag = self.soup.title
+        return title_tag.get_text() if title_tag else None
@@ -6,6 +6,9 @@ from googleapiclient.errors import HttpError
 import gspread
 from datetime import datetime
 
+from deal_sinks import export_history, records_from_rows
+from sheet_io import SheetWriter, sheet_key
+
 class GoogleSheetsClient:
     def __init__(self, credentials_file='credentials.json'):
         """
@@ -124,15 +127,16 @@ class GoogleSheetsClient:
             print(f"スプレッドシートの取得/作成に失敗しました: {e}")
             return None
     
-    def write_data(self, sheet_name, worksheet_name, headers, data):
+    def write_data(self, sheet_name, worksheet_name, headers, data, site_name=None):
         """
-        スプレッドシートにデータを書き込み
+        スプレッドシートにデータを書き込み（履歴のParquet/JSONLにも追記）
         
         Args:
             sheet_name (str): スプレッドシート名
             worksheet_name (str): ワークシート名
             headers (list): ヘッダー行のリスト
             data (list): 書き込むデータの2次元リスト
+            site_name (str): 履歴のパーティションに使うサイト名（省略時はワークシート名）
         """
         try:
             if not self.gc:
@@ -162,9 +166,12 @@ class GoogleSheetsClient:
             # タイムスタンプを追加
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
+            # 見出し行は記録済みのものと比べ、全データの読み込みはしない
+            writer = SheetWriter(worksheet, sheet_key(spreadsheet.id, worksheet_name))
+            
             # ヘッダーが存在しない場合は追加
-            if not worksheet.get_all_values() or worksheet.row_values(1) != headers:
-                worksheet.insert_row(headers, 1)
+            if writer.headers() != headers:
+                writer.insert_headers(headers)
                 print("ヘッダー行を追加しました。")
             
             # データを追加（既存データの下に追加）
@@ -175,9 +182,10 @@ class GoogleSheetsClient:
                     new_row = row + [timestamp]  # タイムスタンプを最後の列に追加
                     data_with_timestamp.append(new_row)
                 
-                # データを一括で追加
-                worksheet.append_rows(data_with_timestamp)
+                # データを一括で追加（上限内のペースで分割送信し、429・5xxは再試行）
+                writer.append_rows(data_with_timestamp)
                 print(f"{len(data)}行のデータを追加しました。")
+                export_history(records_from_rows(headers, data), site_name=site_name or worksheet_name)
                 
                 # スプレッドシートのURLを表示
                 print(f"データを確認: https://docs.google.com/spreadsheets/d/{spreadsheet.id}")
@@ -0,0 +1,188 @@
+# html_backend.py - HTMLパーサーのバックエンド（bs4+lxml / lxml.html / selectolax）を切り替えられる共通の検索API
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from fetched_document import FetchedDocument
+from selector_compiler import CompiledSelector, compile_selector, element_text
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:  # selectolaxは任意（未インストールならバックエンド一覧から外れる）
+    SelectolaxParser = None
+
+DEFAULT_BACKEND = 'bs4-lxml'
+
+
+class HtmlBackend:
+    """
+    パーサーバックエンドの共通インターフェース。
+    サイトのパーサーはparse()で得たルートに対してselect / select_one / text / attrだけを使う
+    （見出しの後ろの要素をたどる詳細ページはnext_siblings / tagも使う）。
+    """
+    name = ''
+
+    def parse(self, html: str) -> Any:
+        raise NotImplementedError
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        raise NotImplementedError
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def text(self, node: Any, strip: bool = False) -> str:
+        raise NotImplementedError
+
+    def attr(self, node: Any, name: str, default: Optional[str] = None) -> Optional[str]:
+        raise NotImplementedError
+
+    def next_siblings(self, node: Any) -> List[Any]:
+        """後ろに続く兄弟要素（テキストノード・コメントを除く）"""
+        raise NotImplementedError
+
+    def tag(self, node: Any) -> str:
+        """小文字のタグ名"""
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class Bs4Backend(HtmlBackend):
+    """BeautifulSoup（soupsieve）。parserは'lxml'または'html.parser'"""
+
+    def __init__(self, parser: str = 'lxml'):
+        self.parser = parser
+        self.name = f"bs4-{parser}"
+
+    def parse(self, html: str) -> Any:
+        return BeautifulSoup(html, self.parser)
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        return node.select(css)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return node.select_one(css)
+
+    def text(self, node: Any, strip: bool = False) -> str:
+        return node.get_text(strip=strip)
+
+    def attr(self, node: Any, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = node.get(name, default)
+        # class属性などの複数値属性は他のバックエンドと同じくスペース区切りの文字列で返す
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def next_siblings(self, node: Any) -> List[Any]:
+        return node.find_next_siblings(True)
+
+    def tag(self, node: Any) -> str:
+        return node.name or ''
+
+
+@lru_cache(maxsize=512)
+def _compiled(css: str) -> CompiledSelector:
+    compiled = compile_selector(css)
+    if compiled is None:
+        raise ValueError(f"Selector '{css}' is not supported by the lxml backend")
+    return compiled
+
+
+class LxmlBackend(HtmlBackend):
+    """lxml.html＋コンパイル済みXPath（セレクタはプロセス内でキャッシュ）"""
+    name = 'lxml'
+
+    def parse(self, html: str) -> Any:
+        return FetchedDocument(html).tree
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        return _compiled(css).all(node)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return _compiled(css).first(node)
+
+    def text(self, node: Any, strip: bool = False) -> str:
+        return element_text(node, strip=strip)
+
+    def attr(self, node: Any, name: str, default: Optional[str] = None) -> Optional[str]:
+        return node.get(name, default)
+
+    def next_siblings(self, node: Any) -> List[Any]:
+        return [sibling for sibling in node.itersiblings() if isinstance(sibling.tag, str)]
+
+    def tag(self, node: Any) -> str:
+        return node.tag.lower() if isinstance(node.tag, str) else ''
+
+
+class SelectolaxBackend(HtmlBackend):
+    """selectolax（Lexbor/Modest）。最速だが:containsなどsoupsieve独自の擬似クラスは使えない"""
+    name = 'selectolax'
+
+    def parse(self, html: str) -> Any:
+        return SelectolaxParser(html)
+
+    def select(self, node: Any, css: str) -> List[Any]:
+        return node.css(css)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return node.css_first(css)
+
+    def text(self, node: Any, strip: bool = False) -> str:
+        if hasattr(node, 'root'):  # HTMLParser（ドキュメント全体）
+            node = node.root
+        return node.text(deep=True, separator='', strip=strip) if node is not None else ''
+
+    def attr(self, node: Any, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = node.attributes.get(name, default)
+        return default if value is None else value
+
+    def next_siblings(self, node: Any) -> List[Any]:
+        siblings = []
+        sibling = node.next
+        while sibling is not None:
+            if not sibling.tag.startswith('-'):  # -text・-commentなど
+                siblings.append(sibling)
+            sibling = sibling.next
+        return siblings
+
+    def tag(self, node: Any) -> str:
+        return (node.tag or '').lower()
+
+
+_factories: Dict[str, Callable[[], HtmlBackend]] = {
+    'bs4-lxml': lambda: Bs4Backend('lxml'),
+    'bs4-html.parser': lambda: Bs4Backend('html.parser'),
+    'lxml': LxmlBackend,
+}
+if SelectolaxParser is not None:
+    _factories['selectolax'] = SelectolaxBackend
+
+_backends: Dict[str, HtmlBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], HtmlBackend]) -> None:
+    """バックエンドを追加登録"""
+    with _backends_lock:
+        _factories[name] = factory
+        _backends.pop(name, None)
+
+
+def available_backends() -> List[str]:
+    """利用可能なバックエンド名の一覧"""
+    return list(_factories)
+
+
+def get_html_backend(name: Optional[str] = None) -> HtmlBackend:
+    """名前でバックエンドを取得（未登録・未インストールの場合は警告してDEFAULT_BACKENDを使う）"""
+    name = name or DEFAULT_BACKEND
+    if name not in _factories:
+        logging.warning(f"HTML backend '{name}' is not available; using {DEFAULT_BACKEND}")
+        name = DEFAULT_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _factories[name]()
+        return _backends[name]
@@ -0,0 +1,138 @@
+# http_client.py - ホスト単位のコネクションプールを共有するHTTPクライアント管理
+import logging
+import threading
+from typing import Any, ContextManager, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
+}
+
+
+def _http2_available() -> bool:
+    """h2パッケージが導入済みか確認（httpxのHTTP/2はオプション依存）"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpClientManager:
+    """ホストごとに長寿命のhttpx.Clientを保持し、keep-aliveで接続を再利用する"""
+
+    def __init__(self, scraping_config: Optional[Dict[str, Any]] = None):
+        scraping_config = scraping_config or {}
+        pool_config = scraping_config.get('http_pool', {}) or {}
+
+        self.timeout = scraping_config.get('timeout', 15)
+        self.limits = httpx.Limits(
+            max_connections=pool_config.get('max_connections_per_host', 10),
+            max_keepalive_connections=pool_config.get('max_keepalive_per_host', 5),
+            keepalive_expiry=pool_config.get('keepalive_expiry', 30.0),
+        )
+
+        self.http2 = bool(pool_config.get('http2', False))
+        if self.http2 and not _http2_available():
+            logging.warning("HTTP/2 is enabled in config but 'h2' is not installed. Falling back to HTTP/1.1")
+            self.http2 = False
+
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def client_for(self, url: str) -> httpx.Client:
+        """URLのホストに対応するクライアントを取得（なければ生成）"""
+        host = self._host_key(url)
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    base_url=host,
+                    headers=DEFAULT_HEADERS,
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    http2=self.http2,
+                    follow_redirects=True,
+                )
+                self._clients[host] = client
+                logging.debug(f"Opened pooled HTTP client for {host} (http2={self.http2})")
+            return client
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        """プール済みクライアントでGETリクエストを送信"""
+        kwargs: Dict[str, Any] = {}
+        if headers:
+            kwargs['headers'] = headers
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        return self.client_for(url).get(url, **kwargs)
+
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None,
+               timeout: Optional[float] = None) -> ContextManager[httpx.Response]:
+        """プール済みクライアントでGETをストリーミング（with文で使い、iter_bytes()で本文を順に読む）"""
+        kwargs: Dict[str, Any] = {}
+        if headers:
+            kwargs['headers'] = headers
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        return self.client_for(url).stream('GET', url, **kwargs)
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                content: Optional[str] = None, timeout: Optional[float] = None) -> httpx.Response:
+        """プール済みクライアントで任意のメソッドのリクエストを送信（XHRの再送など）"""
+        kwargs: Dict[str, Any] = {}
+        if headers:
+            kwargs['headers'] = headers
+        if content is not None:
+            kwargs['content'] = content
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        return self.client_for(url).request(method, url, **kwargs)
+
+    def close(self) -> None:
+        """全ホストのクライアントを閉じる"""
+        with self._lock:
+            for host, client in self._clients.items():
+                try:
+                    client.close()
+                except Exception as e:
+                    logging.error(f"Error closing HTTP client for {host}: {e}")
+            self._clients.clear()
+
+    def __enter__(self) -> 'HttpClientManager':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_shared_manager: Optional[HttpClientManager] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client(config: Optional[Dict[str, Any]] = None) -> HttpClientManager:
+    """一覧・詳細ページで共有するHttpClientManagerを取得"""
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            scraping_config = (config or {}).get('scraping', {})
+            _shared_manager = HttpClientManager(scraping_config)
+        return _shared_manager
+
+
+def close_http_client() -> None:
+    """共有HttpClientManagerを閉じる（実行終了時に呼び出す）"""
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is not None:
+            _shared_manager.close()
+            _shared_manager = None
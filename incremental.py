@@ -0,0 +1,65 @@
+# incremental.py - 既知案件だけのページが続いたら一覧のページ送りを打ち切る差分クロール
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+DEFAULT_INCREMENTAL_SETTINGS: Dict[str, Any] = {
+    'enabled': True,
+    'max_known_pages': 1,  # 全件既知のページがこの数だけ連続したら停止
+    'newest_first': False,  # 一覧が新着順に並ぶサイトだけTrue（それ以外は既知のページが続いても最後まで取得）
+}
+
+
+def get_incremental_settings(config: Dict[str, Any], site_name: str) -> Dict[str, Any]:
+    """config.yamlのincremental設定（default＋サイト別上書き）を取得"""
+    incremental_config = config.get('incremental', {}) or {}
+    settings = dict(DEFAULT_INCREMENTAL_SETTINGS)
+    settings.update(incremental_config.get('default', {}) or {})
+    settings.update((incremental_config.get('sites', {}) or {}).get(site_name, {}) or {})
+    return settings
+
+
+class KnownPageTracker:
+    """
+    新着順に並ぶ一覧ページで、全案件が既知のページの連続数を数える。
+    known_idsがNone（既存ID不明）、無効設定、または新着順でない（newest_first=False）サイトでは常に全ページを取得する。
+    """
+
+    def __init__(self, site_name: str, known_ids: Optional[Set[str]],
+                 enabled: bool = True, max_known_pages: int = 1, newest_first: bool = False):
+        self.site_name = site_name
+        self.known_ids = known_ids
+        self.max_known_pages = max(1, int(max_known_pages))
+        self.enabled = bool(enabled) and bool(newest_first) and known_ids is not None
+        self.consecutive_known_pages = 0
+
+    @classmethod
+    def for_site(cls, config: Dict[str, Any], site_name: str, known_ids: Optional[Set[str]]) -> 'KnownPageTracker':
+        settings = get_incremental_settings(config, site_name)
+        return cls(site_name, known_ids, settings.get('enabled', True), settings.get('max_known_pages', 1),
+                   settings.get('newest_first', False))
+
+    @property
+    def prefetch_window(self) -> Optional[int]:
+        """先行取得するページ数の上限（差分モード無効ならNone＝全ページ）"""
+        return self.max_known_pages if self.enabled else None
+
+    def should_stop(self, page_ids: Iterable[str]) -> bool:
+        """ページ内のIDを受け取り、ページ送りを止めるべきならTrueを返す"""
+        if not self.enabled:
+            return False
+
+        page_ids = list(page_ids)
+        if not page_ids:
+            # 条件に合う案件が1件もないページは判定材料にしない
+            return False
+
+        if all(page_id in self.known_ids for page_id in page_ids):
+            self.consecutive_known_pages += 1
+        else:
+            self.consecutive_known_pages = 0
+
+        if self.consecutive_known_pages >= self.max_known_pages:
+            logging.info(f"  ⏹️ {self.site_name}: {self.consecutive_known_pages} consecutive page(s) of known deals. "
+                         f"Stopping pagination (incremental mode)")
+            return True
+        return False
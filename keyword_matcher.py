@@ -0,0 +1,92 @@
+# keyword_matcher.py - 複数のキーワード辞書を1本の正規表現（トライ木）にまとめ、テキストを1回走査するだけで分類する
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """キーワード群を共通接頭辞でまとめた正規表現に変換（長いキーワードを優先）"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict[str, dict]) -> str:
+    terminal = '' in node
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        # ここで終わるキーワードもあるので続きは任意（貪欲なので長いキーワードが優先される）
+        return '(?:' + body + ')?'
+    return body
+
+
+class KeywordMatcher:
+    """
+    {ラベル: [キーワード, ...]} からマッチャーを作成する。
+    match_labels()はテキストを1回走査し、含まれるキーワードのラベル集合を返す
+    （`keyword in text` をキーワードの数だけ繰り返すのと同じ結果）。
+    ignore_case=Trueの場合はテキストを1回だけ小文字化して照合する（re.IGNORECASEは大幅に遅いため使わない）。
+    """
+
+    def __init__(self, groups: Dict[str, List[str]], ignore_case: bool = False):
+        self.labels = list(groups)
+        self.ignore_case = ignore_case
+        self._order = {label: index for index, label in enumerate(self.labels)}
+
+        keyword_labels: Dict[str, Set[str]] = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                if keyword:
+                    keyword_labels.setdefault(self._key(keyword), set()).add(label)
+
+        # 一致したキーワードの中に含まれる短いキーワードは走査で拾われないため、そのラベルも持たせておく
+        self._labels_by_keyword: Dict[str, frozenset] = {}
+        # 一致の途中から始まり、一致の外まで続くキーワードがあり得るか（あれば一致の次の文字から走査を再開）
+        self._rescan: Dict[str, bool] = {}
+        for keyword in keyword_labels:
+            labels = set()
+            for other, other_labels in keyword_labels.items():
+                if other in keyword:
+                    labels |= other_labels
+            self._labels_by_keyword[keyword] = frozenset(labels)
+            self._rescan[keyword] = any(
+                other.startswith(keyword[offset:]) and len(other) > len(keyword) - offset
+                for offset in range(1, len(keyword)) for other in keyword_labels
+            )
+
+        self._pattern = re.compile(_trie_pattern(keyword_labels)) if keyword_labels else None
+
+    def _key(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def match_labels(self, text: Optional[str]) -> Set[str]:
+        """テキストに含まれるキーワードのラベル集合"""
+        found: Set[str] = set()
+        if not text or self._pattern is None:
+            return found
+        text = self._key(text)
+        search = self._pattern.search
+        position = 0
+        while True:
+            match = search(text, position)
+            if match is None:
+                break
+            keyword = match.group()
+            found |= self._labels_by_keyword[keyword]
+            if len(found) == len(self.labels):
+                break
+            position = match.start() + 1 if self._rescan[keyword] else match.end()
+        return found
+
+    def first_label(self, text: Optional[str]) -> Optional[str]:
+        """含まれるラベルのうち、辞書の定義順で最初のもの（なければNone）"""
+        found = self.match_labels(text)
+        if not found:
+            return None
+        return min(found, key=self._order.__getitem__)
@@ -1,6 +1,7 @@
 # main.py (完全版 - 修正済み)
 import httpx
 from bs4 import BeautifulSoup, Tag
+from lxml import etree
 import gspread
 from google.oauth2.service_account import Credentials
 import datetime
@@ -13,15 +14,31 @@ import os
 import re
 import random
 from functools import wraps
-from typing import Optional, Dict, List, Set, Any
+from typing import Optional, Dict, List, Set, Any, Union, Tuple, Iterable, Iterator, Callable
 from dataclasses import dataclass, fields
 from enum import Enum
 
+from http_client import get_http_client, close_http_client
+from webdriver_pool import get_webdriver_pool, close_webdriver_pool, performance_logging_driver
+from async_fetcher import build_list_page_urls, prefetch_list_pages
+from incremental import KnownPageTracker
+from adaptive_throttle import get_host_throttle
+from page_readiness import get_readiness_settings, wait_until_ready
+from fetched_document import FetchedDocument
+from selector_compiler import (SiteExtractionPlan, compile_extraction_plans, compile_selector,
+                               element_text, get_extraction_plan)
+from selector_memory import get_selector_memory
+from amount_parser import amount_to_yen
+from streaming_parser import get_streaming_settings, stream_list_items
+from features_normalizer import normalize_features
+from data_feed import FeedError, capture_feed, fetch_feed, get_feed_settings, get_feed_store
+from deal_sinks import SheetsSink, close_history_sink, export_history
+from deal_store import DealStore, close_deal_store, get_deal_store
+from write_behind import WriteBehindSink, get_write_behind_settings
+from sheet_io import AppendError, SheetWriter, get_sheet_layout_cache, get_writer_settings, load_column_rows, sheet_key
+
 # Selenium関連
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -31,6 +48,8 @@ from selenium.webdriver.support import expected_conditions as EC
 CONFIG: Dict[str, Any] = {}
 
 # --- 定数と構造化データクラス ---
+STRIKE_LIST_LIMIT = 52  # ストライク一覧の対象件数（14行×3案件/行の上から52件）
+
 class Constants:
     FIELD_EXTRACTION_TIME = "extraction_time"
     FIELD_SITE_NAME = "site_name"
@@ -104,24 +123,8 @@ class FormattedDealData:
 class DataConverter:
     @staticmethod
     def parse_financial_value(text: str) -> int:
-        """財務テキストを数値に変換"""
-        if not text or any(keyword in text for keyword in ["非公開", "応相談", "赤字", "N/A", "希望なし", "黒字なし", "損益なし"]):
-            return 0
-        text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789')).replace(',', '')
-        target_text = re.split(r'[〜～-]', text)[-1]
-        match = re.search(r'([\d\.]+)', target_text)
-        if not match:
-            return 0
-        try:
-            value = float(match.group(1))
-        except ValueError:
-            return 0
-        multipliers = {'億': 100_000_000, '千万': 10_000_000, '百万': 1_000_000, '万': 10_000}
-        for unit, multiplier in multipliers.items():
-            if unit in text:
-                value *= multiplier
-                break
-        return int(value)
+        """財務テキストを数値に変換（レンジは上限値。解析はamount_parserの共通エンジン）"""
+        return amount_to_yen(text, 'upper')
     
     @staticmethod
     def format_financial_text(text: str) -> str:
@@ -195,9 +198,37 @@ class AntiBlockingManager:
         """ブロック後の回復待機時間を生成"""
         return random.uniform(15, 30)
     
-    def is_blocked_response(self, html_content: str) -> bool:
+    @property
+    def adaptive(self) -> bool:
+        """ホスト別の適応スロットルを使うかどうか（config.yamlのthrottle.adaptive）"""
+        return CONFIG.get('throttle', {}).get('adaptive', True)
+    
+    def wait_before_request(self, url: str, base_min: float = 3, base_max: float = 8) -> float:
+        """リクエスト前の待機（適応スロットル有効時はホストの応答状況に応じた間隔）"""
+        if self.adaptive:
+            return get_host_throttle(url, CONFIG).wait()
+        delay = self.get_human_like_delay(base_min, base_max)
+        time.sleep(delay)
+        return delay
+    
+    def record_page_load(self, url: str, latency: float, blocked: bool, driver: Optional[webdriver.Chrome] = None) -> None:
+        """ページ読み込みの応答時間・ステータス・ブロック有無をスロットルに反映"""
+        if not self.adaptive:
+            return
+        status = None
+        if driver is not None:
+            try:
+                status = driver.execute_script(
+                    "const nav = performance.getEntriesByType('navigation')[0];"
+                    "return nav && nav.responseStatus ? nav.responseStatus : null;")
+            except Exception:
+                status = None
+        get_host_throttle(url, CONFIG).record(latency, status=status, blocked=blocked)
+    
+    def is_blocked_response(self, html_content: Union[str, FetchedDocument]) -> bool:
         """403エラーページかどうかを判定"""
-        if not html_content:
+        document = FetchedDocument.coerce(html_content)
+        if not document:
             return False
             
         blocked_indicators = [
@@ -210,17 +241,16 @@ class AntiBlockingManager:
         ]
         
         # HTMLを小文字に変換して検索
-        content_lower = html_content.lower()
+        content_lower = document.lower_text
         
         for indicator in blocked_indicators:
             if indicator.lower() in content_lower:
                 return True
         
-        # titleタグの確認
-        soup = BeautifulSoup(html_content, 'lxml')
-        title_tag = soup.find('title')
-        if title_tag:
-            title_text = title_tag.get_text().lower()
+        # titleタグの確認（パースツリーは後続の処理でも使い回す）
+        title = document.title
+        if title:
+            title_text = title.lower()
             if 'error' in title_text or 'blocked' in title_text or 'denied' in title_text:
                 return True
         
@@ -234,32 +264,11 @@ class WebDriverManager:
         self.anti_blocking = anti_blocking or AntiBlockingManager()
 
     def __enter__(self) -> webdriver.Chrome:
-        logging.info("Initializing Selenium WebDriver with anti-blocking measures...")
-        chrome_options = Options()
-        
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        # より人間らしいブラウザ設定
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920x1080")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # User-Agentを設定
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        chrome_options.add_argument(f"--user-agent={user_agent}")
-        
+        # 実行全体で共有するプールから起動済みブラウザを借り出す
+        logging.info("Checking out Selenium WebDriver from pool...")
+        self._checkout = get_webdriver_pool(CONFIG, self.headless).checkout()
         try:
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-            
-            # WebDriverの自動化検出を回避
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            logging.info("✅ WebDriver initialized successfully with anti-blocking measures.")
+            self.driver = self._checkout.__enter__()
             return self.driver
         except Exception as e:
             logging.error(f"Failed to initialize WebDriver: {e}")
@@ -267,11 +276,9 @@ class WebDriverManager:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.driver:
-            try:
-                self.driver.quit()
-                logging.info("WebDriver has been closed.")
-            except Exception as e:
-                logging.error(f"Error closing WebDriver: {e}")
+            # ブラウザは終了せずプールへ返却（終了はmain()のclose_webdriver_pool）
+            self._checkout.__exit__(exc_type, exc_val, exc_tb)
+            self.driver = None
 
 class DetailPageScraper:
     """詳細ページのスクレイピングを専門に行うクラス（403対策強化版）"""
@@ -280,30 +287,11 @@ class DetailPageScraper:
         self.anti_blocking = anti_blocking
 
     def _format_features_text(self, raw_text_block: str) -> str:
-        """特色テキストの整形処理"""
-        text_with_header_breaks = re.sub(r'(?<!^)(【[^【】]+】)', r'\n\1', raw_text_block)
-        
-        # 行頭のマーカーのみを対象とし、文中の「・」は分割しない
-        line_start_marker_pattern = r'(?<!^)(?<=。\s*)([・○◆✓●◉▼■])|(?<!^)(?<=、\s*)([・○◆✓●◉▼■])|(?<!^)(?<=\n\s*)([・○◆✓●◉▼■])'
-        
-        # より慎重な分割：文の終わりや明確な区切りの後のマーカーのみ分割
-        if re.search(line_start_marker_pattern, text_with_header_breaks):
-            text_with_all_breaks = re.sub(line_start_marker_pattern, r'\n\1\2\3', text_with_header_breaks)
-            lines = text_with_all_breaks.splitlines()
-        else:
-            lines = text_with_header_breaks.splitlines()
-        
-        final_lines = []
-        for line in lines:
-            stripped_line = line.strip()
-            if stripped_line:
-                # マーカー後の不要なスペースを削除
-                cleaned_line = re.sub(r'^([・○◆✓●◉▼■　☆★※▲▽])[\s　\t]+', r'\1', stripped_line)
-                final_lines.append(cleaned_line)
-        
-        return "\n".join(final_lines)
+        """特色テキストの整形処理（【見出し】と文末・読点の後の行頭マーカーで改行し、空白を詰める）"""
+        return normalize_features(raw_text_block)
 
-    def fetch_features_with_blocking_protection(self, detail_url: str, selectors: Dict[str, Any], referer_url: str = None) -> str:
+    def fetch_features_with_blocking_protection(self, detail_url: str, selectors: Dict[str, Any], referer_url: str = None,
+                                                site_name: Optional[str] = None) -> str:
         """403ブロック対策付きの汎用的な特色抽出メソッド"""
         if not detail_url or detail_url == 'N/A':
             return "-"
@@ -311,19 +299,23 @@ class DetailPageScraper:
         try:
             logging.info(f"    -> Accessing detail page: {detail_url}")
             
-            # 人間らしい待機時間
-            delay = self.anti_blocking.get_human_like_delay()
-            logging.info(f"    -> Waiting {delay:.1f} seconds before access...")
-            time.sleep(delay)
+            # ホストの応答状況に応じた待機時間
+            delay = self.anti_blocking.wait_before_request(detail_url)
+            logging.info(f"    -> Waited {delay:.1f} seconds before access")
             
             # ページにアクセス
+            started = time.monotonic()
             self.driver.get(detail_url)
-            time.sleep(2.5)  # ページ読み込み待機
+            latency = time.monotonic() - started
+            readiness = get_readiness_settings(CONFIG, site_name, 'detail')
+            wait_until_ready(self.driver, readiness, f"{site_name or 'detail'} detail")  # ページ読み込み待機
             
-            html_content = self.driver.page_source
+            document = FetchedDocument(self.driver.page_source, url=detail_url)
+            blocked = self.anti_blocking.is_blocked_response(document)
+            self.anti_blocking.record_page_load(detail_url, latency, blocked, self.driver)
             
             # 403ブロックの検出
-            if self.anti_blocking.is_blocked_response(html_content):
+            if blocked:
                 logging.warning(f"    -> 🚫 403 BLOCK DETECTED for URL: {detail_url}")
                 
                 if not self.anti_blocking.blocked_detected:
@@ -338,22 +330,22 @@ class DetailPageScraper:
                     # リトライ
                     logging.info("    -> Retrying access...")
                     self.driver.get(detail_url)
-                    time.sleep(3)
+                    wait_until_ready(self.driver, readiness, f"{site_name or 'detail'} detail retry")
                     
-                    retry_html = self.driver.page_source
+                    retry_document = FetchedDocument(self.driver.page_source, url=detail_url)
                     
-                    if self.anti_blocking.is_blocked_response(retry_html):
+                    if self.anti_blocking.is_blocked_response(retry_document):
                         logging.error("    -> ❌ Still blocked after retry. Skipping this deal.")
                         return "-"
                     else:
                         logging.info("    -> ✅ Recovery successful!")
-                        html_content = retry_html
+                        document = retry_document
                         self.anti_blocking.blocked_detected = False
                 else:
                     logging.error("    -> ❌ Already in blocked state. Skipping this deal.")
                     return "-"
             
-            detail_soup = BeautifulSoup(html_content, 'lxml')
+            detail_soup = document.soup
             
             # M&A総合研究所の特別処理
             if 'masouken.com' in detail_url:
@@ -504,88 +496,10 @@ class DetailPageScraper:
         return ""
 
     def _format_strike_text_with_linebreaks(self, text: str) -> str:
-        """ストライクのテキストを改行を保持しながら整形"""
+        """ストライクのテキストを改行を保持しながら整形（文中の「企画・開発」などの「・」では分割しない）"""
         if not text:
             return ""
-        
-        lines = []
-        
-        # 既存の改行で分割
-        raw_lines = text.split('\n')
-        
-        for line in raw_lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 行頭のマーカーがある場合の処理
-            line_start_markers = ['■', '●', '◆', '○', '▼', '◎']  # ←ここに「■」を追加
-            has_line_start_marker = any(line.startswith(marker) for marker in line_start_markers)
-            
-            if has_line_start_marker:
-                # 行頭にマーカーがある場合はそのまま追加（マーカー後の空白は削除）
-                cleaned_line = re.sub(r'^([■●◆○▼◎])[\s　\t]+', r'\1', line)  # ←ここにも「■」を追加
-                lines.append(cleaned_line)
-            else:
-                # 行頭にマーカーがない場合は、文中の「・」では分割しない
-                # ただし、明らかに箇条書きと思われる場合（「・」の後に大文字や改行がある場合）のみ分割
-                bullet_pattern = r'([・])(?=\s*[A-Z一-龯])'  # 「・」の後に文字が続く場合のみ
-                
-                # 文中の「・」（例：「企画・開発」）は分割しない
-                # 箇条書きの「・」（例：「・関西地方を中心に」）のみ分割
-                if '・' in line:
-                    # 「・」が行頭にある、または「・」の前後に十分な文脈がある場合のみ分割
-                    parts = re.split(r'(?<=。)\s*・|(?<=、)\s*・|^\s*・', line)
-                    
-                    if len(parts) > 1:
-                        # 分割された場合
-                        for i, part in enumerate(parts):
-                            part = part.strip()
-                            if part:
-                                if i == 0 and not part.startswith('・'):
-                                    lines.append(part)
-                                else:
-                                    if not part.startswith('・'):
-                                        part = f'・{part}'
-                                    # マーカー後の空白を削除
-                                    cleaned_part = re.sub(r'^([・])[\s　\t]+', r'\1', part)
-                                    lines.append(cleaned_part)
-                    else:
-                        # 分割されなかった場合（文中の「・」）はそのまま追加
-                        lines.append(line)
-                else:
-                    # 「・」がない場合は「■」での分割処理を追加
-                    if '■' in line and not line.startswith('■'):
-                        # 「■」で分割（文末の「。」の後の「■」のみ）
-                        parts = re.split(r'(?<=。)\s*■', line)
-                        
-                        if len(parts) > 1:
-                            # 最初の部分をそのまま追加
-                            if parts[0].strip():
-                                lines.append(parts[0].strip())
-                            
-                            # 残りの部分に「■」を付けて追加
-                            for part in parts[1:]:
-                                part = part.strip()
-                                if part:
-                                    cleaned_part = re.sub(r'^[\s　\t]+', '', part)
-                                    lines.append(f'■{cleaned_part}')
-                        else:
-                            lines.append(line)
-                    else:
-                        # 「■」がない場合、または行頭が「■」の場合はそのまま追加
-                        lines.append(line)
-        
-        # 重複除去と最終クリーンアップ
-        final_lines = []
-        seen = set()
-        
-        for line in lines:
-            if line and len(line) > 2 and line not in seen:
-                final_lines.append(line)
-                seen.add(line)
-        
-        return '\n'.join(final_lines)
+        return normalize_features(text, 'strike')
 
     def _extract_strike_features_from_text(self, detail_soup: BeautifulSoup) -> List[str]:
         """ストライクの特色をテキスト全体から抽出（フォールバック）"""
@@ -831,36 +745,11 @@ class DetailPageScraper:
         
         cleaned_text = text.strip()
         
-        # 【修正】マーカーがある場合は改行を保持
+        # 【修正】マーカーがある場合は改行を保持（行ごとに最初のマーカーで項目に分け、最大5項目）
         if any(marker in cleaned_text for marker in ['・', '◆', '▼', '○', '●']):
-            lines = []
-            # まず改行で分割
-            text_lines = cleaned_text.split('\n')
-            
-            for line in text_lines:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # マーカーで分割しつつ改行も考慮
-                found_marker = False
-                for marker in ['・', '◆', '▼', '○', '●']:
-                    if marker in line:
-                        found_marker = True
-                        # マーカーで分割
-                        parts = line.split(marker)
-                        for part in parts[1:]:  # 最初の空の部分をスキップ
-                            part = part.strip()
-                            if len(part) > 10:
-                                cleaned_part = re.sub(r'^[\s　]+', '', part)
-                                lines.append(f"・{cleaned_part}")
-                        break
-                
-                if not found_marker and len(line) > 10:
-                    lines.append(f"・{line}")
-            
-            if lines:
-                return '\n'.join(lines[:5])  # 最大5項目
+            formatted = normalize_features(cleaned_text, 'masouken')
+            if formatted:
+                return formatted
         
         # 長すぎる場合は切り詰め
         if len(cleaned_text) > 500:
@@ -892,40 +781,63 @@ class UniversalParser:
     """統一されたパーサークラス"""
     
     @staticmethod
-    def parse_list_page(site_config: Dict[str, Any], html_content: str) -> List[RawDealData]:
-        """汎用的な一覧ページパーサー"""
+    def parse_list_page(site_config: Dict[str, Any], html_content: Union[str, FetchedDocument]) -> List[RawDealData]:
+        """汎用的な一覧ページパーサー（パースツリーはFetchedDocumentのものを共有）"""
+        document = FetchedDocument.coerce(html_content)
         site_name = site_config['name']
         parser_type = site_config.get('parser_type', 'standard')
         
         # M&A総合研究所の特別処理
         if parser_type == 'text_based' or site_name == "M&A総合研究所":
-            return UniversalParser._parse_masouken_text_based(site_config, html_content)
+            return UniversalParser._parse_masouken_text_based(site_config, document)
         
-        # M&Aキャピタルパートナーズの特別処理
+        # M&Aキャピタルパートナーズの特別処理（:containsを含むセレクタもコンパイル済みならlxmlで直接抽出）
         if site_name == "M&Aキャピタルパートナーズ":
-            return UniversalParser._parse_ma_capital_partners(site_config, html_content)
+            plan = get_extraction_plan(site_config)
+            if plan is not None:
+                return UniversalParser._parse_ma_capital_partners_compiled(site_config, document, plan)
+            return UniversalParser._parse_ma_capital_partners(site_config, document)
         
         # ストライクの特別処理
         if site_name == "ストライク":
-            return UniversalParser._parse_strike(site_config, html_content)
+            return UniversalParser._parse_strike(site_config, document)
         
-        # 標準的なHTMLセレクター処理
-        return UniversalParser._parse_selector_based(site_config, html_content)
+        # 標準的なHTMLセレクター処理（コンパイル済みプランがあればlxmlで直接抽出）
+        plan = get_extraction_plan(site_config)
+        if plan is not None:
+            return UniversalParser._parse_selector_compiled(site_config, document, plan)
+        return UniversalParser._parse_selector_based(site_config, document)
+    
+    @staticmethod
+    def selector_plan_for(site_config: Dict[str, Any]) -> Optional[SiteExtractionPlan]:
+        """標準セレクターパーサーで処理されるサイトのコンパイル済みプラン（専用パーサーのサイトはNone）"""
+        site_name = site_config['name']
+        if site_config.get('parser_type', 'standard') == 'text_based' or site_name in (
+                "M&A総合研究所", "M&Aキャピタルパートナーズ", "ストライク"):
+            return None
+        return get_extraction_plan(site_config)
     
     @staticmethod
-    def _parse_strike(site_config: Dict[str, Any], html_content: str) -> List[RawDealData]:
+    def _parse_strike(site_config: Dict[str, Any], document: FetchedDocument) -> List[RawDealData]:
         """ストライク専用パーサー（動的読み込み対応版）"""
-        soup = BeautifulSoup(html_content, 'lxml')
-        results = []
-        
         # デバッグ用: HTMLファイル保存
         if CONFIG.get('debug', {}).get('save_html_files', False):
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             debug_file = os.path.join("debug", f"debug_strike_{timestamp}.html")
             with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+                f.write(document.text)
             logging.info(f"Debug: HTML saved to {debug_file}")
         
+        entries = UniversalParser._strike_list_entries(document)
+        results = UniversalParser._strike_entries_to_deals(site_config, entries)
+        logging.info(f"ストライク: Successfully extracted {len(results)} deals meeting criteria")
+        return results
+
+    @staticmethod
+    def _strike_list_entries(document: FetchedDocument) -> List[Dict[str, str]]:
+        """ストライク一覧の表示値（案件ID・売上高）を上から順に取得"""
+        soup = document.soup
+        
         # 案件アイテムを抽出（より柔軟なセレクター）
         selectors_to_try = [
             'div.search-result__item',
@@ -947,59 +859,51 @@ class UniversalParser:
             logging.warning("No items found with any selector")
             return []
         
-        # 上から52件を対象（14行×3案件/行）
-        items_to_process = items[:52]
-        
+        entries = []
+        items_to_process = items[:STRIKE_LIST_LIMIT]
         for i, item in enumerate(items_to_process):
             try:
-                logging.info(f"Processing item {i+1}/{len(items_to_process)}")
-                
                 # 案件番号の抽出（より柔軟に）
                 deal_id = UniversalParser._extract_strike_deal_id_flexible(item)
                 if not deal_id:
                     logging.info(f"No deal ID found in item {i+1}, skipping")
                     continue
-                
-                logging.info(f"Found deal ID: {deal_id}")
-                
-                # 売上高の抽出とフィルタリング
-                revenue_text = UniversalParser._extract_strike_revenue_flexible(item)
-                
-                # 売上高フィルタリング：指定された4パターンのみ詳細ページに進む
-                valid_revenues = ["5～10億円", "10～50億円", "50～100億円", "100億円超"]
-                if revenue_text not in valid_revenues:
-                    logging.info(f"Skipping deal {deal_id}: Revenue '{revenue_text}' doesn't meet criteria")
-                    continue
-                
-                logging.info(f"Revenue meets criteria: {revenue_text}")
-                
-                # タイトルの抽出（詳細ページで取得するため、ここでは仮のタイトル）
-                title = f"ストライク案件_{deal_id}"
-                
-                # 詳細ページのリンクを構築
-                link = f"https://www.strike.co.jp/smart/sell_details.html?code={deal_id}"
-                
-                # データ作成
-                deal_data = RawDealData(
-                    site_name=site_config['name'],
-                    deal_id=deal_id,
-                    title=title,
-                    link=link,
-                    location_text="",
-                    revenue_text=revenue_text,
-                    profit_text="-",
-                    price_text="-",
-                    features_text=""
-                )
-                
-                results.append(deal_data)
-                logging.info(f"Successfully extracted deal: {deal_id}")
-                
+                entries.append({'id': deal_id, 'revenue': UniversalParser._extract_strike_revenue_flexible(item)})
             except Exception as e:
                 logging.error(f"Error parsing ストライク item {i+1}: {e}")
                 continue
-        
-        logging.info(f"ストライク: Successfully extracted {len(results)} deals meeting criteria")
+        return entries
+
+    @staticmethod
+    def _strike_entries_to_deals(site_config: Dict[str, Any], entries: List[Dict[str, str]]) -> List[RawDealData]:
+        """案件ID・売上高から、売上高の条件を満たす案件のデータを作成（一覧ページ・データフィード共通）"""
+        results = []
+        for entry in entries:
+            deal_id = entry['id']
+            logging.info(f"Found deal ID: {deal_id}")
+            
+            # 売上高フィルタリング：指定された4パターンのみ詳細ページに進む
+            revenue_text = entry.get('revenue', '')
+            valid_revenues = ["5～10億円", "10～50億円", "50～100億円", "100億円超"]
+            if revenue_text not in valid_revenues:
+                logging.info(f"Skipping deal {deal_id}: Revenue '{revenue_text}' doesn't meet criteria")
+                continue
+            
+            logging.info(f"Revenue meets criteria: {revenue_text}")
+            
+            # データ作成（タイトルは詳細ページで取得するため、ここでは仮のタイトル）
+            results.append(RawDealData(
+                site_name=site_config['name'],
+                deal_id=deal_id,
+                title=f"ストライク案件_{deal_id}",
+                link=f"https://www.strike.co.jp/smart/sell_details.html?code={deal_id}",
+                location_text="",
+                revenue_text=revenue_text,
+                profit_text="-",
+                price_text="-",
+                features_text=""
+            ))
+            logging.info(f"Successfully extracted deal: {deal_id}")
         return results
 
     @staticmethod
@@ -1063,9 +967,9 @@ class UniversalParser:
         return ""
     
     @staticmethod
-    def _parse_ma_capital_partners(site_config: Dict[str, Any], html_content: str) -> List[RawDealData]:
+    def _parse_ma_capital_partners(site_config: Dict[str, Any], document: FetchedDocument) -> List[RawDealData]:
         """M&Aキャピタルパートナーズ専用パーサー（柔軟性向上版）"""
-        soup = BeautifulSoup(html_content, 'lxml')
+        soup = document.soup
         results = []
         
         # デバッグ用: HTMLファイル保存
@@ -1073,7 +977,7 @@ class UniversalParser:
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             debug_file = os.path.join("debug", f"debug_ma_capital_{timestamp}.html")
             with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+                f.write(document.text)
             logging.info(f"Debug: HTML saved to {debug_file}")
         
         # 案件リストを抽出（より柔軟なセレクター）
@@ -1160,6 +1064,105 @@ class UniversalParser:
         logging.info(f"M&Aキャピタルパートナーズ: Successfully extracted {len(results)} deals")
         return results
     
+    @staticmethod
+    def _parse_ma_capital_partners_compiled(site_config: Dict[str, Any], document: FetchedDocument,
+                                            plan: SiteExtractionPlan) -> List[RawDealData]:
+        """
+        M&Aキャピタルパートナーズのコンパイル済みXPath版（config.yamlのdata_selectorsで各項目を取り、
+        取れない項目だけ_parse_ma_capital_partnersと同じく本文から補う。特色は条件を満たした案件だけ従来のヘルパーで抽出）
+        """
+        if CONFIG.get('debug', {}).get('save_html_files', False):
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            debug_file = os.path.join("debug", f"debug_ma_capital_{timestamp}.html")
+            with open(debug_file, 'w', encoding='utf-8') as f:
+                f.write(document.text)
+            logging.info(f"Debug: HTML saved to {debug_file}")
+        
+        used_selector, items = plan.select_items(document.tree, get_selector_memory(CONFIG))
+        if not items:
+            logging.warning("No items found with any selector")
+            return []
+        logging.info(f"Found {len(items)} items using selector: {used_selector}")
+        
+        base_url = '/'.join(site_config['url'].split('/')[:3])
+        min_revenue = CONFIG.get('scraping', {}).get('min_revenue', 300000000)
+        min_profit = CONFIG.get('scraping', {}).get('min_profit', 30000000)
+        results = []
+        
+        def field_text(item, jp_key: str) -> str:
+            element = plan.extract_first(item, jp_key)
+            return element_text(element, strip=True) if element is not None else ""
+        
+        for i, item in enumerate(items):
+            try:
+                item_text = element_text(item)
+                deal_match = re.search(r'案件No[：:\s]*([A-Z0-9-]+)', field_text(item, '案件ID'))
+                deal_id = deal_match.group(1) if deal_match else UniversalParser._ma_capital_text_field(
+                    item_text, ['案件No', '案件番号', 'No'], r'[：:\s]*([A-Z0-9-]+)')
+                if not deal_id:
+                    logging.info(f"No deal number found in item {i+1}, skipping")
+                    continue
+                
+                title = field_text(item, 'タイトル')
+                if len(title) <= 5:
+                    title = f"M&A案件_{deal_id}"
+                
+                link_element = plan.extract_first(item, 'リンク')
+                if link_element is None or not link_element.get('href'):
+                    link_element = next((a for a in item.iter('a') if a.get('href')), None)
+                if link_element is not None:
+                    href = link_element.get('href')
+                    link = href if href.startswith('http') else f"{base_url}{href}"
+                else:
+                    link = f"{base_url}/deal/{deal_id}/"
+                
+                revenue_text = field_text(item, '売上高') or UniversalParser._ma_capital_text_field(
+                    item_text, ['概算売上', '売上高', '売上'])
+                profit_text = field_text(item, '営業利益') or UniversalParser._ma_capital_text_field(
+                    item_text, ['営業利益', '利益'])
+                
+                if (DataConverter.parse_financial_value(revenue_text) < min_revenue
+                        or DataConverter.parse_financial_value(profit_text) < min_profit):
+                    logging.info(f"Skipping deal {deal_id}: doesn't meet financial criteria")
+                    continue
+                
+                location_text = field_text(item, '所在地') or UniversalParser._ma_capital_text_field(
+                    item_text, ['所在地', 'エリア', '地域'])
+                price_text = field_text(item, '希望金額') or UniversalParser._ma_capital_text_field(
+                    item_text, ['希望金額', '譲渡希望価格', '価格'])
+                # 事業内容は<br>区切りのブロックを整形する従来のヘルパーを、条件を満たした案件の要素だけに使う
+                item_soup = BeautifulSoup(etree.tostring(item, encoding='unicode', method='html'), 'html.parser')
+                features_text = UniversalParser._extract_ma_capital_business_content_flexible(item_soup)
+                
+                results.append(RawDealData(
+                    site_name=site_config['name'],
+                    deal_id=deal_id,
+                    title=title,
+                    link=link,
+                    location_text=location_text,
+                    revenue_text=revenue_text,
+                    profit_text=profit_text,
+                    price_text=price_text,
+                    features_text=features_text
+                ))
+                logging.info(f"Successfully extracted deal: {deal_id} - {title[:50]}")
+                
+            except Exception as e:
+                logging.error(f"Error parsing M&Aキャピタルパートナーズ item {i+1}: {e}")
+                continue
+        
+        logging.info(f"M&Aキャピタルパートナーズ: Successfully extracted {len(results)} deals")
+        return results
+    
+    @staticmethod
+    def _ma_capital_text_field(item_text: str, field_names: List[str], value_pattern: str = r'[：:\s]*([^\n]+)') -> str:
+        """案件の本文から「項目名＋値」を探し、最初に見つかった値を返す（見つからなければ空文字）"""
+        for field_name in field_names:
+            match = re.search(rf'{field_name}{value_pattern}', item_text)
+            if match:
+                return match.group(1).strip()
+        return ""
+    
     @staticmethod
     def _extract_ma_capital_deal_id_flexible(item: Tag) -> str:
         """M&Aキャピタルパートナーズの案件IDを柔軟に抽出"""
@@ -1262,14 +1265,7 @@ class UniversalParser:
                         return dd.get_text(strip=True)
         
         # アプローチ3: テキスト全体から抽出
-        item_text = item.get_text()
-        for field_name in field_names:
-            pattern = rf'{field_name}[：:\s]*([^\n]+)'
-            match = re.search(pattern, item_text)
-            if match:
-                return match.group(1).strip()
-        
-        return ""
+        return UniversalParser._ma_capital_text_field(item.get_text(), field_names)
 
     @staticmethod
     def _extract_ma_capital_business_content_flexible(item: Tag) -> str:
@@ -1414,9 +1410,9 @@ class UniversalParser:
         return ""
         
     @staticmethod
-    def _parse_selector_based(site_config: Dict[str, Any], html_content: str) -> List[RawDealData]:
+    def _parse_selector_based(site_config: Dict[str, Any], document: FetchedDocument) -> List[RawDealData]:
         """セレクターベースの標準パーサー（柔軟性向上版）"""
-        soup = BeautifulSoup(html_content, 'lxml')
+        soup = document.soup
         
         # より柔軟なアイテムセレクター
         item_selectors = [
@@ -1429,17 +1425,14 @@ class UniversalParser:
             'tr'
         ]
         
-        items = []
-        for selector in item_selectors:
-            if selector:
-                items = soup.select(selector)
-                if items:
-                    logging.info(f"Found {len(items)} items using selector: {selector}")
-                    break
+        # 前回当たったセレクタから試し、外れたときだけ総当たり（どのページにも一致しやすいarticle・trは記録しない）
+        used_selector, items = get_selector_memory(CONFIG).find_first(
+            site_config['name'], 'list_items', item_selectors, soup.select, generic=['article', 'tr'])
         
         if not items:
             logging.warning("No items found with any selector")
             return []
+        logging.info(f"Found {len(items)} items using selector: {used_selector}")
         
         results = []
         
@@ -1494,7 +1487,60 @@ class UniversalParser:
         return results
 
     @staticmethod
-    def _parse_masouken_text_based(site_config: Dict[str, Any], html_content: str) -> List[RawDealData]:
+    def _parse_selector_compiled(site_config: Dict[str, Any], document: FetchedDocument,
+                                 plan: SiteExtractionPlan) -> List[RawDealData]:
+        """コンパイル済みXPathによるセレクターベースパーサー（_parse_selector_basedと同じ抽出結果）"""
+        used_selector, items = plan.select_items(document.tree, get_selector_memory(CONFIG))
+        if not items:
+            logging.warning("No items found with any selector")
+            return []
+        logging.info(f"Found {len(items)} items using selector: {used_selector}")
+        
+        results = []
+        base_url = '/'.join(site_config['url'].split('/')[:3])
+        
+        for item in items:
+            deal = UniversalParser._compiled_item_to_deal(site_config, item, plan, base_url)
+            if deal is not None:
+                results.append(deal)
+        
+        return results
+
+    @staticmethod
+    def _compiled_item_to_deal(site_config: Dict[str, Any], item, plan: SiteExtractionPlan,
+                               base_url: str) -> Optional[RawDealData]:
+        """1件分のアイテム要素（lxml）から案件データを作成（ストリーミング解析でも使用）"""
+        data = {'site_name': site_config['name']}
+        
+        for jp_key in plan.fields:
+            en_key = Constants.JAPANESE_TO_ENGLISH_FIELDS.get(jp_key)
+            if not en_key:
+                continue
+            
+            element = plan.extract_first(item, jp_key)
+            text_content = element_text(element, strip=True) if element is not None else ""
+            
+            if en_key == Constants.FIELD_LINK and element is not None:
+                href = element.get('href', '')
+                data[en_key] = href if href.startswith('http') else f"{base_url}{href}"
+            elif en_key in [Constants.FIELD_REVENUE, Constants.FIELD_PROFIT, Constants.FIELD_LOCATION, Constants.FIELD_PRICE, Constants.FIELD_FEATURES]:
+                data[f"{en_key}_text"] = text_content
+            else:
+                data[en_key] = text_content
+        
+        # 追加のDL要素処理（M&Aロイヤル用）
+        if site_config['name'] == "M&Aロイヤルアドバイザリー":
+            UniversalParser._extract_dl_elements_compiled(item, data)
+            enhanced_features = UniversalParser._extract_enhanced_features_flexible(item)
+            if enhanced_features and enhanced_features != "-":
+                data['features_text'] = enhanced_features
+        
+        if data.get('deal_id') and data.get('title') and data.get('link'):
+            return RawDealData(**{k: v for k, v in data.items() if k in {f.name for f in fields(RawDealData)}})
+        return None
+
+    @staticmethod
+    def _parse_masouken_text_based(site_config: Dict[str, Any], document: FetchedDocument) -> List[RawDealData]:
         """M&A総合研究所専用の改良版テキストベースパーサー（柔軟性向上版）"""
         results = []
         
@@ -1503,11 +1549,11 @@ class UniversalParser:
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             debug_file = os.path.join("debug", f"debug_masouken_{timestamp}.html")
             with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+                f.write(document.text)
             logging.info(f"Debug: HTML saved to {debug_file}")
         
-        # BeautifulSoupでパース
-        soup = BeautifulSoup(html_content, 'lxml')
+        # 共有のパースツリーを使用
+        soup = document.soup
         
         # より柔軟なセレクターを試行
         deal_selectors = [
@@ -1520,12 +1566,13 @@ class UniversalParser:
             'div[class*="item"]'
         ]
         
-        deal_items = []
-        for selector in deal_selectors:
-            deal_items = soup.select(selector)
-            if deal_items:
-                logging.info(f"Found {len(deal_items)} items using selector: {selector}")
-                break
+        # 前回当たったセレクタから試す（どのページにも一致しやすい汎用の代替は記録しない）
+        used_selector, deal_items = get_selector_memory(CONFIG).find_first(
+            site_config['name'], 'list_items', deal_selectors, soup.select,
+            generic=['article', 'li[class*="item"]', 'div[class*="item"]'])
+        deal_items = deal_items or []
+        if deal_items:
+            logging.info(f"Found {len(deal_items)} items using selector: {used_selector}")
         
         if deal_items:
             for item in deal_items:
@@ -1602,21 +1649,18 @@ class UniversalParser:
         
         # フォールバック処理も改善
         if not results:
-            results = UniversalParser._parse_masouken_text_fallback_improved(site_config, html_content)
+            results = UniversalParser._parse_masouken_text_fallback_improved(site_config, document)
         
         logging.info(f"M&A総合研究所: Successfully extracted {len(results)} deals")
         return results
 
     @staticmethod
-    def _parse_masouken_text_fallback_improved(site_config: Dict[str, Any], html_content: str) -> List[RawDealData]:
+    def _parse_masouken_text_fallback_improved(site_config: Dict[str, Any], document: FetchedDocument) -> List[RawDealData]:
         """M&A総合研究所のフォールバックテキスト抽出（改善版）"""
         results = []
         
-        # BeautifulSoupでパース
-        soup = BeautifulSoup(html_content, 'lxml')
-        
         # アプローチ1: 案件IDパターンでテキスト分割
-        content_text = soup.get_text()
+        content_text = document.page_text
         logging.info(f"Total content length: {len(content_text)} characters")
         
         # 案件IDパターンを検索
@@ -1786,15 +1830,8 @@ class UniversalParser:
     def _extract_dl_elements_flexible(item: Tag, data: Dict[str, str]) -> None:
         """DL要素からの詳細情報抽出（柔軟版）"""
         # より多くのdl構造を試行
-        dl_selectors = [
-            "dl.p-case__dl",
-            "dl[class*='case']",
-            "div dl",
-            "dl"
-        ]
-        
         dl_tags = []
-        for selector in dl_selectors:
+        for selector in UniversalParser._DL_SELECTORS:
             dl_tags = item.select(selector)
             if dl_tags:
                 break
@@ -1811,11 +1848,37 @@ class UniversalParser:
                                         Constants.FIELD_LOCATION, Constants.FIELD_PRICE]:
                     data[f"{en_key}_text"] = dd.get_text(strip=True)
 
+    _DL_SELECTORS = ["dl.p-case__dl", "dl[class*='case']", "div dl", "dl"]
+    _COMPILED_DL_SELECTORS = [compile_selector(selector) for selector in _DL_SELECTORS]
+    _COMPILED_DT = compile_selector("dt")
+    _COMPILED_DD = compile_selector("dd")
+
+    @staticmethod
+    def _extract_dl_elements_compiled(item, data: Dict[str, str]) -> None:
+        """DL要素からの詳細情報抽出（lxml要素版・_extract_dl_elements_flexibleと同じ処理）"""
+        dl_tags = []
+        for selector in UniversalParser._COMPILED_DL_SELECTORS:
+            dl_tags = selector.all(item)
+            if dl_tags:
+                break
+        
+        for dl in dl_tags:
+            dt = UniversalParser._COMPILED_DT.first(dl)
+            dd = UniversalParser._COMPILED_DD.first(dl)
+            
+            if dt is not None and dd is not None:
+                jp_key = element_text(dt, strip=True)
+                en_key = Constants.JAPANESE_TO_ENGLISH_FIELDS.get(jp_key)
+                
+                if en_key and en_key in [Constants.FIELD_REVENUE, Constants.FIELD_PROFIT, 
+                                        Constants.FIELD_LOCATION, Constants.FIELD_PRICE]:
+                    data[f"{en_key}_text"] = element_text(dd, strip=True)
+
     @staticmethod
-    def _extract_enhanced_features_flexible(item_element: Tag) -> str:
-        """M&Aロイヤル用の拡張特色抽出（柔軟版）"""
+    def _extract_enhanced_features_flexible(item_element) -> str:
+        """M&Aロイヤル用の拡張特色抽出（柔軟版・BeautifulSoup/lxmlどちらの要素も可）"""
         try:
-            all_text = item_element.get_text()
+            all_text = item_element.get_text() if isinstance(item_element, Tag) else element_text(item_element)
             
             # 特徴セクションのパターン検索（より多くのパターン）
             feature_patterns = [
@@ -1871,6 +1934,10 @@ class GSheetConnector:
     def __init__(self, config: Dict):
         self.config = config['google_sheets']
         self.worksheet = self._connect()
+        self.sheet_key = sheet_key(self.config['spreadsheet_id'], self.config['sheet_name'])
+        self.layout_cache = get_sheet_layout_cache(config)
+        self.writer = SheetWriter(self.worksheet, self.sheet_key, self.layout_cache, get_writer_settings(config))
+        self.sink = SheetsSink(self.writer, [f.name for f in fields(FormattedDealData)])
 
     def _connect(self):
         logging.info("Connecting to Google Sheets...")
@@ -1891,40 +1958,53 @@ class GSheetConnector:
             logging.critical(f"❌ Google Sheets connection error: {e}")
             return None
 
-    def get_existing_ids(self) -> Set[str]:
-        """既存のユニークIDを取得"""
+    def get_existing_rows(self) -> Optional[Dict[str, int]]:
+        """既存のユニークID -> 行番号を取得（ローカルの案件ストアとの突き合わせ用。読み込みに失敗したらNone）"""
         if not self.worksheet:
-            return set()
+            return None
         logging.info("Fetching existing deal IDs from the sheet...")
         try:
-            all_data = self.worksheet.get_all_records()
-            if all_data and Constants.FIELD_UNIQUE_ID in all_data[0]:
-                ids = {row[Constants.FIELD_UNIQUE_ID] for row in all_data if row.get(Constants.FIELD_UNIQUE_ID)}
-                logging.info(f"Found {len(ids)} existing IDs.")
-                return ids
-            logging.info("No existing data or 'unique_id' column found.")
-            return set()
+            # 全セルではなくunique_id列だけを読む（列番号は記録済みの見出し行から求める）
+            rows = self.writer.call(load_column_rows, self.worksheet, self.sheet_key, Constants.FIELD_UNIQUE_ID, self.layout_cache)
+            if rows:
+                logging.info(f"Found {len(rows)} existing IDs.")
+            else:
+                logging.info("No existing data or 'unique_id' column found.")
+            return rows
         except Exception as e:
             logging.error(f"Error fetching existing IDs: {e}")
-            return set()
+            return None
 
-    def write_deals(self, new_deals: List[FormattedDealData]) -> None:
-        """新しい案件データをスプレッドシートに書き込み"""
+    def write_deals(self, new_deals: List[FormattedDealData]) -> Optional[List[Optional[int]]]:
+        """新しい案件データをスプレッドシートに書き込み（記録済みの見出し行に列順を合わせる）。成功したら各案件の行番号、失敗したらNone"""
         if not self.worksheet or not new_deals:
-            return
+            return None
         logging.info(f"Writing {len(new_deals)} new deals to the spreadsheet...")
         try:
-            all_values = self.worksheet.get_all_values()
-            headers = [f.name for f in fields(FormattedDealData)]
-            if not all_values:
-                self.worksheet.append_row(headers, value_input_option='USER_ENTERED')
-            existing_headers = self.worksheet.row_values(1) if all_values else headers
-            rows_to_append = [[getattr(deal, key, '') for key in existing_headers] for deal in new_deals]
-            if rows_to_append:
-                self.worksheet.append_rows(rows_to_append, value_input_option='USER_ENTERED')
+            # 記録済みの見出しの順に並べ、上限内のペースでまとめて追記する（429・5xxは再試行）
+            sheet_rows = self.sink.write(new_deals)
             logging.info(f"✅ Successfully appended {len(new_deals)} rows.")
+            return sheet_rows
+        except AppendError as e:
+            # 書き込めたチャンクの分だけ返し、次回その分を再送しないようにする
+            logging.error(f"Error writing to spreadsheet after {len(e.sheet_rows)} rows: {e.cause}")
+            return e.sheet_rows or None
         except Exception as e:
             logging.error(f"Error writing to spreadsheet: {e}")
+            return None
+
+    def update_deals(self, updates: Dict[str, Tuple[int, Dict[str, str]]]) -> Tuple[List[str], List[str]]:
+        """掲載内容が変わった案件の変更セルだけを書き換える（行のunique_idを確かめてから）。(書き換えたID, 行がずれていたID)を返す"""
+        if not self.worksheet or not updates:
+            return [], []
+        logging.info(f"Updating {len(updates)} changed deals in the spreadsheet...")
+        try:
+            updated, moved = self.writer.update_cells(updates, Constants.FIELD_UNIQUE_ID)
+            logging.info(f"✅ Successfully updated {len(updated)} deals.")
+            return updated, moved
+        except Exception as e:
+            logging.error(f"Error updating spreadsheet: {e}")
+            return [], []
 
 def load_config(file_path: str = 'config.yaml') -> None:
     """設定ファイルの読み込み"""
@@ -1934,7 +2014,11 @@ def load_config(file_path: str = 'config.yaml') -> None:
             config = yaml.safe_load(f)
         if 'GOOGLE_SHEETS_ID' in os.environ:
             config['google_sheets']['spreadsheet_id'] = os.environ['GOOGLE_SHEETS_ID']
+        # セレクタ記憶などの相対パスはconfig.yamlのあるディレクトリ基準で解決する
+        config['config_dir'] = os.path.dirname(os.path.abspath(file_path))
         CONFIG = config
+        # 一覧ページのセレクタは読み込み時に1回だけXPathへコンパイル
+        compile_extraction_plans(CONFIG)
     except Exception as e:
         print(f"❌ Config file read error: {e}")
         raise
@@ -1973,15 +2057,12 @@ def retry_on_failure(max_retries_key: str = 'max_retries', delay_key: str = 'ret
     return decorator
 
 @retry_on_failure()
-def fetch_html(url: str) -> Optional[str]:
-    """HTMLコンテンツの取得"""
-    timeout = CONFIG.get('scraping', {}).get('timeout', 15)
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+def fetch_document(url: str) -> Optional[FetchedDocument]:
+    """HTMLコンテンツの取得（生バイト・デコード済みテキストを保持したFetchedDocumentを返す）"""
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.text
+        response = get_http_client(CONFIG).get(url)
+        response.raise_for_status()
+        return FetchedDocument.from_response(response)
     except httpx.TimeoutException as e:
         raise httpx.RequestError(f"Timeout occurred: {e}")
     except httpx.HTTPStatusError as e:
@@ -1994,20 +2075,28 @@ def fetch_html(url: str) -> Optional[str]:
         logging.error(f"Unexpected error fetching {url}: {e}")
         return None
 
-def diagnose_site_structure(site_config: Dict[str, Any], html_content: str) -> None:
+def diagnose_site_structure(site_config: Dict[str, Any], html_content: Union[str, FetchedDocument]) -> None:
     """サイト構造の診断機能"""
-    soup = BeautifulSoup(html_content, 'lxml')
+    document = FetchedDocument.coerce(html_content)
     site_name = site_config['name']
     
+    # コンパイル済みプランで解析されるサイトはlxmlツリー、それ以外はパーサーと同じsoupで診断
+    plan = UniversalParser.selector_plan_for(site_config)
+    if plan is not None:
+        tree = document.tree
+        select = lambda css: compile_selector(css).all(tree)
+    else:
+        select = lambda css: document.soup.select(css)
+    
     logging.info(f"🔍 Diagnosing {site_name} structure...")
     
     # HTMLの基本情報
-    logging.info(f"  HTML length: {len(html_content)} characters")
-    logging.info(f"  Title: {soup.title.string if soup.title else 'No title'}")
+    logging.info(f"  HTML length: {len(document)} characters")
+    logging.info(f"  Title: {document.title if document.title is not None else 'No title'}")
     
     # 設定されたセレクターの検証
     if 'item_selector' in site_config:
-        items = soup.select(site_config['item_selector'])
+        items = plan.item_selectors[0].all(tree) if plan is not None else select(site_config['item_selector'])
         logging.info(f"  Items found with '{site_config['item_selector']}': {len(items)}")
         
         if len(items) == 0:
@@ -2019,18 +2108,67 @@ def diagnose_site_structure(site_config: Dict[str, Any], html_content: str) -> N
             ]
             
             for alt_selector in alternative_selectors:
-                alt_items = soup.select(alt_selector)
+                alt_items = select(alt_selector)
                 if len(alt_items) > 0:
                     logging.warning(f"  🔄 Alternative selector '{alt_selector}' found {len(alt_items)} items")
     
     # エラーページの検出
     error_indicators = ['404', 'error', 'not found', 'blocked', 'forbidden']
-    page_text = soup.get_text().lower()
+    page_text = document.page_text.lower()
     
     for indicator in error_indicators:
         if indicator in page_text:
             logging.warning(f"  ⚠️ Possible error page detected: '{indicator}' found in content")
 
+def generate_unique_id(raw_deal: RawDealData) -> str:
+    """サイト名＋案件IDからユニークIDを生成"""
+    return hashlib.md5(f"{raw_deal.site_name}_{raw_deal.deal_id}".encode()).hexdigest()[:12]
+
+def drop_known_deals(raw_deals: List[RawDealData], existing_ids: Set[str]) -> List[RawDealData]:
+    """スプレッドシートに登録済みの案件を詳細ページ取得前に除外"""
+    new_deals = []
+    seen_ids: Set[str] = set()
+    for raw_deal in raw_deals:
+        unique_id = generate_unique_id(raw_deal)
+        if unique_id in existing_ids or unique_id in seen_ids:
+            continue
+        seen_ids.add(unique_id)
+        new_deals.append(raw_deal)
+    
+    skipped = len(raw_deals) - len(new_deals)
+    if skipped:
+        logging.info(f"  ⏭️ Skipped {skipped} known deals before detail fetching ({len(new_deals)} new)")
+    return new_deals
+
+def record_rejected_deals(deal_store: DealStore, site_name: str, candidate_ids: List[str],
+                          kept_ids: Iterable[str]) -> None:
+    """詳細取得・整形の対象にしたが条件に合わず除外された案件を記録（次回以降、差分クロールの停止判定で既知として扱う）"""
+    kept_ids = set(kept_ids)
+    rejected = deal_store.record_rejected(site_name, (unique_id for unique_id in candidate_ids if unique_id not in kept_ids))
+    if rejected:
+        logging.info(f"  🚫 {site_name}: recorded {rejected} deals that did not meet the criteria")
+
+def format_money_fields(raw_deal: RawDealData) -> Tuple[str, str, str]:
+    """売上高・営業利益・価格を表示用に整形（ストライクの売上高は百万円単位に変換）"""
+    if raw_deal.site_name == "ストライク":
+        revenue_formatted = DataConverter.convert_strike_revenue_to_million(raw_deal.revenue_text)
+    else:
+        revenue_formatted = DataConverter.format_financial_text(raw_deal.revenue_text)
+    return (revenue_formatted,
+            DataConverter.format_financial_text(raw_deal.profit_text),
+            DataConverter.format_financial_text(raw_deal.price_text))
+
+def listing_snapshots(raw_deals: List[RawDealData]) -> Dict[str, Dict[str, str]]:
+    """一覧ページから分かる項目（空でないもの）を整形後の表示値で取得（unique_id -> 項目名 -> 値。掲載内容の変更検知用）"""
+    snapshots = {}
+    for raw_deal in raw_deals:
+        revenue, profit, price = format_money_fields(raw_deal)
+        values = {'title': (raw_deal.title, raw_deal.title), 'location': (raw_deal.location_text, raw_deal.location_text),
+                  'revenue': (raw_deal.revenue_text, revenue), 'profit': (raw_deal.profit_text, profit),
+                  'price': (raw_deal.price_text, price)}
+        snapshots[generate_unique_id(raw_deal)] = {name: shown for name, (text, shown) in values.items() if text}
+    return snapshots
+
 def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> List[FormattedDealData]:
     """生データを整形済みデータに変換し、条件チェックを行う"""
     formatted_deals = []
@@ -2038,7 +2176,7 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
     
     for raw_deal in raw_deals:
         try:
-            unique_id = hashlib.md5(f"{raw_deal.site_name}_{raw_deal.deal_id}".encode()).hexdigest()[:12]
+            unique_id = generate_unique_id(raw_deal)
             
             if unique_id in existing_ids:
                 logging.info(f"    -> Skipping duplicate deal: {raw_deal.deal_id}")
@@ -2056,11 +2194,7 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
                     logging.info(f"    -> Skipping deal {raw_deal.deal_id}: doesn't meet financial criteria")
                     continue
             
-            # ストライクの売上高を百万円単位に変換
-            if raw_deal.site_name == "ストライク":
-                revenue_formatted = DataConverter.convert_strike_revenue_to_million(raw_deal.revenue_text)
-            else:
-                revenue_formatted = DataConverter.format_financial_text(raw_deal.revenue_text)
+            revenue_formatted, profit_formatted, price_formatted = format_money_fields(raw_deal)
             
             formatted_deal = FormattedDealData(
                 extraction_time=extraction_time,
@@ -2069,8 +2203,8 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
                 title=raw_deal.title,
                 location=raw_deal.location_text or "-",
                 revenue=revenue_formatted,
-                profit=DataConverter.format_financial_text(raw_deal.profit_text),
-                price=DataConverter.format_financial_text(raw_deal.price_text),
+                profit=profit_formatted,
+                price=price_formatted,
                 features=raw_deal.features_text or "-",
                 link=raw_deal.link,
                 unique_id=unique_id
@@ -2085,46 +2219,89 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
     
     return formatted_deals
 
-def scrape_site(site_config: Dict[str, Any]) -> List[RawDealData]:
-    """各サイトのスクレイピングを実行（診断機能付き）"""
+def scrape_site(site_config: Dict[str, Any], prefetched_pages: Optional[Dict[str, Optional[str]]] = None,
+                seen_ids: Optional[Set[str]] = None,
+                on_streamed_deal: Optional[Callable[[RawDealData], None]] = None) -> List[RawDealData]:
+    """
+    各サイトのスクレイピングを実行（診断機能付き・先行取得済みページ・差分クロール対応。seen_idsは登録済み＋除外済みの案件ID）。
+    on_streamed_dealを渡すと、ストリーミング解析で取り出した案件はページの受信を待たずに1件ずつ渡し、戻り値には含めない。
+    """
     if not site_config.get('enabled', False):
         logging.info(f"Site {site_config['name']} is disabled. Skipping.")
         return []
     
     logging.info(f"🔍 Starting scraping for: {site_config['name']}")
     all_deals = []
+    streamed_count = 0
+    prefetched_pages = prefetched_pages or {}
+    tracker = KnownPageTracker.for_site(CONFIG, site_config['name'], seen_ids)
+    streaming_settings = get_streaming_settings(CONFIG, site_config['name'])
+    use_streaming = streaming_settings['enabled'] and UniversalParser.selector_plan_for(site_config) is not None
     
     try:
         max_pages = site_config.get('max_pages', 1)
-        base_url = site_config['url']
-        
-        for page_num in range(1, max_pages + 1):
-            if site_config.get('pagination', {}).get('type') == 'query_param':
-                param = site_config['pagination']['param']
-                url = f"{base_url}?{param}={page_num}"
-            elif site_config.get('pagination', {}).get('type') == 'path':
-                path_template = site_config['pagination']['path']
-                url = f"{base_url}{path_template.format(page_num=page_num)}"
-            else:
-                url = base_url
-            
+        
+        for page_num, url in enumerate(build_list_page_urls(site_config), 1):
             logging.info(f"  📄 Scraping page {page_num}: {url}")
             
-            # ストライクサイトの動的読み込み対応
+            # ストリーミング解析（ダウンロードしながら案件を取り出し、取り出した順に後続処理へ渡す）
+            if use_streaming and not prefetched_pages.get(url):
+                page_ids = []
+                try:
+                    for deal in stream_list_page(site_config, url, streaming_settings):
+                        page_ids.append(generate_unique_id(deal))
+                        if on_streamed_deal is not None:
+                            on_streamed_deal(deal)
+                        else:
+                            all_deals.append(deal)
+                except (httpx.HTTPError, ValueError) as e:
+                    # 途中まで渡した案件は、取り直したページから再び取り出されても呼び出し側の重複判定で除外される
+                    logging.warning(f"  ⚠️ Streaming failed for {url}: {e}. Falling back to full-page parsing")
+                    page_ids = []
+                else:
+                    if not page_ids:
+                        logging.warning(f"  ⚠️ No items streamed from {url}; falling back to full-page parsing")
+                if page_ids:
+                    streamed_count += len(page_ids)
+                    if tracker.should_stop(page_ids):
+                        break
+                    time.sleep(2)
+                    if max_pages == 1:
+                        break
+                    continue
+            
+            # ストライクサイトの動的読み込み対応（特定済みのデータフィードがあればブラウザを使わない）
+            fetched_live = False
             if site_config['name'] == "ストライク":
-                html_content = scrape_strike_with_dynamic_loading(url)
+                feed_settings = get_feed_settings(CONFIG, site_config['name'])
+                if feed_settings['enabled']:
+                    deals = fetch_strike_feed(site_config, url, feed_settings)
+                    if deals is not None:
+                        all_deals.extend(deals)
+                        if tracker.should_stop(generate_unique_id(deal) for deal in deals) or max_pages == 1:
+                            break
+                        time.sleep(2)
+                        continue
+                # フィード未特定のときだけ通信ログ用のブラウザで特定を試みる（見つからなかったページはretry_capture_hoursの間プールのブラウザ）
+                capture = feed_settings['enabled'] and get_feed_store(CONFIG).capture_due(
+                    site_config['name'], url, feed_settings['retry_capture_hours'])
+                document = scrape_strike_with_dynamic_loading(url, capture_data_feed=capture)
+                fetched_live = True
+            elif prefetched_pages.get(url):
+                document = FetchedDocument.coerce(prefetched_pages[url], url=url)
             else:
-                html_content = fetch_html(url)
+                document = fetch_document(url)
+                fetched_live = True
             
-            if not html_content:
+            if not document:
                 logging.error(f"  ❌ Failed to fetch page {page_num}")
                 continue
             
-            # 診断実行
-            diagnose_site_structure(site_config, html_content)
+            # 診断実行（パースツリーは診断・パーサーで共有）
+            diagnose_site_structure(site_config, document)
             
             # 統一されたパーサーを使用
-            deals = UniversalParser.parse_list_page(site_config, html_content)
+            deals = UniversalParser.parse_list_page(site_config, document)
             all_deals.extend(deals)
             
             # 診断機能：1ページ目で案件が0件の場合は警告
@@ -2134,7 +2311,13 @@ def scrape_site(site_config: Dict[str, Any]) -> List[RawDealData]:
                 logging.critical(f"   config.yamlのCSSセレクタを見直してください。")
                 logging.critical(f"   現在のitem_selector: {site_config.get('item_selector')}")
             
-            time.sleep(2)
+            # 差分モード：既知案件だけのページが続いたら以降のページは取得しない
+            if tracker.should_stop(generate_unique_id(deal) for deal in deals):
+                break
+            
+            # 先行取得済みページは非同期エンジン側でホスト単位の間隔制御済み
+            if fetched_live:
+                time.sleep(2)
             
             if max_pages == 1:
                 break
@@ -2143,14 +2326,82 @@ def scrape_site(site_config: Dict[str, Any]) -> List[RawDealData]:
         logging.error(f"❌ Error scraping {site_config['name']}: {e}")
         logging.debug(traceback.format_exc())
     
-    logging.info(f"🎯 Total deals found from {site_config['name']}: {len(all_deals)}")
+    logging.info(f"🎯 Total deals found from {site_config['name']}: {len(all_deals) + streamed_count}")
     return all_deals
 
-def scrape_strike_with_dynamic_loading(url: str) -> Optional[str]:
-    """ストライク専用の動的読み込み対応スクレイピング"""
+def stream_list_page(site_config: Dict[str, Any], url: str,
+                     streaming_settings: Dict[str, Any]) -> Iterator[RawDealData]:
+    """
+    一覧ページをストリーミング取得し、アイテム要素が閉じるたびに案件データをyield（ページ全体の受信を待たない）。
+    ページ内の重複は取り出した時点で除外する。取得・解析に失敗したらhttpx.HTTPError / ValueErrorを送出。
+    """
+    plan = UniversalParser.selector_plan_for(site_config)
+    item_selector = plan.item_selectors[0].css
+    base_url = '/'.join(site_config['url'].split('/')[:3])
+    
+    def extract(item) -> Optional[RawDealData]:
+        return UniversalParser._compiled_item_to_deal(site_config, item, plan, base_url)
+    
+    seen_ids: Set[str] = set()
+    for deal in stream_list_items(url, item_selector, extract, CONFIG,
+                                  chunk_size=streaming_settings['chunk_size']):
+        # ページ内の重複はダウンロード中に除外
+        unique_id = generate_unique_id(deal)
+        if unique_id in seen_ids:
+            continue
+        seen_ids.add(unique_id)
+        yield deal
+    logging.info(f"  🌊 Streamed {len(seen_ids)} deals from {url} with '{item_selector}'")
+
+def fetch_strike_feed(site_config: Dict[str, Any], url: str,
+                      feed_settings: Dict[str, Any]) -> Optional[List[RawDealData]]:
+    """
+    特定済みのデータフィード（一覧を埋めるJSON）からストライクの案件を直接取得。
+    未特定・取得失敗・未知の値があればNone（呼び出し側でブラウザ取得にフォールバックし、フィードを特定し直す）。
+    """
+    store = get_feed_store(CONFIG)
+    endpoint = store.get(site_config['name'], url)
+    if endpoint is None:
+        return None
+    
+    started = time.monotonic()
+    try:
+        entries = fetch_feed(endpoint, CONFIG, timeout=feed_settings['timeout'])
+    except FeedError as e:
+        logging.warning(f"  ⚠️ Data feed failed for {url}: {e}. Falling back to the browser")
+        store.forget(site_config['name'], url)
+        return None
+    
+    deals = UniversalParser._strike_entries_to_deals(site_config, entries[:STRIKE_LIST_LIMIT])
+    logging.info(f"  📡 Fetched {len(entries)} listings from data feed in {time.monotonic() - started:.2f}s "
+                 f"({len(deals)} meet criteria)")
+    return deals
+
+def capture_strike_feed(driver: webdriver.Chrome, url: str, document: FetchedDocument) -> None:
+    """表示済みの一覧と通信ログを突き合わせてデータフィードを特定し、次回以降のために保存（見つからなければそのことを保存）"""
+    site_name = "ストライク"
+    store = get_feed_store(CONFIG)
+    try:
+        entries = UniversalParser._strike_list_entries(document)
+        endpoint = capture_feed(driver, site_name, url, entries, get_feed_settings(CONFIG, site_name)['min_matches'])
+    except Exception as e:
+        logging.warning(f"  ⚠️ Could not capture data feed for {url}: {e}")
+        logging.debug(traceback.format_exc())
+        endpoint = None
+    if endpoint:
+        store.put(endpoint)
+    else:
+        store.record_miss(site_name, url)
+
+def scrape_strike_with_dynamic_loading(url: str, capture_data_feed: bool = False) -> Optional[FetchedDocument]:
+    """ストライク専用の動的読み込み対応スクレイピング（capture_data_feed=Trueなら通信ログからデータフィードも特定）"""
     try:
         anti_blocking = AntiBlockingManager()
-        with WebDriverManager(headless=CONFIG.get('debug', {}).get('headless_mode', True), anti_blocking=anti_blocking) as driver:
+        headless = CONFIG.get('debug', {}).get('headless_mode', True)
+        # 通信ログの記録はフィードを特定するときだけ（プールのブラウザとは別に起動）
+        driver_context = (performance_logging_driver(headless) if capture_data_feed
+                          else WebDriverManager(headless=headless, anti_blocking=anti_blocking))
+        with driver_context as driver:
             logging.info(f"  🚀 Loading Strike page with dynamic loading support: {url}")
             driver.get(url)
             
@@ -2168,27 +2419,32 @@ def scrape_strike_with_dynamic_loading(url: str) -> Optional[str]:
                     'div[class*="item"]'
                 ]
                 
-                items_found = False
-                for selector in selectors_to_wait:
+                def wait_for_items(selector: str) -> List[Any]:
                     try:
                         wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, selector)) >= 10)
-                        current_items = driver.find_elements(By.CSS_SELECTOR, selector)
-                        logging.info(f"  ✅ {len(current_items)} items loaded with selector: {selector}")
-                        items_found = True
-                        break
+                        return driver.find_elements(By.CSS_SELECTOR, selector)
                     except TimeoutException:
-                        continue
+                        return []
                 
-                if not items_found:
+                # 前回読み込みを確認できたセレクタから待機（外れたときだけ他の候補でタイムアウト待ち）
+                used_selector, current_items = get_selector_memory(CONFIG).find_first(
+                    "ストライク", 'list_wait', selectors_to_wait, wait_for_items, generic=['div[class*="item"]'])
+                items_found = used_selector is not None
+                if items_found:
+                    logging.info(f"  ✅ {len(current_items)} items loaded with selector: {used_selector}")
+                else:
                     logging.warning("  ⚠️ Timeout waiting for items with all selectors")
                     
             except TimeoutException:
                 logging.warning(f"  ⚠️ Timeout waiting for items")
             
-            # 追加の待機（JavaScriptの完全な実行完了を確保）
-            time.sleep(3)
+            # 追加の待機（案件数が増えなくなるまで＝JavaScriptによる描画完了を確認）
+            wait_until_ready(driver, get_readiness_settings(CONFIG, "ストライク", 'list'), "ストライク list")
             
-            return driver.page_source
+            document = FetchedDocument(driver.page_source, url=url)
+            if capture_data_feed:
+                capture_strike_feed(driver, url, document)
+            return document
             
     except Exception as e:
         logging.error(f"  ❌ Error in Strike dynamic loading: {e}")
@@ -2240,7 +2496,8 @@ def enhance_deals_with_details(raw_deals: List[RawDealData], site_config: Dict[s
                         features = scraper.fetch_features_with_blocking_protection(
                             deal.link, 
                             site_config.get('detail_page_selectors', {}),
-                            referer_url
+                            referer_url,
+                            site_config['name']
                         )
                         
                         if features and features != "-":
@@ -2251,14 +2508,16 @@ def enhance_deals_with_details(raw_deals: List[RawDealData], site_config: Dict[s
                         
                         enhanced_deals.append(deal)
                     
-                    # 人間らしい待機時間
-                    if site_config['name'] in ["ストライク", "M&Aロイヤルアドバイザリー"]:
-                        delay = anti_blocking.get_human_like_delay(4, 6)
-                    else:
-                        delay = anti_blocking.get_human_like_delay(2, 4)
-                    
-                    logging.info(f"    -> Waiting {delay:.1f} seconds before next request...")
-                    time.sleep(delay)
+                    # 適応スロットル有効時はリクエスト前の待機で間隔を制御済み
+                    if not anti_blocking.adaptive:
+                        # 人間らしい待機時間
+                        if site_config['name'] in ["ストライク", "M&Aロイヤルアドバイザリー"]:
+                            delay = anti_blocking.get_human_like_delay(4, 6)
+                        else:
+                            delay = anti_blocking.get_human_like_delay(2, 4)
+                        
+                        logging.info(f"    -> Waiting {delay:.1f} seconds before next request...")
+                        time.sleep(delay)
                     
                 except Exception as e:
                     logging.error(f"  ❌ Error processing deal {deal.deal_id}: {e}")
@@ -2282,7 +2541,8 @@ def enhance_maroyal_deal_with_features(deal: RawDealData, scraper: DetailPageScr
         features_text = scraper.fetch_features_with_blocking_protection(
             deal.link, 
             {},  # M&Aロイヤルは独自の抽出ロジックを使用
-            referer_url
+            referer_url,
+            "M&Aロイヤルアドバイザリー"
         )
         
         if features_text and features_text != "-":
@@ -2301,19 +2561,23 @@ def enhance_strike_deal_with_details_protected(deal: RawDealData, scraper: Detai
     try:
         logging.info(f"    -> Accessing Strike detail page: {deal.link}")
         
-        # 人間らしい待機時間
-        delay = anti_blocking.get_human_like_delay(3, 8)
-        logging.info(f"    -> Human-like delay: {delay:.1f} seconds...")
-        time.sleep(delay)
+        # ホストの応答状況に応じた待機時間
+        delay = anti_blocking.wait_before_request(deal.link, 3, 8)
+        logging.info(f"    -> Waited {delay:.1f} seconds before access")
         
         # ページにアクセス
+        started = time.monotonic()
         scraper.driver.get(deal.link)
-        time.sleep(3)  # ページ読み込み待機
+        latency = time.monotonic() - started
+        readiness = get_readiness_settings(CONFIG, "ストライク", 'detail')
+        wait_until_ready(scraper.driver, readiness, "ストライク detail")  # ページ読み込み待機
         
-        html_content = scraper.driver.page_source
+        document = FetchedDocument(scraper.driver.page_source, url=deal.link)
+        blocked = anti_blocking.is_blocked_response(document)
+        anti_blocking.record_page_load(deal.link, latency, blocked, scraper.driver)
         
         # 403ブロックの検出
-        if anti_blocking.is_blocked_response(html_content):
+        if blocked:
             logging.warning(f"    -> 🚫 403 BLOCK DETECTED for deal: {deal.deal_id}")
             
             if not anti_blocking.blocked_detected:
@@ -2328,23 +2592,23 @@ def enhance_strike_deal_with_details_protected(deal: RawDealData, scraper: Detai
                 # リトライ
                 logging.info("    -> Retrying Strike access...")
                 scraper.driver.get(deal.link)
-                time.sleep(5)  # より長い読み込み待機
+                wait_until_ready(scraper.driver, readiness, "ストライク detail retry")
                 
-                retry_html = scraper.driver.page_source
+                retry_document = FetchedDocument(scraper.driver.page_source, url=deal.link)
                 
-                if anti_blocking.is_blocked_response(retry_html):
+                if anti_blocking.is_blocked_response(retry_document):
                     logging.error("    -> ❌ Still blocked after retry. Aborting Strike detail scraping.")
                     anti_blocking.blocked_detected = True
                     return deal
                 else:
                     logging.info("    -> ✅ Strike recovery successful!")
-                    html_content = retry_html
+                    document = retry_document
                     anti_blocking.blocked_detected = False
             else:
                 logging.error("    -> ❌ Already in blocked state. Skipping Strike deal.")
                 return deal
         
-        detail_soup = BeautifulSoup(html_content, 'lxml')
+        detail_soup = document.soup
         
         # タイトルの取得
         title = extract_strike_title_enhanced(detail_soup, deal.deal_id)
@@ -2463,6 +2727,7 @@ def extract_strike_location_enhanced(detail_soup: BeautifulSoup) -> str:
 
 def main():
     """メイン実行関数（診断機能付き）"""
+    sheet_sink = None
     try:
         load_config()
         setup_logging(CONFIG)
@@ -2475,46 +2740,116 @@ def main():
             logging.critical("❌ Cannot proceed without Google Sheets connection")
             return
         
-        existing_ids = sheet_connector.get_existing_ids()
-        logging.info(f"📋 Found {len(existing_ids)} existing deals in spreadsheet")
+        # 重複判定はローカルの案件ストアで行い、スプレッドシートの全件読み込みは定期的な突き合わせのときだけ
+        deal_store = get_deal_store(CONFIG)
+        deal_store.reconcile_if_due(sheet_connector.get_existing_rows)
+        existing_ids = deal_store.existing_ids()
+        logging.info(f"📋 Found {len(existing_ids)} existing deals in the local deal store")
+        # ページ送りの停止判定では、条件に合わず除外した案件も既知として扱う
+        seen_ids = deal_store.seen_ids()
         
-        all_new_deals = []
         target_sites = ["M&A総合研究所", "M&Aキャピタルパートナーズ", "M&Aロイヤルアドバイザリー", "ストライク"]
         enabled_sites = [site for site in CONFIG['sites'] 
                         if site.get('enabled', False) and site['name'] in target_sites]
         
+        # スプレッドシートへはサイトごとに整形が済んだ案件からスクレイピングと並行して書き込む（前回書き込めなかった分が先）
+        sheet_sink = WriteBehindSink(lambda deals: deal_store.sync(deals, sheet_connector.write_deals),
+                                     **get_write_behind_settings(CONFIG))
+        sheet_sink.push(deal_store.pending_deals(FormattedDealData, target_sites))
+        
+        # 一覧ページを全サイト同時に先行取得（ストライクはSelenium、ストリーミング解析のサイトは逐次取得のため対象外）
+        # 差分モードのサイトは停止判定に必要な先頭ページのみ先行取得する
+        prefetch_jobs = {}
+        for site in enabled_sites:
+            if site['name'] == "ストライク" or get_streaming_settings(CONFIG, site['name'])['enabled']:
+                continue
+            window = KnownPageTracker.for_site(CONFIG, site['name'], seen_ids).prefetch_window
+            prefetch_jobs[site['name']] = build_list_page_urls(site)[:window]
+        prefetched_by_site = prefetch_list_pages(prefetch_jobs, CONFIG)
+        
+        def process_deals(site_config: Dict[str, Any], raw_deals: List[RawDealData]) -> List[FormattedDealData]:
+            """
+            一覧から取り出した案件を詳細取得・整形してストアと書き込みキューへ（ストリーミング解析のサイトは1件ずつ呼ばれる）。
+            履歴のParquet/JSONLは1件ずつ書くと小さなファイルが大量にできるため、サイトの処理が終わってから呼び出し側でまとめて追記する。
+            """
+            # upsertモードでは登録済み案件の一覧の掲載内容を前回と比べ、変わった項目をシートへの反映待ちにする
+            listings = listing_snapshots(raw_deals) if deal_store.upsert else {}
+            deal_store.observe_listings(listings)
+            
+            # 登録済み案件は詳細ページを取得しない
+            raw_deals = drop_known_deals(raw_deals, existing_ids)
+            if not raw_deals:
+                return []
+            
+            candidate_ids = [generate_unique_id(deal) for deal in raw_deals]
+            enhanced_deals = enhance_deals_with_details(raw_deals, site_config)
+            formatted_deals = format_deal_data(enhanced_deals, existing_ids)
+            record_rejected_deals(deal_store, site_config['name'], candidate_ids,
+                                  (deal.unique_id for deal in formatted_deals))
+            # 同じ実行で再び取り出された案件（ストリーミングの取り直しなど）は処理しない
+            existing_ids.update(candidate_ids)
+            
+            # 途中で止まっても失われないよう先にストアへ保存してから書き込みキューへ
+            deal_store.add_deals(formatted_deals, listings)
+            sheet_sink.push(formatted_deals)
+            return formatted_deals
+        
         for site_config in enabled_sites:
+            # ストリーミング解析のサイトは、取り出した案件をページの受信完了を待たずに処理する
+            streamed_deals: List[RawDealData] = []
+            formatted_deals: List[FormattedDealData] = []
             try:
                 logging.info(f"🔍 Processing {site_config['name']}")
                 
-                raw_deals = scrape_site(site_config)
+                def process_streamed_deal(deal: RawDealData, site_config: Dict[str, Any] = site_config) -> None:
+                    streamed_deals.append(deal)
+                    formatted_deals.extend(process_deals(site_config, [deal]))
+                
+                raw_deals = scrape_site(site_config, prefetched_by_site.get(site_config['name']), seen_ids,
+                                        process_streamed_deal)
                 
-                if not raw_deals:
+                if not raw_deals and not streamed_deals:
                     logging.warning(f"⚠️ {site_config['name']}: No deals extracted")
                     continue
                 
-                enhanced_deals = enhance_deals_with_details(raw_deals, site_config)
-                formatted_deals = format_deal_data(enhanced_deals, existing_ids)
-                
+                if raw_deals:
+                    formatted_deals.extend(process_deals(site_config, raw_deals))
                 logging.info(f"✅ {site_config['name']}: {len(formatted_deals)} new deals after filtering")
-                all_new_deals.extend(formatted_deals)
                 
             except Exception as e:
                 logging.error(f"❌ Failed to process {site_config['name']}: {e}")
                 continue
-        
-        if all_new_deals:
-            sheet_connector.write_deals(all_new_deals)
-            logging.info(f"🎉 Successfully added {len(all_new_deals)} new deals to spreadsheet")
-        else:
+            finally:
+                # 履歴のParquet/JSONLにはサイトごとにまとめて1回だけ追記（途中で失敗しても処理済みの分は残す）
+                export_history(formatted_deals, config=CONFIG)
+        
+        # キューに残った案件を書き込んでから集計
+        sheet_sink.close()
+        if sheet_sink.written:
+            logging.info(f"🎉 Successfully added {sheet_sink.written} new deals to spreadsheet")
+        if sheet_sink.failed:
+            logging.warning(f"⚠️ {sheet_sink.failed} deals kept in the local deal store; they will be written on the next run")
+        if not sheet_sink.written and not sheet_sink.failed:
             logging.warning("📝 No new deals found across all sites")
         
+        # 掲載内容が変わった登録済み案件は、変更されたセルだけを書き換える
+        updated = deal_store.sync_updates(sheet_connector.update_deals, target_sites)
+        if updated:
+            logging.info(f"🔁 Updated {updated} changed deals in spreadsheet")
+        
         logging.info("✨ Scraping process completed successfully with diagnostics and anti-blocking measures")
         
     except Exception as e:
         logging.critical(f"💥 Critical error in main process: {e}")
         logging.debug(traceback.format_exc())
         raise
+    finally:
+        if sheet_sink is not None:
+            sheet_sink.close()
+        close_webdriver_pool()
+        close_http_client()
+        close_deal_store()
+        close_history_sink()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
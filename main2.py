@@ -12,10 +12,24 @@ import time
 import os
 import re
 from functools import wraps
-from typing import Optional, Dict, List, Set, Any
+from typing import Optional, Dict, List, Set, Any, Tuple, Iterable
 from dataclasses import dataclass, fields
 from enum import Enum
 
+from http_client import get_http_client, close_http_client
+from async_fetcher import prefetch_list_pages
+from detail_enricher import enrich_concurrently
+from incremental import KnownPageTracker
+from webdriver_pool import get_webdriver_pool, close_webdriver_pool
+from page_readiness import get_readiness_settings, wait_until_ready
+from selector_memory import get_selector_memory
+from features_normalizer import normalize_features
+from amount_parser import amount_to_yen, parse_amount
+from deal_sinks import SheetsSink, close_history_sink, export_history
+from deal_store import DealStore, close_deal_store, get_deal_store
+from write_behind import WriteBehindSink, get_write_behind_settings
+from sheet_io import AppendError, SheetWriter, get_sheet_layout_cache, get_writer_settings, load_column_rows, sheet_key
+
 # --- グローバル設定 ---
 CONFIG: Dict[str, Any] = {}
 
@@ -59,24 +73,17 @@ class FormattedDealData:
     link: str
     unique_id: str
 
+# 売上高の判定は各サイトの一覧に出る表記で行う（表記の照合だけで済むので金額は解析しない）
+NIHON_MA_ACCEPTED_REVENUES = frozenset(["5億円～10億円", "10億円～20億円", "20億円～50億円", "50億円～100億円", "100億円以上"])
+INTEGROUP_EXCLUDED_REVENUES = frozenset(["～１億円", "１～５億円"])
+NEWOLD_ACCEPTED_REVENUES = frozenset(["3億円～5億円", "5億円～10億円"])
+
 # --- データ変換クラス ---
 class DataConverter:
     @staticmethod
     def parse_nihon_ma_revenue(revenue_text: str) -> bool:
-        """日本M&Aセンターの売上高が5億円以上かチェック"""
-        if not revenue_text:
-            return False
-        
-        # 5億円以上のパターン
-        valid_patterns = [
-            "5億円～10億円",
-            "10億円～20億円", 
-            "20億円～50億円",
-            "50億円～100億円",
-            "100億円以上"
-        ]
-        
-        return revenue_text in valid_patterns
+        """日本M&Aセンターの売上高が5億円以上かチェック（5億円以上の表記のみ対象）"""
+        return revenue_text in NIHON_MA_ACCEPTED_REVENUES
     
     @staticmethod
     def convert_nihon_ma_revenue_to_million(revenue_text: str) -> str:
@@ -196,18 +203,8 @@ class DataConverter:
     
     @staticmethod
     def parse_integroup_revenue(revenue_text: str) -> bool:
-        """インテグループの売上高が5億円以上かチェック"""
-        if not revenue_text:
-            return False
-        
-        # 5億円以上のパターン（除外対象以外）
-        exclude_patterns = [
-            "～１億円",
-            "１～５億円"
-        ]
-        
-        # 除外対象でなければOK
-        return revenue_text not in exclude_patterns
+        """インテグループの売上高が5億円以上かチェック（「～１億円」「１～５億円」以外の表記はすべて対象）"""
+        return bool(revenue_text) and revenue_text not in INTEGROUP_EXCLUDED_REVENUES
     
     @staticmethod
     def convert_integroup_revenue_to_million(revenue_text: str) -> str:
@@ -229,17 +226,8 @@ class DataConverter:
     
     @staticmethod
     def parse_newold_revenue(revenue_text: str) -> bool:
-        """NEWOLD CAPITALの売上高が3億円以上かチェック"""
-        if not revenue_text:
-            return False
-        
-        # 3億円以上のパターン
-        valid_patterns = [
-            "3億円～5億円",
-            "5億円～10億円"
-        ]
-        
-        return revenue_text in valid_patterns
+        """NEWOLD CAPITALの売上高が3億円以上かチェック（3億円以上の表記のみ対象）"""
+        return revenue_text in NEWOLD_ACCEPTED_REVENUES
     
     @staticmethod
     def convert_newold_revenue_to_million(revenue_text: str) -> str:
@@ -415,208 +403,37 @@ class DataConverter:
     
     @staticmethod
     def parse_newold_profit(profit_text: str) -> bool:
-        """NEWOLD CAPITALの営業利益が3,000万円以上かチェック"""
-        if not profit_text:
-            return False
-        
-        # レンジの上限値を抽出して判定
-        # 例: "2,000万円～5,000万円" → 5,000万円 ≥ 3,000万円 → OK
-        
-        # まず「万円」単位での抽出を試行
-        range_pattern = r'([\d,]+)万円～([\d,]+)万円'
-        range_match = re.search(range_pattern, profit_text)
-        
-        if range_match:
-            upper_value_str = range_match.group(2).replace(',', '')
-            try:
-                upper_value = int(upper_value_str)
-                return upper_value >= 3000  # 3,000万円以上
-            except ValueError:
-                pass
-        
-        # 「億円」が含まれる場合は確実にOK
-        if '億円' in profit_text:
-            return True
-        
-        # 単一値の場合の処理
-        single_pattern = r'([\d,]+)万円'
-        single_match = re.search(single_pattern, profit_text)
-        
-        if single_match:
-            value_str = single_match.group(1).replace(',', '')
-            try:
-                value = int(value_str)
-                return value >= 3000
-            except ValueError:
-                pass
-        
-        return False
+        """NEWOLD CAPITALの営業利益が3,000万円以上かチェック（レンジは上限で判定。例: "2,000万円～5,000万円" → OK）"""
+        return amount_to_yen(profit_text, 'upper') >= 30_000_000
     
     @staticmethod
     def parse_nihon_ma_profit(profit_text: str) -> bool:
-        """日本M&Aセンターの実態営業利益が5,000万円以上かチェック"""
-        if not profit_text:
-            return False
-        
-        # レンジの上限値を抽出して判定
-        # 例: "3,000万円～8,000万円" → 8,000万円 ≥ 5,000万円 → OK
-        
-        # まず「万円」単位での抽出を試行
-        range_pattern = r'([\d,]+)万円～([\d,]+)万円'
-        range_match = re.search(range_pattern, profit_text)
-        
-        if range_match:
-            upper_value_str = range_match.group(2).replace(',', '')
-            try:
-                upper_value = int(upper_value_str)
-                return upper_value >= 5000  # 5,000万円以上
-            except ValueError:
-                pass
-        
-        # 「億円」が含まれる場合は確実にOK
-        if '億円' in profit_text:
-            return True
-        
-        # 単一値の場合の処理
-        single_pattern = r'([\d,]+)万円'
-        single_match = re.search(single_pattern, profit_text)
-        
-        if single_match:
-            value_str = single_match.group(1).replace(',', '')
-            try:
-                value = int(value_str)
-                return value >= 5000
-            except ValueError:
-                pass
-        
-        return False
+        """日本M&Aセンターの実態営業利益が5,000万円以上かチェック（レンジは上限で判定。例: "3,000万円～8,000万円" → OK）"""
+        return amount_to_yen(profit_text, 'upper') >= 50_000_000
     
     @staticmethod
     def clean_integroup_features(features_text: str) -> str:
-        """インテグループの特色テキストから不要な宣伝文を除去"""
+        """インテグループの特色テキストから不要な宣伝文を除去（宣伝文・それを含む行の除去ルールはfeatures_normalizer）"""
         if not features_text:
             return features_text
-        
-        # 除去対象のパターン（部分一致で検索）
-        unwanted_patterns = [
-            r'M&Aを成功させるための秘訣.*?を無料で進呈します。',
-            r'最新のM&A事例を踏まえて.*?お気軽にお問合せください。',
-            r'『中小企業M&Aの真実』.*?を無料で進呈します。',
-            r'無料価値算定サービス.*?お気軽にお問合せください。',
-            r'M&Aを成功させるための.*?無料で進呈します。',
-            r'企業価値を無料で算定.*?お問合せください。'
-        ]
-        
-        cleaned_text = features_text
-        
-        # パターンマッチングで不要部分を除去
-        for pattern in unwanted_patterns:
-            cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.DOTALL | re.IGNORECASE)
-        
-        # より具体的な除去（キーワードベース）
-        unwanted_keywords = [
-            "M&Aを成功させるための秘訣",
-            "中小企業M&Aの真実",
-            "無料で進呈します",
-            "無料価値算定サービス",
-            "企業価値を無料で算定",
-            "強引に売却を勧めたり",
-            "お気軽にお問合せください"
-        ]
-        
-        # 行ごとに処理して不要行を除去
-        lines = cleaned_text.split('\n')
-        filtered_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line and not any(keyword in line for keyword in unwanted_keywords):
-                filtered_lines.append(line)
-        
-        # 空行を除去して再結合
-        result = '\n'.join(filtered_lines).strip()
-        
-        # 最終的な整理
-        # 連続する空行を単一の空行に変換
-        result = re.sub(r'\n\s*\n\s*\n+', '\n\n', result)
-        
-        return result
+        return normalize_features(features_text, 'integroup')
     
     @staticmethod
     def parse_ondeck_revenue(revenue_text: str) -> bool:
-        """オンデックの売上高が300百万円以上かチェック（強化版）"""
-        if not revenue_text:
-            return False
-        
-        # 「応相談」などの非数値テキストは除外
-        if any(keyword in revenue_text for keyword in ['応相談', '非開示', '未開示', '-']):
-            return False
-        
-        try:
-            # 「約」や括弧書きなどを除去
-            cleaned_text = re.sub(r'約|[（(][^）)]*[）)]', '', revenue_text)
-            
-            # レンジ表記の場合は下限値で判定
-            range_pattern = r'([\d,]+)～([\d,]+)'
-            range_match = re.search(range_pattern, cleaned_text)
-            
-            if range_match:
-                lower_value_str = range_match.group(1).replace(',', '')
-                lower_value = int(lower_value_str)
-                return lower_value >= 300  # 300百万円以上
-            
-            # 単一値の場合
-            single_pattern = r'([\d,]+)'
-            single_match = re.search(single_pattern, cleaned_text)
-            
-            if single_match:
-                value_str = single_match.group(1).replace(',', '')
-                value = int(value_str)
-                return value >= 300
-        
-        except (ValueError, AttributeError) as e:
-            logging.warning(f"Revenue parsing error for '{revenue_text}': {e}")
-            return False
-        
-        return False
+        """オンデックの売上高が300百万円以上かチェック（単位のない数値は百万円。レンジは下限で判定）"""
+        parsed = parse_amount(revenue_text, default_unit='百万')
+        return not parsed.undisclosed and parsed.has_value and parsed.lower >= 300_000_000
     
     @staticmethod
     def parse_ondeck_profit(profit_text: str) -> bool:
-        """オンデックの営業利益が30百万円以上かチェック（修正版）"""
-        if not profit_text:
+        """オンデックの営業利益が30百万円以上かチェック（単位のない数値は百万円。レンジは下限で判定、マイナスは除外）"""
+        parsed = parse_amount(profit_text, default_unit='百万')
+        if parsed.undisclosed or not parsed.has_value:
             return False
-        
-        # マイナス値（▲や-が含まれる）は除外
-        if '▲' in profit_text or '－' in profit_text or profit_text.strip().startswith('-'):
+        if parsed.lower < 0:
             logging.info(f"    -> Excluding negative profit: {profit_text}")
             return False
-        
-        # 「約」や括弧書きなどを無視して数字部分のみを抽出
-        # レンジ表記の場合は下限値で判定
-        range_pattern = r'([\d,]+)～([\d,]+)'
-        range_match = re.search(range_pattern, profit_text)
-        
-        if range_match:
-            lower_value_str = range_match.group(1).replace(',', '')
-            try:
-                lower_value = int(lower_value_str)
-                return lower_value >= 30  # 30百万円以上
-            except ValueError:
-                pass
-        
-        # 単一値の場合の処理
-        single_pattern = r'([\d,]+)'
-        single_match = re.search(single_pattern, profit_text)
-        
-        if single_match:
-            value_str = single_match.group(1).replace(',', '')
-            try:
-                value = int(value_str)
-                return value >= 30
-            except ValueError:
-                pass
-        
-        return False
+        return parsed.lower >= 30_000_000
     
     @staticmethod
     def clean_ondeck_revenue(revenue_text: str) -> str:
@@ -751,12 +568,14 @@ class NihonMACenterParser:
             'tbody tr'
         ]
         
-        items = []
-        for selector in possible_selectors:
-            items = soup.select(selector)
-            if items and len(items) > 1:  # ヘッダー行を除く
-                logging.info(f"    -> Found {len(items)} items using selector: {selector}")
-                break
+        # 前回当たったセレクタから試し、外れたときだけ総当たり
+        used_selector, items = get_selector_memory(CONFIG).find_first(
+            "日本M&Aセンター", 'list_items', possible_selectors, soup.select,
+            accept=lambda found: bool(found) and len(found) > 1,  # ヘッダー行を除く
+            generic=['div[class*="case"]', 'table tr', 'tbody tr'])  # 汎用の代替は記録しない
+        items = items or []
+        if items:
+            logging.info(f"    -> Found {len(items)} items using selector: {used_selector}")
         
         if not items:
             # フォールバック: aタグでneeds_convey_single.phpを含むリンクを探す
@@ -1030,12 +849,12 @@ class IntegroupParser:
             'div.item'
         ]
         
-        items = []
-        for selector in possible_selectors:
-            items = soup.select(selector)
-            if items:
-                logging.info(f"    -> Found {len(items)} items using selector: {selector}")
-                break
+        used_selector, items = get_selector_memory(CONFIG).find_first(
+            "インテグループ", 'list_items', possible_selectors, soup.select,
+            generic=['div[class*="sell"]', 'div[class*="case"]', 'li.item', 'div.item'])  # 汎用の代替は記録しない
+        items = items or []
+        if items:
+            logging.info(f"    -> Found {len(items)} items using selector: {used_selector}")
         
         if not items:
             # フォールバック: 詳細ページリンクから逆算
@@ -1782,35 +1601,26 @@ class DetailPageScraper:
         try:
             logging.info(f"    -> Fetching detail page: {detail_url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-            
-            with httpx.Client(timeout=15, follow_redirects=True) as client:
-                response = client.get(detail_url, headers=headers)
-                response.raise_for_status()
+            response = get_http_client(CONFIG).get(detail_url)
+            response.raise_for_status()
                 
-                detail_soup = BeautifulSoup(response.text, 'lxml')
+            detail_soup = BeautifulSoup(response.text, 'lxml')
                 
-                # デバッグ用: 詳細ページHTMLファイル保存
-                if CONFIG.get('debug', {}).get('save_html_files', False):
-                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                    deal_id = detail_url.split('no=')[-1] if 'no=' in detail_url else 'unknown'
-                    debug_file = f"debug/debug_nihon_ma_detail_{deal_id}_{timestamp}.html"
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    logging.info(f"Debug: Detail HTML saved to {debug_file}")
+            # デバッグ用: 詳細ページHTMLファイル保存
+            if CONFIG.get('debug', {}).get('save_html_files', False):
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                deal_id = detail_url.split('no=')[-1] if 'no=' in detail_url else 'unknown'
+                debug_file = f"debug/debug_nihon_ma_detail_{deal_id}_{timestamp}.html"
+                with open(debug_file, 'w', encoding='utf-8') as f:
+                    f.write(response.text)
+                logging.info(f"Debug: Detail HTML saved to {debug_file}")
                 
-                return {
-                    'profit': DetailPageScraper._extract_nihon_ma_profit(detail_soup),
-                    'features': DetailPageScraper._extract_nihon_ma_features(detail_soup),
-                    'location': DetailPageScraper._extract_nihon_ma_location(detail_soup),
-                    'price': DetailPageScraper._extract_nihon_ma_price(detail_soup)
-                }
+            return {
+                'profit': DetailPageScraper._extract_nihon_ma_profit(detail_soup),
+                'features': DetailPageScraper._extract_nihon_ma_features(detail_soup),
+                'location': DetailPageScraper._extract_nihon_ma_location(detail_soup),
+                'price': DetailPageScraper._extract_nihon_ma_price(detail_soup)
+            }
         
         except Exception as e:
             logging.error(f"    -> Error fetching detail page: {e}")
@@ -1825,36 +1635,27 @@ class DetailPageScraper:
         try:
             logging.info(f"    -> Fetching detail page: {detail_url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-            
-            with httpx.Client(timeout=15, follow_redirects=True) as client:
-                response = client.get(detail_url, headers=headers)
-                response.raise_for_status()
+            response = get_http_client(CONFIG).get(detail_url)
+            response.raise_for_status()
                 
-                detail_soup = BeautifulSoup(response.text, 'lxml')
+            detail_soup = BeautifulSoup(response.text, 'lxml')
                 
-                # デバッグ用: 詳細ページHTMLファイル保存
-                if CONFIG.get('debug', {}).get('save_html_files', False):
-                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                    deal_id = detail_url.split('/')[-1].replace('.html', '') if '.html' in detail_url else 'unknown'
-                    debug_file = f"debug/debug_integroup_detail_{deal_id}_{timestamp}.html"
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    logging.info(f"Debug: Detail HTML saved to {debug_file}")
+            # デバッグ用: 詳細ページHTMLファイル保存
+            if CONFIG.get('debug', {}).get('save_html_files', False):
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                deal_id = detail_url.split('/')[-1].replace('.html', '') if '.html' in detail_url else 'unknown'
+                debug_file = f"debug/debug_integroup_detail_{deal_id}_{timestamp}.html"
+                with open(debug_file, 'w', encoding='utf-8') as f:
+                    f.write(response.text)
+                logging.info(f"Debug: Detail HTML saved to {debug_file}")
                 
-                # 特色を抽出して不要部分を除去
-                raw_features = DetailPageScraper._extract_integroup_features(detail_soup)
-                cleaned_features = DataConverter.clean_integroup_features(raw_features)
+            # 特色を抽出して不要部分を除去
+            raw_features = DetailPageScraper._extract_integroup_features(detail_soup)
+            cleaned_features = DataConverter.clean_integroup_features(raw_features)
                 
-                return {
-                    'features': cleaned_features
-                }
+            return {
+                'features': cleaned_features
+            }
         
         except Exception as e:
             logging.error(f"    -> Error fetching detail page: {e}")
@@ -1869,38 +1670,29 @@ class DetailPageScraper:
         try:
             logging.info(f"    -> Fetching detail page: {detail_url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-            
-            with httpx.Client(timeout=15, follow_redirects=True) as client:
-                response = client.get(detail_url, headers=headers)
-                response.raise_for_status()
+            response = get_http_client(CONFIG).get(detail_url)
+            response.raise_for_status()
                 
-                detail_soup = BeautifulSoup(response.text, 'lxml')
+            detail_soup = BeautifulSoup(response.text, 'lxml')
                 
-                # デバッグ用: 詳細ページHTMLファイル保存
-                if CONFIG.get('debug', {}).get('save_html_files', False):
-                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                    deal_id = detail_url.split('/')[-2] if detail_url.endswith('/') else detail_url.split('/')[-1]
-                    debug_file = f"debug/debug_newold_detail_{deal_id}_{timestamp}.html"
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    logging.info(f"Debug: Detail HTML saved to {debug_file}")
+            # デバッグ用: 詳細ページHTMLファイル保存
+            if CONFIG.get('debug', {}).get('save_html_files', False):
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                deal_id = detail_url.split('/')[-2] if detail_url.endswith('/') else detail_url.split('/')[-1]
+                debug_file = f"debug/debug_newold_detail_{deal_id}_{timestamp}.html"
+                with open(debug_file, 'w', encoding='utf-8') as f:
+                    f.write(response.text)
+                logging.info(f"Debug: Detail HTML saved to {debug_file}")
                 
-                # タイトル抽出を追加
-                title = DetailPageScraper._extract_newold_title_from_detail_page(detail_soup)
+            # タイトル抽出を追加
+            title = DetailPageScraper._extract_newold_title_from_detail_page(detail_soup)
                 
-                return {
-                    'title': title,  # 新規追加
-                    'profit': DetailPageScraper._extract_newold_profit(detail_soup),
-                    'features': DetailPageScraper._extract_newold_features(detail_soup),
-                    'price': DetailPageScraper._extract_newold_price(detail_soup)
-                }
+            return {
+                'title': title,  # 新規追加
+                'profit': DetailPageScraper._extract_newold_profit(detail_soup),
+                'features': DetailPageScraper._extract_newold_features(detail_soup),
+                'price': DetailPageScraper._extract_newold_price(detail_soup)
+            }
         
         except Exception as e:
             logging.error(f"    -> Error fetching detail page: {e}")
@@ -1915,39 +1707,30 @@ class DetailPageScraper:
         try:
             logging.info(f"    -> Fetching detail page: {detail_url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-            
-            with httpx.Client(timeout=15, follow_redirects=True) as client:
-                response = client.get(detail_url, headers=headers)
-                response.raise_for_status()
+            response = get_http_client(CONFIG).get(detail_url)
+            response.raise_for_status()
                 
-                # 修正: response.textではなくresponse.contentを使用
-                # BeautifulSoupが自動的に文字エンコーディングを判定し、
-                # 圧縮されたデータも正しく解凍してくれる
-                detail_soup = BeautifulSoup(response.content, 'lxml')
+            # 修正: response.textではなくresponse.contentを使用
+            # BeautifulSoupが自動的に文字エンコーディングを判定し、
+            # 圧縮されたデータも正しく解凍してくれる
+            detail_soup = BeautifulSoup(response.content, 'lxml')
                 
-                # デバッグ用: 詳細ページHTMLファイル保存
-                if CONFIG.get('debug', {}).get('save_html_files', False):
-                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                    deal_id = detail_url.split('/')[-1] if detail_url.split('/')[-1] else detail_url.split('/')[-2]
-                    debug_file = f"debug/debug_ondeck_detail_{deal_id}_{timestamp}.html"
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        # デバッグファイル保存時も正しくデコードされたHTMLを使用
-                        f.write(str(detail_soup))
-                    logging.info(f"Debug: Detail HTML saved to {debug_file}")
+            # デバッグ用: 詳細ページHTMLファイル保存
+            if CONFIG.get('debug', {}).get('save_html_files', False):
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                deal_id = detail_url.split('/')[-1] if detail_url.split('/')[-1] else detail_url.split('/')[-2]
+                debug_file = f"debug/debug_ondeck_detail_{deal_id}_{timestamp}.html"
+                with open(debug_file, 'w', encoding='utf-8') as f:
+                    # デバッグファイル保存時も正しくデコードされたHTMLを使用
+                    f.write(str(detail_soup))
+                logging.info(f"Debug: Detail HTML saved to {debug_file}")
                 
-                return {
-                    'profit': DetailPageScraper._extract_ondeck_profit(detail_soup),
-                    'features': DetailPageScraper._extract_ondeck_features(detail_soup),
-                    'location': DetailPageScraper._extract_ondeck_location(detail_soup),
-                    'price': DetailPageScraper._extract_ondeck_price(detail_soup)
-                }
+            return {
+                'profit': DetailPageScraper._extract_ondeck_profit(detail_soup),
+                'features': DetailPageScraper._extract_ondeck_features(detail_soup),
+                'location': DetailPageScraper._extract_ondeck_location(detail_soup),
+                'price': DetailPageScraper._extract_ondeck_price(detail_soup)
+            }
         
         except Exception as e:
             logging.error(f"    -> Error fetching detail page: {e}")
@@ -2667,6 +2450,10 @@ class GSheetConnector:
         # コンフィグから設定を読み込む（認証情報ファイルは除く）
         self.config = config['google_sheets']
         self.worksheet = self._connect()
+        self.sheet_key = sheet_key(self.config['spreadsheet_id'], self.config['sheet_name'])
+        self.layout_cache = get_sheet_layout_cache(config)
+        self.writer = SheetWriter(self.worksheet, self.sheet_key, self.layout_cache, get_writer_settings(config))
+        self.sink = SheetsSink(self.writer, [f.name for f in fields(FormattedDealData)])
 
     def _connect(self):
         logging.info("Connecting to Google Sheets...")
@@ -2687,63 +2474,57 @@ class GSheetConnector:
             logging.critical(f"❌ Google Sheets connection error: {e}")
             return None
 
-    def get_existing_ids(self) -> Set[str]:
-        """既存のユニークIDを取得"""
+    def get_existing_rows(self) -> Optional[Dict[str, int]]:
+        """既存のユニークID -> 行番号を取得（ローカルの案件ストアとの突き合わせ用。読み込みに失敗したらNone）"""
         if not self.worksheet:
-            return set()
+            return None
         logging.info("Fetching existing deal IDs from the sheet...")
         try:
-            all_data = self.worksheet.get_all_records()
-            if all_data and Constants.FIELD_UNIQUE_ID in all_data[0]:
-                ids = {row[Constants.FIELD_UNIQUE_ID] for row in all_data if row.get(Constants.FIELD_UNIQUE_ID)}
-                logging.info(f"Found {len(ids)} existing IDs.")
-                return ids
-            logging.info("No existing data or 'unique_id' column found.")
-            return set()
+            # 全セルではなくunique_id列だけを読む（列番号は記録済みの見出し行から求める）
+            rows = self.writer.call(load_column_rows, self.worksheet, self.sheet_key, Constants.FIELD_UNIQUE_ID, self.layout_cache)
+            if rows:
+                logging.info(f"Found {len(rows)} existing IDs.")
+            else:
+                logging.info("No existing data or 'unique_id' column found.")
+            return rows
         except Exception as e:
             logging.error(f"Error fetching existing IDs: {e}")
-            return set()
+            return None
 
-    def write_deals(self, new_deals: List[FormattedDealData]) -> None:
-        """新しい案件データをスプレッドシートに書き込み"""
+    def write_deals(self, new_deals: List[FormattedDealData]) -> Optional[List[Optional[int]]]:
+        """新しい案件データをスプレッドシートに書き込み（記録済みの見出し行に列順を合わせる）。成功したら各案件の行番号、失敗したらNone"""
         if not self.worksheet or not new_deals:
-            return
+            return None
         
         logging.info(f"Writing {len(new_deals)} new deals to the spreadsheet...")
         
         try:
-            # 書き込み直前に既存データを再取得（他のプロセスによる更新対応）
-            current_existing_ids = self.get_existing_ids()
-            
-            # 最終的な重複チェック
-            final_deals = []
-            for deal in new_deals:
-                if deal.unique_id not in current_existing_ids:
-                    final_deals.append(deal)
-                    logging.info(f"    -> Adding deal: {deal.deal_id} (unique_id: {deal.unique_id})")
-                else:
-                    logging.info(f"    -> Final duplicate check: Skipping {deal.deal_id} (unique_id: {deal.unique_id})")
+            # 重複の最終チェックはローカルの案件ストアで済んでいるので、シートは読まずに記録済みの見出しの順で追記する
+            sheet_rows = self.sink.write(new_deals)
             
-            if not final_deals:
-                logging.info("No new deals to write after final duplicate check.")
-                return
-            
-            all_values = self.worksheet.get_all_values()
-            headers = [f.name for f in fields(FormattedDealData)]
-            
-            if not all_values:
-                self.worksheet.append_row(headers, value_input_option='USER_ENTERED')
-            
-            existing_headers = self.worksheet.row_values(1) if all_values else headers
-            rows_to_append = [[getattr(deal, key, '') for key in existing_headers] for deal in final_deals]
-            
-            if rows_to_append:
-                self.worksheet.append_rows(rows_to_append, value_input_option='USER_ENTERED')
-            
-            logging.info(f"✅ Successfully appended {len(final_deals)} rows.")
+            logging.info(f"✅ Successfully appended {len(new_deals)} rows.")
+            return sheet_rows
             
+        except AppendError as e:
+            # 書き込めたチャンクの分だけ返し、次回その分を再送しないようにする
+            logging.error(f"Error writing to spreadsheet after {len(e.sheet_rows)} rows: {e.cause}")
+            return e.sheet_rows or None
         except Exception as e:
             logging.error(f"Error writing to spreadsheet: {e}")
+            return None
+
+    def update_deals(self, updates: Dict[str, Tuple[int, Dict[str, str]]]) -> Tuple[List[str], List[str]]:
+        """掲載内容が変わった案件の変更セルだけを書き換える（行のunique_idを確かめてから）。(書き換えたID, 行がずれていたID)を返す"""
+        if not self.worksheet or not updates:
+            return [], []
+        logging.info(f"Updating {len(updates)} changed deals in the spreadsheet...")
+        try:
+            updated, moved = self.writer.update_cells(updates, Constants.FIELD_UNIQUE_ID)
+            logging.info(f"✅ Successfully updated {len(updated)} deals.")
+            return updated, moved
+        except Exception as e:
+            logging.error(f"Error updating spreadsheet: {e}")
+            return [], []
 
 # --- ユーティリティ関数 ---
 def load_config(file_path: str = 'config.yaml') -> None:
@@ -2754,6 +2535,8 @@ def load_config(file_path: str = 'config.yaml') -> None:
             config = yaml.safe_load(f)
         if 'GOOGLE_SHEETS_ID' in os.environ:
             config['google_sheets']['spreadsheet_id'] = os.environ['GOOGLE_SHEETS_ID']
+        # セレクタ記憶などの相対パスはconfig.yamlのあるディレクトリ基準で解決する
+        config['config_dir'] = os.path.dirname(os.path.abspath(file_path))
         CONFIG = config
     except Exception as e:
         print(f"❌ Config file read error: {e}")
@@ -2792,43 +2575,34 @@ def retry_on_failure(max_retries: int = 3, delay: int = 1):
 @retry_on_failure()
 def fetch_html(url: str) -> Optional[str]:
     """HTMLコンテンツの取得"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive'
-    }
-    
     try:
-        with httpx.Client(timeout=15, follow_redirects=True) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
+        response = get_http_client(CONFIG).get(url)
+        response.raise_for_status()
             
-            # より堅牢なエンコーディング処理
-            try:
-                # まずはresponse.textを試す
-                content = response.text
-            except UnicodeDecodeError:
-                # 失敗した場合は複数のエンコーディングを試行
-                for encoding in ['utf-8', 'shift_jis', 'euc-jp', 'iso-2022-jp']:
-                    try:
-                        content = response.content.decode(encoding, errors='ignore')
-                        logging.info(f"Successfully decoded with {encoding} for {url}")
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    # 全て失敗した場合はUTF-8で強制デコード
-                    content = response.content.decode('utf-8', errors='ignore')
-                    logging.warning(f"Forced UTF-8 decode for {url}")
+        # より堅牢なエンコーディング処理
+        try:
+            # まずはresponse.textを試す
+            content = response.text
+        except UnicodeDecodeError:
+            # 失敗した場合は複数のエンコーディングを試行
+            for encoding in ['utf-8', 'shift_jis', 'euc-jp', 'iso-2022-jp']:
+                try:
+                    content = response.content.decode(encoding, errors='ignore')
+                    logging.info(f"Successfully decoded with {encoding} for {url}")
+                    break
+                except UnicodeDecodeError:
+                    continue
+            else:
+                # 全て失敗した場合はUTF-8で強制デコード
+                content = response.content.decode('utf-8', errors='ignore')
+                logging.warning(f"Forced UTF-8 decode for {url}")
             
-            # 取得したコンテンツが空でないことを確認
-            if not content or len(content) < 100:
-                logging.error(f"Retrieved content is too short or empty for {url}")
-                return None
+        # 取得したコンテンツが空でないことを確認
+        if not content or len(content) < 100:
+            logging.error(f"Retrieved content is too short or empty for {url}")
+            return None
             
-            return content
+        return content
             
     except httpx.TimeoutException as e:
         raise httpx.RequestError(f"Timeout occurred: {e}")
@@ -2851,6 +2625,8 @@ def load_config(file_path: str = 'config.yaml') -> None:
             config = yaml.safe_load(f)
         if 'GOOGLE_SHEETS_ID' in os.environ:
             config['google_sheets']['spreadsheet_id'] = os.environ['GOOGLE_SHEETS_ID']
+        # セレクタ記憶などの相対パスはconfig.yamlのあるディレクトリ基準で解決する
+        config['config_dir'] = os.path.dirname(os.path.abspath(file_path))
         CONFIG = config
     except Exception as e:
         print(f"❌ Config file read error: {e}")
@@ -2886,6 +2662,71 @@ def retry_on_failure(max_retries: int = 3, delay: int = 1):
         return wrapper
     return decorator
 
+def generate_unique_id(raw_deal: RawDealData) -> str:
+    """ユニークIDを生成（リンクがあればURLベース、なければ案件IDベース）"""
+    if raw_deal.link:
+        return hashlib.md5(f"{raw_deal.site_name}_{raw_deal.link}".encode()).hexdigest()[:12]
+    return hashlib.md5(f"{raw_deal.site_name}_{raw_deal.deal_id}".encode()).hexdigest()[:12]
+
+def drop_known_deals(raw_deals: List[RawDealData], existing_ids: Optional[Set[str]]) -> List[RawDealData]:
+    """スプレッドシートに登録済みの案件を詳細ページ取得前に除外"""
+    if not raw_deals:
+        return raw_deals
+    existing_ids = existing_ids or set()
+    new_deals = []
+    seen_ids: Set[str] = set()
+    for raw_deal in raw_deals:
+        unique_id = generate_unique_id(raw_deal)
+        if unique_id in existing_ids or unique_id in seen_ids:
+            continue
+        seen_ids.add(unique_id)
+        new_deals.append(raw_deal)
+    
+    skipped = len(raw_deals) - len(new_deals)
+    if skipped:
+        logging.info(f"  ⏭️ Skipped {skipped} known deals before detail fetching ({len(new_deals)} new)")
+    return new_deals
+
+def record_rejected_deals(deal_store: DealStore, site_name: str, candidate_ids: List[str],
+                          kept_ids: Iterable[str]) -> None:
+    """詳細取得・整形の対象にしたが条件に合わず除外された案件を記録（次回以降、差分クロールの停止判定で既知として扱う）"""
+    kept_ids = set(kept_ids)
+    rejected = deal_store.record_rejected(site_name, (unique_id for unique_id in candidate_ids if unique_id not in kept_ids))
+    if rejected:
+        logging.info(f"  🚫 {site_name}: recorded {rejected} deals that did not meet the criteria")
+
+def format_money_fields(raw_deal: RawDealData) -> Tuple[str, str, str]:
+    """サイト別に売上高・営業利益・価格を百万円単位などの表示用に整形"""
+    if raw_deal.site_name == "日本M&Aセンター":
+        revenue = DataConverter.convert_nihon_ma_revenue_to_million(raw_deal.revenue_text)
+        profit = DataConverter.convert_nihon_ma_profit_to_million(raw_deal.profit_text)
+        price = DataConverter.format_financial_text(raw_deal.price_text)
+    elif raw_deal.site_name == "NEWOLD CAPITAL":
+        revenue = DataConverter.format_financial_text(raw_deal.revenue_text)  # 既に変換済み
+        profit = DataConverter.convert_newold_profit_to_million(raw_deal.profit_text)
+        price = DataConverter.convert_newold_price_to_million(raw_deal.price_text)
+    elif raw_deal.site_name == "オンデック":
+        revenue = DataConverter.clean_ondeck_revenue(raw_deal.revenue_text)
+        profit = DataConverter.clean_ondeck_profit(raw_deal.profit_text)
+        price = DataConverter.clean_ondeck_price(raw_deal.price_text)
+    else:
+        # インテグループの場合は既に変換済み
+        revenue = DataConverter.format_financial_text(raw_deal.revenue_text)
+        profit = DataConverter.format_financial_text(raw_deal.profit_text)
+        price = DataConverter.format_financial_text(raw_deal.price_text)
+    return revenue, profit, price
+
+def listing_snapshots(raw_deals: List[RawDealData]) -> Dict[str, Dict[str, str]]:
+    """一覧ページから分かる項目（空でないもの）を整形後の表示値で取得（unique_id -> 項目名 -> 値。掲載内容の変更検知用）"""
+    snapshots = {}
+    for raw_deal in raw_deals:
+        revenue, profit, price = format_money_fields(raw_deal)
+        values = {'title': (raw_deal.title, raw_deal.title), 'location': (raw_deal.location_text, raw_deal.location_text),
+                  'revenue': (raw_deal.revenue_text, revenue), 'profit': (raw_deal.profit_text, profit),
+                  'price': (raw_deal.price_text, price)}
+        snapshots[generate_unique_id(raw_deal)] = {name: shown for name, (text, shown) in values.items() if text}
+    return snapshots
+
 def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> List[FormattedDealData]:
     """生データを整形済みデータに変換"""
     formatted_deals = []
@@ -2894,13 +2735,7 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
     for raw_deal in raw_deals:
         try:
             # より堅牢なユニークID生成（URLベース）
-            if raw_deal.link:
-                # URLから案件IDを抽出してユニークIDを生成
-                url_based_id = f"{raw_deal.site_name}_{raw_deal.link}"
-                unique_id = hashlib.md5(url_based_id.encode()).hexdigest()[:12]
-            else:
-                # フォールバック: 従来の方法
-                unique_id = hashlib.md5(f"{raw_deal.site_name}_{raw_deal.deal_id}".encode()).hexdigest()[:12]
+            unique_id = generate_unique_id(raw_deal)
             
             # デバッグ情報をログ出力
             logging.info(f"    -> Generating unique_id for {raw_deal.site_name} {raw_deal.deal_id}")
@@ -2914,24 +2749,7 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
             # 処理済みIDセットに追加（同一実行内での重複防止）
             existing_ids.add(unique_id)
             
-            # サイト別に売上高と営業利益を百万円単位に変換
-            if raw_deal.site_name == "日本M&Aセンター":
-                revenue = DataConverter.convert_nihon_ma_revenue_to_million(raw_deal.revenue_text)
-                profit = DataConverter.convert_nihon_ma_profit_to_million(raw_deal.profit_text)
-                price = DataConverter.format_financial_text(raw_deal.price_text)
-            elif raw_deal.site_name == "NEWOLD CAPITAL":
-                revenue = DataConverter.format_financial_text(raw_deal.revenue_text)  # 既に変換済み
-                profit = DataConverter.convert_newold_profit_to_million(raw_deal.profit_text)
-                price = DataConverter.convert_newold_price_to_million(raw_deal.price_text)
-            elif raw_deal.site_name == "オンデック":
-                revenue = DataConverter.clean_ondeck_revenue(raw_deal.revenue_text)
-                profit = DataConverter.clean_ondeck_profit(raw_deal.profit_text)
-                price = DataConverter.clean_ondeck_price(raw_deal.price_text)
-            else:
-                # インテグループの場合は既に変換済み
-                revenue = DataConverter.format_financial_text(raw_deal.revenue_text)
-                profit = DataConverter.format_financial_text(raw_deal.profit_text)
-                price = DataConverter.format_financial_text(raw_deal.price_text)
+            revenue, profit, price = format_money_fields(raw_deal)
             
             formatted_deal = FormattedDealData(
                 extraction_time=extraction_time,
@@ -2956,24 +2774,50 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
     
     return formatted_deals
 
-def scrape_nihon_ma_center() -> List[RawDealData]:
-    """日本M&Aセンターのスクレイピング実行"""
+def nihon_ma_list_urls(max_pages: int = 3) -> List[str]:
+    """日本M&Aセンターの一覧ページURL"""
+    base_url = "https://www.nihon-ma.co.jp/anken/needs_convey.php"
+    return [base_url if page_num == 1 else f"{base_url}?p={page_num}" for page_num in range(1, max_pages + 1)]
+
+def integroup_list_urls(max_pages: int = 3) -> List[str]:
+    """インテグループの一覧ページURL"""
+    base_url = "https://www.integroup.jp/sell/"
+    return [base_url if page_num == 1 else f"{base_url}page/{page_num}/" for page_num in range(1, max_pages + 1)]
+
+def newold_list_urls() -> List[str]:
+    """NEWOLD CAPITALの一覧ページURL（1ページのみ）"""
+    return ["https://newold.co.jp/anken/"]
+
+def prefetch_main2_list_pages(seen_ids: Optional[Set[str]] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """httpxで取得する3サイトの一覧ページを同時に先行取得（差分モードのサイトは先頭ページのみ）"""
+    jobs = {
+        "日本M&Aセンター": nihon_ma_list_urls(),
+        "インテグループ": integroup_list_urls(),
+        "NEWOLD CAPITAL": newold_list_urls(),
+    }
+    for site_name, urls in jobs.items():
+        window = KnownPageTracker.for_site(CONFIG, site_name, seen_ids).prefetch_window
+        jobs[site_name] = urls[:window]
+    return prefetch_list_pages(jobs, CONFIG)
+
+def _get_list_page(url: str, prefetched_pages: Optional[Dict[str, Optional[str]]]) -> Tuple[Optional[str], bool]:
+    """先行取得済みならそれを使い、なければ同期取得する（戻り値: HTML, 同期取得したか）"""
+    if prefetched_pages and prefetched_pages.get(url):
+        return prefetched_pages[url], False
+    return fetch_html(url), True
+
+def scrape_nihon_ma_center(prefetched_pages: Optional[Dict[str, Optional[str]]] = None,
+                           seen_ids: Optional[Set[str]] = None) -> List[RawDealData]:
+    """日本M&Aセンターのスクレイピング実行（seen_idsは登録済み＋除外済みの案件ID。差分クロールの停止判定用）"""
     logging.info("🔍 Starting scraping for: 日本M&Aセンター")
     all_deals = []
+    tracker = KnownPageTracker.for_site(CONFIG, "日本M&Aセンター", seen_ids)
     
     try:
-        base_url = "https://www.nihon-ma.co.jp/anken/needs_convey.php"
-        max_pages = 3
-        
-        for page_num in range(1, max_pages + 1):
-            if page_num == 1:
-                url = base_url
-            else:
-                url = f"{base_url}?p={page_num}"
-            
+        for page_num, url in enumerate(nihon_ma_list_urls(), 1):
             logging.info(f"  📄 Scraping page {page_num}: {url}")
             
-            html_content = fetch_html(url)
+            html_content, fetched_live = _get_list_page(url, prefetched_pages)
             if not html_content:
                 logging.error(f"  ❌ Failed to fetch page {page_num}")
                 continue
@@ -2984,7 +2828,12 @@ def scrape_nihon_ma_center() -> List[RawDealData]:
             logging.info(f"  ✅ Found {len(deals)} deals meeting revenue criteria on page {page_num}")
             all_deals.extend(deals)
             
-            time.sleep(2)  # ページ間の待機時間
+            # 差分モード：既知案件だけのページが続いたら打ち切り
+            if tracker.should_stop(generate_unique_id(deal) for deal in deals):
+                break
+            
+            if fetched_live:
+                time.sleep(2)  # ページ間の待機時間
     
     except Exception as e:
         logging.error(f"❌ Error scraping 日本M&Aセンター: {e}")
@@ -2993,24 +2842,18 @@ def scrape_nihon_ma_center() -> List[RawDealData]:
     logging.info(f"🎯 Total deals found from 日本M&Aセンター: {len(all_deals)}")
     return all_deals
 
-def scrape_integroup() -> List[RawDealData]:
-    """インテグループのスクレイピング実行"""
+def scrape_integroup(prefetched_pages: Optional[Dict[str, Optional[str]]] = None,
+                     seen_ids: Optional[Set[str]] = None) -> List[RawDealData]:
+    """インテグループのスクレイピング実行（seen_idsは登録済み＋除外済みの案件ID。差分クロールの停止判定用）"""
     logging.info("🔍 Starting scraping for: インテグループ")
     all_deals = []
+    tracker = KnownPageTracker.for_site(CONFIG, "インテグループ", seen_ids)
     
     try:
-        base_url = "https://www.integroup.jp/sell/"
-        max_pages = 3
-        
-        for page_num in range(1, max_pages + 1):
-            if page_num == 1:
-                url = base_url
-            else:
-                url = f"{base_url}page/{page_num}/"
-            
+        for page_num, url in enumerate(integroup_list_urls(), 1):
             logging.info(f"  📄 Scraping page {page_num}: {url}")
             
-            html_content = fetch_html(url)
+            html_content, fetched_live = _get_list_page(url, prefetched_pages)
             if not html_content:
                 logging.error(f"  ❌ Failed to fetch page {page_num}")
                 continue
@@ -3021,7 +2864,12 @@ def scrape_integroup() -> List[RawDealData]:
             logging.info(f"  ✅ Found {len(deals)} deals meeting revenue criteria on page {page_num}")
             all_deals.extend(deals)
             
-            time.sleep(2)  # ページ間の待機時間
+            # 差分モード：既知案件だけのページが続いたら打ち切り
+            if tracker.should_stop(generate_unique_id(deal) for deal in deals):
+                break
+            
+            if fetched_live:
+                time.sleep(2)  # ページ間の待機時間
     
     except Exception as e:
         logging.error(f"❌ Error scraping インテグループ: {e}")
@@ -3030,17 +2878,17 @@ def scrape_integroup() -> List[RawDealData]:
     logging.info(f"🎯 Total deals found from インテグループ: {len(all_deals)}")
     return all_deals
 
-def scrape_newold_capital() -> List[RawDealData]:
+def scrape_newold_capital(prefetched_pages: Optional[Dict[str, Optional[str]]] = None) -> List[RawDealData]:
     """NEWOLD CAPITALのスクレイピング実行"""
     logging.info("🔍 Starting scraping for: NEWOLD CAPITAL")
     all_deals = []
     
     try:
-        url = "https://newold.co.jp/anken/"
+        url = newold_list_urls()[0]
         
         logging.info(f"  📄 Scraping page: {url}")
         
-        html_content = fetch_html(url)
+        html_content, _ = _get_list_page(url, prefetched_pages)
         if not html_content:
             logging.error(f"  ❌ Failed to fetch page")
             return all_deals
@@ -3058,8 +2906,12 @@ def scrape_newold_capital() -> List[RawDealData]:
     logging.info(f"🎯 Total deals found from NEWOLD CAPITAL: {len(all_deals)}")
     return all_deals
 
-def scrape_ondeck() -> List[RawDealData]:
-    """オンデックのスクレイピング実行（Selenium統一版）"""
+def scrape_ondeck(existing_ids: Optional[Set[str]] = None, seen_ids: Optional[Set[str]] = None,
+                  deal_store: Optional[DealStore] = None) -> List[RawDealData]:
+    """
+    オンデックのスクレイピング実行（Selenium統一版）。
+    seen_ids（登録済み＋除外済みの案件ID）は差分クロールの停止判定に使う。deal_storeを渡すと詳細ページで条件に合わなかった案件を記録する。
+    """
     logging.info("🔍 Starting scraping for: オンデック")
     all_deals = []
     
@@ -3077,25 +2929,10 @@ def scrape_ondeck() -> List[RawDealData]:
         
         base_url = ondeck_config['base_url']
         max_pages = ondeck_config.get('max_pages', 3)
+        tracker = KnownPageTracker.for_site(CONFIG, "オンデック", seen_ids if seen_ids is not None else existing_ids)
         
-        # Seleniumの初期化
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-        
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        
-        driver = webdriver.Chrome(options=options)
-        
-        try:
+        # Seleniumの初期化（共有プールから起動済みブラウザを借り出す）
+        with get_webdriver_pool(CONFIG).checkout() as driver:
             # 一覧ページのスクレイピング
             for page_num in range(1, max_pages + 1):
                 if page_num == 1:
@@ -3108,10 +2945,7 @@ def scrape_ondeck() -> List[RawDealData]:
                 
                 try:
                     driver.get(url)
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "body"))
-                    )
-                    time.sleep(3)  # ページ読み込み待機
+                    wait_until_ready(driver, get_readiness_settings(CONFIG, "オンデック", 'list'), "オンデック list")  # ページ読み込み待機
                     
                     html_content = driver.page_source
                     
@@ -3125,12 +2959,20 @@ def scrape_ondeck() -> List[RawDealData]:
                     logging.info(f"  ✅ Found {len(deals)} deals meeting revenue criteria on page {page_num}")
                     all_deals.extend(deals)
                     
+                    # 差分モード：既知案件だけのページが続いたら打ち切り
+                    if tracker.should_stop(generate_unique_id(deal) for deal in deals):
+                        break
+                    
                     time.sleep(2)  # ページ間の待機時間
                     
                 except Exception as e:
                     logging.error(f"  ❌ Failed to fetch page {page_num}: {e}")
                     continue
             
+            # 登録済み案件は詳細ページを取得しない
+            all_deals = drop_known_deals(all_deals, existing_ids)
+            candidate_ids = [generate_unique_id(deal) for deal in all_deals]
+            
             # 詳細ページの情報取得と二次フィルタリング（Seleniumで統一）
             if all_deals:
                 logging.info(f"🔗 Fetching details for {len(all_deals)} deals from オンデック using Selenium")
@@ -3142,10 +2984,7 @@ def scrape_ondeck() -> List[RawDealData]:
                         
                         # Seleniumで詳細ページにアクセス
                         driver.get(deal.link)
-                        WebDriverWait(driver, 15).until(
-                            EC.presence_of_element_located((By.TAG_NAME, "body"))
-                        )
-                        time.sleep(2)  # ページ読み込み待機
+                        wait_until_ready(driver, get_readiness_settings(CONFIG, "オンデック", 'detail'), "オンデック detail")  # ページ読み込み待機
                         
                         # 完全なHTMLを取得
                         detail_html = driver.page_source
@@ -3192,9 +3031,9 @@ def scrape_ondeck() -> List[RawDealData]:
                 
                 logging.info(f"✅ Enhanced {len(enhanced_deals)} deals meeting all criteria")
                 all_deals = enhanced_deals
-        
-        finally:
-            driver.quit()
+                if deal_store is not None:
+                    record_rejected_deals(deal_store, "オンデック", candidate_ids,
+                                          (generate_unique_id(deal) for deal in enhanced_deals))
     
     except Exception as e:
         logging.error(f"❌ Error scraping オンデック: {e}")
@@ -3211,151 +3050,115 @@ def enhance_ondeck_deals_with_details(raw_deals: List[RawDealData]) -> List[RawD
 
 def enhance_nihon_ma_deals_with_details(raw_deals: List[RawDealData]) -> List[RawDealData]:
     """日本M&Aセンターの詳細ページから情報を取得して既存データを拡張"""
-    logging.info(f"🔗 Fetching details for {len(raw_deals)} deals from 日本M&Aセンター")
-    enhanced_deals = []
+    def apply_details(i: int, deal: RawDealData, detail_info: Dict[str, str]) -> bool:
+        logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
+        
+        if not detail_info.get('profit'):
+            logging.warning(f"    -> No profit info found for deal {deal.deal_id}")
+            return False
+        
+        # 実態営業利益のフィルタリング
+        if not DataConverter.parse_nihon_ma_profit(detail_info['profit']):
+            logging.info(f"    -> Skipping deal {deal.deal_id}: Profit '{detail_info['profit']}' doesn't meet criteria")
+            return False
+        
+        logging.info(f"    -> Deal {deal.deal_id} meets profit criteria: {detail_info['profit']}")
+        
+        # 詳細情報を設定
+        deal.profit_text = detail_info.get('profit', '')
+        deal.features_text = detail_info.get('features', '')
+        deal.location_text = detail_info.get('location', '')
+        deal.price_text = detail_info.get('price', '')
+        return True
     
-    for i, deal in enumerate(raw_deals, 1):
-        try:
-            logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
-            
-            # 詳細ページから情報取得
-            detail_info = DetailPageScraper.fetch_nihon_ma_details(deal.link)
-            
-            if detail_info.get('profit'):
-                # 実態営業利益のフィルタリング
-                if DataConverter.parse_nihon_ma_profit(detail_info['profit']):
-                    logging.info(f"    -> Deal {deal.deal_id} meets profit criteria: {detail_info['profit']}")
-                    
-                    # 詳細情報を設定
-                    deal.profit_text = detail_info.get('profit', '')
-                    deal.features_text = detail_info.get('features', '')
-                    deal.location_text = detail_info.get('location', '')
-                    deal.price_text = detail_info.get('price', '')
-                    
-                    enhanced_deals.append(deal)
-                else:
-                    logging.info(f"    -> Skipping deal {deal.deal_id}: Profit '{detail_info['profit']}' doesn't meet criteria")
-            else:
-                logging.warning(f"    -> No profit info found for deal {deal.deal_id}")
-            
-            time.sleep(1)  # リクエスト間の待機時間
-            
-        except Exception as e:
-            logging.error(f"  ❌ Error processing deal {deal.deal_id}: {e}")
-            continue
+    enhanced_deals = enrich_concurrently(raw_deals, DetailPageScraper.fetch_nihon_ma_details,
+                                         apply_details, "日本M&Aセンター", CONFIG)
     
     logging.info(f"✅ Enhanced {len(enhanced_deals)} deals meeting all criteria")
     return enhanced_deals
 
 def enhance_integroup_deals_with_details(raw_deals: List[RawDealData]) -> List[RawDealData]:
     """インテグループの詳細ページから情報を取得して既存データを拡張"""
-    logging.info(f"🔗 Fetching details for {len(raw_deals)} deals from インテグループ")
-    enhanced_deals = []
+    def apply_details(i: int, deal: RawDealData, detail_info: Dict[str, str]) -> bool:
+        logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
+        
+        # 特色情報を設定（クリーニング済み）
+        deal.features_text = detail_info.get('features', '')
+        
+        logging.info(f"    -> Enhanced deal {deal.deal_id}")
+        return True
     
-    for i, deal in enumerate(raw_deals, 1):
-        try:
-            logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
-            
-            # 詳細ページから情報取得
-            detail_info = DetailPageScraper.fetch_integroup_details(deal.link)
-            
-            # 特色情報を設定（クリーニング済み）
-            deal.features_text = detail_info.get('features', '')
-            
-            enhanced_deals.append(deal)
-            logging.info(f"    -> Enhanced deal {deal.deal_id}")
-            
-            time.sleep(1)  # リクエスト間の待機時間
-            
-        except Exception as e:
-            logging.error(f"  ❌ Error processing deal {deal.deal_id}: {e}")
-            continue
+    enhanced_deals = enrich_concurrently(raw_deals, DetailPageScraper.fetch_integroup_details,
+                                         apply_details, "インテグループ", CONFIG)
     
     logging.info(f"✅ Enhanced {len(enhanced_deals)} deals from インテグループ")
     return enhanced_deals
 
 def enhance_newold_deals_with_details(raw_deals: List[RawDealData]) -> List[RawDealData]:
     """NEWOLD CAPITALの詳細ページから情報を取得して既存データを拡張（タイトル更新追加版）"""
-    logging.info(f"🔗 Fetching details for {len(raw_deals)} deals from NEWOLD CAPITAL")
-    enhanced_deals = []
+    def apply_details(i: int, deal: RawDealData, detail_info: Dict[str, str]) -> bool:
+        logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
+        
+        # タイトルを更新（重要な修正点）
+        if detail_info.get('title'):
+            deal.title = detail_info['title']
+            logging.info(f"    -> Updated title to: {deal.title}")
+        
+        if not detail_info.get('profit'):
+            logging.warning(f"    -> No profit info found for deal {deal.deal_id}")
+            return False
+        
+        # 営業利益のフィルタリング
+        if not DataConverter.parse_newold_profit(detail_info['profit']):
+            logging.info(f"    -> Skipping deal {deal.deal_id}: Profit '{detail_info['profit']}' doesn't meet criteria")
+            return False
+        
+        logging.info(f"    -> Deal {deal.deal_id} meets profit criteria: {detail_info['profit']}")
+        
+        # 詳細情報を設定
+        deal.profit_text = detail_info.get('profit', '')
+        deal.features_text = detail_info.get('features', '')
+        deal.price_text = detail_info.get('price', '')
+        return True
     
-    for i, deal in enumerate(raw_deals, 1):
-        try:
-            logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
-            
-            # 詳細ページから情報取得
-            detail_info = DetailPageScraper.fetch_newold_details(deal.link)
-            
-            # タイトルを更新（重要な修正点）
-            if detail_info.get('title'):
-                deal.title = detail_info['title']
-                logging.info(f"    -> Updated title to: {deal.title}")
-            
-            if detail_info.get('profit'):
-                # 営業利益のフィルタリング
-                if DataConverter.parse_newold_profit(detail_info['profit']):
-                    logging.info(f"    -> Deal {deal.deal_id} meets profit criteria: {detail_info['profit']}")
-                    
-                    # 詳細情報を設定
-                    deal.profit_text = detail_info.get('profit', '')
-                    deal.features_text = detail_info.get('features', '')
-                    deal.price_text = detail_info.get('price', '')
-                    
-                    enhanced_deals.append(deal)
-                else:
-                    logging.info(f"    -> Skipping deal {deal.deal_id}: Profit '{detail_info['profit']}' doesn't meet criteria")
-            else:
-                logging.warning(f"    -> No profit info found for deal {deal.deal_id}")
-            
-            time.sleep(1)  # リクエスト間の待機時間
-            
-        except Exception as e:
-            logging.error(f"  ❌ Error processing deal {deal.deal_id}: {e}")
-            continue
+    enhanced_deals = enrich_concurrently(raw_deals, DetailPageScraper.fetch_newold_details,
+                                         apply_details, "NEWOLD CAPITAL", CONFIG)
     
     logging.info(f"✅ Enhanced {len(enhanced_deals)} deals meeting all criteria")
     return enhanced_deals
 
 def enhance_ondeck_deals_with_details(raw_deals: List[RawDealData]) -> List[RawDealData]:
     """オンデックの詳細ページから情報を取得して二次フィルタリング"""
-    logging.info(f"🔗 Fetching details for {len(raw_deals)} deals from オンデック")
-    enhanced_deals = []
+    def apply_details(i: int, deal: RawDealData, detail_info: Dict[str, str]) -> bool:
+        logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
+        
+        if not detail_info.get('profit'):
+            logging.warning(f"    -> No profit info found for deal {deal.deal_id}")
+            return False
+        
+        # 営業利益による二次フィルタリング
+        if not DataConverter.parse_ondeck_profit(detail_info['profit']):
+            logging.info(f"    -> Skipping deal {deal.deal_id}: Profit '{detail_info['profit']}' doesn't meet criteria")
+            return False
+        
+        logging.info(f"    -> Deal {deal.deal_id} meets profit criteria: {detail_info['profit']}")
+        
+        # 詳細情報を設定
+        deal.profit_text = detail_info.get('profit', '')
+        deal.features_text = detail_info.get('features', '')
+        deal.location_text = detail_info.get('location', '')
+        deal.price_text = detail_info.get('price', '')
+        return True
     
-    for i, deal in enumerate(raw_deals, 1):
-        try:
-            logging.info(f"  📖 Processing deal {i}/{len(raw_deals)}: {deal.deal_id}")
-            
-            # 詳細ページから情報取得
-            detail_info = DetailPageScraper.fetch_ondeck_details(deal.link)
-            
-            if detail_info.get('profit'):
-                # 営業利益による二次フィルタリング
-                if DataConverter.parse_ondeck_profit(detail_info['profit']):
-                    logging.info(f"    -> Deal {deal.deal_id} meets profit criteria: {detail_info['profit']}")
-                    
-                    # 詳細情報を設定
-                    deal.profit_text = detail_info.get('profit', '')
-                    deal.features_text = detail_info.get('features', '')
-                    deal.location_text = detail_info.get('location', '')
-                    deal.price_text = detail_info.get('price', '')
-                    
-                    enhanced_deals.append(deal)
-                else:
-                    logging.info(f"    -> Skipping deal {deal.deal_id}: Profit '{detail_info['profit']}' doesn't meet criteria")
-            else:
-                logging.warning(f"    -> No profit info found for deal {deal.deal_id}")
-            
-            time.sleep(1)  # リクエスト間の待機時間
-            
-        except Exception as e:
-            logging.error(f"  ❌ Error processing deal {deal.deal_id}: {e}")
-            continue
+    enhanced_deals = enrich_concurrently(raw_deals, DetailPageScraper.fetch_ondeck_details,
+                                         apply_details, "オンデック", CONFIG)
     
     logging.info(f"✅ Enhanced {len(enhanced_deals)} deals meeting all criteria")
     return enhanced_deals
 
 def main():
     """メイン実行関数"""
+    sheet_sink = None
     try:
         load_config()
         setup_logging(CONFIG)
@@ -3368,23 +3171,56 @@ def main():
             logging.critical("❌ Cannot proceed without Google Sheets connection")
             return
         
-        existing_ids = sheet_connector.get_existing_ids()
-        logging.info(f"📋 Found {len(existing_ids)} existing deals in spreadsheet")
+        # 重複判定はローカルの案件ストアで行い、スプレッドシートの全件読み込みは定期的な突き合わせのときだけ
+        deal_store = get_deal_store(CONFIG)
+        deal_store.reconcile_if_due(sheet_connector.get_existing_rows)
+        existing_ids = deal_store.existing_ids()
+        logging.info(f"📋 Found {len(existing_ids)} existing deals in the local deal store")
+        # ページ送りの停止判定では、条件に合わず除外した案件も既知として扱う
+        seen_ids = deal_store.seen_ids()
         
         all_formatted_deals = []
+        target_sites = ["日本M&Aセンター", "インテグループ", "NEWOLD CAPITAL", "オンデック"]
+        
+        # スプレッドシートへはサイトごとに整形が済んだ案件からスクレイピングと並行して書き込む（前回書き込めなかった分が先）
+        sheet_sink = WriteBehindSink(lambda deals: deal_store.sync(deals, sheet_connector.write_deals),
+                                     **get_write_behind_settings(CONFIG))
+        sheet_sink.push(deal_store.pending_deals(FormattedDealData, target_sites))
+        
+        def queue_for_sheet(formatted_deals: List[FormattedDealData], listings: Dict[str, Dict[str, str]]) -> None:
+            """途中で止まっても失われないよう先にストアへ保存してから書き込みキューへ（履歴のParquet/JSONLにも追記）"""
+            all_formatted_deals.extend(formatted_deals)
+            deal_store.add_deals(formatted_deals, listings)
+            export_history(formatted_deals, config=CONFIG)
+            sheet_sink.push(formatted_deals)
+        
+        def observe_listings(raw_deals: List[RawDealData]) -> Dict[str, Dict[str, str]]:
+            """upsertモードでは登録済み案件の一覧の掲載内容を前回と比べ、変わった項目をシートへの反映待ちにする"""
+            listings = listing_snapshots(raw_deals) if deal_store.upsert else {}
+            deal_store.observe_listings(listings)
+            return listings
+        
+        # httpxで取得する3サイトの一覧ページを同時に先行取得
+        prefetched_by_site = prefetch_main2_list_pages(seen_ids)
         
         # 日本M&Aセンターのスクレイピング実行
         logging.info("=" * 60)
         logging.info("日本M&Aセンター processing started")
-        nihon_ma_raw_deals = scrape_nihon_ma_center()
+        nihon_ma_raw_deals = scrape_nihon_ma_center(prefetched_by_site.get("日本M&Aセンター"), seen_ids)
+        
+        nihon_ma_listings = observe_listings(nihon_ma_raw_deals)
+        nihon_ma_raw_deals = drop_known_deals(nihon_ma_raw_deals, existing_ids)  # 登録済み案件は詳細取得しない
         
         if nihon_ma_raw_deals:
+            nihon_ma_candidate_ids = [generate_unique_id(deal) for deal in nihon_ma_raw_deals]
             # 詳細ページから情報取得＆実態営業利益フィルタリング
             nihon_ma_enhanced_deals = enhance_nihon_ma_deals_with_details(nihon_ma_raw_deals)
             
             # データ整形
             nihon_ma_formatted_deals = format_deal_data(nihon_ma_enhanced_deals, existing_ids)
-            all_formatted_deals.extend(nihon_ma_formatted_deals)
+            record_rejected_deals(deal_store, "日本M&Aセンター", nihon_ma_candidate_ids,
+                                  (deal.unique_id for deal in nihon_ma_formatted_deals))
+            queue_for_sheet(nihon_ma_formatted_deals, nihon_ma_listings)
             
             logging.info(f"✅ 日本M&Aセンター: {len(nihon_ma_formatted_deals)} new deals after all filtering")
         else:
@@ -3393,15 +3229,21 @@ def main():
         # インテグループのスクレイピング実行
         logging.info("=" * 60)
         logging.info("インテグループ processing started")
-        integroup_raw_deals = scrape_integroup()
+        integroup_raw_deals = scrape_integroup(prefetched_by_site.get("インテグループ"), seen_ids)
+        
+        integroup_listings = observe_listings(integroup_raw_deals)
+        integroup_raw_deals = drop_known_deals(integroup_raw_deals, existing_ids)  # 登録済み案件は詳細取得しない
         
         if integroup_raw_deals:
+            integroup_candidate_ids = [generate_unique_id(deal) for deal in integroup_raw_deals]
             # 詳細ページから情報取得
             integroup_enhanced_deals = enhance_integroup_deals_with_details(integroup_raw_deals)
             
             # データ整形
             integroup_formatted_deals = format_deal_data(integroup_enhanced_deals, existing_ids)
-            all_formatted_deals.extend(integroup_formatted_deals)
+            record_rejected_deals(deal_store, "インテグループ", integroup_candidate_ids,
+                                  (deal.unique_id for deal in integroup_formatted_deals))
+            queue_for_sheet(integroup_formatted_deals, integroup_listings)
             
             logging.info(f"✅ インテグループ: {len(integroup_formatted_deals)} new deals after all filtering")
         else:
@@ -3410,15 +3252,21 @@ def main():
         # NEWOLD CAPITALのスクレイピング実行
         logging.info("=" * 60)
         logging.info("NEWOLD CAPITAL processing started")
-        newold_raw_deals = scrape_newold_capital()
+        newold_raw_deals = scrape_newold_capital(prefetched_by_site.get("NEWOLD CAPITAL"))
+        
+        newold_listings = observe_listings(newold_raw_deals)
+        newold_raw_deals = drop_known_deals(newold_raw_deals, existing_ids)  # 登録済み案件は詳細取得しない
         
         if newold_raw_deals:
+            newold_candidate_ids = [generate_unique_id(deal) for deal in newold_raw_deals]
             # 詳細ページから情報取得＆営業利益フィルタリング
             newold_enhanced_deals = enhance_newold_deals_with_details(newold_raw_deals)
             
             # データ整形
             newold_formatted_deals = format_deal_data(newold_enhanced_deals, existing_ids)
-            all_formatted_deals.extend(newold_formatted_deals)
+            record_rejected_deals(deal_store, "NEWOLD CAPITAL", newold_candidate_ids,
+                                  (deal.unique_id for deal in newold_formatted_deals))
+            queue_for_sheet(newold_formatted_deals, newold_listings)
             
             logging.info(f"✅ NEWOLD CAPITAL: {len(newold_formatted_deals)} new deals after all filtering")
         else:
@@ -3427,24 +3275,27 @@ def main():
         # オンデックのスクレイピング実行（Selenium統一版 - 詳細取得も含む）
         logging.info("=" * 60)
         logging.info("オンデック processing started")
-        ondeck_enhanced_deals = scrape_ondeck()  # 既に詳細情報取得とフィルタリング済み
+        ondeck_enhanced_deals = scrape_ondeck(existing_ids, seen_ids, deal_store)  # 既に詳細情報取得とフィルタリング済み
         
         if ondeck_enhanced_deals:
             # データ整形のみ
             ondeck_formatted_deals = format_deal_data(ondeck_enhanced_deals, existing_ids)
-            all_formatted_deals.extend(ondeck_formatted_deals)
+            queue_for_sheet(ondeck_formatted_deals, {})  # 取得時点で新着分に絞り込まれるので掲載内容は比べない
             
             logging.info(f"✅ オンデック: {len(ondeck_formatted_deals)} new deals after all filtering")
         else:
             logging.info("No deals found from オンデック")
         
-        # 結果をスプレッドシートに書き込み
+        # キューに残った案件の書き込みを待って結果を集計
         logging.info("=" * 60)
         logging.info(f"📝 Total new deals to add: {len(all_formatted_deals)}")
         
-        if all_formatted_deals:
-            sheet_connector.write_deals(all_formatted_deals)
-            logging.info(f"🎉 Successfully added {len(all_formatted_deals)} new deals to spreadsheet")
+        sheet_sink.close()
+        if sheet_sink.failed:
+            logging.warning(f"⚠️ {sheet_sink.failed} deals kept in the local deal store; they will be written on the next run")
+        
+        if sheet_sink.written:
+            logging.info(f"🎉 Successfully added {sheet_sink.written} new deals to spreadsheet")
             
             # サイト別の集計情報をログ出力
             site_counts = {}
@@ -3453,15 +3304,27 @@ def main():
             
             for site_name, count in site_counts.items():
                 logging.info(f"  - {site_name}: {count} deals")
-        else:
+        elif not sheet_sink.failed:
             logging.info("📝 No new deals to add")
         
+        # 掲載内容が変わった登録済み案件は、変更されたセルだけを書き換える
+        updated = deal_store.sync_updates(sheet_connector.update_deals, target_sites)
+        if updated:
+            logging.info(f"🔁 Updated {updated} changed deals in spreadsheet")
+        
         logging.info("✨ M&A scraping process completed successfully")
         
     except Exception as e:
         logging.critical(f"💥 Critical error in main process: {e}")
         logging.debug(traceback.format_exc())
         raise
+    finally:
+        if sheet_sink is not None:
+            sheet_sink.close()
+        close_webdriver_pool()
+        close_http_client()
+        close_deal_store()
+        close_history_sink()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
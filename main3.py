@@ -13,15 +13,23 @@ import os
 import re
 import random
 from functools import wraps
-from typing import Optional, Dict, List, Set, Any
+from typing import Optional, Dict, List, Set, Any, Union, Tuple, Iterable
 from dataclasses import dataclass, fields
 from enum import Enum
 
+from http_client import get_http_client, close_http_client
+from webdriver_pool import get_webdriver_pool, close_webdriver_pool
+from incremental import KnownPageTracker
+from adaptive_throttle import get_host_throttle
+from page_readiness import get_readiness_settings, wait_until_ready
+from fetched_document import FetchedDocument
+from amount_parser import amount_to_yen
+from deal_sinks import SheetsSink, close_history_sink, export_history
+from deal_store import DealStore, close_deal_store, get_deal_store
+from sheet_io import AppendError, SheetWriter, get_sheet_layout_cache, get_writer_settings, load_column_rows, sheet_key
+
 # Selenium関連
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -79,50 +87,8 @@ class FormattedDealData:
 class SpeedMADataConverter:
     @staticmethod
     def parse_financial_value(text: str) -> int:
-        """スピードM&Aの財務テキストを数値に変換"""
-        if not text or any(keyword in text for keyword in ["非公開", "応相談", "赤字", "N/A", "希望なし", "**"]):
-            return 0
-        
-        # 全角数字を半角に変換、カンマ除去
-        text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789')).replace(',', '')
-        
-        # レンジ表記の場合は下限値を取得
-        if any(separator in text for separator in ['〜', '～', '-', '?']):
-            for separator in ['〜', '～', '-', '?']:
-                if separator in text:
-                    parts = text.split(separator)
-                    if len(parts) >= 1:
-                        text = parts[0].strip()
-                    break
-        
-        # 数値とマルチプライヤーを抽出
-        match = re.search(r'([\d\.]+)', text)
-        if not match:
-            return 0
-        
-        try:
-            value = float(match.group(1))
-        except ValueError:
-            return 0
-        
-        # 単位による乗算
-        multipliers = {
-            '億円': 100_000_000,
-            '億': 100_000_000,
-            '千万円': 10_000_000,
-            '千万': 10_000_000,
-            '百万円': 1_000_000,
-            '百万': 1_000_000,
-            '万円': 10_000,
-            '万': 10_000
-        }
-        
-        for unit, multiplier in multipliers.items():
-            if unit in text:
-                value *= multiplier
-                break
-        
-        return int(value)
+        """スピードM&Aの財務テキストを数値に変換（レンジは下限値。解析はamount_parserの共通エンジン）"""
+        return amount_to_yen(text, 'lower')
     
     @staticmethod
     def format_to_million_yen(text: str) -> str:
@@ -185,8 +151,36 @@ class AntiBlockingManager:
     def get_recovery_delay(self) -> float:
         return random.uniform(15, 30)
     
-    def is_blocked_response(self, html_content: str) -> bool:
-        if not html_content:
+    @property
+    def adaptive(self) -> bool:
+        """ホスト別の適応スロットルを使うかどうか（config.yamlのthrottle.adaptive）"""
+        return CONFIG.get('throttle', {}).get('adaptive', True)
+    
+    def wait_before_request(self, url: str, base_min: float = 3, base_max: float = 8) -> float:
+        """リクエスト前の待機（適応スロットル有効時はホストの応答状況に応じた間隔）"""
+        if self.adaptive:
+            return get_host_throttle(url, CONFIG).wait()
+        delay = self.get_human_like_delay(base_min, base_max)
+        time.sleep(delay)
+        return delay
+    
+    def record_page_load(self, url: str, latency: float, blocked: bool, driver: Optional[webdriver.Chrome] = None) -> None:
+        """ページ読み込みの応答時間・ステータス・ブロック有無をスロットルに反映"""
+        if not self.adaptive:
+            return
+        status = None
+        if driver is not None:
+            try:
+                status = driver.execute_script(
+                    "const nav = performance.getEntriesByType('navigation')[0];"
+                    "return nav && nav.responseStatus ? nav.responseStatus : null;")
+            except Exception:
+                status = None
+        get_host_throttle(url, CONFIG).record(latency, status=status, blocked=blocked)
+    
+    def is_blocked_response(self, html_content: Union[str, FetchedDocument]) -> bool:
+        document = FetchedDocument.coerce(html_content)
+        if not document:
             return False
             
         blocked_indicators = [
@@ -194,16 +188,15 @@ class AntiBlockingManager:
             "Request blocked", "cloudfront", "Access Denied", "Forbidden"
         ]
         
-        content_lower = html_content.lower()
+        content_lower = document.lower_text
         
         for indicator in blocked_indicators:
             if indicator.lower() in content_lower:
                 return True
         
-        soup = BeautifulSoup(html_content, 'lxml')
-        title_tag = soup.find('title')
-        if title_tag:
-            title_text = title_tag.get_text().lower()
+        title = document.title
+        if title:
+            title_text = title.lower()
             if 'error' in title_text or 'blocked' in title_text or 'denied' in title_text:
                 return True
         
@@ -217,27 +210,11 @@ class WebDriverManager:
         self.anti_blocking = anti_blocking or AntiBlockingManager()
 
     def __enter__(self) -> webdriver.Chrome:
-        logging.info("Initializing Selenium WebDriver for SpeedM&A...")
-        chrome_options = Options()
-        
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920x1080")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        chrome_options.add_argument(f"--user-agent={user_agent}")
-        
+        # 実行全体で共有するプールから起動済みブラウザを借り出す
+        logging.info("Checking out Selenium WebDriver from pool...")
+        self._checkout = get_webdriver_pool(CONFIG, self.headless).checkout()
         try:
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            logging.info("✅ WebDriver initialized successfully.")
+            self.driver = self._checkout.__enter__()
             return self.driver
         except Exception as e:
             logging.error(f"Failed to initialize WebDriver: {e}")
@@ -245,11 +222,9 @@ class WebDriverManager:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.driver:
-            try:
-                self.driver.quit()
-                logging.info("WebDriver has been closed.")
-            except Exception as e:
-                logging.error(f"Error closing WebDriver: {e}")
+            # ブラウザは終了せずプールへ返却（終了はmain()のclose_webdriver_pool）
+            self._checkout.__exit__(exc_type, exc_val, exc_tb)
+            self.driver = None
 
 # --- スピードM&A専用パーサークラス ---
 class SpeedMAParser:
@@ -357,19 +332,22 @@ class SpeedMADetailScraper:
         try:
             logging.info(f"    -> Accessing detail page: {deal.link}")
             
-            # 人間らしい待機時間
-            delay = self.anti_blocking.get_human_like_delay(2, 5)
-            logging.info(f"    -> Waiting {delay:.1f} seconds before access...")
-            time.sleep(delay)
+            # ホストの応答状況に応じた待機時間
+            delay = self.anti_blocking.wait_before_request(deal.link, 2, 5)
+            logging.info(f"    -> Waited {delay:.1f} seconds before access")
             
             # ページにアクセス
+            started = time.monotonic()
             self.driver.get(deal.link)
-            time.sleep(3)  # ページ読み込み待機
+            latency = time.monotonic() - started
+            wait_until_ready(self.driver, get_readiness_settings(CONFIG, "スピードM&A", 'detail'), "スピードM&A detail")  # ページ読み込み待機
             
-            html_content = self.driver.page_source
+            document = FetchedDocument(self.driver.page_source, url=deal.link)
+            blocked = self.anti_blocking.is_blocked_response(document)
+            self.anti_blocking.record_page_load(deal.link, latency, blocked, self.driver)
             
             # 403ブロックの検出
-            if self.anti_blocking.is_blocked_response(html_content):
+            if blocked:
                 logging.warning(f"    -> 🚫 403 BLOCK DETECTED for deal: {deal.deal_id}")
                 return deal
             
@@ -379,10 +357,10 @@ class SpeedMADetailScraper:
                 debug_file = os.path.join("debug", f"debug_speedma_detail_{deal.deal_id}_{timestamp}.html")
                 os.makedirs("debug", exist_ok=True)
                 with open(debug_file, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                    f.write(document.text)
                 logging.info(f"Debug: Detail HTML saved to {debug_file}")
             
-            detail_soup = BeautifulSoup(html_content, 'lxml')
+            detail_soup = document.soup
             
             # 各情報を抽出
             deal.title = self._extract_title(detail_soup, deal.deal_id)
@@ -525,6 +503,10 @@ class GSheetConnector:
     def __init__(self, config: Dict):
         self.config = config['google_sheets']
         self.worksheet = self._connect()
+        self.sheet_key = sheet_key(self.config['spreadsheet_id'], self.config['sheet_name'])
+        self.layout_cache = get_sheet_layout_cache(config)
+        self.writer = SheetWriter(self.worksheet, self.sheet_key, self.layout_cache, get_writer_settings(config))
+        self.sink = SheetsSink(self.writer, [f.name for f in fields(FormattedDealData)])
 
     def _connect(self):
         logging.info("Connecting to Google Sheets...")
@@ -544,40 +526,53 @@ class GSheetConnector:
             logging.critical(f"❌ Google Sheets connection error: {e}")
             return None
 
-    def get_existing_ids(self) -> Set[str]:
-        """既存のユニークIDを取得"""
+    def get_existing_rows(self) -> Optional[Dict[str, int]]:
+        """既存のユニークID -> 行番号を取得（ローカルの案件ストアとの突き合わせ用。読み込みに失敗したらNone）"""
         if not self.worksheet:
-            return set()
+            return None
         logging.info("Fetching existing deal IDs from the sheet...")
         try:
-            all_data = self.worksheet.get_all_records()
-            if all_data and Constants.FIELD_UNIQUE_ID in all_data[0]:
-                ids = {row[Constants.FIELD_UNIQUE_ID] for row in all_data if row.get(Constants.FIELD_UNIQUE_ID)}
-                logging.info(f"Found {len(ids)} existing IDs.")
-                return ids
-            logging.info("No existing data or 'unique_id' column found.")
-            return set()
+            # 全セルではなくunique_id列だけを読む（列番号は記録済みの見出し行から求める）
+            rows = self.writer.call(load_column_rows, self.worksheet, self.sheet_key, Constants.FIELD_UNIQUE_ID, self.layout_cache)
+            if rows:
+                logging.info(f"Found {len(rows)} existing IDs.")
+            else:
+                logging.info("No existing data or 'unique_id' column found.")
+            return rows
         except Exception as e:
             logging.error(f"Error fetching existing IDs: {e}")
-            return set()
+            return None
 
-    def write_deals(self, new_deals: List[FormattedDealData]) -> None:
-        """新しい案件データをスプレッドシートに書き込み"""
+    def write_deals(self, new_deals: List[FormattedDealData]) -> Optional[List[Optional[int]]]:
+        """新しい案件データをスプレッドシートに書き込み（記録済みの見出し行に列順を合わせる）。成功したら各案件の行番号、失敗したらNone"""
         if not self.worksheet or not new_deals:
-            return
+            return None
         logging.info(f"Writing {len(new_deals)} new deals to the spreadsheet...")
         try:
-            all_values = self.worksheet.get_all_values()
-            headers = [f.name for f in fields(FormattedDealData)]
-            if not all_values:
-                self.worksheet.append_row(headers, value_input_option='USER_ENTERED')
-            existing_headers = self.worksheet.row_values(1) if all_values else headers
-            rows_to_append = [[getattr(deal, key, '') for key in existing_headers] for deal in new_deals]
-            if rows_to_append:
-                self.worksheet.append_rows(rows_to_append, value_input_option='USER_ENTERED')
+            # 記録済みの見出しの順に並べ、上限内のペースでまとめて追記する（429・5xxは再試行）
+            sheet_rows = self.sink.write(new_deals)
             logging.info(f"✅ Successfully appended {len(new_deals)} rows.")
+            return sheet_rows
+        except AppendError as e:
+            # 書き込めたチャンクの分だけ返し、次回その分を再送しないようにする
+            logging.error(f"Error writing to spreadsheet after {len(e.sheet_rows)} rows: {e.cause}")
+            return e.sheet_rows or None
         except Exception as e:
             logging.error(f"Error writing to spreadsheet: {e}")
+            return None
+
+    def update_deals(self, updates: Dict[str, Tuple[int, Dict[str, str]]]) -> Tuple[List[str], List[str]]:
+        """掲載内容が変わった案件の変更セルだけを書き換える（行のunique_idを確かめてから）。(書き換えたID, 行がずれていたID)を返す"""
+        if not self.worksheet or not updates:
+            return [], []
+        logging.info(f"Updating {len(updates)} changed deals in the spreadsheet...")
+        try:
+            updated, moved = self.writer.update_cells(updates, Constants.FIELD_UNIQUE_ID)
+            logging.info(f"✅ Successfully updated {len(updated)} deals.")
+            return updated, moved
+        except Exception as e:
+            logging.error(f"Error updating spreadsheet: {e}")
+            return [], []
 
 # --- ユーティリティ関数 ---
 def load_config(file_path: str = 'config.yaml') -> None:
@@ -588,6 +583,8 @@ def load_config(file_path: str = 'config.yaml') -> None:
             config = yaml.safe_load(f)
         if 'GOOGLE_SHEETS_ID' in os.environ:
             config['google_sheets']['spreadsheet_id'] = os.environ['GOOGLE_SHEETS_ID']
+        # セレクタ記憶などの相対パスはconfig.yamlのあるディレクトリ基準で解決する
+        config['config_dir'] = os.path.dirname(os.path.abspath(file_path))
         CONFIG = config
     except Exception as e:
         print(f"❌ Config file read error: {e}")
@@ -626,13 +623,10 @@ def retry_on_failure(max_retries: int = 3, delay: int = 1):
 @retry_on_failure()
 def fetch_html(url: str) -> Optional[str]:
     """HTMLコンテンツの取得"""
-    timeout = CONFIG.get('scraping', {}).get('timeout', 15)
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.text
+        response = get_http_client(CONFIG).get(url)
+        response.raise_for_status()
+        return response.text
     except httpx.TimeoutException as e:
         raise httpx.RequestError(f"Timeout occurred: {e}")
     except httpx.HTTPStatusError as e:
@@ -645,6 +639,45 @@ def fetch_html(url: str) -> Optional[str]:
         logging.error(f"Unexpected error fetching {url}: {e}")
         return None
 
+def generate_unique_id(raw_deal: RawDealData) -> str:
+    """サイト名＋案件IDからユニークIDを生成"""
+    return hashlib.md5(f"{raw_deal.site_name}_{raw_deal.deal_id}".encode()).hexdigest()[:12]
+
+def drop_known_deals(raw_deals: List[RawDealData], existing_ids: Set[str]) -> List[RawDealData]:
+    """スプレッドシートに登録済みの案件を詳細ページ取得前に除外"""
+    new_deals = []
+    seen_ids: Set[str] = set()
+    for raw_deal in raw_deals:
+        unique_id = generate_unique_id(raw_deal)
+        if unique_id in existing_ids or unique_id in seen_ids:
+            continue
+        seen_ids.add(unique_id)
+        new_deals.append(raw_deal)
+    
+    skipped = len(raw_deals) - len(new_deals)
+    if skipped:
+        logging.info(f"  ⏭️ Skipped {skipped} known deals before detail fetching ({len(new_deals)} new)")
+    return new_deals
+
+def record_rejected_deals(deal_store: DealStore, site_name: str, candidate_ids: List[str],
+                          kept_ids: Iterable[str]) -> None:
+    """詳細取得・整形の対象にしたが条件に合わず除外された案件を記録（次回以降、差分クロールの停止判定で既知として扱う）"""
+    kept_ids = set(kept_ids)
+    rejected = deal_store.record_rejected(site_name, (unique_id for unique_id in candidate_ids if unique_id not in kept_ids))
+    if rejected:
+        logging.info(f"  🚫 {site_name}: recorded {rejected} deals that did not meet the criteria")
+
+def listing_snapshots(raw_deals: List[RawDealData]) -> Dict[str, Dict[str, str]]:
+    """一覧ページから分かる項目（空でないもの）を整形後の表示値で取得（unique_id -> 項目名 -> 値。掲載内容の変更検知用）"""
+    snapshots = {}
+    for raw_deal in raw_deals:
+        values = {'title': (raw_deal.title, raw_deal.title), 'location': (raw_deal.location_text, raw_deal.location_text),
+                  'revenue': (raw_deal.revenue_text, SpeedMADataConverter.format_to_million_yen(raw_deal.revenue_text)),
+                  'profit': (raw_deal.profit_text, SpeedMADataConverter.format_to_million_yen(raw_deal.profit_text)),
+                  'price': (raw_deal.price_text, SpeedMADataConverter.format_to_million_yen(raw_deal.price_text))}
+        snapshots[generate_unique_id(raw_deal)] = {name: shown for name, (text, shown) in values.items() if text}
+    return snapshots
+
 def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> List[FormattedDealData]:
     """生データを整形済みデータに変換し、条件チェックを行う（修正版）"""
     formatted_deals = []
@@ -656,7 +689,7 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
     
     for raw_deal in raw_deals:
         try:
-            unique_id = hashlib.md5(f"{raw_deal.site_name}_{raw_deal.deal_id}".encode()).hexdigest()[:12]
+            unique_id = generate_unique_id(raw_deal)
             
             if unique_id in existing_ids:
                 logging.info(f"    -> Skipping duplicate deal: {raw_deal.deal_id}")
@@ -705,10 +738,11 @@ def format_deal_data(raw_deals: List[RawDealData], existing_ids: Set[str]) -> Li
     
     return formatted_deals
 
-def scrape_speed_ma() -> List[RawDealData]:
-    """スピードM&Aのスクレイピングを実行（修正版）"""
+def scrape_speed_ma(seen_ids: Optional[Set[str]] = None) -> List[RawDealData]:
+    """スピードM&Aのスクレイピングを実行（修正版・差分クロール対応。seen_idsは登録済み＋除外済みの案件ID）"""
     logging.info("🔍 Starting scraping for: スピードM&A")
     all_deals = []
+    tracker = KnownPageTracker.for_site(CONFIG, "スピードM&A", seen_ids)
     
     try:
         max_pages = CONFIG.get('speed_ma', {}).get('max_pages', 2)
@@ -736,6 +770,10 @@ def scrape_speed_ma() -> List[RawDealData]:
                 logging.critical(f"🚨 CRITICAL - スピードM&Aの1ページ目から案件が1件も見つかりませんでした。")
                 logging.critical(f"   サイトのHTML構造が変更された可能性があります。")
             
+            # 差分モード：既知案件だけのページが続いたら打ち切り
+            if tracker.should_stop(generate_unique_id(deal) for deal in deals):
+                break
+            
             time.sleep(2)
     
     except Exception as e:
@@ -768,10 +806,12 @@ def enhance_deals_with_details(raw_deals: List[RawDealData]) -> List[RawDealData
                     enhanced_deal = scraper.enhance_deal_with_details(deal)
                     enhanced_deals.append(enhanced_deal)
                     
-                    # 人間らしい待機時間
-                    delay = anti_blocking.get_human_like_delay(3, 6)
-                    logging.info(f"    -> Waiting {delay:.1f} seconds before next request...")
-                    time.sleep(delay)
+                    # 適応スロットル有効時はリクエスト前の待機で間隔を制御済み
+                    if not anti_blocking.adaptive:
+                        # 人間らしい待機時間
+                        delay = anti_blocking.get_human_like_delay(3, 6)
+                        logging.info(f"    -> Waiting {delay:.1f} seconds before next request...")
+                        time.sleep(delay)
                     
                 except Exception as e:
                     logging.error(f"  ❌ Error processing deal {deal.deal_id}: {e}")
@@ -799,36 +839,69 @@ def main():
             logging.critical("❌ Cannot proceed without Google Sheets connection")
             return
         
-        existing_ids = sheet_connector.get_existing_ids()
-        logging.info(f"📋 Found {len(existing_ids)} existing deals in spreadsheet")
+        # 重複判定はローカルの案件ストアで行い、スプレッドシートの全件読み込みは定期的な突き合わせのときだけ
+        deal_store = get_deal_store(CONFIG)
+        deal_store.reconcile_if_due(sheet_connector.get_existing_rows)
+        existing_ids = deal_store.existing_ids()
+        logging.info(f"📋 Found {len(existing_ids)} existing deals in the local deal store")
         
-        # スピードM&Aをスクレイピング（売上高フィルタリング済み）
-        raw_deals = scrape_speed_ma()
+        # スピードM&Aをスクレイピング（売上高フィルタリング済み。ページ送りの停止判定では条件に合わず除外した案件も既知として扱う）
+        raw_deals = scrape_speed_ma(deal_store.seen_ids())
+        formatted_deals = []
+        listings = {}
         
         if not raw_deals:
             logging.warning("⚠️ スピードM&A: No deals extracted (after revenue filtering)")
-            return
-        
-        # 詳細ページから情報を取得
-        enhanced_deals = enhance_deals_with_details(raw_deals)
-        
-        # データをフォーマットし、最終条件でフィルタリング
-        formatted_deals = format_deal_data(enhanced_deals, existing_ids)
-        
-        logging.info(f"✅ スピードM&A: {len(formatted_deals)} new deals after all filtering")
-        
-        if formatted_deals:
-            sheet_connector.write_deals(formatted_deals)
-            logging.info(f"🎉 Successfully added {len(formatted_deals)} new deals to spreadsheet")
+        else:
+            # upsertモードでは登録済み案件の一覧の掲載内容を前回と比べ、変わった項目をシートへの反映待ちにする
+            if deal_store.upsert:
+                listings = listing_snapshots(raw_deals)
+                deal_store.observe_listings(listings)
+            
+            # 登録済み案件は詳細ページを取得しない
+            raw_deals = drop_known_deals(raw_deals, existing_ids)
+            if not raw_deals:
+                logging.info("✅ スピードM&A: No new deals (all already in spreadsheet)")
+            else:
+                # 詳細ページから情報を取得
+                candidate_ids = [generate_unique_id(deal) for deal in raw_deals]
+                enhanced_deals = enhance_deals_with_details(raw_deals)
+                
+                # データをフォーマットし、最終条件でフィルタリング
+                formatted_deals = format_deal_data(enhanced_deals, existing_ids)
+                record_rejected_deals(deal_store, "スピードM&A", candidate_ids,
+                                      (deal.unique_id for deal in formatted_deals))
+                
+                logging.info(f"✅ スピードM&A: {len(formatted_deals)} new deals after all filtering")
+        
+        # 新着案件を先にストアへ保存し（履歴のParquet/JSONLにも追記）、前回書き込めなかった分と合わせてスプレッドシートへ書き込む
+        deal_store.add_deals(formatted_deals, listings)
+        export_history(formatted_deals, config=CONFIG)
+        pending_deals = deal_store.pending_deals(FormattedDealData, ["スピードM&A"])
+        if pending_deals:
+            if deal_store.sync(pending_deals, sheet_connector.write_deals):
+                logging.info(f"🎉 Successfully added {len(pending_deals)} new deals to spreadsheet")
+            else:
+                logging.warning(f"⚠️ {len(pending_deals)} deals kept in the local deal store; they will be written on the next run")
         else:
             logging.warning("📝 No new deals found that meet all criteria")
         
+        # 掲載内容が変わった登録済み案件は、変更されたセルだけを書き換える
+        updated = deal_store.sync_updates(sheet_connector.update_deals, ["スピードM&A"])
+        if updated:
+            logging.info(f"🔁 Updated {updated} changed deals in spreadsheet")
+        
         logging.info("✨ SpeedM&A scraping process completed successfully")
         
     except Exception as e:
         logging.critical(f"💥 Critical error in main process: {e}")
         logging.debug(traceback.format_exc())
         raise
+    finally:
+        close_webdriver_pool()
+        close_http_client()
+        close_deal_store()
+        close_history_sink()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,83 @@
+# page_readiness.py - 固定sleepの代わりに「ページが使える状態になったか」を判定して待機する
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_READINESS_SETTINGS: Dict[str, Any] = {
+    'ready_state': 'complete',  # document.readyStateの到達目標（complete / interactive / null）
+    'selector': None,           # 存在を待つCSSセレクタ
+    'min_count': 1,             # selectorの最低要素数
+    'stable_for': 0.0,          # 要素数がこの秒数変化しなければ読み込み完了とみなす
+    'timeout': 10.0,
+    'poll_frequency': 0.2,
+}
+
+_READY_STATE_ORDER = {'loading': 0, 'interactive': 1, 'complete': 2}
+
+
+def get_readiness_settings(config: Dict[str, Any], site_name: Optional[str], page: str = 'detail') -> Dict[str, Any]:
+    """config.yamlのpage_readiness設定（default＋サイト別・ページ種別の上書き）を取得"""
+    readiness_config = config.get('page_readiness', {}) or {}
+    settings = dict(DEFAULT_READINESS_SETTINGS)
+    settings.update(readiness_config.get('default', {}) or {})
+    site_settings = (readiness_config.get('sites', {}) or {}).get(site_name, {}) or {}
+    settings.update(site_settings.get(page, {}) or {})
+    return settings
+
+
+def _ready_state_reached(driver, target: Optional[str]) -> bool:
+    if not target:
+        return True
+    state = driver.execute_script("return document.readyState")
+    return _READY_STATE_ORDER.get(state, 0) >= _READY_STATE_ORDER.get(target, 2)
+
+
+def _build_predicate(settings: Dict[str, Any]) -> Callable[[Any], bool]:
+    """設定から待機条件（readyState・セレクタ存在・要素数の安定）を組み立てる"""
+    target_state = settings.get('ready_state')
+    selector = settings.get('selector')
+    min_count = int(settings.get('min_count') or 1)
+    stable_for = float(settings.get('stable_for') or 0.0)
+    count_selector = selector or 'body *'
+    state = {'count': -1, 'since': 0.0}
+
+    def predicate(driver) -> bool:
+        if not _ready_state_reached(driver, target_state):
+            return False
+
+        if selector or stable_for > 0:
+            count = len(driver.find_elements(By.CSS_SELECTOR, count_selector))
+            if selector and count < min_count:
+                return False
+            if stable_for > 0:
+                now = time.monotonic()
+                if count != state['count']:
+                    state['count'] = count
+                    state['since'] = now
+                    return False
+                return now - state['since'] >= stable_for
+        return True
+
+    return predicate
+
+
+def wait_until_ready(driver, settings: Dict[str, Any], label: str = "") -> bool:
+    """ページが準備完了になるまで待機（タイムアウト時はFalseを返して処理は続行）"""
+    merged = dict(DEFAULT_READINESS_SETTINGS)
+    merged.update(settings or {})
+    started = time.monotonic()
+    try:
+        WebDriverWait(driver, float(merged['timeout']), poll_frequency=float(merged['poll_frequency'])).until(
+            _build_predicate(merged))
+        logging.debug(f"Page ready{f' ({label})' if label else ''} in {time.monotonic() - started:.2f}s")
+        return True
+    except TimeoutException:
+        logging.warning(f"    -> ⚠️ Page readiness timeout{f' ({label})' if label else ''} after {merged['timeout']}s. Continuing")
+        return False
+    except WebDriverException as e:
+        logging.warning(f"    -> ⚠️ Page readiness check failed{f' ({label})' if label else ''}: {e}")
+        return False
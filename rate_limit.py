@@ -0,0 +1,77 @@
+# rate_limit.py - ホスト単位のトークンバケット式レートリミッター
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """毎秒rate個のトークンを補充し、最大burst個まで貯められるトークンバケット（スレッドセーフ）"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """トークンがあれば消費してTrue、なければ待たずにFalse"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def tighten(self, rate: float, burst: int = 1) -> None:
+        """より厳しい補充ペース・上限が指定されたら切り替える（緩い指定は無視）"""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.rate, float(rate))
+            self.capacity = min(self.capacity, max(1, int(burst)))
+            self._tokens = min(self._tokens, self.capacity)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """トークンが貯まるまで待機して消費する（戻り値: 待機した秒数）"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_host_bucket(url: str, rate: float, burst: int = 1) -> TokenBucket:
+    """
+    URLのホストに対応するトークンバケットを取得（同一ホストは全スレッドで共有）。
+    呼び出し元ごとに異なるrate/burstが指定された場合は、最も厳しい値をそのホストのバケットに適用する。
+    """
+    host = urlsplit(url).netloc or url
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            _buckets[host] = bucket
+        else:
+            bucket.tighten(rate, burst)
+        return bucket
@@ -0,0 +1,61 @@
+# reevaluate_deals.py - 保存済みの過去案件（DealStoreまたは履歴JSONL）を現在のconfig.yamlの財務条件で一括再判定する
+import argparse
+import os
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from deal_batch import DealBatch, FilterResult, load_threshold_rules
+from deal_sinks import get_history_settings, read_history_jsonl
+from deal_store import DEFAULT_STORE_PATH, DealStore
+
+
+def load_archive(config: Dict[str, Any], source: str, site_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """再判定する過去案件を読み込む（source='store'はdeal_storeのSQLite、'history'は履歴のJSONL）"""
+    if source == 'history':
+        root = os.path.join(get_history_settings(config)['path'], 'jsonl')
+        return list(read_history_jsonl(root, site_names))
+    store_config = config.get('deal_store', {}) or {}
+    store = DealStore(store_config.get('path', DEFAULT_STORE_PATH))
+    try:
+        return store.stored_records(site_names)
+    finally:
+        store.close()
+
+
+def reevaluate(config: Dict[str, Any], deals: List[Dict[str, Any]]) -> FilterResult:
+    """整形済み案件の売上高・営業利益の表記をDealBatchで解析し、サイト別の条件で判定する"""
+    default_rule, site_rules = load_threshold_rules(config)
+    batch = DealBatch.from_deals(deals, revenue_key='revenue', profit_key='profit')
+    return batch.evaluate(default_rule, site_rules)
+
+
+def report(result: FilterResult, show_rejected: int = 0) -> None:
+    print(f"📊 Re-evaluated {len(result):,} deals: {int(result.accepted.sum()):,} accepted")
+    for site_name, counts in result.summary().items():
+        print(f"  {site_name or '(サイト名なし)'}: {counts}")
+    rejected = [index for index in range(len(result)) if not result.accepted[index]]
+    for index in rejected[:show_rejected]:
+        print(f"    {result.batch.deal_ids[index]}: {result.reason(index)}")
+
+
+def run(config_path: str, source: str, site_names: Optional[List[str]], show_rejected: int) -> FilterResult:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    deals = load_archive(config, source, site_names)
+    if not deals:
+        print(f"⚠️ No stored deals found ({source})")
+    result = reevaluate(config, deals)
+    report(result, show_rejected)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='過去案件の財務条件一括再判定（閾値を変更したときの影響確認用）')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--source', choices=['store', 'history'], default='store',
+                        help='store: deal_storeのSQLite / history: 履歴のJSONL')
+    parser.add_argument('--site', action='append', dest='sites', help='対象サイト名（複数指定可。省略時は全サイト）')
+    parser.add_argument('--show-rejected', type=int, default=0, help='条件外になった案件を理由付きで表示する件数')
+    args = parser.parse_args()
+    run(args.config, args.source, args.sites, args.show_rejected)
@@ -1,11 +1,12 @@
 import time
 import re
-import csv
 import configparser
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
+from amount_parser import amount_range
+from deal_sinks import CsvSink, export_history, records_from_rows
 from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -16,67 +17,12 @@ def load_config():
     config.read('config.ini', encoding='utf-8-sig')
     return config
 
-def _extract_single_value(text):
-    """単一の金額文字列から数値を抽出する"""
-    if not text: 
-        return 0
-    
-    original_text = text  # デバッグ用に元のテキストを保持
-    text = text.replace(",", "").replace("，", "")  # 全角カンマも除去
-    
-    # より柔軟な数値抽出（小数点も含む）
-    match = re.search(r'([\d\.]+)', text)
-    if not match: 
-        print(f"        [DEBUG] 数値が見つかりません: '{original_text}' → 処理後: '{text}'")
-        return 0
-    
-    value = float(match.group(1))
-    original_value = value
-    
-    # より詳細な単位判定
-    if "億" in text: 
-        value *= 100_000_000
-        print(f"        [DEBUG] '{original_text}' → {original_value}億円 → {value:,}円")
-    elif "万" in text: 
-        value *= 10_000
-        print(f"        [DEBUG] '{original_text}' → {original_value}万円 → {value:,}円")
-    elif "千" in text:  # 「千万円」対応を追加
-        value *= 1_000
-        print(f"        [DEBUG] '{original_text}' → {original_value}千円 → {value:,}円")
-    else:
-        print(f"        [DEBUG] '{original_text}' → {value:,}円（単位なし）")
-    
-    return int(value)
 
 def parse_financial_value(text):
-    """「3億円」「5,000万円」「2億円～3億円」を数値(円)に変換する"""
-    if not text: 
-        return (0, 0)
-    
-    print(f"    [DEBUG] 元テキスト: '{text}'")
-    
-    # 様々な区切り文字に対応（～、〜、?、-など）
-    separators = ["～", "〜", "?", "？", "-", "ー", "–", "—"]
-    is_range = False
-    parts = [text]
-    
-    for sep in separators:
-        if sep in text:
-            parts = text.split(sep)
-            is_range = True
-            print(f"    [DEBUG] 区切り文字'{sep}'で分割: {parts}")
-            break
-    
-    if is_range and len(parts) >= 2:
-        min_val = _extract_single_value(parts[0].strip())
-        max_val = _extract_single_value(parts[1].strip())
-        print(f"    [DEBUG] 範囲結果: {min_val:,}円 ～ {max_val:,}円")
-        return (min_val, max_val)
-    else:
-        # 単一値の場合
-        single_val = _extract_single_value(text)
-        print(f"    [DEBUG] 単一値結果: {single_val:,}円")
-        return (single_val, single_val)
+    """「3億円」「5,000万円」「2億円～3億円」を数値(円)に変換する（解析はamount_parserの共通エンジン）"""
+    value_range = amount_range(text)
+    print(f"    [DEBUG] '{text}' → {value_range}")
+    return value_range
 
 def meets_condition(value_range, threshold):
     """範囲が条件を満たすかチェック（範囲の最大値が閾値以上であればOK）"""
@@ -116,7 +62,7 @@ def main():
     conds = config['ScrapingConditions']
     output = config['Output']
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     all_found_deals = []
 
     try:
@@ -212,6 +158,17 @@ def main():
         full_link = "https://batonz.jp" + deal[3] if deal[3].startswith('/') else deal[3]
         formatted_deals.append([deal[0], full_link, deal[1], deal[2]])
 
+    output_filename = output['FileName']
+    print(f"--- {len(formatted_deals)}件の案件を「{output_filename}」に保存します ---")
+    records = records_from_rows(headers, formatted_deals)
+    try:
+        with CsvSink(output_filename, headers) as sink:
+            sink.write(records)
+        export_history(records, site_name="バトンズ")
+        print("--- 保存完了 ---")
+    except Exception as e:
+        print(f"!!! ファイルの保存中にエラーが発生しました: {e} !!!")
+
     return {"headers": headers, "data": formatted_deals}
 
 if __name__ == "__main__":
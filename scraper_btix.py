@@ -1,12 +1,18 @@
 import time
 import re
-import csv
+import logging
 import configparser
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from driver_resolver import resolve_chromedriver_path
+from amount_parser import amount_range
+from deal_sinks import CsvSink, export_history, load_known_values, records_from_rows
+from incremental import KnownPageTracker
+from page_readiness import wait_until_ready
+from fetched_document import FetchedDocument
+from keyword_matcher import KeywordMatcher
+from selector_compiler import element_text
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
@@ -250,242 +256,102 @@ def manual_login_fallback(driver, login_id):
     print("="*60 + "\n")
     print("--- ログイン後の処理を再開します ---")
 
-def normalize_text(text):
-    """テキストの表記揺れを統一する（強化版）"""
-    if not text:
-        return text
-    
-    # 全角・半角の統一
-    text = text.replace('０', '0').replace('１', '1').replace('２', '2').replace('３', '3').replace('４', '4')
-    text = text.replace('５', '5').replace('６', '6').replace('７', '7').replace('８', '8').replace('９', '9')
-    text = text.replace('，', ',').replace('、', ',')
-    
-    # チルダ系の統一
-    text = text.replace('〜', '～').replace('~', '～').replace('ー', '～')
-    
-    # マイナス記号の統一
-    text = text.replace('▲', '-').replace('△', '-').replace('−', '-').replace('—', '-')
-    
-    # スラッシュの統一
-    text = text.replace('／', '/')
-    
-    return text
-
-def _extract_single_value(text):
-    """単一の金額文字列から数値を抽出する（表記揺れ対応強化版）"""
-    if not text:
-        return 0
-
-    # 表記揺れを統一
-    text = normalize_text(text)
-    
-    print(f"        [VALUE_DEBUG] 正規化後のテキスト: '{text}'")
-    
-    # 数値（マイナス、小数点含む）を抽出（より柔軟なパターン）
-    number_patterns = [
-        r'(-?[\d,，]+\.?\d*)',  # 基本的な数値パターン
-        r'(-?[\d,，]+)',        # 整数パターン
-        r'(-?\d+\.?\d*)',       # シンプルな数値パターン
-    ]
-    
-    value = 0
-    for pattern in number_patterns:
-        match = re.search(pattern, text)
-        if match:
-            number_str = match.group(1).replace(',', '').replace('，', '')
-            try:
-                value = float(number_str)
-                print(f"        [VALUE_DEBUG] 抽出された数値: {value}")
-                break
-            except ValueError:
-                continue
-    
-    if value == 0:
-        print(f"        [VALUE_DEBUG] 数値を抽出できませんでした")
-        return 0
 
-    # 単位の判定（より包括的に）
-    unit_multiplier = 1
-    if "億" in text:
-        unit_multiplier = 100_000_000
-        print(f"        [VALUE_DEBUG] 単位: 億円")
-    elif "百万円" in text:
-        unit_multiplier = 1_000_000
-        print(f"        [VALUE_DEBUG] 単位: 百万円")
-    elif "万" in text:
-        unit_multiplier = 10_000
-        print(f"        [VALUE_DEBUG] 単位: 万円")
-    elif "千" in text:
-        unit_multiplier = 1_000
-        print(f"        [VALUE_DEBUG] 単位: 千円")
-    else:
-        print(f"        [VALUE_DEBUG] 単位: 円（デフォルト）")
-
-    final_value = int(value * unit_multiplier)
-    print(f"        [VALUE_DEBUG] 最終計算値: {final_value:,} 円")
-    
-    return final_value
+# MAXの一覧で金額の代わりに書かれる表記（ほかのサイトでは金額なしとみなさない）
+UNDISCLOSED_KEYWORDS = ('別途', 'その他')
 
 def parse_financial_value(text):
-    """「６億円/年間」、「７億２，０００万円/年間」等を数値(円)の範囲に変換する（表記揺れ対応強化版）"""
-    if not text:
-        return (0, 0)
-        
-    print(f"    [PARSE_DEBUG] 元のテキスト: '{text}'")
-    
-    # 特殊ケースの処理
-    if any(keyword in text for keyword in ["応相談", "非開示", "要相談", "別途", "その他"]):
-        print(f"    [PARSE_DEBUG] 特殊ケース（相談・非開示等）として除外")
-        return (0, 0)
-
-    # 表記揺れを統一
-    normalized_text = normalize_text(text)
-    print(f"    [PARSE_DEBUG] 正規化後: '{normalized_text}'")
-    
-    # 「/年間」、「/年」の除去
-    normalized_text = re.sub(r'/年間?', '', normalized_text)
-    print(f"    [PARSE_DEBUG] 年間表記除去後: '{normalized_text}'")
-    
-    # 範囲を示す区切り文字（表記揺れ対応）
-    separators = ["～", "〜", "~", "ー", "-", "から", "〜"]
-    
-    # 「未満」「以下」の処理
-    if "未満" in normalized_text or "以下" in normalized_text:
-        val = _extract_single_value(normalized_text)
-        print(f"    [PARSE_DEBUG] 未満/以下パターン: 0 ～ {val:,}")
-        return (0, val)
-    
-    # 「以上」または「～」で終わるパターン
-    if "以上" in normalized_text or normalized_text.rstrip().endswith("～"):
-        val = _extract_single_value(normalized_text)
-        if val < 0:
-            print(f"    [PARSE_DEBUG] マイナス以上パターン: -∞ ～ {val:,}")
-            return (float('-inf'), val)
-        else:
-            print(f"    [PARSE_DEBUG] 以上パターン: {val:,} ～ +∞")
-            return (val, float('inf'))
-
-    # 範囲パターンの分割
-    parts = [normalized_text]
-    used_separator = None
-    for sep in separators:
-        if sep in normalized_text:
-            parts = normalized_text.split(sep, 1)  # 最初の区切り文字のみで分割
-            used_separator = sep
-            break
-    
-    print(f"    [PARSE_DEBUG] 分割結果: {parts} (区切り文字: {used_separator})")
-    
-    if len(parts) >= 2:
-        min_part = parts[0].strip()
-        max_part = parts[1].strip()
-        
-        min_val = _extract_single_value(min_part)
-        max_val = _extract_single_value(max_part)
-        
-        print(f"    [PARSE_DEBUG] 範囲パターン: {min_val:,} ～ {max_val:,}")
-        return (min_val, max_val)
-    else:
-        single_val = _extract_single_value(normalized_text)
-        print(f"    [PARSE_DEBUG] 単一値パターン: {single_val:,}")
-        return (single_val, single_val)
+    """「６億円/年間」、「７億２，０００万円/年間」等を数値(円)の範囲に変換する（表記揺れ対応強化版）（解析はamount_parserの共通エンジン）"""
+    value_range = amount_range(text, undisclosed_keywords=UNDISCLOSED_KEYWORDS)
+    logging.debug(f"金額解析: '{text}' → {value_range}")
+    return value_range
 
 def meets_condition(value_range, threshold):
     """範囲が条件を満たすかチェック（範囲の最大値が閾値以上であればOK）"""
     min_val, max_val = value_range
     
-    print(f"        [CONDITION_DEBUG] 範囲: {min_val:,} ～ {max_val:,}, 閾値: {threshold:,}")
+    logging.debug(f"範囲: {min_val:,} ～ {max_val:,}, 閾値: {threshold:,}")
     
     if max_val < 0 and threshold > 0:
         result = False
-        print(f"        [CONDITION_DEBUG] マイナス値のため除外")
+        logging.debug("マイナス値のため除外")
     else:
         result = max_val >= threshold
-        print(f"        [CONDITION_DEBUG] 判定結果: {'合格' if result else '不合格'}")
+        logging.debug(f"判定結果: {'合格' if result else '不合格'}")
     
     return result
 
+# 業界キーワード辞書（定義順が判定の優先順位）
+INDUSTRY_KEYWORDS = {
+    # IT・通信・システム関連
+    'IT・システム': ['IT', 'システム', 'ソフトウェア', 'アプリ', 'プログラム', 'SE', 'エンジニア', 'プラットフォーム', 'クラウド', 'AI', 'IoT', 'DX'],
+    '通信・インターネット': ['通信', 'インターネット', 'ネット', 'Web', 'ウェブ', 'SNS', 'ECサイト', 'オンライン', 'デジタル', 'データ'],
+    
+    # 製造・建設関連  
+    '製造業': ['製造', '工場', '生産', 'メーカー', '部品', '機械', '設備', '装置', '電子', '精密', '金属', '化学', '素材', '材料'],
+    '建設・不動産': ['建設', '工事', '施工', '建築', '土木', '不動産', '住宅', 'マンション', 'ビル', '物件', '賃貸', '売買', '仲介'],
+    
+    # サービス・小売関連
+    'サービス業': ['サービス', '清掃', '警備', '人材', '派遣', '紹介', 'コンサル', 'コンサルティング', '広告', 'PR', '企画', '代行'],
+    '小売・卸売': ['小売', '卸売', '販売', '売買', '商社', '貿易', '輸出', '輸入', '流通', '物流', '配送', '運送', '倉庫'],
+    
+    # 飲食・宿泊関連
+    '飲食業': ['飲食', 'レストラン', '居酒屋', 'カフェ', '喫茶', '食堂', '弁当', '仕出し', 'ケータリング', '食品', '料理'],
+    '宿泊・観光': ['ホテル', '旅館', '宿泊', '観光', '旅行', 'ツアー', 'レジャー', 'リゾート', '温泉'],
+    
+    # 医療・福祉・教育関連
+    '医療・介護': ['医療', '病院', 'クリニック', '診療所', '薬局', '介護', 'デイサービス', '福祉', 'ヘルパー', 'ケア', '看護'],
+    '教育・研修': ['教育', '学習', '塾', 'スクール', '研修', 'セミナー', '講座', 'トレーニング', 'eラーニング'],
+    
+    # 金融・保険関連
+    '金融・保険': ['金融', '銀行', '証券', '保険', 'ファイナンス', '投資', '融資', 'ローン', 'クレジット', 'リース'],
+    
+    # その他専門サービス
+    '専門サービス': ['法律', '税理', '会計', '監査', '特許', '翻訳', '通訳', 'デザイン', '印刷', '出版'],
+    '美容・健康': ['美容', 'エステ', '化粧品', 'コスメ', '健康', 'フィットネス', 'ジム', 'マッサージ', '整体'],
+    'その他': ['その他', 'other', 'サポート', 'メンテナンス', '保守', '管理']
+}
+
+# キーワードで判定できなかった場合のパターン
+ADVANCED_INDUSTRY_PATTERNS = [
+    (re.compile(r'.*業$'), '製造業'),  # 〜業で終わる
+    (re.compile(r'.*サービス'), 'サービス業'),
+    (re.compile(r'.*システム'), 'IT・システム'),
+    (re.compile(r'.*商事|.*商社'), '小売・卸売'),
+    (re.compile(r'.*建設|.*工業'), '建設・不動産'),
+]
+
+# 全業界のキーワードを1本にまとめたマッチャー（モジュール読み込み時に1回だけ構築）
+INDUSTRY_MATCHER = KeywordMatcher(INDUSTRY_KEYWORDS, ignore_case=True)
+
 def extract_industry_info(text_content):
-    """業種・業態を抽出する改良版関数"""
-    # より包括的な業界キーワード辞書
-    industry_patterns = {
-        # IT・通信・システム関連
-        'IT・システム': ['IT', 'システム', 'ソフトウェア', 'アプリ', 'プログラム', 'SE', 'エンジニア', 'プラットフォーム', 'クラウド', 'AI', 'IoT', 'DX'],
-        '通信・インターネット': ['通信', 'インターネット', 'ネット', 'Web', 'ウェブ', 'SNS', 'ECサイト', 'オンライン', 'デジタル', 'データ'],
-        
-        # 製造・建設関連  
-        '製造業': ['製造', '工場', '生産', 'メーカー', '部品', '機械', '設備', '装置', '電子', '精密', '金属', '化学', '素材', '材料'],
-        '建設・不動産': ['建設', '工事', '施工', '建築', '土木', '不動産', '住宅', 'マンション', 'ビル', '物件', '賃貸', '売買', '仲介'],
-        
-        # サービス・小売関連
-        'サービス業': ['サービス', '清掃', '警備', '人材', '派遣', '紹介', 'コンサル', 'コンサルティング', '広告', 'PR', '企画', '代行'],
-        '小売・卸売': ['小売', '卸売', '販売', '売買', '商社', '貿易', '輸出', '輸入', '流通', '物流', '配送', '運送', '倉庫'],
-        
-        # 飲食・宿泊関連
-        '飲食業': ['飲食', 'レストラン', '居酒屋', 'カフェ', '喫茶', '食堂', '弁当', '仕出し', 'ケータリング', '食品', '料理'],
-        '宿泊・観光': ['ホテル', '旅館', '宿泊', '観光', '旅行', 'ツアー', 'レジャー', 'リゾート', '温泉'],
-        
-        # 医療・福祉・教育関連
-        '医療・介護': ['医療', '病院', 'クリニック', '診療所', '薬局', '介護', 'デイサービス', '福祉', 'ヘルパー', 'ケア', '看護'],
-        '教育・研修': ['教育', '学習', '塾', 'スクール', '研修', 'セミナー', '講座', 'トレーニング', 'eラーニング'],
-        
-        # 金融・保険関連
-        '金融・保険': ['金融', '銀行', '証券', '保険', 'ファイナンス', '投資', '融資', 'ローン', 'クレジット', 'リース'],
-        
-        # その他専門サービス
-        '専門サービス': ['法律', '税理', '会計', '監査', '特許', '翻訳', '通訳', 'デザイン', '印刷', '出版'],
-        '美容・健康': ['美容', 'エステ', '化粧品', 'コスメ', '健康', 'フィットネス', 'ジム', 'マッサージ', '整体'],
-        'その他': ['その他', 'other', 'サポート', 'メンテナンス', '保守', '管理']
-    }
-    
-    # テキストから業界を判定
-    found_industries = []
-    text_lower = text_content.lower()
-    
-    for industry, keywords in industry_patterns.items():
-        for keyword in keywords:
-            if keyword.lower() in text_lower or keyword in text_content:
-                if industry not in found_industries:
-                    found_industries.append(industry)
-                    print(f"    [INDUSTRY_DEBUG] 業界キーワード '{keyword}' から '{industry}' を検出")
-    
-    # 複数見つかった場合は最初のものを返す、見つからなかった場合はパターンマッチング
-    if found_industries:
-        return found_industries[0]
+    """業種・業態を抽出する（全キーワードを1回の走査で照合し、辞書の定義順で最初の業界を返す）"""
+    industry = INDUSTRY_MATCHER.first_label(text_content)
+    if industry:
+        return industry
     
     # より高度なパターンマッチングを実行
-    advanced_patterns = [
-        (r'.*業$', '製造業'),  # 〜業で終わる
-        (r'.*サービス', 'サービス業'),
-        (r'.*システム', 'IT・システム'),
-        (r'.*商事|.*商社', '小売・卸売'),
-        (r'.*建設|.*工業', '建設・不動産'),
-        (r'株式会社.*', None)  # 会社名パターンは除外
-    ]
-    
-    for pattern, industry in advanced_patterns:
-        if industry and re.search(pattern, text_content):
-            print(f"    [INDUSTRY_DEBUG] パターン '{pattern}' から '{industry}' を検出")
+    for pattern, industry in ADVANCED_INDUSTRY_PATTERNS:
+        if pattern.search(text_content):
             return industry
     
-    print(f"    [INDUSTRY_DEBUG] 業界を特定できませんでした")
     return None
 
-def extract_deal_info(deal_soup):
-    """MAXの案件情報から必要な項目を抽出する（業種・業態抽出強化版）"""
+def extract_deal_info(deal_element):
+    """MAXの案件情報（lxml要素）から必要な項目を抽出する（業種・業態抽出強化版）"""
     
-    text_content = deal_soup.get_text()
+    text_content = element_text(deal_element)
     
-    # デバッグ: 処理中の要素の全テキストを表示（最初の300文字）
-    print(f"    [DEBUG] 処理中の要素内容: {text_content[:300]}...")
+    logging.debug(f"処理中の要素内容: {text_content[:300]}...")
     
     # テーブル行の場合、セルごとに分割して処理
-    cells = deal_soup.find_all(['td', 'th'])
-    cell_texts = [cell.get_text(strip=True) for cell in cells]
+    cells = list(deal_element.iter('td', 'th'))
+    cell_texts = [element_text(cell, strip=True) for cell in cells]
     
-    print(f"    [DEBUG] テーブルセル数: {len(cells)}")
-    for i, cell_text in enumerate(cell_texts[:10]):  # 最初の10セルを表示
-        print(f"    [DEBUG] セル{i+1}: '{cell_text}'")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"テーブルセル数: {len(cells)}")
+        for i, cell_text in enumerate(cell_texts[:10]):  # 最初の10セルを表示
+            logging.debug(f"セル{i+1}: '{cell_text}'")
     
     # 初期化
     project_id = None
@@ -504,7 +370,7 @@ def extract_deal_info(deal_soup):
             cell_industry = extract_industry_info(cell_text)
             if cell_industry:
                 industry = cell_industry
-                print(f"    [DEBUG] セル{i+1}から業界検出: '{industry}'")
+                logging.debug(f"セル{i+1}から業界検出: '{industry}'")
                 break
     
     # MAXの標準的なテーブル構造に基づく抽出
@@ -512,7 +378,7 @@ def extract_deal_info(deal_soup):
         # 案件ID（最初のセル、数値のみまたは英数字）
         if cell_texts[0] and re.match(r'^[A-Z0-9\-_]+$', cell_texts[0]):
             project_id = cell_texts[0]
-            print(f"    [DEBUG] 案件ID発見（セル1）: '{project_id}'")
+            logging.debug(f"案件ID発見（セル1）: '{project_id}'")
         
         # タイトル抽出の改善
         for i, cell_text in enumerate(cell_texts):
@@ -521,7 +387,7 @@ def extract_deal_info(deal_soup):
                 not re.match(r'^[A-Z0-9\-_]+$', cell_text)):  # IDっぽくない
                 if not title or len(cell_text) > len(title):  # より長い説明文を優先
                     title = cell_text
-                    print(f"    [DEBUG] タイトル候補発見（セル{i+1}）: '{title[:50]}...'")
+                    logging.debug(f"タイトル候補発見（セル{i+1}）: '{title[:50]}...'")
         
         # 地域（地域らしいキーワード）
         for i, cell_text in enumerate(cell_texts):
@@ -529,7 +395,7 @@ def extract_deal_info(deal_soup):
                 region_keywords = ['地方', '圏', '県', '都', '府', '道', '市', '区', '町', '村']
                 if any(keyword in cell_text for keyword in region_keywords) and len(cell_text) < 50:
                     region = cell_text
-                    print(f"    [DEBUG] 地域発見（セル{i+1}）: '{region}'")
+                    logging.debug(f"地域発見（セル{i+1}）: '{region}'")
                     break
         
         # 売上規模と希望価格（金額表記を含むセルを全てチェック）
@@ -537,30 +403,30 @@ def extract_deal_info(deal_soup):
         for i, cell_text in enumerate(cell_texts):
             if cell_text and any(keyword in cell_text for keyword in ['円', '万', '億']):
                 money_cells.append((i, cell_text))
-                print(f"    [DEBUG] 金額セル発見（セル{i+1}）: '{cell_text}'")
+                logging.debug(f"金額セル発見（セル{i+1}）: '{cell_text}'")
         
         # 売上と価格の判別ロジック改善
         for i, cell_text in money_cells:
             # 売上関連キーワードが含まれる場合
             if any(keyword in cell_text for keyword in ['売上', '年商', '収益', '営業', '業績']) and not revenue:
                 revenue = cell_text
-                print(f"    [DEBUG] 売上規模発見（セル{i+1}）: '{revenue}'")
+                logging.debug(f"売上規模発見（セル{i+1}）: '{revenue}'")
             # 価格関連キーワードが含まれる場合
             elif any(keyword in cell_text for keyword in ['価格', '譲渡', '希望', '売却']) and not price:
                 price = cell_text
-                print(f"    [DEBUG] 希望価格発見（セル{i+1}）: '{price}'")
+                logging.debug(f"希望価格発見（セル{i+1}）: '{price}'")
         
         # 売上と価格がまだ見つからない場合、位置で推定
         if money_cells and not revenue and not price:
             if len(money_cells) == 1:
                 # 1つだけの場合は売上として扱う
                 revenue = money_cells[0][1]
-                print(f"    [DEBUG] 単一金額を売上規模として扱います: '{revenue}'")
+                logging.debug(f"単一金額を売上規模として扱います: '{revenue}'")
             elif len(money_cells) >= 2:
                 # 複数ある場合、最初を売上、2番目を価格として扱う
                 revenue = money_cells[0][1]
                 price = money_cells[1][1]
-                print(f"    [DEBUG] 位置推定 - 売上規模: '{revenue}', 希望価格: '{price}'")
+                logging.debug(f"位置推定 - 売上規模: '{revenue}', 希望価格: '{price}'")
     
     # フォールバック: パターンマッチングによる抽出
     if not project_id:
@@ -575,7 +441,7 @@ def extract_deal_info(deal_soup):
             id_match = re.search(pattern, text_content)
             if id_match:
                 project_id = id_match.group(1)
-                print(f"    [DEBUG] パターンから案件ID発見: '{project_id}'")
+                logging.debug(f"パターンから案件ID発見: '{project_id}'")
                 break
     
     if not revenue:
@@ -593,7 +459,7 @@ def extract_deal_info(deal_soup):
                 revenue_candidate = match.group(1).strip()
                 if len(revenue_candidate) < 100 and revenue_candidate != price:
                     revenue = revenue_candidate
-                    print(f"    [DEBUG] パターンから売上規模発見: '{revenue}'")
+                    logging.debug(f"パターンから売上規模発見: '{revenue}'")
                     break
     
     if not price:
@@ -610,14 +476,14 @@ def extract_deal_info(deal_soup):
                 price_candidate = match.group(1).strip()
                 if price_candidate != revenue:
                     price = price_candidate
-                    print(f"    [DEBUG] パターンから希望価格発見: '{price}'")
+                    logging.debug(f"パターンから希望価格発見: '{price}'")
                     break
     
     # IDが見つからない場合は自動生成
     if not project_id:
         import random
         project_id = f"UNKNOWN_{random.randint(1000, 9999)}"
-        print(f"    [DEBUG] ID未発見のため自動生成: '{project_id}'")
+        logging.debug(f"ID未発見のため自動生成: '{project_id}'")
     
     # タイトルが見つからない場合のフォールバック
     if not title:
@@ -632,13 +498,12 @@ def extract_deal_info(deal_soup):
         
         if longest_text:
             title = longest_text
-            print(f"    [DEBUG] 最長テキストをタイトルとして採用: '{title[:50]}...'")
+            logging.debug(f"最長テキストをタイトルとして採用: '{title[:50]}...'")
     
     # リンク抽出
     detail_link = None
-    links = deal_soup.find_all('a', href=True)
-    for link in links:
-        href = link['href']
+    for link in deal_element.iter('a'):
+        href = link.get('href')
         if href and ('detail' in href or 'matter' in href):
             detail_link = href
             if not detail_link.startswith('http'):
@@ -656,15 +521,52 @@ def extract_deal_info(deal_soup):
         'link': detail_link
     }
     
-    print(f"    [DEBUG] 最終抽出結果: {result}")
+    logging.debug(f"最終抽出結果: {result}")
     
     return result
 
-def scrape_all_pages(driver, min_revenue):
-    """全ページから案件情報を抽出する（表記揺れ対応強化版）"""
+# テーブル行の判定に使うキーワード（1行につき1回の走査で全ラベルを判定）
+ROW_KEYWORDS = {
+    'header': ['タイトル', 'ヘッダー', '案件名'],
+    'id': ['ID'],
+    'sales': ['売上'],
+    # 条件1: 金額情報（円、万、億のいずれか）
+    'money': ['円', '万', '億'],
+    # 条件2: 案件らしい情報
+    'business': ['売上', '価格', '規模', '事業', '会社', 'ID', '譲渡', '買収', '業界',
+                 '製造', 'サービス', '地方', '建設', '不動産'],
+    'page': ['ページ'],
+    'page_nav': ['前へ', '次へ'],
+}
+
+ROW_MATCHER = KeywordMatcher(ROW_KEYWORDS)
+
+def classify_row(text_content, header_skipped=False):
+    """テーブル行を'header'・'deal'・None（対象外）に分類し、(分類, 一致したラベル)を返す"""
+    labels = ROW_MATCHER.match_labels(text_content)
+    
+    # ヘッダー行（一般的なヘッダーキーワードを含む行）
+    if not header_skipped and ('header' in labels or ('id' in labels and 'sales' in labels)):
+        return 'header', labels
+    
+    # 条件3: 最小限のテキスト長（空行や短すぎる行を除外）
+    has_sufficient_content = len(text_content.strip()) > 20
+    # 条件4: 明らかにナビゲーション要素ではない
+    not_navigation = not ('page' in labels and 'page_nav' in labels)
+    
+    if has_sufficient_content and not_navigation and ('money' in labels or 'business' in labels):
+        return 'deal', labels
+    return None, labels
+
+# 一覧ページの読み込み完了条件（テーブル行数が1秒間変化しなければ完了とみなす）
+PAGE_READINESS = {'selector': 'tr', 'stable_for': 1.0, 'timeout': 20}
+
+def scrape_all_pages(driver, min_revenue, known_ids=None, max_known_pages=1, newest_first=False):
+    """全ページから案件情報を抽出する（表記揺れ対応強化版・known_idsを渡すと既知案件を除外し、newest_first=Trueなら既知のページが続いたら停止）"""
     all_found_deals = []
     processed_ids = set()
     page_num = 1
+    tracker = KnownPageTracker("MAX", known_ids, max_known_pages=max_known_pages, newest_first=newest_first)
     
     wait = WebDriverWait(driver, 20)
     
@@ -674,88 +576,66 @@ def scrape_all_pages(driver, min_revenue):
         # 現在のページのURLを表示
         print(f"現在のURL: {driver.current_url}")
         
-        # ページの読み込みを待つ
-        time.sleep(5)
+        # ページの読み込みを待つ（テーブル行数が安定するまで）
+        wait_until_ready(driver, PAGE_READINESS, f"ページ {page_num}")
         
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        # lxmlで1回だけパース（行の判定・抽出はすべてこのツリー上で行う）
+        tree = FetchedDocument(driver.page_source, url=driver.current_url).tree
         
         # MAXサイトの案件要素を探す（テーブル行に特化）
         print("テーブル行から案件情報を抽出します...")
         
         # まずすべてのtr要素を取得
-        all_rows = soup.select("tr")
+        all_rows = list(tree.iter("tr"))
         print(f"全テーブル行数: {len(all_rows)} 個")
         
         current_page_deals = []
         header_skipped = False
         
         for i, row in enumerate(all_rows):
-            text_content = row.get_text()
+            text_content = element_text(row)
             
             # デバッグ用：最初の10行の内容を表示
             if i < 10:
                 print(f"    行 {i+1}: {text_content[:100]}...")
             
-            # ヘッダー行をスキップ（一般的なヘッダーキーワードを含む行）
-            if not header_skipped and ('タイトル' in text_content or 'ヘッダー' in text_content or 
-                                     '案件名' in text_content or ('ID' in text_content and '売上' in text_content)):
+            row_kind, labels = classify_row(text_content, header_skipped)
+            if row_kind == 'header':
                 print(f"    ヘッダー行をスキップ: 行 {i+1}")
                 header_skipped = True
-                continue
-            
-            # より緩い条件で案件行を判定
-            is_deal_row = False
-            
-            # 条件1: 金額情報を含む（円、万、億のいずれかが含まれる）
-            has_money = ('円' in text_content or '万' in text_content or '億' in text_content)
-            
-            # 条件2: 案件らしい情報を含む
-            has_business_info = (
-                '売上' in text_content or '価格' in text_content or '規模' in text_content or
-                '事業' in text_content or '会社' in text_content or 'ID' in text_content or
-                '譲渡' in text_content or '買収' in text_content or '業界' in text_content or
-                '製造' in text_content or 'サービス' in text_content or '地方' in text_content or
-                '建設' in text_content or '不動産' in text_content
-            )
-            
-            # 条件3: 最小限のテキスト長（空行や短すぎる行を除外）
-            has_sufficient_content = len(text_content.strip()) > 20
-            
-            # 条件4: 明らかにナビゲーション要素ではない
-            not_navigation = not ('ページ' in text_content and ('前へ' in text_content or '次へ' in text_content))
-            
-            # 総合判定（条件を緩和）
-            if has_sufficient_content and not_navigation and (has_money or has_business_info):
-                is_deal_row = True
-                print(f"    [OK] 案件行として判定: 行 {i+1}")
-            elif i < 10:  # 最初の10行については なぜ除外されたかを表示
-                print(f"    [NG] 除外: 行 {i+1} (金額:{has_money}, 事業情報:{has_business_info}, 十分な長さ:{has_sufficient_content})")
-            
-            if is_deal_row:
+            elif row_kind == 'deal':
                 current_page_deals.append(row)
+            elif i < 10:  # 最初の10行については なぜ除外されたかを表示
+                print(f"    [NG] 除外: 行 {i+1} (金額:{'money' in labels}, 事業情報:{'business' in labels}, "
+                      f"十分な長さ:{len(text_content.strip()) > 20})")
         
         print(f"案件として判定された行数: {len(current_page_deals)} 個")
         
         if not current_page_deals:
             print("案件要素が見つかりませんでした。ページ全体から情報を抽出します...")
             # フォールバック: ページ全体を1つの案件として処理
-            page_info = extract_deal_info(soup)
+            page_info = extract_deal_info(tree)
             if page_info['revenue'] or page_info['price']:
-                current_page_deals = [soup]
+                current_page_deals = [tree]
         
         print(f"ページ {page_num} で処理対象の案件数: {len(current_page_deals)}")
         
         # 現在のページで見つかった案件数をカウント
         page_new_deals = 0
+        page_ids = []
         
         for deal in current_page_deals:
             deal_info = extract_deal_info(deal)
             
             project_id = deal_info['project_id']
+            page_ids.append(project_id)
             if project_id in processed_ids:
                 print(f"    案件ID {project_id} は既に処理済みのため、スキップします")
                 continue
             processed_ids.add(project_id)
+            if known_ids and project_id in known_ids:
+                print(f"    案件ID {project_id} は前回までに取得済みのため、スキップします")
+                continue
             
             title = deal_info['title']
             revenue_str = deal_info['revenue']
@@ -798,6 +678,11 @@ def scrape_all_pages(driver, min_revenue):
         print(f"\nページ {page_num} で新規追加された案件: {page_new_deals} 件")
         print(f"累計合格案件数: {len(all_found_deals)} 件")
         
+        # 差分モード：既知案件のみのページが続いたらページ送りを打ち切る
+        if tracker.should_stop(page_ids):
+            print(f"差分モード: 既知案件のみのページが続いたため、ページ {page_num} で処理を終了します")
+            break
+        
         # 次のページへのリンクを探す
         next_page_found = False
         try:
@@ -854,13 +739,19 @@ def scrape_all_pages(driver, min_revenue):
             if next_link:
                 print(f"次のページ（{page_num + 1}）へ移動します...")
                 try:
+                    old_rows = driver.find_elements(By.CSS_SELECTOR, "tr")
+                    
                     # JavaScriptでクリック（より確実）
                     driver.execute_script("arguments[0].click();", next_link)
                     page_num += 1
                     next_page_found = True
                     
-                    # ページ遷移の完了を待つ
-                    time.sleep(5)
+                    # ページ遷移の完了を待つ（旧ページの行が破棄されるまで。新ページの描画はループ先頭で確認）
+                    if old_rows:
+                        try:
+                            WebDriverWait(driver, 10).until(EC.staleness_of(old_rows[0]))
+                        except TimeoutException:
+                            print("旧ページの行が残っています。描画完了の確認に進みます")
                     
                     # URLが変わったかチェック（オプション）
                     new_url = driver.current_url
@@ -886,8 +777,25 @@ def scrape_all_pages(driver, min_revenue):
     
     return all_found_deals
 
-def main():
-    """メインの実行関数（表記揺れ対応強化版）"""
+def save_results(output_filename, headers, rows):
+    """抽出結果をCSVファイルと履歴（Parquet/JSONL）に保存"""
+    print(f"--- {len(rows)}件の案件を「{output_filename}」に保存します ---")
+    records = records_from_rows(headers, rows)
+    try:
+        with CsvSink(output_filename, headers) as sink:
+            sink.write(records)
+        export_history(records, site_name="MAX")
+        print("--- 保存完了 ---")
+    except Exception as e:
+        print(f"!!! ファイルの保存中にエラーが発生しました: {e} !!!")
+
+def main(known_ids=None):
+    """
+    メインの実行関数（表記揺れ対応強化版・known_idsで差分クロール）
+    既定では全件を取得して出力CSVを現在の掲載案件で作り直す。ScrapingConditionsのIncremental = trueでknown_idsを省略すると
+    履歴と前回の出力CSVから取得済みの案件IDを読み込んで差分クロールする（出力CSVは今回の新着分だけになる。
+    一覧が新着順ならNewestFirst = trueで既知のページが続いたところで停止）
+    """
     config = load_config()
     
     # MAX用の設定セクションを追加  
@@ -915,7 +823,7 @@ FileName = max_deals.csv
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=Service(resolve_chromedriver_path()),
         options=chrome_options
     )
     
@@ -942,7 +850,12 @@ FileName = max_deals.csv
         print("\n--- MAX案件情報の全ページ抽出を開始します ---")
         
         # 全ページから案件情報を抽出（表記揺れ対応強化版）
-        all_found_deals = scrape_all_pages(driver, min_revenue)
+        if known_ids is None and conds.getboolean('Incremental', fallback=False):
+            known_ids = load_known_values("MAX", '案件ID', output['FileName'])
+            print(f"差分モード: 取得済みの案件 {len(known_ids)} 件をスキップします（出力CSVは新着分のみ）")
+        max_known_pages = int(conds.get('MaxKnownPages', 1))
+        newest_first = conds.getboolean('NewestFirst', fallback=False)
+        all_found_deals = scrape_all_pages(driver, min_revenue, known_ids, max_known_pages, newest_first)
 
     finally:
         print("\n--- 処理が完了しました。ブラウザを閉じます ---")
@@ -950,6 +863,7 @@ FileName = max_deals.csv
 
     print(f"\n--- {len(all_found_deals)}件の案件を抽出しました ---")
     headers = ['タイトル', '案件ID', '業界', '売上規模', '営業利益', '希望価格', 'リンク']
+    save_results(output['FileName'], headers, all_found_deals)
     
     return {"headers": headers, "data": all_found_deals}
 
@@ -4,7 +4,7 @@ import configparser
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
 from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -59,7 +59,7 @@ def parse_financial_value(text):
 def main():
     """メインの実行関数"""
     config = load_config()
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     base_url = "https://www.integroup.jp/sell/"
     deals_found = []
     processed_ids = set()
@@ -165,7 +165,7 @@ def main():
         
         print(f"\n--- {len(deals_found)}件の案件をGoogle Sheetsに保存します ---\n")
         gs_client = GoogleSheetsClient()
-        gs_client.write_data(sheet_name, worksheet_name, headers, data_to_write)
+        gs_client.write_data(sheet_name, worksheet_name, headers, data_to_write, site_name="インテグループ")
         print("--- 保存完了 ---\\n")
     else:
         print("\n条件に合致する案件は見つかりませんでした。Google Sheetsには何も書き込みません。\n")
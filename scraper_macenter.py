@@ -3,7 +3,7 @@ import re
 import configparser
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
 from bs4 import BeautifulSoup
 from google_sheets_client import GoogleSheetsClient
 
@@ -95,7 +95,7 @@ def extract_deal_info_from_listing(deal_element):
 def main():
     ""メインの実行関数"""
     config = load_config()
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     base_url = "https://www.nihon-ma.co.jp"
     deals_found = []
 
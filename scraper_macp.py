@@ -4,10 +4,12 @@ import configparser
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from driver_resolver import resolve_chromedriver_path
+from html_backend import get_html_backend
 import gspread
 from google.oauth2.service_account import Credentials
+from sheet_io import SheetWriter, sheet_key
+from deal_sinks import export_history, records_from_rows
 
 def load_config():
     """設定ファイル(config.ini)を読み込む"""
@@ -21,6 +23,7 @@ MIN_PROFIT_THRESHOLD = 30_000_000     # 営業利益の最低ライン（単位
 MAX_PAGES_TO_SCRAPE = 5               # 取得する最大ページ数
 SERVICE_ACCOUNT_FILE = 'test-key.json' # サービスアカウントキーファイルのパス
 SITE_NAME = "M&Aキャピタルパートナーズ" # サイト名
+HTML_BACKEND = "lxml"                 # 一覧・詳細ページのパーサー（benchmark_html_backends.pyで選定）
 # ----------------
 
 class GoogleSheetsServiceAccount:
@@ -48,34 +51,6 @@ class GoogleSheetsServiceAccount:
             try:
                 worksheet = spreadsheet.worksheet(worksheet_name)
                 print(f"既存のワークシート '{worksheet_name}' を使用します")
-                
-                existing_data = worksheet.get_all_values()
-                
-                if existing_data:
-                    print(f"既存データが {len(existing_data)} 行見つかりました。データを追加します。")
-                    
-                    if existing_data[0] != headers:
-                        print("ヘッダーが異なるか存在しません。ヘッダーを追加します。")
-                        worksheet.append_row(headers)
-                    else:
-                        print("ヘッダーは既に存在するため、スキップします。")
-                    
-                    if data:
-                        for row in data:
-                            worksheet.append_row(row)
-                        print(f"{len(data)} 行のデータを既存データの下に追加しました")
-                else:
-                    print("既存データが見つかりませんでした。新規でデータを書き込みます。")
-                    
-                    if headers:
-                        worksheet.append_row(headers)
-                        print(f"ヘッダーを書き込みました: {headers}")
-                    
-                    if data:
-                        for row in data:
-                            worksheet.append_row(row)
-                        print(f"{len(data)} 行のデータを書き込みました")
-                            
             except gspread.WorksheetNotFound:
                 worksheet = spreadsheet.add_worksheet(
                     title=worksheet_name, 
@@ -83,15 +58,32 @@ class GoogleSheetsServiceAccount:
                     cols=len(headers) + 5
                 )
                 print(f"新しいワークシート '{worksheet_name}' を作成しました")
-                
+            
+            # 見出し行は記録済みのものを使い、全行の読み込みと1行ずつの追記はしない
+            writer = SheetWriter(worksheet, sheet_key(spreadsheet_id, worksheet_name))
+            rows = []
+            existing_headers = writer.headers()
+            if not existing_headers:
+                print("既存データが見つかりませんでした。新規でデータを書き込みます。")
                 if headers:
-                    worksheet.append_row(headers)
-                    print(f"ヘッダーを書き込みました: {headers}")
-                
-                if data:
-                    for row in data:
-                        worksheet.append_row(row)
-                    print(f"{len(data)} 行のデータを書き込みました")
+                    rows.append(headers)
+                    print(f"ヘッダーを書き込みます: {headers}")
+            elif existing_headers != headers:
+                print("ヘッダーが異なるか存在しません。ヘッダーを追加します。")
+                rows.append(headers)
+            else:
+                print("ヘッダーは既に存在するため、スキップします。")
+            
+            # ヘッダーとデータをまとめて追記（上限内のペースで分割送信し、429・5xxは再試行）
+            rows.extend(data or [])
+            if rows:
+                writer.append_rows(rows)
+            if not existing_headers and headers:
+                writer.cache.remember(writer.key, [str(header) for header in headers])
+            if data:
+                print(f"{len(data)} 行のデータを追加しました")
+                # 履歴（Parquet/JSONL）にも追記
+                export_history(records_from_rows(headers, data), site_name=SITE_NAME)
             
             print(f"Google Sheetsへの書き込み完了！")
             print(f"URL: https://docs.google.com/spreadsheets/d/{spreadsheet_id}")
@@ -162,6 +154,105 @@ def convert_single_value_to_million(text):
     else:
         return text
 
+def extract_list_deals(html, base_url="https://www.ma-cp.com", backend_name=HTML_BACKEND):
+    """一覧ページのHTMLから案件情報（ID・タイトル・リンク・財務項目）を抽出する"""
+    backend = get_html_backend(backend_name)
+    root = backend.parse(html)
+    deals = []
+    
+    for article in backend.select(root, "article.c-filter-project"):
+        id_tag = backend.select_one(article, "p.c-filter-project__no")
+        case_id_text = backend.text(id_tag, strip=True) if id_tag is not None else "ID不明"
+        
+        title_tag = backend.select_one(article, "h4.c-filter-project__ttl")
+        title = backend.text(title_tag, strip=True) if title_tag is not None else "タイトル不明"
+        
+        link_tag = backend.select_one(article, "a.c-cta")
+        relative_link = backend.attr(link_tag, "href") if link_tag is not None else None
+        if relative_link:
+            link = base_url + relative_link if relative_link.startswith('/') else relative_link
+        else:
+            link = "リンク不明"
+        
+        deal = {
+            'id': case_id_text.replace("案件No：", "").strip(),
+            'title': title,
+            'link': link,
+            'revenue_text': "",
+            'profit_text': "",
+            'location_text': "",
+            'desired_amount_text': "",
+        }
+        
+        for dl in backend.select(article, "dl.c-filter-project__dataList"):
+            dt = backend.select_one(dl, "dt")
+            dd = backend.select_one(dl, "dd")
+            if dt is not None and dd is not None:
+                key = backend.text(dt, strip=True)
+                value = backend.text(dd, strip=True)
+                if "概算売上" in key:
+                    deal['revenue_text'] = value
+                elif "営業利益" in key:
+                    deal['profit_text'] = value
+                elif "所在地" in key:
+                    deal['location_text'] = value
+                elif "希望金額" in key or "希望価格" in key or "譲渡価格" in key:
+                    deal['desired_amount_text'] = value
+        
+        deals.append(deal)
+    
+    return deals
+
+def extract_detail_features(html, backend_name=HTML_BACKEND):
+    """詳細ページのHTMLから「事業概要」などの見出しに続く項目を抽出する（見出しがなければ「・」の箇条書き）"""
+    backend = get_html_backend(backend_name)
+    root = backend.parse(html)
+    headings = backend.select(root, "h4")
+    
+    target_keywords = ["事業概要", "事業内容", "特色", "企業の特徴"]
+    for keyword in target_keywords:
+        target_h4 = next((h4 for h4 in headings if keyword in backend.text(h4)), None)
+        if target_h4 is None:
+            continue
+        print(f"      - 見出し「{keyword}」を発見")
+        collected_text = []
+        
+        for next_element in backend.next_siblings(target_h4):
+            name = backend.tag(next_element)
+            if name == "h4":
+                break
+            
+            if name == "ul":
+                li_texts = [backend.text(li, strip=True) for li in backend.select(next_element, "li") if backend.text(li, strip=True)]
+                if li_texts:
+                    collected_text.extend(li_texts)
+            
+            elif name == "p":
+                p_text = backend.text(next_element, strip=True)
+                if p_text and p_text not in ["", "・"]:
+                    collected_text.append(p_text)
+            
+            elif name == "div":
+                div_text = backend.text(next_element, strip=True)
+                if div_text and len(div_text) > 5:
+                    collected_text.append(div_text)
+        
+        if collected_text:
+            print(f"      - 特色情報を取得しました: {len(collected_text)}項目")
+            return "\n".join(collected_text)
+    
+    print("      - 見出しベースでの検索に失敗。ページ全体から箇条書きを探しています...")
+    bullet_lines = []
+    for line in backend.text(root).split('\n'):
+        line = line.strip()
+        if line.startswith('・') and len(line) > 5:
+            bullet_lines.append(line)
+    
+    if bullet_lines and len(bullet_lines) >= 2:
+        print(f"      - 箇条書きパターンから特色情報を取得: {len(bullet_lines)}項目")
+        return "\n".join(bullet_lines[:10])
+    return ""
+
 def get_feature_from_detail_page(driver, url):
     """案件詳細ページにアクセスし、「事業概要」や「事業内容」の情報を抽出する。"""
     try:
@@ -169,57 +260,9 @@ def get_feature_from_detail_page(driver, url):
         driver.get(url)
         time.sleep(3)
         
-        detail_soup = BeautifulSoup(driver.page_source, "html.parser")
-        feature_text = ""
-        
-        target_keywords = ["事業概要", "事業内容", "特色", "企業の特徴"]
-        for keyword in target_keywords:
-            target_h4 = detail_soup.find("h4", string=lambda t: t and keyword in t)
-            if target_h4:
-                print(f"      - 見出し「{keyword}」を発見")
-                next_element = target_h4.find_next_sibling()
-                collected_text = []
-                
-                while next_element:
-                    if next_element.name == "h4":
-                        break
-                    
-                    if next_element.name == "ul":
-                        li_texts = [li.get_text(strip=True) for li in next_element.find_all("li") if li.get_text(strip=True)]
-                        if li_texts:
-                            collected_text.extend(li_texts)
-                    
-                    elif next_element.name == "p":
-                        p_text = next_element.get_text(strip=True)
-                        if p_text and p_text not in ["", "・"]:
-                            collected_text.append(p_text)
-                    
-                    elif next_element.name == "div":
-                        div_text = next_element.get_text(strip=True)
-                        if div_text and len(div_text) > 5:
-                            collected_text.append(div_text)
-                    
-                    next_element = next_element.find_next_sibling()
-                
-                if collected_text:
-                    feature_text = "\n".join(collected_text)
-                    print(f"      - 特色情報を取得しました: {len(collected_text)}項目")
-                    break
-        
-        if not feature_text:
-            print("      - 見出しベースでの検索に失敗。ページ全体から箇条書きを探しています...")
-            all_text = detail_soup.get_text()
-            bullet_lines = []
-            for line in all_text.split('\n'):
-                line = line.strip()
-                if line.startswith('・') and len(line) > 5:
-                    bullet_lines.append(line)
-            
-            if bullet_lines and len(bullet_lines) >= 2:
-                feature_text = "\n".join(bullet_lines[:10])
-                print(f"      - 箇条書きパターンから特色情報を取得: {len(bullet_lines)}項目")
-        
-        return feature_text
+        feature_text = extract_detail_features(driver.page_source)
+        if feature_text:
+            return feature_text
 
     except Exception as e:
         print(f"      - 詳細ページの解析中にエラーが発生しました: {e}")
@@ -230,7 +273,7 @@ def get_feature_from_detail_page(driver, url):
 def main():
     """メインの実行関数"""
     config = load_config()
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     base_url = "https://www.ma-cp.com"
     deals_found = []
     processed_ids = set()
@@ -254,8 +297,7 @@ def main():
             driver.get(target_url)
             time.sleep(3)
 
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            deal_articles = soup.select("article.c-filter-project")
+            deal_articles = extract_list_deals(driver.page_source, base_url)
 
             if not deal_articles:
                 print("このページに案件が見つかりませんでした。")
@@ -264,47 +306,17 @@ def main():
             print(f"{len(deal_articles)}件の案件が見つかりました。条件を確認します。")
 
             for article in deal_articles:
-                id_tag = article.find("p", class_="c-filter-project__no")
-                case_id_text = id_tag.get_text(strip=True) if id_tag else "ID不明"
-                case_id = case_id_text.replace("案件No：", "").strip()
-
+                case_id = article['id']
                 if case_id in processed_ids:
                     continue
                 processed_ids.add(case_id)
 
-                title_tag = article.find("h4", class_="c-filter-project__ttl")
-                title = title_tag.get_text(strip=True) if title_tag else "タイトル不明"
-
-                link_tag = article.find("a", class_="c-cta")
-                if link_tag and link_tag.get('href'):
-                    relative_link = link_tag['href']
-                    if relative_link.startswith('/'):
-                        link = base_url + relative_link
-                    else:
-                        link = relative_link
-                else:
-                    link = "リンク不明"
-
-                revenue_text = ""
-                profit_text = ""
-                location_text = ""
-                desired_amount_text = ""
-                
-                data_list = article.select("dl.c-filter-project__dataList")
-                for dl in data_list:
-                    dt = dl.find("dt")
-                    dd = dl.find("dd")
-                    if dt and dd:
-                        key = dt.get_text(strip=True)
-                        value = dd.get_text(strip=True)
-                        if "概算売上" in key:
-                            revenue_text = value
-                        elif "営業利益" in key:
-                            profit_text = value
-                        elif "所在地" in key:
-                            location_text = value
-                        elif "希望金額" in key or "希望価格" in key or "譲渡価格" in key:
-                            desired_amount_text = value
+                title = article['title']
+                link = article['link']
+                revenue_text = article['revenue_text']
+                profit_text = article['profit_text']
+                location_text = article['location_text']
+                desired_amount_text = article['desired_amount_text']
                 
                 print(f"  - ID: {case_id} ({title}) を確認中...")
                 print(f"    売上高: {revenue_text or '情報なし'}, 営業利益: {profit_text or '情報なし'}")
@@ -3,7 +3,7 @@ import re
 import configparser
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
 from bs4 import BeautifulSoup
 from google_sheets_client import GoogleSheetsClient
 
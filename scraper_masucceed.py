@@ -1,11 +1,11 @@
 import time
-import re
-import csv
 import configparser
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
+from amount_parser import amount_range
+from deal_sinks import CsvSink, export_history, records_from_rows
 from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -164,70 +164,11 @@ def manual_login_fallback(driver, email):
     print("="*60 + "\n")
     print("--- ログイン後の処理を再開します ---")
 
-def _extract_single_value(text):
-    """単一の金額文字列から数値を抽出する (「百万円」「▲」表記に対応)"""
-    if not text:
-        return 0
-
-    original_text = text
-    text = text.replace(",", "").replace("，", "")
-    text = text.replace("▲", "-") # マイナス記号に置換
-
-    # 数値（マイナス、小数点含む）を抽出
-    match = re.search(r'(-?[\d\.]+)', text)
-    if not match:
-        # print(f"        [DEBUG] 数値が見つかりません: '{original_text}'") # デバッグ時以外はコメントアウト
-        return 0
-
-    value = float(match.group(1))
-
-    # 単位の判定
-    if "億" in text:
-        value *= 100_000_000
-    elif "百万円" in text:
-        value *= 1_000_000
-    elif "万" in text:
-        value *= 10_000
-    elif "千" in text:
-        value *= 1_000
-
-    return int(value)
 
 def parse_financial_value(text):
-    """「1億円～2億5,000万円」「500万円未満」「▲1,000万円〜」等を数値(円)の範囲に変換する"""
-    if not text or "応相談" in text:
-        return (0, 0)
-    
-    # print(f"    [DEBUG] 元テキスト: '{text}'") # デバッグ時以外はコメントアウト
-
-    separators = ["～", "〜", "~", "ー"]
-    
-    if "未満" in text or "以下" in text:
-        val = _extract_single_value(text)
-        return (0, val)
-    
-    if "以上" in text or text.strip().endswith("〜"):
-        val = _extract_single_value(text)
-        if val < 0:
-            return (float('-inf'), val)
-        else:
-            return (val, float('inf'))
-
-    parts = [text]
-    for sep in separators:
-        if sep in text:
-            parts = text.split(sep)
-            break
-    
-    if len(parts) >= 2:
-        min_val = _extract_single_value(parts[0].strip())
-        max_val = _extract_single_value(parts[1].strip())
-        # print(f"    [DEBUG] 範囲結果: {min_val:,}円 ～ {max_val:,}円") # デバッグ時以外はコメントアウト
-        return (min_val, max_val)
-    else:
-        single_val = _extract_single_value(text)
-        # print(f"    [DEBUG] 単一値結果: {single_val:,}円") # デバッグ時以外はコメントアウト
-        return (single_val, single_val)
+    """「1億円～2億5,000万円」「500万円未満」「▲1,000万円〜」等を数値(円)の範囲に変換する（解析はamount_parserの共通エンジン）"""
+    value_range = amount_range(text)
+    return value_range
 
 def meets_condition(value_range, threshold):
     """範囲が条件を満たすかチェック（範囲の最大値が閾値以上であればOK）"""
@@ -262,7 +203,7 @@ def main():
     conds = config['ScrapingConditions']
     output = config['SucceedOutput']
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     all_found_deals = []
     processed_links = set()
 
@@ -380,11 +321,12 @@ def main():
 
     output_filename = output['FileName']
     print(f"\n--- {len(all_found_deals)}件の案件を「{output_filename}」に保存します ---")
+    headers = ['タイトル', 'リンク', '売上高', '利益']
+    records = records_from_rows(headers, all_found_deals)
     try:
-        with open(output_filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(['タイトル', 'リンク', '売上高', '利益'])
-            writer.writerows(all_found_deals)
+        with CsvSink(output_filename, headers) as sink:
+            sink.write(records)
+        export_history(records, site_name="M&Aサクシード")
         print("--- 保存完了 ---")
     except Exception as e:
         print(f"!!! ファイルの保存中にエラーが発生しました: {e} !!!")
@@ -1,10 +1,10 @@
 import time
 import re
-import csv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
+from deal_sinks import CsvSink, export_history, records_from_rows
 from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -91,7 +91,7 @@ def clean_text(text):
 
 def main():
     "メインの実行関数"
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     deals_found = []
     processed_deal_ids = set()  # 重複チェック用
 
@@ -250,16 +250,17 @@ def main():
 
     # --- 最終結果をCSVに出力 ---
     print(f"\n--- {len(deals_found)}件の案件を「{OUTPUT_CSV_FILE}」に保存します ---")
+    headers = ['案件ID', 'タイトル', '業種', '地域', '売上高', '営業利益', '譲渡価格', 'リンク']
+    records = records_from_rows(headers, [
+        [deal['deal_id'], deal['title'], deal['industry'],
+         deal['region'], deal['revenue'], deal['profit'],
+         deal['price'], deal['link']]
+        for deal in deals_found
+    ])
     try:
-        with open(OUTPUT_CSV_FILE, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(['案件ID', 'タイトル', '業種', '地域', '売上高', '営業利益', '譲渡価格', 'リンク'])
-            for deal in deals_found:
-                writer.writerow([
-                    deal['deal_id'], deal['title'], deal['industry'], 
-                    deal['region'], deal['revenue'], deal['profit'], 
-                    deal['price'], deal['link']
-                ])
+        with CsvSink(OUTPUT_CSV_FILE, headers) as sink:
+            sink.write(records)
+        export_history(records, site_name="NEWOLD CAPITAL")
         print("--- 保存完了 ---")
     except Exception as e:
         print(f"!!! ファイルの保存中にエラーが発生しました: {e} !!!")
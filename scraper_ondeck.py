@@ -6,21 +6,29 @@ https://www.ondeck.jp/sell から条件に合致する案件を自動抽出
 """
 
 import re
-import csv
 import time
 import logging
 import os
 from datetime import datetime
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from bs4 import BeautifulSoup
-import unicodedata
+from driver_resolver import resolve_chromedriver_path
+from incremental import KnownPageTracker
+from page_readiness import wait_until_ready
+from amount_parser import amount_to_yen
+from deal_sinks import CsvSink, export_history, load_known_values
 import json
 
+# ページ読み込み完了の判定条件（固定sleepの代わり）
+LIST_PAGE_READINESS = {'selector': 'a[href*="/sell/"]', 'stable_for': 0.5, 'timeout': 15}
+DETAIL_PAGE_READINESS = {'ready_state': 'complete', 'selector': 'body', 'timeout': 15}
+
+# 出力するCSVファイル名（次回の差分クロールでは取得済みの案件URLをここからも読み込む）
+OUTPUT_CSV_FILE = 'ondeck_ma_cases.csv'
+
 class OnDeckScraper:
     def __init__(self, debug=True):
         """スクレイパーの初期化"""
@@ -33,9 +41,6 @@ class OnDeckScraper:
         self.min_revenue = 300_000_000  # 3億円
         self.min_profit = 30_000_000   # 3千万円
         
-        # レンジ区切り文字（文字化け対応含む）
-        self.range_separators = ['～', '?', '?', '-', '〜', 'ー', '−', '–', '—']
-        
         # デバッグ用ディレクトリ作成
         self.debug_dir = f"debug_{{datetime.now().strftime('%Y%m%d_%H%M%S')}}"
         if self.debug:
@@ -89,7 +94,7 @@ class OnDeckScraper:
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
         
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()), options=chrome_options)
             self.driver.implicitly_wait(10)
             self.logger.info("Chromeドライバーを起動しました")
         except Exception as e:
@@ -122,114 +127,17 @@ class OnDeckScraper:
         except Exception as e:
             self.logger.error(f"デバッグ情報保存エラー: {e}")
     
-    def normalize_text(self, text):
-        """テキストの正規化（全角→半角変換、空白除去）"""
-        if not text:
-            return ""
-        # Unicode正規化
-        text = unicodedata.normalize('NFKC', text)
-        # 余分な空白を除去
-        text = re.sub(r'\s+', '', text)
-        return text
-    
     def parse_amount(self, amount_str):
         """
-        金額文字列を数値に変換（百万円単位対応）
+        金額文字列を数値に変換（百万円単位対応・解析はamount_parserの共通エンジン）
         例: "約820百万円" → 820000000, "約53百万円" → 53000000
         レンジの場合は最大値を返す
         """
-        if not amount_str:
-            return 0
-            
-        original_str = amount_str
-        amount_str = self.normalize_text(amount_str)
-        self.logger.debug(f"金額解析開始: '{original_str}' → '{amount_str}'")
-        
-        # 「約」「（直近期実績）」「（修正後）」などを除去
-        amount_str = re.sub(r'約|（[^）]*）|直近期実績|修正後', '', amount_str)
-        
-        # レンジかどうかを判定
-        range_match = None
-        separator_used = None
-        
-        for sep in self.range_separators:
-            if sep in amount_str:
-                parts = amount_str.split(sep)
-                if len(parts) == 2:
-                    range_match = parts
-                    separator_used = sep
-                    self.logger.debug(f"レンジ検出: {parts[0]} {sep} {parts[1]}")
-                    break
-        
-        if range_match:
-            # レンジの場合、最大値（右側）を使用
-            max_amount_str = range_match[1].strip()
-            self.logger.debug(f"レンジの最大値を使用: '{max_amount_str}'")
-            return self._convert_single_amount(max_amount_str)
-        else:
-            # 単一値の場合
-            return self._convert_single_amount(amount_str)
+        value = amount_to_yen(amount_str, 'upper')
+        self.logger.debug(f"金額解析: '{amount_str}' → {value}")
+        return value
     
-    def _convert_single_amount(self, amount_str):
-        """単一の金額文字列を数値に変換（百万円単位対応）"""
-        if not amount_str:
-            return 0
-            
-        amount_str = self.normalize_text(amount_str)
-        self.logger.debug(f"単一金額変換: '{amount_str}'")
-        
-        # 「円」を除去
-        amount_str = amount_str.replace('円', '')
-        
-        # カンマを除去
-        amount_str = amount_str.replace(',', '')
-        
-        try:
-            # 百万円単位の処理（最優先）
-            if '百万' in amount_str:
-                match = re.search(r'(\d+(?:\.\d+)?)\s*百万', amount_str)
-                if match:
-                    value = float(match.group(1)) * 1_000_000
-                    self.logger.debug(f"百万円単位変換: {match.group(1)}百万円 → {int(value)}")
-                    return int(value)
-            
-            # 億・万・千の単位処理
-            elif '億' in amount_str:
-                match = re.search(r'(\d+(?:\.\d+)?)\s*億', amount_str)
-                if match:
-                    value = float(match.group(1)) * 100_000_000
-                    self.logger.debug(f"億単位変換: {match.group(1)}億 → {int(value)}")
-                    return int(value)
-                    
-            elif '万' in amount_str:
-                match = re.search(r'(\d+(?:,\d+)*(?:\.\d+)?)\s*万', amount_str)
-                if match:
-                    num_str = match.group(1).replace(',', '')
-                    value = float(num_str) * 10_000
-                    self.logger.debug(f"万単位変換: {num_str}万 → {int(value)}")
-                    return int(value)
-                    
-            elif '千' in amount_str:
-                match = re.search(r'(\d+(?:,\d+)*(?:\.\d+)?)\s*千', amount_str)
-                if match:
-                    num_str = match.group(1).replace(',', '')
-                    value = float(num_str) * 1_000
-                    self.logger.debug(f"千単位変換: {num_str}千 → {int(value)}")
-                    return int(value)
-            
-            # 数値のみの場合
-            match = re.search(r'(\d+(?:,\d+)*(?:\.\d+)?)', amount_str)
-            if match:
-                num_str = match.group(1).replace(',', '')
-                value = int(float(num_str))
-                self.logger.debug(f"数値のみ変換: {num_str} → {value}")
-                return value
-                
-        except Exception as e:
-            self.logger.warning(f"金額変換エラー: '{amount_str}' - {e}")
-            
-        self.logger.warning(f"金額変換失敗: '{amount_str}'")
-        return 0
+
     
     def extract_case_links(self, page_num=1):
         """案件一覧から詳細ページのリンクを抽出"""
@@ -238,10 +146,7 @@ class OnDeckScraper:
         
         try:
             self.driver.get(url)
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            time.sleep(3)  # ページ読み込み待機
+            wait_until_ready(self.driver, LIST_PAGE_READINESS, f"ページ {page_num}")  # ページ読み込み待機
             
             # HTMLを保存（デバッグ用）
             html_content = self.driver.page_source
@@ -326,10 +231,7 @@ class OnDeckScraper:
         
         try:
             self.driver.get(detail_url)
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            time.sleep(2)
+            wait_until_ready(self.driver, DETAIL_PAGE_READINESS, detail_url)
             
             # HTMLを保存（デバッグ用）
             html_content = self.driver.page_source
@@ -556,19 +458,16 @@ class OnDeckScraper:
         
         return is_profit_match
     
-    def save_to_csv(self, filename='ondeck_ma_cases.csv'):
-        """結果をCSVファイルに保存"""
+    def save_to_csv(self, filename=OUTPUT_CSV_FILE):
+        """結果をCSVファイルと履歴（Parquet/JSONL）に保存"""
         if not self.results:
             self.logger.warning("保存する結果がありません")
             return
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['業種', '案件No.', '年商', '営業利益', '譲渡希望額', 'リンク']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for result in self.results:
-                writer.writerow(result)
+        fieldnames = ['業種', '案件No.', '年商', '営業利益', '譲渡希望額', 'リンク']
+        with CsvSink(filename, fieldnames, encoding='utf-8') as sink:
+            sink.write(self.results)
+        export_history(self.results, site_name="オンデック")
         
         self.logger.info(f"結果をCSVファイルに保存しました: {filename} ({len(self.results)}件)")
     
@@ -602,14 +501,16 @@ class OnDeckScraper:
             print(f"譲渡希望額: {result['譲渡希望額']}")
             print(f"リンク: {result['リンク']}")
     
-    def run(self, max_pages=5):
-        """メイン実行関数"""
+    def run(self, max_pages=5, known_ids=None, max_known_pages=1, newest_first=False):
+        """メイン実行関数（known_idsに既知の案件URLを渡すと既知案件を除外。newest_first=Trueなら既知のページが続いたら停止）"""
         self.logger.info("=" * 60)
         self.logger.info("M&A案件抽出を開始します（デバッグモード）")
         self.logger.info(f"条件: 年商{self.min_revenue:,}円以上 AND 営業利益{self.min_profit:,}円以上")
         self.logger.info(f"デバッグディレクトリ: {self.debug_dir}")
         self.logger.info("=" * 60)
         
+        tracker = KnownPageTracker("オンデック", known_ids, max_known_pages=max_known_pages, newest_first=newest_first)
+        
         try:
             self.setup_driver()
             
@@ -624,6 +525,12 @@ class OnDeckScraper:
                     self.logger.info(f"ページ {page_num}: 案件リンクが見つかりません")
                     continue
                 
+                # 差分モード：既知の案件が続いたらページ送りを打ち切り、既知案件の詳細は取得しない
+                stop_paging = tracker.should_stop(case_links)
+                if known_ids:
+                    case_links = [case_url for case_url in case_links if case_url not in known_ids]
+                    self.logger.info(f"ページ {page_num}: 未取得の案件 {len(case_links)} 件")
+                
                 # 各案件の詳細をチェック（最初の5件のみデバッグ用）
                 max_cases = len(case_links) if not self.debug else min(5, len(case_links))
                 self.logger.info(f"ページ {page_num}: {max_cases}/{len(case_links)} 件の案件を処理します")
@@ -643,6 +550,10 @@ class OnDeckScraper:
                             'リンク': case_info['detail_url']
                         })
                 
+                if stop_paging:
+                    self.logger.info(f"差分モード: 既知案件のみのページが続いたため {page_num} ページで停止します")
+                    break
+                
                 time.sleep(2)  # ページ間の待機
                 
                 if self.debug and page_num >= 2:  # デバッグ時は2ページまで
@@ -669,10 +580,18 @@ class OnDeckScraper:
                 self.driver.quit()
                 self.logger.info("ブラウザを終了しました")
 
-def main(max_pages=2, debug=True):
-    """新しいメイン関数"""
+def main(max_pages=2, debug=True, known_ids=None, max_known_pages=1, incremental=False, newest_first=False):
+    """
+    新しいメイン関数（既定では全件を取得して出力CSVを現在の掲載案件で作り直す）。
+    incremental=Trueでknown_idsを省略すると履歴と前回の出力CSVから取得済みの案件URLを読み込んで差分クロールする
+    （出力CSVは今回の新着分だけになる）。
+    """
     scraper = OnDeckScraper(debug=debug)
-    return scraper.run(max_pages=max_pages)
+    if known_ids is None and incremental:
+        known_ids = load_known_values("オンデック", 'リンク', OUTPUT_CSV_FILE, csv_encoding='utf-8')
+        scraper.logger.info(f"差分モード: 取得済みの案件 {len(known_ids)} 件をスキップします（出力CSVは新着分のみ）")
+    return scraper.run(max_pages=max_pages, known_ids=known_ids, max_known_pages=max_known_pages,
+                       newest_first=newest_first)
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -3,7 +3,7 @@ import re
 import csv
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import resolve_chromedriver_path
 from bs4 import BeautifulSoup
 
 # --- 設定項目 ---
@@ -110,7 +110,7 @@ def extract_deal_info_from_strike(soup, max_deals):
     return deals
 
 def main():
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()))
     deals_found = []
     print(f"🎯 ストライク（SMART）の案件を解析中...（上限: {MAX_DEALS_TO_PROCESS}件）")
     try:
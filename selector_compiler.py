@@ -0,0 +1,166 @@
+# selector_compiler.py - config.yamlのCSSセレクタを設定読み込み時にlxmlのXPathへコンパイルして抽出を高速化する
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cssselect import HTMLTranslator, SelectorError
+from lxml import etree
+
+# BeautifulSoupのget_text()と同様に、本文として扱わない要素
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+# 一覧ページで汎用的に試す代替アイテムセレクタ（UniversalParser._parse_selector_basedと同じ順序）
+FALLBACK_ITEM_SELECTORS = [
+    'article',
+    'div[class*="item"]',
+    'li[class*="item"]',
+    'div[class*="case"]',
+    'div[class*="project"]',
+    'tr',
+]
+
+_translator = HTMLTranslator()
+
+
+class CompiledSelector:
+    """1つのCSSセレクタをコンパイル済みXPathとして保持する"""
+
+    def __init__(self, css: str):
+        self.css = css
+        # select_one/selectと同様に、基準要素の子孫のみを対象にする
+        self.xpath = etree.XPath(_translator.css_to_xpath(css, prefix='descendant::'))
+
+    def all(self, element) -> List[Any]:
+        return self.xpath(element)
+
+    def first(self, element) -> Optional[Any]:
+        matches = self.xpath(element)
+        return matches[0] if matches else None
+
+    def __repr__(self) -> str:
+        return f"CompiledSelector({self.css!r})"
+
+
+def compile_selector(css: str) -> Optional[CompiledSelector]:
+    """CSSセレクタをコンパイル（変換できない場合はNone）"""
+    if not css:
+        return None
+    try:
+        return CompiledSelector(css)
+    except (SelectorError, etree.XPathError) as e:
+        logging.debug(f"Selector '{css}' could not be compiled to XPath: {e}")
+        return None
+
+
+def selector_variants(selector: str) -> List[str]:
+    """元のセレクタと、[class*=...]部分だけを使った代替セレクタ"""
+    variants = [selector]
+    if '[class*=' in selector:
+        class_part = re.search(r'\[class\*="([^"]+)"\]', selector)
+        if class_part:
+            variants.append(f'[class*="{class_part.group(1)}"]')
+    return variants
+
+
+def element_text(element, strip: bool = False) -> str:
+    """lxml要素のテキスト（BeautifulSoupのget_text()/get_text(strip=True)と同じ結果）"""
+    strings = _iter_strings(element)
+    if strip:
+        return ''.join(text.strip() for text in strings)
+    return ''.join(strings)
+
+
+def _iter_strings(element) -> Iterator[str]:
+    if not isinstance(element.tag, str) or element.tag in _NON_TEXT_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+class SiteExtractionPlan:
+    """1サイト分のコンパイル済み抽出プラン（item_selector＋data_selectors）"""
+
+    def __init__(self, site_name: str, item_selectors: List[CompiledSelector],
+                 fields: Dict[str, List[CompiledSelector]]):
+        self.site_name = site_name
+        self.item_selectors = item_selectors
+        self.fields = fields
+
+    def select_items(self, root, memory=None) -> Tuple[Optional[str], List[Any]]:
+        """
+        アイテムセレクタを順に試し、最初に見つかったセレクタと要素を返す。
+        memory（SelectorMemory）を渡すと前回当たったセレクタから試す（FALLBACK_ITEM_SELECTORSは記録しない）。
+        """
+        if memory is not None:
+            compiled = {selector.css: selector for selector in self.item_selectors}
+            used_selector, items = memory.find_first(self.site_name, 'list_items', list(compiled),
+                                                     lambda css: compiled[css].all(root),
+                                                     generic=FALLBACK_ITEM_SELECTORS)
+            return used_selector, items or []
+        for selector in self.item_selectors:
+            items = selector.all(root)
+            if items:
+                return selector.css, items
+        return None, []
+
+    def extract_first(self, item, jp_key: str) -> Optional[Any]:
+        """フィールドのセレクタ（代替含む）を順に試して最初の要素を返す"""
+        for selector in self.fields.get(jp_key, []):
+            element = selector.first(item)
+            if element is not None:
+                return element
+        return None
+
+
+def compile_site_plan(site_config: Dict[str, Any]) -> Optional[SiteExtractionPlan]:
+    """
+    サイト設定からプランを作成。
+    1つでもXPathに変換できないセレクタがあれば、そのサイトは従来のsoupsieve経路に任せる（None）。
+    """
+    site_name = site_config.get('name', '')
+    data_selectors = site_config.get('data_selectors') or {}
+    if not site_config.get('item_selector') or not data_selectors:
+        return None
+
+    item_selectors = []
+    for css in [site_config['item_selector']] + FALLBACK_ITEM_SELECTORS:
+        compiled = compile_selector(css)
+        if compiled is None:
+            return None
+        item_selectors.append(compiled)
+
+    fields: Dict[str, List[CompiledSelector]] = {}
+    for jp_key, selector in data_selectors.items():
+        compiled_variants = [compile_selector(css) for css in selector_variants(selector)]
+        if any(compiled is None for compiled in compiled_variants):
+            return None
+        fields[jp_key] = compiled_variants
+
+    return SiteExtractionPlan(site_name, item_selectors, fields)
+
+
+_plans: Dict[str, Optional[SiteExtractionPlan]] = {}
+
+
+def compile_extraction_plans(config: Dict[str, Any]) -> Dict[str, Optional[SiteExtractionPlan]]:
+    """config.yamlの全サイトのプランをまとめてコンパイル（設定読み込み時に1回だけ呼ぶ）"""
+    _plans.clear()
+    for site_config in config.get('sites', []) or []:
+        if isinstance(site_config, dict) and site_config.get('name'):
+            _plans[site_config['name']] = compile_site_plan(site_config)
+    compiled = sorted(name for name, plan in _plans.items() if plan is not None)
+    if compiled:
+        logging.debug(f"Compiled extraction plans: {', '.join(compiled)}")
+    return dict(_plans)
+
+
+def get_extraction_plan(site_config: Dict[str, Any]) -> Optional[SiteExtractionPlan]:
+    """サイトのコンパイル済みプランを取得（未コンパイルならその場でコンパイルして保持）"""
+    site_name = site_config.get('name', '')
+    if site_name not in _plans:
+        _plans[site_name] = compile_site_plan(site_config)
+    return _plans[site_name]
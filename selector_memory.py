@@ -0,0 +1,121 @@
+# selector_memory.py - サイトごとに「前回当たったセレクタ」を記録し、候補セレクタの総当たりを省略する
+import datetime
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+DEFAULT_MEMORY_PATH = 'selector_memory.json'
+
+
+class SelectorMemory:
+    """
+    サイト名＋用途（slot）ごとに、候補セレクタのうち最後に一致したものをJSONファイルに保存する。
+    次回はそのセレクタを最初に試し、一致しなくなったときだけ候補を総当たりする（＝サイト構造変更のサイン）。
+    どのページにも一致しやすい汎用の代替セレクタ（generic）は記録しない。メンテナンス画面などで一度だけ当たっても、
+    次回は設定・サイト固有のセレクタから順に試す。
+    """
+
+    def __init__(self, path: str = DEFAULT_MEMORY_PATH, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = self._load() if enabled else {}
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write selector memory {self.path}: {e}")
+
+    def remembered(self, site_name: str, slot: str) -> Optional[str]:
+        """記録済みのセレクタ（なければNone）"""
+        with self._lock:
+            return (self._entries.get(site_name, {}).get(slot) or {}).get('selector')
+
+    def remember(self, site_name: str, slot: str, selector: str) -> None:
+        """一致したセレクタを記録（変化があったときだけファイルに書き込む）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            site_entries = self._entries.setdefault(site_name, {})
+            if (site_entries.get(slot) or {}).get('selector') == selector:
+                return
+            site_entries[slot] = {
+                'selector': selector,
+                'updated_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self._save()
+
+    def find_first(self, site_name: str, slot: str, candidates: List[str], probe: Callable[[str], Any],
+                   accept: Callable[[Any], bool] = bool, generic: Collection[str] = ()) -> Tuple[Optional[str], Any]:
+        """
+        候補セレクタを記録済みのもの→残りの順に試し、最初にacceptを満たした(セレクタ, 結果)を返す。
+        どれも一致しなければ(None, None)。genericに含まれるセレクタは当たっても記録せず、記録済みでも先に試さない。
+        """
+        remembered = self.remembered(site_name, slot) if self.enabled else None
+        if remembered in generic:
+            remembered = None
+        if remembered in candidates:
+            result = probe(remembered)
+            if accept(result):
+                return remembered, result
+            logging.warning(f"🧩 {site_name} [{slot}]: remembered selector '{remembered}' no longer matches. "
+                            f"Site structure may have changed; trying all candidates")
+
+        for selector in candidates:
+            if selector == remembered or not selector:
+                continue
+            result = probe(selector)
+            if accept(result):
+                if selector in generic:
+                    logging.warning(f"🧩 {site_name} [{slot}]: only the generic fallback '{selector}' matched. "
+                                    f"Site structure may have changed (not remembered)")
+                    return selector, result
+                if remembered and remembered in candidates:
+                    logging.warning(f"🧩 {site_name} [{slot}]: new winning selector '{selector}' (was '{remembered}')")
+                self.remember(site_name, slot, selector)
+                return selector, result
+        return None, None
+
+
+_memory: Optional[SelectorMemory] = None
+_memory_lock = threading.Lock()
+
+
+def resolve_memory_path(config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    記録ファイルのパス（config.yamlのselector_memory.path）。相対パスは実行時のカレントディレクトリではなく
+    config.yamlのあるディレクトリ（load_configが設定するconfig_dir。なければ同梱のconfig.yamlと同じこのモジュールの場所）基準。
+    """
+    config = config or {}
+    path = (config.get('selector_memory', {}) or {}).get('path', DEFAULT_MEMORY_PATH)
+    if os.path.isabs(path):
+        return path
+    base_dir = config.get('config_dir') or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, path)
+
+
+def get_selector_memory(config: Optional[Dict[str, Any]] = None) -> SelectorMemory:
+    """共有のSelectorMemoryを取得（config.yamlのselector_memory設定を使用）"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            memory_config = (config or {}).get('selector_memory', {}) or {}
+            _memory = SelectorMemory(resolve_memory_path(config), memory_config.get('enabled', True))
+        return _memory
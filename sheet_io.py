@@ -0,0 +1,296 @@
+# sheet_io.py - スプレッドシートの見出し行（列構成）を記録し、必要な列だけを読み込み、書き込みはまとめて送る
+import datetime
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import requests
+from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1
+
+from rate_limit import TokenBucket, get_host_bucket
+
+DEFAULT_LAYOUT_PATH = 'sheet_layout.json'
+
+SHEETS_API_URL = 'https://sheets.googleapis.com'
+
+DEFAULT_WRITER_SETTINGS: Dict[str, Any] = {
+    'chunk_rows': 500,            # append_rows 1回あたりの最大行数
+    'requests_per_minute': 50,    # Sheets APIの書き込み上限（1ユーザー60回/分）より少し下に抑える
+    'burst': 5,                   # 連続して送ってよい回数
+    'max_retries': 5,             # 429・5xx・接続エラーの再試行回数
+    'backoff_base': 1.0,          # 再試行の待機時間（秒）。base×2^試行回数を上限にランダムに待つ
+    'backoff_max': 64.0,
+}
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# values.appendのレスポンスのupdatedRange（'シート1'!A101:K150）から先頭行を取り出す
+_UPDATED_RANGE_START_ROW = re.compile(r'![A-Z]+(\d+)')
+
+
+def sheet_key(spreadsheet_id: str, sheet_name: str) -> str:
+    """列構成の記録に使うキー（スプレッドシートID＋シート名）"""
+    return f"{spreadsheet_id}/{sheet_name}"
+
+
+class SheetLayoutCache:
+    """シートごとの見出し行をJSONファイルに保存し、実行のたびに見出し行を読み直すのを省く"""
+
+    def __init__(self, path: str = DEFAULT_LAYOUT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write sheet layout cache {self.path}: {e}")
+
+    def headers(self, key: str) -> Optional[List[str]]:
+        """記録済みの見出し行（なければNone）"""
+        with self._lock:
+            return (self._entries.get(key) or {}).get('headers')
+
+    def remember(self, key: str, headers: List[str]) -> None:
+        """見出し行を記録（変化があったときだけファイルに書き込む）"""
+        with self._lock:
+            if (self._entries.get(key) or {}).get('headers') == headers:
+                return
+            self._entries[key] = {
+                'headers': list(headers),
+                'updated_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self._save()
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+
+_cache: Optional[SheetLayoutCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_sheet_layout_cache(config: Optional[Dict[str, Any]] = None) -> SheetLayoutCache:
+    """共有のSheetLayoutCacheを取得（config.yamlのsheet_io.layout_path）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SheetLayoutCache(((config or {}).get('sheet_io', {}) or {}).get('layout_path', DEFAULT_LAYOUT_PATH))
+        return _cache
+
+
+def read_headers(worksheet, key: str, cache: SheetLayoutCache, refresh: bool = False) -> List[str]:
+    """見出し行を取得（記録済みならAPIを呼ばない。refresh=Trueでシートから読み直して記録し直す）"""
+    headers = None if refresh else cache.headers(key)
+    if headers is None:
+        headers = [str(value) for value in worksheet.row_values(1)]
+        if headers:
+            cache.remember(key, headers)
+        else:
+            cache.forget(key)
+    return headers
+
+
+def load_column_rows(worksheet, key: str, column_name: str, cache: SheetLayoutCache) -> Dict[str, int]:
+    """
+    見出しがcolumn_nameの列だけを読み込み、空でない値 -> 行番号（同じ値は最初の行）を返す（列がなければ空）。
+    列番号は記録済みの見出し行から求め、読み込んだ列の先頭が見出しと一致しなければ列が移動したとみなして1回だけ読み直す。
+    """
+    for refresh in (False, True):
+        headers = read_headers(worksheet, key, cache, refresh=refresh)
+        if column_name not in headers:
+            if refresh:
+                return {}
+            continue
+        values = worksheet.col_values(headers.index(column_name) + 1)
+        if values and str(values[0]) == column_name:
+            rows: Dict[str, int] = {}
+            for row, value in enumerate(values[1:], start=2):
+                if value not in (None, ''):
+                    rows.setdefault(str(value), row)
+            return rows
+        logging.info(f"Sheet layout for {key} changed; re-reading the header row")
+    return {}
+
+
+def load_column_ids(worksheet, key: str, column_name: str, cache: SheetLayoutCache) -> Set[str]:
+    """見出しがcolumn_nameの列だけを読み込み、空でない値の集合を返す（列がなければ空集合）"""
+    return set(load_column_rows(worksheet, key, column_name, cache))
+
+
+def get_writer_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """config.yamlのsheet_io.writer設定を取得（未設定の項目は既定値）"""
+    settings = dict(DEFAULT_WRITER_SETTINGS)
+    settings.update((((config or {}).get('sheet_io', {}) or {}).get('writer', {}) or {}))
+    return settings
+
+
+class AppendError(Exception):
+    """
+    append_rowsの途中のチャンクで失敗した。sheet_rowsはそれまでに書き込めた先頭からの行の行番号
+    （書き込めた行は再送しないよう、呼び出し側はこの分だけを書き込み済みにする）。
+    """
+
+    def __init__(self, sheet_rows: List[Optional[int]], cause: Exception):
+        super().__init__(f"appended {len(sheet_rows)} rows before failing: {cause}")
+        self.sheet_rows = sheet_rows
+        self.cause = cause
+
+
+def _retry_status(error: Exception) -> Optional[int]:
+    """再試行すべきエラーならステータスコード（接続エラーは0）、そうでなければNone"""
+    if isinstance(error, APIError):
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status if status in _RETRY_STATUS else None
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return 0
+    return None
+
+
+def _not_applied(error: Exception) -> bool:
+    """サーバーが処理していないことが確実なエラー（429、接続前のタイムアウト）。追記のように再送で重複する呼び出しはこれだけ再試行する"""
+    if isinstance(error, APIError):
+        return getattr(getattr(error, 'response', None), 'status_code', None) == 429
+    return isinstance(error, requests.exceptions.ConnectTimeout)
+
+
+class SheetWriter:
+    """
+    1つのワークシートへの書き込みを、記録済みの見出し行に合わせてまとめて送る。
+    API呼び出しはすべてSheets API共有のトークンバケットで間隔を空け、429・5xxはジッター付きの指数バックオフで再試行する。
+    """
+
+    def __init__(self, worksheet, key: str, cache: Optional[SheetLayoutCache] = None,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.worksheet = worksheet
+        self.key = key
+        self.cache = cache or get_sheet_layout_cache()
+        self.settings = dict(DEFAULT_WRITER_SETTINGS, **(settings or {}))
+        self._bucket: TokenBucket = get_host_bucket(
+            SHEETS_API_URL, self.settings['requests_per_minute'] / 60.0, self.settings['burst'])
+
+    def call(self, func: Callable[..., Any], *args, idempotent: bool = True, **kwargs) -> Any:
+        """
+        Sheets APIの呼び出しを上限内のペースで実行（一時的なエラーは再試行）。
+        idempotent=False（追記・行の挿入）はレスポンスが失われただけで処理済みの可能性がある5xx・通信エラーは再試行せず、
+        429など処理されていないことが確実なエラーだけ再試行する。
+        """
+        max_retries = self.settings['max_retries']
+        for attempt in range(max_retries + 1):
+            self._bucket.acquire()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                status = _retry_status(e)
+                if status is None or attempt == max_retries or (not idempotent and not _not_applied(e)):
+                    raise
+                delay = random.uniform(0, min(self.settings['backoff_max'],
+                                              self.settings['backoff_base'] * 2 ** attempt))
+                logging.warning(f"📄 Sheets API {'connection error' if status == 0 else status}; "
+                                f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+                time.sleep(delay)
+
+    def headers(self, refresh: bool = False) -> List[str]:
+        """見出し行（記録済みならAPIを呼ばない）"""
+        cached = None if refresh else self.cache.headers(self.key)
+        if cached is not None:
+            return cached
+        return self.call(read_headers, self.worksheet, self.key, self.cache, refresh=True)
+
+    def ensure_headers(self, default_headers: Sequence[str]) -> List[str]:
+        """見出し行を取得し、シートが空ならdefault_headersを書き込んでそれを返す"""
+        headers = self.headers()
+        if not headers:
+            headers = [str(header) for header in default_headers]
+            # gspread 5系と6系で位置引数の順序が違うのでキーワードで渡す
+            self.call(self.worksheet.update, range_name='A1', values=[headers], value_input_option='USER_ENTERED')
+            self.cache.remember(self.key, headers)
+        return headers
+
+    def insert_headers(self, headers: Sequence[str]) -> None:
+        """先頭に見出し行を挿入して記録し直す"""
+        headers = [str(header) for header in headers]
+        self.call(self.worksheet.insert_row, headers, 1, idempotent=False)
+        self.cache.remember(self.key, headers)
+
+    def append_rows(self, rows: Sequence[Sequence[Any]], value_input_option: str = 'RAW') -> List[Optional[int]]:
+        """
+        行をchunk_rows行ずつappend_rowsで追記し、各行が入った行番号（レスポンスから分からなければNone）を返す。
+        途中のチャンクで失敗したら、それまでに書き込めた行の行番号を持つAppendErrorを送出する。
+        """
+        chunk_rows = max(1, int(self.settings['chunk_rows']))
+        sheet_rows: List[Optional[int]] = []
+        for start in range(0, len(rows), chunk_rows):
+            chunk = [list(row) for row in rows[start:start + chunk_rows]]
+            try:
+                response = self.call(self.worksheet.append_rows, chunk, value_input_option=value_input_option,
+                                     idempotent=False)
+            except Exception as e:
+                raise AppendError(sheet_rows, e) from e
+            updated_range = ((response or {}).get('updates') or {}).get('updatedRange', '')
+            match = _UPDATED_RANGE_START_ROW.search(updated_range)
+            first_row = int(match.group(1)) if match else None
+            sheet_rows.extend(first_row + offset if first_row else None for offset in range(len(chunk)))
+        return sheet_rows
+
+    def update_cells(self, updates: Dict[str, Tuple[int, Dict[str, Any]]],
+                     key_column: str) -> Tuple[List[str], List[str]]:
+        """
+        updates（キー列の値 -> (行番号, 見出し -> 新しい値)）の変更セルだけをbatch_updateで書き込む。
+        書き込む前に各行のキー列を1回のbatch_getで確かめ、並べ替えや行の削除で行番号がずれていた行は書き換えない。
+        (書き込めたキー, 行がずれていたキー)を返す。
+        """
+        headers = self.headers()
+        if key_column not in headers:
+            return [], list(updates)
+        key_col = headers.index(key_column) + 1
+        targets = list(updates.items())
+        chunk_size = max(1, int(self.settings['chunk_rows']))
+
+        verified: List[Tuple[str, int, Dict[str, Any]]] = []
+        moved: List[str] = []
+        for start in range(0, len(targets), chunk_size):
+            chunk = targets[start:start + chunk_size]
+            found = self.call(self.worksheet.batch_get, [rowcol_to_a1(row, key_col) for _, (row, _) in chunk])
+            for (key, (row, cells)), value_range in zip(chunk, found):
+                value = value_range[0][0] if value_range and value_range[0] else ''
+                if str(value) == key:
+                    verified.append((key, row, cells))
+                else:
+                    moved.append(key)
+
+        data = [{'range': rowcol_to_a1(row, headers.index(name) + 1), 'values': [[value]]}
+                for _, row, cells in verified for name, value in cells.items() if name in headers]
+        for start in range(0, len(data), chunk_size):
+            self.call(self.worksheet.batch_update, data[start:start + chunk_size], value_input_option='USER_ENTERED')
+        return [key for key, _, _ in verified], moved
+
+    def append_records(self, records: Iterable[Any], default_headers: Sequence[str],
+                       value_input_option: str = 'USER_ENTERED') -> List[Optional[int]]:
+        """データクラスなどのレコードをシートの見出しの順に並べて追記（見出しにない属性は書かない）。各行の行番号を返す"""
+        headers = self.ensure_headers(default_headers)
+        rows = [[getattr(record, header, '') for header in headers] for record in records]
+        return self.append_rows(rows, value_input_option=value_input_option)
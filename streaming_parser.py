@@ -0,0 +1,176 @@
+# streaming_parser.py - 一覧ページをダウンロードしながらlxmlで逐次パースし、案件コンテナが閉じるたびに案件を取り出す
+import codecs
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar, Union
+
+from cssselect import HTMLTranslator, SelectorError
+from lxml import etree
+
+from http_client import get_http_client
+
+T = TypeVar('T')
+
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+DEFAULT_STREAMING_SETTINGS: Dict[str, Any] = {
+    'enabled': False,
+    'chunk_size': DEFAULT_CHUNK_SIZE,
+}
+
+_translator = HTMLTranslator()
+
+# 先頭チャンクの<meta charset="...">・<meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def get_streaming_settings(config: Dict[str, Any], site_name: str) -> Dict[str, Any]:
+    """config.yamlのstreaming設定（default＋サイト別上書き）を取得"""
+    streaming_config = config.get('streaming', {}) or {}
+    settings = dict(DEFAULT_STREAMING_SETTINGS)
+    settings.update(streaming_config.get('default', {}) or {})
+    settings.update((streaming_config.get('sites', {}) or {}).get(site_name, {}) or {})
+    return settings
+
+
+def sniff_meta_charset(head: bytes) -> Optional[str]:
+    """ページ先頭のmetaタグで宣言された文字コード（なければNone）"""
+    match = _META_CHARSET.search(head[:4096])
+    return match.group(1).decode('ascii') if match else None
+
+
+def compile_item_matcher(css: str) -> Callable[[Any], bool]:
+    """
+    アイテムセレクタを「この要素自身が一致するか」の判定関数にする。
+    ストリーミングでは要素が閉じた時点で判定するため、子孫結合子を含まない単純なセレクタのみ対応。
+    """
+    outer = re.sub(r'\[[^\]]*\]|\([^)]*\)', '', css.strip())
+    if any(combinator in outer for combinator in (' ', '>', '+', '~', ',')):
+        raise ValueError(f"Streaming item selector must be a simple selector: '{css}'")
+    try:
+        xpath = etree.XPath(_translator.css_to_xpath(css, prefix='self::'))
+    except (SelectorError, etree.XPathError) as e:
+        raise ValueError(f"Selector '{css}' could not be compiled to XPath: {e}") from e
+    return lambda element: bool(xpath(element))
+
+
+class StreamingListParser:
+    """
+    レスポンスのチャンクをfeed()で受け取り、アイテムセレクタに一致する要素が閉じるたびにextract(要素)の結果を返す。
+    取り出し済みの要素と、それより前の兄弟要素は破棄するため、保持するのはほぼ1件分のツリーだけになる。
+    """
+
+    def __init__(self, item_selector: str, extract: Callable[[Any], Optional[T]],
+                 encoding: Optional[str] = None, default_encoding: str = 'utf-8'):
+        self.item_selector = item_selector
+        self.extract = extract
+        self.encoding = encoding
+        self.default_encoding = default_encoding
+        self._matches = compile_item_matcher(item_selector)
+        self._parser = None
+        self._open_items: List[Any] = []  # 開いている一致要素（入れ子の内側は外側が閉じるまで破棄しない）
+        self.items_seen = 0
+        self.items_emitted = 0
+
+    def feed(self, chunk: Union[bytes, str]) -> List[T]:
+        """チャンクを追加し、このチャンクで閉じたアイテムの抽出結果を返す"""
+        self._ensure_parser(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[T]:
+        """入力の終わりを通知し、残りのアイテムを返す"""
+        self._ensure_parser(b'')
+        self._parser.close()
+        return self._drain()
+
+    def _ensure_parser(self, first_chunk: Union[bytes, str]) -> None:
+        """
+        最初のチャンクでパーサーを作る。文字コードはヘッダーのcharset > 先頭のmetaタグ > default_encoding の順
+        （何も指定しないとlibxml2はLatin-1とみなすため、ページ全体を読む経路のresponse.textと同じくUTF-8を既定にする）
+        """
+        if self._parser is not None:
+            return
+        if not isinstance(first_chunk, bytes):
+            self._parser = etree.HTMLPullParser(events=('start', 'end'))
+            return
+        declared = self.encoding or sniff_meta_charset(first_chunk)
+        candidates = [declared] if declared else []
+        if declared:
+            try:
+                # libxml2が知らない別名（Windows-31Jなど）はPythonの正規名（cp932）で試す
+                candidates.append(codecs.lookup(declared).name)
+            except LookupError:
+                pass
+        candidates.append(self.default_encoding)
+        for encoding in candidates:
+            try:
+                self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+                return
+            except LookupError:
+                continue
+        logging.warning(f"Unknown encodings {candidates} for streamed page; falling back to UTF-8")
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding='utf-8')
+
+    def _drain(self) -> List[T]:
+        results = []
+        for event, element in self._parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+            if event == 'start':
+                if self._matches(element):
+                    self._open_items.append(element)
+                continue
+            if not self._open_items or element is not self._open_items[-1]:
+                continue
+            self._open_items.pop()
+            self.items_seen += 1
+            try:
+                item = self.extract(element)
+            except Exception as e:
+                logging.error(f"Error extracting streamed item ({self.item_selector}): {e}")
+                item = None
+            if item is not None:
+                self.items_emitted += 1
+                results.append(item)
+            if not self._open_items:
+                self._discard(element)
+        return results
+
+    @staticmethod
+    def _discard(element) -> None:
+        """取り出し済みの要素と、それより前の兄弟要素を解放"""
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def stream_list_items(url: str, item_selector: str, extract: Callable[[Any], Optional[T]],
+                      config: Optional[Dict[str, Any]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      headers: Optional[Dict[str, str]] = None) -> Iterator[T]:
+    """
+    共有HTTPクライアントで一覧ページをストリーミング取得し、案件を取り出せた順にyieldする。
+    ページ全体のダウンロードを待たずに重複除外などの後続処理を始められる。
+    """
+    started = time.perf_counter()
+    first_item_at = None
+    with get_http_client(config).stream(url, headers=headers) as response:
+        response.raise_for_status()
+        # 文字コードはヘッダー優先、なければ先頭チャンクのmetaタグ、それもなければresponse.textと同じ既定値
+        parser = StreamingListParser(item_selector, extract, encoding=response.charset_encoding,
+                                     default_encoding=response.encoding or 'utf-8')
+        for chunk in response.iter_bytes(chunk_size):
+            for item in parser.feed(chunk):
+                if first_item_at is None:
+                    first_item_at = time.perf_counter() - started
+                yield item
+        for item in parser.close():
+            if first_item_at is None:
+                first_item_at = time.perf_counter() - started
+            yield item
+    if first_item_at is not None:
+        logging.debug(f"Streamed {parser.items_emitted}/{parser.items_seen} items from {url} "
+                      f"(first item after {first_item_at * 1000:.0f} ms, total {(time.perf_counter() - started) * 1000:.0f} ms)")
@@ -0,0 +1,76 @@
+# test_amount_parser.py - 金額解析エンジン（amount_parser）と従来の各サイト別実装の判定が既知の差分以外で一致することを確認
+import pytest
+
+from amount_parser import amount_range, amount_to_yen, parse_amount
+from amount_fixtures import CASES, KNOWN_DIFFERENCES, legacy_ondeck_parse_amount, meets_condition
+
+PAIRS = [(key, text, legacy, new, decide) for key, _, legacy, new, decide, corpus in CASES for text in corpus]
+
+
+@pytest.mark.parametrize('key, text, legacy, new, decide', PAIRS,
+                         ids=[f"{key}:{text or '(empty)'}" for key, text, *_ in PAIRS])
+def test_decision_matches_legacy(key, text, legacy, new, decide):
+    legacy_decision, new_decision = decide(legacy(text)), decide(new(text))
+    if (key, text) in KNOWN_DIFFERENCES:
+        assert legacy_decision != new_decision, f"既知の差分に登録されているが判定が一致: {KNOWN_DIFFERENCES[(key, text)]}"
+    else:
+        assert legacy_decision == new_decision, f"legacy={legacy(text)!r} new={new(text)!r}"
+
+
+def test_known_differences_are_in_corpus():
+    covered = {(key, text) for key, text, *_ in PAIRS}
+    assert set(KNOWN_DIFFERENCES) <= covered
+
+
+def test_katakana_after_amount_is_not_a_range():
+    assert amount_range('3,000万円 ※オーナー報酬調整後') == (30_000_000, 30_000_000)
+    assert not meets_condition(amount_range('3,000万円 ※オーナー報酬調整後'), 300_000_000)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1億円ー2億円', (100_000_000, 200_000_000)),
+    ('５ー１０億円', (500_000_000, 1_000_000_000)),
+    ('1億円 ー 2億円', (100_000_000, 200_000_000)),
+])
+def test_long_vowel_between_amounts_is_a_separator(text, expected):
+    assert amount_range(text) == expected
+
+
+def test_trailing_separator_is_open_ended():
+    parsed = parse_amount('3億円～')
+    assert parsed.open_upper and parsed.min == 300_000_000 and parsed.max is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('3億円（別途協議）', (300_000_000, 300_000_000)),
+    ('5億円（その他事業含む）', (500_000_000, 500_000_000)),
+    ('約5億円 ※赤字部門あり', (500_000_000, 500_000_000)),
+])
+def test_keywords_inside_notes_do_not_hide_the_amount(text, expected):
+    assert not parse_amount(text).undisclosed
+    assert amount_range(text) == expected
+
+
+def test_site_keywords_are_opt_in():
+    assert not parse_amount('3億円 その他').undisclosed
+    assert amount_range('3億円 その他', undisclosed_keywords=('別途', 'その他')) == (0, 0)
+    assert amount_range('別途協議', undisclosed_keywords=('別途', 'その他')) == (0, 0)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1億円 2億円', (100_000_000, 100_000_000)),
+    ('年商10億円、営業利益1億円', (1_000_000_000, 1_000_000_000)),
+    ('2023年3月期 5億円', (500_000_000, 500_000_000)),
+])
+def test_separate_amounts_and_dates_are_not_summed(text, expected):
+    assert amount_range(text) == expected
+
+
+def test_fiscal_year_prefix_matches_legacy_ondeck():
+    text = '2023年3月期 5億円'
+    assert amount_to_yen(text, 'upper') == legacy_ondeck_parse_amount(text) == 500_000_000
+
+
+def test_decreasing_units_are_still_combined():
+    assert amount_range('1億2,000万円') == (120_000_000, 120_000_000)
+    assert amount_range('2億5000') == (250_000_000, 250_000_000)
@@ -0,0 +1,34 @@
+# test_rate_limit.py - ホスト単位のトークンバケットを異なるペースで共有したときの挙動を確認
+import pytest
+
+import rate_limit
+from rate_limit import TokenBucket, get_host_bucket
+
+
+@pytest.fixture(autouse=True)
+def fresh_buckets(monkeypatch):
+    monkeypatch.setattr(rate_limit, '_buckets', {})
+
+
+def test_stricter_caller_tightens_shared_bucket():
+    loose = get_host_bucket('https://sheets.googleapis.com/v4/spreadsheets', rate=5.0, burst=10)
+    strict = get_host_bucket('https://sheets.googleapis.com', rate=50 / 60.0, burst=2)
+    assert strict is loose
+    assert loose.rate == pytest.approx(50 / 60.0) and loose.capacity == 2
+    assert loose.try_acquire() and loose.try_acquire() and not loose.try_acquire()
+
+
+def test_looser_caller_does_not_relax_shared_bucket():
+    strict = get_host_bucket('https://example.com/a', rate=0.5, burst=1)
+    loose = get_host_bucket('https://example.com/b', rate=10.0, burst=5)
+    assert loose is strict
+    assert strict.rate == 0.5 and strict.capacity == 1
+
+
+def test_hosts_have_separate_buckets():
+    assert get_host_bucket('https://a.example.com', 1.0) is not get_host_bucket('https://b.example.com', 1.0)
+
+
+def test_tighten_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(1.0).tighten(0)
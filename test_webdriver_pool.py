@@ -0,0 +1,86 @@
+# test_webdriver_pool.py - WebDriverPoolの貸し出し待ち・ヘッドレス指定ごとのプールを確認（Chromeは起動せずダミーのドライバーを使う）
+import threading
+
+import pytest
+
+import webdriver_pool
+from webdriver_pool import WebDriverPool, close_webdriver_pool, get_webdriver_pool
+
+
+class FakeDriver:
+    def __init__(self, headless):
+        self.headless = headless
+        self.alive = True
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        return 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.alive = False
+
+
+def test_waiter_wakes_when_a_driver_is_discarded():
+    pool = WebDriverPool(size=1, max_uses=1, driver_factory=FakeDriver, acquire_timeout=5)
+    got = []
+
+    def borrow():
+        with pool.checkout() as driver:
+            got.append(driver.alive)
+
+    with pool.checkout():
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+    # max_uses=1なので返却時に破棄され、待っていたスレッドは新しいブラウザを起動できる
+    waiter.join(5)
+    assert not waiter.is_alive() and got == [True]
+    pool.close_all()
+
+
+def test_nested_checkout_in_one_thread_does_not_hang():
+    pool = WebDriverPool(size=1, driver_factory=FakeDriver, acquire_timeout=5)
+    with pool.checkout() as outer:
+        with pool.checkout() as inner:
+            assert inner is not outer
+        assert not inner.alive
+    with pool.checkout() as again:
+        assert again is outer
+    pool.close_all()
+
+
+def test_waiter_times_out_instead_of_hanging():
+    pool = WebDriverPool(size=1, driver_factory=FakeDriver, acquire_timeout=0.1)
+    errors = []
+
+    def borrow():
+        try:
+            with pool.checkout():
+                pass
+        except TimeoutError as e:
+            errors.append(e)
+
+    with pool.checkout():
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        waiter.join(5)
+    assert errors
+    pool.close_all()
+
+
+def test_pools_are_keyed_by_headless_mode(monkeypatch):
+    monkeypatch.setattr(webdriver_pool, 'create_chrome_driver', FakeDriver)
+    config = {'debug': {'headless_mode': True}}
+    try:
+        assert get_webdriver_pool(config).headless is True
+        visible = get_webdriver_pool(config, headless=False)
+        assert visible.headless is False and visible is not get_webdriver_pool(config)
+        with visible.checkout() as driver:
+            assert driver.headless is False
+    finally:
+        close_webdriver_pool()
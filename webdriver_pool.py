@@ -0,0 +1,237 @@
+# webdriver_pool.py - 起動済みChromeを使い回すWebDriverプール
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from driver_resolver import resolve_chromedriver_path
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def build_chrome_options(headless: bool = True, user_agent: str = DEFAULT_USER_AGENT,
+                         performance_log: bool = False) -> Options:
+    """ブロック対策込みのChromeオプションを生成（performance_log=TrueならDevToolsの通信ログを記録）"""
+    chrome_options = Options()
+
+    if headless:
+        chrome_options.add_argument("--headless")
+
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920x1080")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument(f"--user-agent={user_agent}")
+    if performance_log:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
+
+def create_chrome_driver(headless: bool = True, performance_log: bool = False) -> webdriver.Chrome:
+    """Chromeを起動し、自動化検出回避スクリプトを適用したWebDriverを返す"""
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()),
+                              options=build_chrome_options(headless, performance_log=performance_log))
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+@contextmanager
+def performance_logging_driver(headless: bool = True) -> Iterator[webdriver.Chrome]:
+    """
+    通信ログ（driver.get_log('performance')）を記録する使い捨てのChrome。
+    ログの記録は負荷がかかるため、プールのブラウザとは別に必要なときだけ起動する。
+    """
+    logging.info("Starting a Chrome instance with performance logging...")
+    driver = create_chrome_driver(headless, performance_log=True)
+    try:
+        yield driver
+    finally:
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.error(f"Error closing WebDriver: {e}")
+
+
+class _PooledDriver:
+    """プール内のWebDriverと利用回数（overflowは満杯時に同じスレッドが追加で借りた一時的なブラウザ）"""
+
+    def __init__(self, driver: webdriver.Chrome, overflow: bool = False):
+        self.driver = driver
+        self.uses = 0
+        self.overflow = overflow
+
+
+class WebDriverPool:
+    """N台のChromeを起動したまま保持し、貸し出し・返却・ヘルスチェック・再起動を行う"""
+
+    def __init__(self, size: int = 1, headless: bool = True, max_uses: int = 50,
+                 driver_factory: Optional[Callable[[bool], webdriver.Chrome]] = None,
+                 acquire_timeout: Optional[float] = 300):
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory or create_chrome_driver
+        self._idle: List[_PooledDriver] = []
+        self._all: List[_PooledDriver] = []
+        self._launched = 0
+        self._lock = threading.Lock()
+        # 返却・破棄・終了のたびに待機中の借り手を起こす（_launched・_idleはこのロックで保護）
+        self._available = threading.Condition(self._lock)
+        self._held = threading.local()
+        self._closed = False
+
+    def _launch(self, overflow: bool = False) -> _PooledDriver:
+        logging.info("Initializing Selenium WebDriver for pool...")
+        pooled = _PooledDriver(self.driver_factory(self.headless), overflow)
+        with self._lock:
+            self._all.append(pooled)
+        if overflow:
+            logging.info("✅ Temporary WebDriver started (pool exhausted by this thread)")
+        else:
+            logging.info(f"✅ WebDriver started ({self._launched}/{self.size} in pool)")
+        return pooled
+
+    def _quit(self, pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.error(f"Error closing WebDriver: {e}")
+        with self._available:
+            if pooled in self._all:
+                self._all.remove(pooled)
+                if not pooled.overflow:
+                    self._launched -= 1
+                    # 空いた枠で待機中の借り手が新しいブラウザを起動できるようにする
+                    self._available.notify()
+
+    @staticmethod
+    def is_healthy(driver: webdriver.Chrome) -> bool:
+        """ブラウザセッションが応答するか確認"""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _held_count(self) -> int:
+        return getattr(self._held, 'count', 0)
+
+    def _acquire(self) -> _PooledDriver:
+        overflow = False
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("WebDriverPool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._launched < self.size:
+                    self._launched += 1
+                    break
+                if self._held_count():
+                    # 満杯のプールを自分で借りているスレッドが待つと返却されずに止まるため、一時的なブラウザを起動する
+                    overflow = True
+                    break
+                if not self._available.wait(self.acquire_timeout):
+                    raise TimeoutError(f"No WebDriver became available within {self.acquire_timeout}s")
+        try:
+            return self._launch(overflow)
+        except Exception:
+            if not overflow:
+                with self._available:
+                    self._launched -= 1
+                    self._available.notify()
+            raise
+
+    def _release(self, pooled: _PooledDriver) -> None:
+        pooled.uses += 1
+        if self._closed or pooled.overflow:
+            self._quit(pooled)
+            return
+        if pooled.uses >= self.max_uses:
+            logging.info(f"♻️ Recycling WebDriver after {pooled.uses} checkouts")
+            self._quit(pooled)
+            return
+        if not self.is_healthy(pooled.driver):
+            logging.warning("⚠️ WebDriver failed health check. Discarding it")
+            self._quit(pooled)
+            return
+        try:
+            # 次の利用者に前のページ状態を持ち越さない
+            pooled.driver.get("about:blank")
+        except Exception:
+            self._quit(pooled)
+            return
+        with self._available:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._idle.append(pooled)
+                self._available.notify()
+        if closed:
+            self._quit(pooled)
+
+    @contextmanager
+    def checkout(self) -> Iterator[webdriver.Chrome]:
+        """WebDriverを借り出し、ブロック終了時にプールへ返却する"""
+        pooled = self._acquire()
+        if not self.is_healthy(pooled.driver):
+            logging.warning("⚠️ Idle WebDriver is unresponsive. Restarting it")
+            self._quit(pooled)
+            pooled = self._acquire()
+        self._held.count = self._held_count() + 1
+        try:
+            yield pooled.driver
+        finally:
+            self._held.count -= 1
+            self._release(pooled)
+
+    def close_all(self) -> None:
+        """プール内の全ブラウザを終了（待機中の借り手にはRuntimeErrorを返す）"""
+        with self._available:
+            self._closed = True
+            drivers = list(self._all)
+            self._idle.clear()
+            self._available.notify_all()
+        for pooled in drivers:
+            self._quit(pooled)
+        if drivers:
+            logging.info(f"WebDriver pool closed ({len(drivers)} browsers)")
+
+
+# ヘッドレス指定ごとのプール（画面表示ありで借りたい呼び出し元にヘッドレスのブラウザを渡さない）
+_shared_pools: Dict[bool, WebDriverPool] = {}
+_shared_pool_lock = threading.Lock()
+
+
+def get_webdriver_pool(config: Optional[Dict[str, Any]] = None,
+                       headless: Optional[bool] = None) -> WebDriverPool:
+    """実行全体で共有するWebDriverPoolを取得（headless省略時はdebug.headless_modeに従う）"""
+    config = config or {}
+    if headless is None:
+        headless = config.get('debug', {}).get('headless_mode', True)
+    with _shared_pool_lock:
+        if headless not in _shared_pools:
+            pool_config = config.get('webdriver_pool', {}) or {}
+            _shared_pools[headless] = WebDriverPool(
+                size=pool_config.get('size', 1),
+                headless=headless,
+                max_uses=pool_config.get('max_uses', 50),
+                acquire_timeout=pool_config.get('acquire_timeout', 300),
+            )
+        return _shared_pools[headless]
+
+
+def close_webdriver_pool() -> None:
+    """共有WebDriverPoolの全ブラウザを終了（実行終了時に呼び出す）"""
+    with _shared_pool_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close_all()
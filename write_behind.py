@@ -0,0 +1,94 @@
+# write_behind.py - サイトごとに整形済みの案件をキューで受け取り、スクレイピングと並行してまとめて書き込む
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+DEFAULT_WRITE_BEHIND_SETTINGS: Dict[str, Any] = {
+    'batch_size': 50,        # この件数たまったら書き込む
+    'flush_interval': 30.0,  # 最初の1件が届いてからこの秒数たったら件数に関係なく書き込む
+}
+
+_STOP = object()
+
+
+def get_write_behind_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """config.yamlのwrite_behind設定を取得（未設定の項目は既定値）"""
+    settings = dict(DEFAULT_WRITE_BEHIND_SETTINGS)
+    settings.update((config or {}).get('write_behind', {}) or {})
+    return settings
+
+
+class WriteBehindSink(Generic[T]):
+    """
+    push()された項目をバックグラウンドのスレッドでbatch_size件ごと、またはflush_interval秒ごとにflushへ渡す。
+    flushは成功ならTrueを返す。close()で残りを書き込んでからスレッドを止める。
+    """
+
+    def __init__(self, flush: Callable[[List[T]], bool], batch_size: int = 50, flush_interval: float = 30.0,
+                 name: str = 'write-behind'):
+        self._flush = flush
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.written = 0
+        self.failed = 0
+        self._queue: 'queue.Queue[Any]' = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def push(self, items: Iterable[T]) -> None:
+        """書き込む項目をキューに追加（すぐに戻る）"""
+        if self._closed:
+            raise RuntimeError("write-behind sink is already closed")
+        for item in items:
+            self._queue.put(item)
+
+    def _write(self, batch: List[T]) -> None:
+        try:
+            ok = self._flush(batch)
+        except Exception as e:
+            logging.error(f"✍️ Write-behind flush of {len(batch)} items failed: {e}")
+            ok = False
+        if ok:
+            self.written += len(batch)
+        else:
+            self.failed += len(batch)
+
+    def _run(self) -> None:
+        batch: List[T] = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            else:
+                if item is _STOP:
+                    if batch:
+                        self._write(batch)
+                    return
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+
+    def close(self) -> None:
+        """キューに残った項目を書き込んでから終了（2回目以降は何もしない）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> 'WriteBehindSink[T]':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()